@@ -7,6 +7,7 @@ from BASE_components.BASE_character import BaseCharacter
 from BASE_components.BASE_platform import BasePlatform
 from BASE_components.BASE_ui import BaseUI
 from BASE_components.BASE_projectile import BaseProjectile
+from BASE_files.BASE_profiler import tick_profiler
 from GameFolder.weapons.Pistol import Pistol
 
 
@@ -147,17 +148,24 @@ class Arena:
 
                 
     def _update_simulation(self, delta_time: float):
-        """Run one tick of physics simulation."""
-        self.manage_weapon_spawns(delta_time)
-        self.manage_ammo_spawns(delta_time)
-        self.handle_respawns(delta_time)
-        self.check_winner()
-        
-        for char in self.characters:
-            char.update(delta_time, self.platforms, self.height, self.width)
-        
-        self.update_projectiles(delta_time)
-        self.handle_collisions(delta_time)
+        """Run one tick of physics simulation (each phase timed by the tick profiler when enabled)."""
+        profiler = tick_profiler
+        with profiler.phase('spawns'):
+            self.manage_weapon_spawns(delta_time)
+            self.manage_ammo_spawns(delta_time)
+        with profiler.phase('respawns'):
+            self.handle_respawns(delta_time)
+        with profiler.phase('winner_check'):
+            self.check_winner()
+
+        with profiler.phase('characters'):
+            for char in self.characters:
+                char.update(delta_time, self.platforms, self.height, self.width)
+
+        with profiler.phase('projectiles'):
+            self.update_projectiles(delta_time)
+        with profiler.phase('collisions'):
+            self.handle_collisions(delta_time)
 
 
 
@@ -0,0 +1,96 @@
+import math
+import pygame
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+
+class EffectSheet:
+    """
+    Pre-rendered animation cycle of a procedural effect.
+    Each frame is a surface; the anchor is the pixel inside a frame that maps
+    to the effect's on-screen position (e.g. the tornado base or black hole center).
+    """
+
+    def __init__(self, frames: List[pygame.Surface], anchor: Tuple[int, int]):
+        self.frames = frames
+        self.anchor = anchor
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+    def frame_index(self, phase: float) -> int:
+        """Map an animation phase in [0, 1) (wrapped) to a frame index."""
+        return int((phase % 1.0) * len(self.frames)) % len(self.frames)
+
+    def blit(self, screen: pygame.Surface, index: int, position: Tuple[float, float], area: Optional[pygame.Rect] = None):
+        """Blit one frame so that its anchor lands on the given screen position."""
+        frame = self.frames[index % len(self.frames)]
+        screen.blit(frame, (int(position[0]) - self.anchor[0], int(position[1]) - self.anchor[1]), area)
+
+
+# Sprite sheets keyed by (effect class, key). Bounded so code reloads and many
+# size buckets cannot grow it forever; least recently used sheets are dropped first.
+MAX_CACHED_SHEETS = 64
+_sheet_cache: "OrderedDict[tuple, EffectSheet]" = OrderedDict()
+
+# Colorkey used for sparse, fully opaque effects (RLE-accelerated blits are much
+# cheaper than per-pixel alpha for mostly empty frames).
+EFFECT_COLORKEY = (255, 0, 255)
+
+
+def size_bucket(value: float, step: int = 10) -> int:
+    """Round a size up to its bucket so nearby sizes share one sheet."""
+    return max(step, int(math.ceil(value / step)) * step)
+
+
+def get_effect_sheet(owner_class: type, key: tuple, size: Tuple[int, int], anchor: Tuple[int, int],
+                     frame_count: int, render_frame: Callable[[pygame.Surface, int], None],
+                     use_alpha: bool = False) -> EffectSheet:
+    """
+    Return the baked sheet for an effect, rendering it on first use.
+
+    Args:
+        owner_class: Class that owns the effect (part of the cache key, so reloaded code re-bakes)
+        key: Size bucket and any other parameters that change the look of the effect
+        size: (width, height) of every frame
+        anchor: Pixel inside a frame that corresponds to the effect's position
+        frame_count: Number of frames in one animation cycle
+        render_frame: Callback drawing frame `index` onto a blank frame surface
+        use_alpha: Bake with per-pixel alpha instead of an RLE colorkey
+
+    Returns:
+        EffectSheet with `frame_count` frames
+    """
+    cache_key = (owner_class, key)
+    sheet = _sheet_cache.get(cache_key)
+    if sheet is not None:
+        _sheet_cache.move_to_end(cache_key)
+        return sheet
+
+    frames = []
+    for index in range(frame_count):
+        if use_alpha:
+            frame = pygame.Surface(size, pygame.SRCALPHA)
+            frame.fill((0, 0, 0, 0))
+        else:
+            frame = pygame.Surface(size)
+            frame.fill(EFFECT_COLORKEY)
+        render_frame(frame, index)
+        if not use_alpha:
+            frame.set_colorkey(EFFECT_COLORKEY, pygame.RLEACCEL)
+        # Match the display pixel format when there is one, so blits need no conversion
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            frame = frame.convert_alpha() if use_alpha else frame.convert()
+        frames.append(frame)
+
+    sheet = EffectSheet(frames, anchor)
+    _sheet_cache[cache_key] = sheet
+    while len(_sheet_cache) > MAX_CACHED_SHEETS:
+        _sheet_cache.popitem(last=False)
+    return sheet
+
+
+def clear_effect_cache():
+    """Drop all baked sheets (e.g. after the display format changed)."""
+    _sheet_cache.clear()
@@ -0,0 +1,106 @@
+"""
+Shared helpers for the tests in GameFolder/tests/ and tests/.
+
+The test runner (BASE_tests.py) only collects test functions that take no
+arguments, so tests cannot rely on pytest fixtures: they use these context
+managers instead, which work the same under pytest and under the runner.
+
+Usage:
+    from BASE_components.BASE_test_helpers import free_port, patched, temporary_directory
+
+    def test_something():
+        with temporary_directory() as tmp_path, patched(module, "LIMIT", 3):
+            ...
+"""
+
+import os
+import shutil
+import socket
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+_MISSING = object()
+
+
+def free_port() -> int:
+    """A TCP port on 127.0.0.1 that nothing is listening on right now."""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+@contextmanager
+def temporary_directory() -> Iterator[Path]:
+    """A fresh directory, removed with everything in it afterwards."""
+    path = Path(tempfile.mkdtemp(prefix="cc_test_"))
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def patched(target, name: str, value):
+    """Set target.name to value, restoring the previous value (or its absence) afterwards."""
+    # Only what target itself defines is restored: an inherited attribute stays inherited
+    previous = vars(target).get(name, _MISSING) if hasattr(target, "__dict__") else getattr(target, name, _MISSING)
+    setattr(target, name, value)
+    try:
+        yield value
+    finally:
+        if previous is _MISSING:
+            delattr(target, name)
+        else:
+            setattr(target, name, previous)
+
+
+@contextmanager
+def environment(**values: Optional[str]):
+    """Set environment variables (None removes one), restoring the previous environment afterwards."""
+    previous = {name: os.environ.get(name) for name in values}
+    try:
+        for name, value in values.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@contextmanager
+def working_directory(path):
+    """Run the block with `path` as the current directory."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+@contextmanager
+def restored_game_modules():
+    """
+    Put GameFolder back the way the block found it: modules imported inside it are dropped, and
+    modules reloaded in place get their previous namespace (and so their previous classes) back.
+    """
+    saved = {name: (module, dict(module.__dict__)) for name, module in list(sys.modules.items())
+             if name.startswith("GameFolder") and module is not None}
+    try:
+        yield
+    finally:
+        for name in [name for name in sys.modules if name.startswith("GameFolder") and name not in saved]:
+            del sys.modules[name]
+        for name, (module, namespace) in saved.items():
+            module.__dict__.clear()
+            module.__dict__.update(namespace)
+            sys.modules[name] = module
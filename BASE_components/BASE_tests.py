@@ -24,6 +24,7 @@ from typing import List, Callable, Optional, Type, Any
 from dataclasses import dataclass, field
 from coding.non_callable_tools.helpers import clear_python_cache
 from coding.non_callable_tools.action_logger import action_logger
+from BASE_files.BASE_metrics import observe_duration
 # Set up headless mode for automated testing (only when run directly)
 import pygame
 
@@ -929,6 +930,7 @@ def run_all_tests(
 
     time.sleep(1)
 
+    run_started = time.perf_counter()
     runner = TestRunner()
     runner.setup_pygame_headless()
 
@@ -1090,7 +1092,9 @@ def run_all_tests(
     
     if verbose:
         print("\n" + combined_suite.get_summary())
-    
+
+    observe_duration('test_run_seconds', time.perf_counter() - run_started,
+                     result='passed' if combined_suite.all_passed else 'failed')
     return combined_suite
 
 
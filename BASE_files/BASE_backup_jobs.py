@@ -0,0 +1,81 @@
+"""
+CPU-heavy backup jobs run in the server's worker process (see BASE_workers).
+
+Each job builds the backup in a hidden staging directory inside backup_dir,
+checks that its directory hash equals the backup name and only then moves it
+into place, so a half-extracted or corrupt backup is never visible. The input
+file (archive or delta) is deleted when the job ends. Jobs only return
+results; logging and client notifications happen in the server's callbacks.
+"""
+
+import os
+import pickle
+import shutil
+import tarfile
+from typing import Tuple
+
+from BASE_files.BASE_delta_sync import reconstruct_backup, delta_stats
+from coding.non_callable_tools.backup_handling import BackupHandler
+
+
+def _publish(staging_path: str, backup_dir: str, backup_name: str) -> Tuple[bool, str]:
+    """Verify a staged backup against its name and move it into place."""
+    computed_hash = BackupHandler(backup_dir).compute_directory_hash(staging_path)
+    if computed_hash != backup_name:
+        return False, f"Hash verification failed: expected {backup_name}, got {computed_hash}"
+    final_path = os.path.join(backup_dir, backup_name)
+    if not os.path.exists(final_path):
+        os.replace(staging_path, final_path)
+    return True, ''
+
+
+def extract_backup_archive(archive_path: str, backup_dir: str, backup_name: str) -> Tuple[bool, str]:
+    """
+    Extract a backup tar.gz sent by a client (top-level entry named after the backup).
+
+    Returns:
+        (success, error)
+    """
+    staging_dir = os.path.join(backup_dir, f".{backup_name}.extract")
+    try:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+        with tarfile.open(archive_path, mode='r:gz') as tar:
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(path=staging_dir, filter='data')  # Rejects absolute paths, '..' and device files
+            else:
+                tar.extractall(path=staging_dir)
+        extracted_path = os.path.join(staging_dir, backup_name)
+        if not os.path.isdir(extracted_path):
+            return False, f"Archive does not contain '{backup_name}'"
+        return _publish(extracted_path, backup_dir, backup_name)
+    except (OSError, tarfile.TarError) as e:
+        return False, str(e)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+
+
+def rebuild_backup_from_delta(delta_path: str, backup_dir: str, basis_name: str,
+                              backup_name: str) -> Tuple[bool, str, Tuple[int, int]]:
+    """
+    Rebuild a backup from a delta against the basis backup `basis_name`.
+
+    Returns:
+        (success, error, (changed files, new bytes))
+    """
+    staging_path = os.path.join(backup_dir, f".{backup_name}.partial")
+    try:
+        with open(delta_path, 'rb') as f:
+            delta = pickle.load(f)
+        shutil.rmtree(staging_path, ignore_errors=True)
+        reconstruct_backup(delta, os.path.join(backup_dir, basis_name), staging_path)
+        success, error = _publish(staging_path, backup_dir, backup_name)
+        return success, error, delta_stats(delta)
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError) as e:
+        return False, str(e), (0, 0)
+    finally:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        if os.path.exists(delta_path):
+            os.remove(delta_path)
@@ -0,0 +1,135 @@
+"""
+Optional unreliable datagram (UDP) channel for game_state and input traffic.
+
+TCP stays the control channel: lobby messages, file sync, patches and backups
+never use UDP. After a player registers, the server issues a random session
+token over TCP ('udp_offer'). The client sends HELLO datagrams carrying that
+token to the server's UDP port (same port number as TCP); the token binds the
+datagram address to the player. From then on the server sends game_state as
+sequenced datagrams and the client sends its binary input packets the same
+way. A lost datagram only loses that one state, later ones are not held back
+behind it (no head-of-line blocking), and stale or duplicated states that
+arrive out of order are dropped by sequence number.
+
+If nothing arrives over UDP for UDP_FALLBACK_TIMEOUT seconds (firewall, NAT,
+server without UDP), the client reports 'udp_disable' over TCP and both sides
+continue TCP-only. States too large for one datagram are sent over TCP.
+
+Datagram layout:
+    DATAGRAM_MAGIC (1 byte) | token (8 bytes) | sequence (uint32) | kind (1 byte) | payload
+"""
+
+import os
+import socket
+import struct
+from typing import Optional, Tuple
+
+DATAGRAM_MAGIC = b'U'
+TOKEN_SIZE = 8
+_HEADER = struct.Struct('>c8sIB')
+DATAGRAM_HEADER_SIZE = _HEADER.size
+
+# Loopback carries up to 65507 bytes per datagram; keep clear of that limit.
+MAX_DATAGRAM_PAYLOAD = 60000
+
+# Datagram kinds
+KIND_HELLO = 1  # Client -> server binding/keepalive; echoed back by the server
+KIND_STATE = 2  # Server -> client pickled game_state
+KIND_INPUT = 3  # Client -> server binary input packet (BASE_input_codec)
+
+UDP_HELLO_INTERVAL = 0.5  # Seconds between client HELLOs (binding retries and keepalive)
+UDP_FALLBACK_TIMEOUT = 3.0  # Seconds without any datagram before falling back to TCP-only
+
+SEQUENCE_MODULO = 1 << 32
+
+
+def new_session_token() -> bytes:
+    """Random token that binds a UDP address to a registered player."""
+    return os.urandom(TOKEN_SIZE)
+
+
+def pack_datagram(token: bytes, sequence: int, kind: int, payload: bytes = b'') -> bytes:
+    return _HEADER.pack(DATAGRAM_MAGIC, token, sequence % SEQUENCE_MODULO, kind) + payload
+
+
+def send_datagram(sock: socket.socket, token: bytes, sequence: int, kind: int, payload=b'', address=None) -> bool:
+    """
+    Send one datagram without copying the payload behind the header (sendmsg scatter-gather).
+    Datagrams are fire-and-forget: a full socket buffer or an ICMP error just drops this one.
+
+    Returns:
+        True if the datagram was handed to the kernel
+    """
+    header = _HEADER.pack(DATAGRAM_MAGIC, token, sequence % SEQUENCE_MODULO, kind)
+    try:
+        if hasattr(sock, 'sendmsg'):
+            if address is None:
+                sock.sendmsg([header, payload])
+            else:
+                sock.sendmsg([header, payload], [], 0, address)
+        elif address is None:
+            sock.send(header + bytes(payload))
+        else:
+            sock.sendto(header + bytes(payload), address)
+        return True
+    except OSError:
+        return False
+
+
+def unpack_datagram(data: bytes) -> Optional[Tuple[bytes, int, int, memoryview]]:
+    """
+    Split a datagram into (token, sequence, kind, payload).
+
+    Returns:
+        None if the datagram is too short or not ours
+    """
+    if len(data) < DATAGRAM_HEADER_SIZE:
+        return None
+    magic, token, sequence, kind = _HEADER.unpack_from(data)
+    if magic != DATAGRAM_MAGIC:
+        return None
+    return token, sequence, kind, memoryview(data)[DATAGRAM_HEADER_SIZE:]
+
+
+class SequenceFilter:
+    """
+    Accepts only datagrams newer than the newest one seen so far.
+    Counts gaps (lost or still in flight) and late arrivals that were discarded.
+    """
+
+    def __init__(self):
+        self.latest = None
+        self.accepted = 0
+        self.stale = 0
+        self.gaps = 0
+
+    def accept(self, sequence: int) -> bool:
+        if self.latest is not None:
+            delta = (sequence - self.latest) % SEQUENCE_MODULO
+            if delta == 0 or delta >= SEQUENCE_MODULO // 2:
+                self.stale += 1
+                return False
+            self.gaps += delta - 1
+        self.latest = sequence
+        self.accepted += 1
+        return True
+
+
+class UdpSession:
+    """Server-side state of one player's datagram channel."""
+
+    def __init__(self, player_id: str):
+        self.player_id = player_id
+        self.token = new_session_token()
+        self.address = None  # Set by the first valid HELLO
+        self.disabled = False  # Client fell back to TCP-only
+        self.send_sequence = 0
+        self.input_filter = SequenceFilter()
+
+    @property
+    def active(self) -> bool:
+        return self.address is not None and not self.disabled
+
+    def next_sequence(self) -> int:
+        self.send_sequence += 1
+        return self.send_sequence
@@ -0,0 +1,218 @@
+"""
+rsync-style delta transfer of backups.
+
+When the server needs a backup it does not have, it usually already holds a
+very similar one (same GameFolder with a few edits). Instead of asking the
+client for a full tar.gz, the server sends a *basis*: the per-file sha256 of
+its closest backup plus rsync block signatures (a rolling weak checksum and a
+short strong hash per BLOCK_SIZE block). The client answers with a delta:
+
+    ('same',)          file identical to the basis file at the same path
+    ('copy', path)     file identical to another basis file (moved/renamed)
+    ('delta', ops)     changed file: ops are basis block indexes (ints), TAIL_BLOCK
+                       for the basis file's final short block, or literal bytes
+    ('data', bytes)    new file with nothing to reuse
+
+Files absent from the delta are not part of the backup. The server rebuilds
+the backup in a staging directory next to the basis, verifies that the
+directory hash equals the backup name and only then moves it into place.
+"""
+
+import hashlib
+import os
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+from coding.non_callable_tools.helpers import should_skip_item
+
+BLOCK_SIZE = 2048
+TAIL_BLOCK = -1  # Op referring to the basis file's final partial block
+_MOD_MASK = 0xFFFF
+
+Basis = Dict[str, object]
+Delta = Dict[str, object]
+
+
+def _strong(block: bytes) -> bytes:
+    return hashlib.blake2b(block, digest_size=8).digest()
+
+
+def _weak_parts(block: bytes) -> Tuple[int, int]:
+    """rsync weak checksum halves: a = sum(x_i), b = sum((len - i) * x_i), both mod 2^16."""
+    length = len(block)
+    a = sum(block)
+    b = length * a - sum(i * x for i, x in enumerate(block))
+    return a & _MOD_MASK, b & _MOD_MASK
+
+
+def block_signature(data: bytes, block_size: int = BLOCK_SIZE) -> dict:
+    """Weak and strong checksums of every full block, plus the strong hash of the short tail."""
+    full = len(data) - len(data) % block_size
+    weak, strong = [], []
+    for offset in range(0, full, block_size):
+        block = data[offset:offset + block_size]
+        a, b = _weak_parts(block)
+        weak.append(a | (b << 16))
+        strong.append(_strong(block))
+    tail = data[full:]
+    return {'weak': weak, 'strong': strong, 'tail': _strong(tail) if tail else None, 'tail_size': len(tail)}
+
+
+def compute_delta(data: bytes, signature: dict, block_size: int = BLOCK_SIZE) -> List[object]:
+    """
+    Express `data` as basis blocks plus literal bytes, using a rolling weak checksum
+    so matches are found at any byte offset (insertions shift the rest of the file).
+    """
+    weak_index: Dict[int, List[int]] = {}
+    for index, weak in enumerate(signature['weak']):
+        weak_index.setdefault(weak, []).append(index)
+    strong_list = signature['strong']
+
+    ops: List[object] = []
+    length = len(data)
+    literal_start = 0
+    position = 0
+    if weak_index and length >= block_size:
+        a, b = _weak_parts(data[:block_size])
+        while position + block_size <= length:
+            candidates = weak_index.get(a | (b << 16))
+            if candidates:
+                strong = _strong(data[position:position + block_size])
+                match = next((i for i in candidates if strong_list[i] == strong), None)
+                if match is not None:
+                    if literal_start < position:
+                        ops.append(data[literal_start:position])
+                    ops.append(match)
+                    position += block_size
+                    literal_start = position
+                    if position + block_size <= length:
+                        a, b = _weak_parts(data[position:position + block_size])
+                    continue
+            # Roll the window one byte forward
+            if position + block_size < length:
+                outgoing = data[position]
+                a = (a - outgoing + data[position + block_size]) & _MOD_MASK
+                b = (b - block_size * outgoing + a) & _MOD_MASK
+            position += 1
+
+    remaining = data[literal_start:]
+    tail_size = signature.get('tail_size', 0)
+    if tail_size and len(remaining) >= tail_size and _strong(remaining[len(remaining) - tail_size:]) == signature['tail']:
+        if len(remaining) > tail_size:
+            ops.append(remaining[:len(remaining) - tail_size])
+        ops.append(TAIL_BLOCK)
+    elif remaining:
+        ops.append(remaining)
+    return ops
+
+
+def apply_delta(basis: bytes, ops: List[object], block_size: int = BLOCK_SIZE) -> bytes:
+    """Rebuild a file from its basis and the ops produced by compute_delta."""
+    parts = []
+    for op in ops:
+        if isinstance(op, bytes):
+            parts.append(op)
+        elif op == TAIL_BLOCK:
+            parts.append(basis[len(basis) - len(basis) % block_size:])
+        else:
+            parts.append(basis[op * block_size:(op + 1) * block_size])
+    return b''.join(parts)
+
+
+def backup_files(root: str) -> Dict[str, str]:
+    """{relative '/' path: absolute path} of the files a backup hash covers."""
+    files = {}
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not should_skip_item(d))
+        for name in sorted(names):
+            if not should_skip_item(name):
+                full_path = os.path.join(directory, name)
+                files[os.path.relpath(full_path, root).replace(os.sep, '/')] = full_path
+    return files
+
+
+def build_basis(root: str, block_size: int = BLOCK_SIZE) -> Basis:
+    """Digest and block signatures of every file in a backup the server already has."""
+    files = {}
+    for rel_path, full_path in backup_files(root).items():
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        files[rel_path] = {'sha256': hashlib.sha256(data).hexdigest(), 'signature': block_signature(data, block_size)}
+    return {'block_size': block_size, 'files': files}
+
+
+def build_delta(root: str, basis: Basis) -> Delta:
+    """Describe the backup at `root` relative to the server's basis."""
+    block_size = basis['block_size']
+    basis_files = basis['files']
+    by_digest = {entry['sha256']: rel_path for rel_path, entry in basis_files.items()}
+    files = {}
+    for rel_path, full_path in backup_files(root).items():
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = basis_files.get(rel_path)
+        if entry is not None and entry['sha256'] == digest:
+            files[rel_path] = ('same',)
+        elif digest in by_digest:
+            files[rel_path] = ('copy', by_digest[digest])
+        elif entry is not None:
+            files[rel_path] = ('delta', compute_delta(data, entry['signature'], block_size))
+        else:
+            files[rel_path] = ('data', data)
+    return {'block_size': block_size, 'files': files}
+
+
+def _safe_join(root: str, rel_path: str) -> Optional[str]:
+    """Join a '/' relative path under root, or None if it escapes root."""
+    if not rel_path or rel_path.startswith('/') or '\\' in rel_path:
+        return None
+    parts = rel_path.split('/')
+    if any(part in ('', '.', '..') for part in parts):
+        return None
+    return os.path.join(root, *parts)
+
+
+def reconstruct_backup(delta: Delta, basis_root: str, target_root: str):
+    """
+    Write the backup described by `delta` into target_root (which must not exist yet).
+
+    Raises:
+        ValueError: If the delta references unsafe paths or basis files that do not exist
+    """
+    block_size = delta['block_size']
+    os.makedirs(target_root)
+    for rel_path, entry in delta['files'].items():
+        target = _safe_join(target_root, rel_path)
+        if target is None:
+            raise ValueError(f"Unsafe path in backup delta: {rel_path!r}")
+        kind = entry[0]
+        if kind == 'data':
+            data = entry[1]
+        else:
+            source = _safe_join(basis_root, rel_path if kind != 'copy' else entry[1])
+            if source is None or not os.path.isfile(source):
+                raise ValueError(f"Backup delta references missing basis file for {rel_path!r}")
+            if kind in ('same', 'copy'):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(source, target)
+                continue
+            with open(source, 'rb') as f:
+                data = apply_delta(f.read(), entry[1], block_size)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+
+
+def delta_stats(delta: Delta) -> Tuple[int, int]:
+    """(files that carry new bytes, literal bytes in the delta)."""
+    changed = 0
+    literal = 0
+    for entry in delta['files'].values():
+        if entry[0] == 'data':
+            changed += 1
+            literal += len(entry[1])
+        elif entry[0] == 'delta':
+            changed += 1
+            literal += sum(len(op) for op in entry[1] if isinstance(op, bytes))
+    return changed, literal
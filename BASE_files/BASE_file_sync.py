@@ -0,0 +1,179 @@
+"""
+Content-addressed GameFolder synchronization.
+
+Instead of shipping the source of every GameFolder file to every joining client,
+the server sends a manifest {relative path: (sha256, size)}. The client keeps
+a local blob cache keyed by sha256, asks the server only for blobs it has neither
+cached nor already on disk, and then writes only the files whose content differs.
+Files that are already identical are never touched, so their mtimes and the
+__pycache__ bytecode built from them stay valid.
+
+Message flow:
+    client -> server  {'type': 'request_file_sync'}
+    server -> client  {'type': 'file_manifest', 'manifest': {path: (sha256, size)}}
+    client -> server  {'type': 'request_blobs', 'hashes': [sha256, ...]}   (only if something is missing)
+    server -> client  {'type': 'file_blobs', 'blobs': {sha256: bytes}}
+"""
+
+import hashlib
+import os
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAME_FOLDER_NAME = "GameFolder"
+BLOB_CACHE_DIR = os.path.join(PROJECT_ROOT, "__blob_cache")
+
+Manifest = Dict[str, Tuple[str, int]]
+
+
+def blob_digest(data: bytes) -> str:
+    """sha256 hex digest used as the blob address."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def build_manifest(files: Dict[str, bytes]) -> Tuple[Manifest, Dict[str, bytes]]:
+    """
+    Build the manifest and the blob table for a set of files.
+
+    Args:
+        files: {relative path: raw file bytes}
+
+    Returns:
+        (manifest {path: (sha256, size)}, blobs {sha256: bytes})
+    """
+    manifest = {}
+    blobs = {}
+    for rel_path, data in files.items():
+        digest = blob_digest(data)
+        manifest[rel_path] = (digest, len(data))
+        blobs[digest] = data
+    return manifest, blobs
+
+
+def resolve_game_path(rel_path: str, root: str = PROJECT_ROOT) -> Optional[str]:
+    """Absolute path for a manifest entry, or None if it would land outside GameFolder."""
+    if not rel_path.replace("\\", "/").startswith(GAME_FOLDER_NAME + "/"):
+        return None
+    game_folder = os.path.abspath(os.path.join(root, GAME_FOLDER_NAME))
+    full_path = os.path.abspath(os.path.join(root, *rel_path.replace("\\", "/").split("/")))
+    if not full_path.startswith(game_folder + os.sep):
+        return None
+    return full_path
+
+
+def file_digest(path: str, expected_size: Optional[int] = None) -> Optional[str]:
+    """sha256 of a file on disk, or None if it is missing (or has a different size)."""
+    try:
+        if expected_size is not None and os.path.getsize(path) != expected_size:
+            return None
+        with open(path, 'rb') as f:
+            return blob_digest(f.read())
+    except OSError:
+        return None
+
+
+class BlobCache:
+    """Directory of blobs named by their sha256 digest."""
+
+    def __init__(self, cache_dir: str = BLOB_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest)
+
+    def has(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Return a cached blob, or None if it is missing or corrupt."""
+        try:
+            with open(self._path(digest), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if blob_digest(data) != digest:
+            # Corrupt entry (e.g. interrupted write on an older version) - drop it
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+            return None
+        return data
+
+    def put(self, data: bytes, digest: Optional[str] = None) -> str:
+        """
+        Store a blob and return its digest.
+
+        Raises:
+            ValueError: If `digest` is given and does not match the data
+        """
+        actual = blob_digest(data)
+        if digest is not None and digest != actual:
+            raise ValueError(f"Blob digest mismatch: expected {digest[:12]}, got {actual[:12]}")
+        path = self._path(actual)
+        if not os.path.exists(path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return actual
+
+
+def missing_blobs(manifest: Manifest, cache: BlobCache, root: str = PROJECT_ROOT) -> List[str]:
+    """
+    Digests the client has to download.
+
+    A file that is already on disk with the right content counts as present,
+    so a fresh cache does not force a full download.
+    """
+    missing = []
+    seen = set()
+    for rel_path, (digest, size) in manifest.items():
+        if digest in seen:
+            continue
+        full_path = resolve_game_path(rel_path, root)
+        if full_path is None or file_digest(full_path, size) == digest or cache.has(digest):
+            continue
+        seen.add(digest)
+        missing.append(digest)
+    return missing
+
+
+def store_blobs(blobs: Dict[str, bytes], cache: BlobCache) -> int:
+    """Add received blobs to the cache, skipping any whose content does not match its digest."""
+    stored = 0
+    for digest, data in blobs.items():
+        try:
+            cache.put(data, digest)
+            stored += 1
+        except ValueError as e:
+            print(f"[warning] Discarded blob: {e}")
+    return stored
+
+
+def apply_manifest(manifest: Manifest, cache: BlobCache, root: str = PROJECT_ROOT) -> List[str]:
+    """
+    Make GameFolder match the manifest, writing only files whose content differs.
+
+    Returns:
+        Relative paths of the files that were written
+
+    Raises:
+        KeyError: If a blob needed for a changed file is not in the cache
+    """
+    written = []
+    for rel_path, (digest, size) in manifest.items():
+        full_path = resolve_game_path(rel_path, root)
+        if full_path is None or file_digest(full_path, size) == digest:
+            continue
+        data = cache.get(digest)
+        if data is None:
+            raise KeyError(f"Blob {digest[:12]} for {rel_path} is not cached")
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        tmp_path = f"{full_path}.sync.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, full_path)
+        written.append(rel_path)
+    return written
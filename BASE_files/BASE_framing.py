@@ -0,0 +1,318 @@
+"""
+Length-prefixed message framing shared by the server and the client.
+
+Every message on the wire is a 4-byte big-endian payload length followed by the
+payload (a pickle or a binary input packet).
+
+FrameReader receives straight into one growable bytearray with recv_into and
+hands out complete payloads as memoryview slices of it, so a multi-megabyte
+file_sync/patch/backup message is never rebuilt by concatenating chunks and a
+header read allocates nothing. One read can deliver any number of frames; all
+complete ones are returned together.
+
+send_frame/send_frames write the header and payload buffers with a single
+scatter-gather sendmsg call instead of joining them into a new bytes object
+(falling back to sendall on platforms without sendmsg, e.g. Windows).
+
+FrameOutbox collects the frames produced for each socket during one server
+tick and writes them with one non-blocking sendmsg per socket when flushed.
+"""
+
+import socket
+import struct
+import threading
+from typing import Dict, Iterable, List
+
+HEADER = struct.Struct('>I')
+HEADER_SIZE = HEADER.size
+
+INITIAL_BUFFER_SIZE = 64 * 1024
+RETAINED_BUFFER_SIZE = 8 * 1024 * 1024  # Larger buffers are dropped once their message was consumed
+MAX_READ_PER_CALL = 8 * 1024 * 1024  # Bytes read per recv_from call before yielding to other sockets
+MAX_FRAME_SIZE = 512 * 1024 * 1024  # Anything larger is a corrupt header, not a real message
+MAX_SEND_BUFFERS = 512  # Buffers per sendmsg call (well under IOV_MAX)
+MAX_OUTBOX_BACKLOG = 128 * 1024 * 1024  # Unsent bytes after which a client is considered dead
+
+HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+# Never block in recv_into, even while another thread has switched the socket to blocking to send
+_RECV_FLAGS = getattr(socket, 'MSG_DONTWAIT', 0)
+
+
+class FrameReader:
+    """
+    Incremental frame decoder for one socket.
+
+    Payloads returned by recv_from are memoryviews into the receive buffer and
+    are only valid until the next recv_from call (they are released then, so a
+    stale view raises instead of showing overwritten data). Callers that need
+    to keep a payload must copy it with bytes().
+    """
+
+    def __init__(self, initial_size: int = INITIAL_BUFFER_SIZE, max_frame_size: int = MAX_FRAME_SIZE):
+        self.initial_size = initial_size
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray(initial_size)
+        self._start = 0  # First byte not yet returned as part of a frame
+        self._end = 0  # One past the last received byte
+        self._views = []  # Views handed out since the last recv_from
+
+    @property
+    def buffered(self) -> int:
+        """Bytes received but not yet returned as a complete frame."""
+        return self._end - self._start
+
+    def _release_views(self):
+        for view in self._views:
+            view.release()
+        self._views.clear()
+
+    def _pending_frame_size(self) -> int:
+        """Total size (header + payload) of the frame at the read position, or 0 if the header is incomplete."""
+        if self._end - self._start < HEADER_SIZE:
+            return 0
+        length = HEADER.unpack_from(self._buffer, self._start)[0]
+        if length > self.max_frame_size:
+            raise ValueError(f"Frame of {length} bytes exceeds limit of {self.max_frame_size}")
+        return HEADER_SIZE + length
+
+    def _make_room(self):
+        """Compact and/or grow the buffer so the pending frame (or at least its header) fits."""
+        buffered = self._end - self._start
+        if buffered == 0:
+            self._start = self._end = 0
+            # Keep a grown buffer for the next message of that size, but not one grown for a huge transfer
+            if len(self._buffer) > max(RETAINED_BUFFER_SIZE, self.initial_size):
+                self._buffer = bytearray(self.initial_size)
+            return
+
+        needed = max(self._pending_frame_size(), HEADER_SIZE)
+        if buffered >= needed or len(self._buffer) - self._start >= needed:
+            return  # A complete frame waits to be popped, or the pending one fits where it is
+
+        if self._start:
+            self._buffer[:buffered] = self._buffer[self._start:self._end]
+            self._start, self._end = 0, buffered
+        if len(self._buffer) < needed:
+            # Grow straight to the size of the pending frame: one copy, however many reads it takes
+            new_buffer = bytearray(max(needed, len(self._buffer) * 2))
+            new_buffer[:buffered] = memoryview(self._buffer)[:buffered]
+            self._buffer = new_buffer
+
+    def feed(self, data) -> List[bytes]:
+        """Append bytes that were received elsewhere and return copies of the complete frames."""
+        self._release_views()
+        frames = []
+        data = memoryview(data)
+        while data:
+            self._make_room()
+            if self._end == len(self._buffer):
+                # Full of complete frames: hand them out before compacting over them
+                frames.extend(bytes(frame) for frame in self.pop_frames())
+                self._release_views()
+                continue
+            count = min(len(data), len(self._buffer) - self._end)
+            self._buffer[self._end:self._end + count] = data[:count]
+            self._end += count
+            data = data[count:]
+        frames.extend(bytes(frame) for frame in self.pop_frames())
+        self._release_views()
+        return frames
+
+    def recv_from(self, sock: socket.socket) -> List[memoryview]:
+        """
+        Read everything currently available on a non-blocking socket (up to
+        MAX_READ_PER_CALL bytes) and return the complete frames, oldest first.
+
+        Raises:
+            ConnectionResetError: If the peer closed the connection
+            ValueError: If a frame header announces an impossible size
+        """
+        self._release_views()
+        total = 0
+        while total < MAX_READ_PER_CALL:
+            self._make_room()
+            if self._end == len(self._buffer):
+                break  # Full of complete frames; pop them before reading more
+            try:
+                count = sock.recv_into(memoryview(self._buffer)[self._end:], 0, _RECV_FLAGS)
+            except (BlockingIOError, InterruptedError):
+                break
+            if count == 0:
+                if total:
+                    break  # Deliver what arrived before the close; the next call reports it
+                raise ConnectionResetError("Connection closed by peer")
+            self._end += count
+            total += count
+            if self._end < len(self._buffer):
+                break  # Short read: the socket is drained for now
+        return self.pop_frames()
+
+    def pop_frames(self) -> List[memoryview]:
+        """Return every complete frame in the buffer as payload views."""
+        frames = []
+        view = memoryview(self._buffer)
+        self._views.append(view)
+        while True:
+            size = self._pending_frame_size()
+            if not size or self._end - self._start < size:
+                break
+            payload = view[self._start + HEADER_SIZE:self._start + size]
+            self._views.append(payload)
+            frames.append(payload)
+            self._start += size
+        return frames
+
+
+def _sendmsg_all(sock: socket.socket, buffers: List[memoryview]):
+    """sendmsg until every buffer is fully written (blocking socket)."""
+    index = 0
+    while index < len(buffers):
+        sent = sock.sendmsg(buffers[index:index + MAX_SEND_BUFFERS])
+        # Skip fully sent buffers, trim a partially sent one
+        while sent and index < len(buffers):
+            size = len(buffers[index])
+            if sent >= size:
+                sent -= size
+                index += 1
+            else:
+                buffers[index] = buffers[index][sent:]
+                sent = 0
+
+
+def send_frames(sock: socket.socket, payloads: Iterable) -> int:
+    """
+    Send several payloads, each with its length header, in as few syscalls as possible.
+    The socket must be blocking (or have a timeout).
+
+    Returns:
+        Total bytes written
+    """
+    buffers = []
+    total = 0
+    for payload in payloads:
+        buffers.append(memoryview(HEADER.pack(len(payload))))
+        buffers.append(memoryview(payload))
+        total += HEADER_SIZE + len(payload)
+    if HAS_SENDMSG:
+        _sendmsg_all(sock, buffers)
+    else:
+        for buffer in buffers:
+            sock.sendall(buffer)
+    return total
+
+
+def send_frame(sock: socket.socket, payload) -> int:
+    """Send one payload with its length header (header and payload go out in one sendmsg)."""
+    return send_frames(sock, (payload,))
+
+
+def enable_nodelay(sock: socket.socket):
+    """Disable Nagle's algorithm so small batched frames leave immediately."""
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except (OSError, AttributeError):
+        pass  # Not a TCP socket (e.g. socketpair in tests)
+
+
+class FrameOutbox:
+    """
+    Per-socket queue of outgoing frames, flushed in batches.
+
+    queue() only appends the header and payload buffers; flush() writes everything
+    queued for a socket with a single non-blocking sendmsg (more only if there are
+    over MAX_SEND_BUFFERS buffers). When the kernel send buffer is full the unsent
+    remainder stays queued, in order, for the next flush, so a slow client never
+    blocks the caller. Safe to use from the game and network threads at once.
+    """
+
+    def __init__(self, max_backlog: int = MAX_OUTBOX_BACKLOG):
+        self.max_backlog = max_backlog
+        self._lock = threading.Lock()
+        self._pending: Dict[socket.socket, List[memoryview]] = {}
+        self._backlog: Dict[socket.socket, int] = {}
+
+        # Counters for telemetry and benchmarks
+        self.frames_queued = 0
+        self.send_calls = 0
+        self.bytes_sent = 0
+
+    def queue(self, sock: socket.socket, payload):
+        """Queue one payload (with its length header) for the next flush."""
+        header = HEADER.pack(len(payload))
+        with self._lock:
+            buffers = self._pending.get(sock)
+            if buffers is None:
+                buffers = self._pending[sock] = []
+            buffers.append(memoryview(header))
+            buffers.append(memoryview(payload))
+            self._backlog[sock] = self._backlog.get(sock, 0) + HEADER_SIZE + len(payload)
+            self.frames_queued += 1
+
+    def pending_bytes(self, sock: socket.socket) -> int:
+        """Bytes queued for a socket but not yet accepted by the kernel."""
+        return self._backlog.get(sock, 0)
+
+    def discard(self, sock: socket.socket):
+        """Forget everything queued for a socket (disconnect/restart)."""
+        with self._lock:
+            self._pending.pop(sock, None)
+            self._backlog.pop(sock, None)
+
+    def flush(self, sock: socket.socket = None) -> List[socket.socket]:
+        """
+        Write queued frames for one socket (or all of them).
+
+        Returns:
+            Sockets that failed (send error or backlog over max_backlog); their
+            queues are dropped and the caller should disconnect them
+        """
+        failed = []
+        with self._lock:
+            targets = [sock] if sock is not None else list(self._pending)
+            for target in targets:
+                buffers = self._pending.get(target)
+                if not buffers:
+                    continue
+                try:
+                    self._write(target, buffers)
+                    healthy = self._backlog[target] <= self.max_backlog
+                except OSError:
+                    healthy = False
+                if not healthy:
+                    failed.append(target)
+                    del self._pending[target]
+                    del self._backlog[target]
+                elif not buffers:
+                    del self._pending[target]
+                    del self._backlog[target]
+        return failed
+
+    def _write(self, sock: socket.socket, buffers: List[memoryview]):
+        """Send as much of `buffers` as the kernel takes right now, consuming what was sent."""
+        while buffers:
+            batch = buffers[:MAX_SEND_BUFFERS]
+            requested = sum(len(buffer) for buffer in batch)
+            try:
+                if HAS_SENDMSG:
+                    sent = sock.sendmsg(batch)
+                else:
+                    sent = sock.send(b''.join(batch))
+            except (BlockingIOError, InterruptedError):
+                return
+            self.send_calls += 1
+            self.bytes_sent += sent
+            self._backlog[sock] -= sent
+
+            consumed = 0
+            remaining = sent
+            while remaining and consumed < len(batch):
+                size = len(buffers[consumed])
+                if remaining >= size:
+                    remaining -= size
+                    consumed += 1
+                else:
+                    buffers[consumed] = buffers[consumed][remaining:]
+                    remaining = 0
+            del buffers[:consumed]
+            if sent < requested:
+                return  # Kernel buffer full; the rest goes out on a later flush
@@ -5,10 +5,25 @@ import time
 import sys
 import traceback
 from BASE_files.network_client import NetworkClient, EntityManager, sync_game_files
+from BASE_files.BASE_telemetry import format_overlay
+from BASE_files.BASE_gc import gc_policy
+from BASE_files.BASE_memory import memory_monitor, start_if_enabled as start_memory_monitor
 
 DEFAULT_WIDTH = 1400
 DEFAULT_HEIGHT = 900
 
+
+def draw_network_overlay(screen, font, telemetry: dict):
+    """Draw the connection's RTT/traffic counters in the top-left corner."""
+    lines = format_overlay(telemetry)
+    line_height = font.get_linesize()
+    panel = pygame.Surface((300, line_height * len(lines) + 8), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 160))
+    screen.blit(panel, (8, 8))
+    for index, line in enumerate(lines):
+        screen.blit(font.render(line, True, (200, 255, 200)), (14, 12 + index * line_height))
+
+
 def run_client(network_client: NetworkClient, player_id: str = ""):
     print("="*70)
     print(" "*20 + "CORE CONFLICT - MULTIPLAYER CLIENT")
@@ -26,6 +41,7 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
     print("  Mouse Right-Click: Secondary Fire")
     print("  E/F: Special Fire")
     print("  Q: Drop current weapon")
+    print("  F3: Network debug overlay (RTT, traffic, state size)")
     print("  ESC: Quit game")
     print("="*70)
     print(f"\nConnecting to server at {network_client.host}:{network_client.port}...\n")
@@ -66,7 +82,7 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
                 if reloaded_setup:
                     # Import game-specific classes for modularity
                     nonlocal ui, Character
-                    entity_manager.clear() # Clear old entities before reloading
+                    entity_manager.migrate_to_reloaded_classes()  # Keep live entities, rebound to the new classes
                     ui = reloaded_setup.GameUI(screen, width, height)
                     Character = reloaded_setup.Character
                     
@@ -79,7 +95,7 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
 
         def on_file_sync_received(files):
             print("Received file sync from server...")
-            if sync_game_files(files):
+            if sync_game_files(files, network_client.blob_cache, network_client.sync_root):
                 # Import the setup function from the synchronized GameFolder
                 try:
                     from BASE_files.BASE_helpers import reload_game_code
@@ -88,11 +104,12 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
                     if reloaded_setup:
                         # Import game-specific classes for modularity
                         nonlocal ui, Character
-                        entity_manager.clear() # Clear old entities before reloading
+                        entity_manager.migrate_to_reloaded_classes()  # Keep live entities, rebound to the new classes
                         ui = reloaded_setup.GameUI(screen, width, height)
                         Character = reloaded_setup.Character
                         
                         print("✓ Game files synchronized and classes deep reloaded")
+                        gc_policy.match_started(network_client)  # Freeze the loaded classes (BASE_gc)
                         # Set flag immediately to prevent race condition
                         network_client.file_sync_complete = True
                         network_client.acknowledge_file_sync()
@@ -123,11 +140,12 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
                 
                 if reloaded_setup:
                     nonlocal ui, Character
-                    entity_manager.clear() # Clear old entities before reloading
+                    entity_manager.migrate_to_reloaded_classes()  # Keep live entities, rebound to the new classes
                     ui = reloaded_setup.GameUI(screen, width, height)
                     Character = reloaded_setup.Character
                     
                     print("✓ Game classes deep reloaded for game start")
+                    gc_policy.match_started(network_client)
                 else:
                     print("[warning] Failed to deep reload for game start")
 
@@ -189,12 +207,17 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
 
         running = True
         last_input_time = 0.0
+        show_network_overlay = False
+        overlay_font = None
 
         print("Connected! Waiting for game to start...\n")
 
         # Request file synchronization from server
         network_client.request_file_sync()
 
+        # Off unless CC_MEMORY_MONITOR=1 (tracemalloc slows every allocation down)
+        owns_memory_monitor = start_memory_monitor()
+
         frame_count = 0
         while running:
             frame_count += 1
@@ -212,6 +235,8 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
                     elif event.key == pygame.K_q:
                         # Drop weapon
                         network_client.send_input({'drop_weapon': True}, entity_manager)
+                    elif event.key == pygame.K_F3:
+                        show_network_overlay = not show_network_overlay
                 elif event.type == pygame.KEYUP:
                     held_keys.discard(event.key)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -243,10 +268,8 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
             # Update network client
             network_client.update()
 
-            # Render
-            screen.fill((135, 206, 235))  # Sky blue background
-
-            # Draw all platforms and entities managed by the entity manager
+            # Render: the entity manager blits the cached sky + static platform layer,
+            # then draws moving platforms and all entities on top
             entity_manager.draw_all(screen, height)
 
             # Draw UI
@@ -254,10 +277,21 @@ def run_client(network_client: NetworkClient, player_id: str = ""):
                 characters = entity_manager.get_entities_by_type(Character)
                 ui.draw(characters, game_over, winner, {})
 
+            if show_network_overlay:
+                if overlay_font is None:
+                    overlay_font = pygame.font.Font(None, 20)
+                draw_network_overlay(screen, overlay_font, network_client.get_telemetry())
+
             pygame.display.flip()
 
+            # Young garbage collections run here, in what is left of the frame
+            gc_policy.idle(1 / 60 - (time.time() - current_time))
+
         # Cleanup
         network_client.disconnect()
+        if owns_memory_monitor:
+            memory_monitor.stop()
+        gc_policy.match_ended(network_client)
         # Don't quit pygame here - let the menu handle it
         print("Game client exited cleanly")
 
@@ -0,0 +1,148 @@
+"""
+Garbage-collector policy for the tick loops (GameServer, RoomManager, game client).
+
+Every tick allocates thousands of short-lived dicts and lists (serialized
+game state, __getstate__ copies, collision pairs). Reference counting frees
+almost all of them, but whatever survives or sits in a reference cycle (game
+code linking projectiles to their spawner, effects to their target) counts
+towards the collector's thresholds. With the defaults (700, 10, 10) that
+triggers a young collection every few hundred such objects wherever it falls,
+usually in the middle of a tick, and an older collection walks every object
+the process ever loaded (modules, classes, the arena): a p99 spike.
+
+While a match is running the policy:
+    - freezes everything that exists once the arena and modules are set up
+      (gc.freeze()), so collections never walk them again;
+    - raises the thresholds to MATCH_THRESHOLDS, so the loops' own garbage
+      (freed by reference counting almost entirely) rarely triggers one;
+    - runs young collections itself in the time left before the next tick
+      (idle()), before the raised threshold forces one in the middle of a tick;
+    - times every collection by generation and logs the slow ones, through the
+      process's BASE_metrics.gc_tracker (the same pauses the exporter publishes).
+
+Hosted rooms share one policy and one game thread, so only the first match
+pays for a full collection; a match starting while others run only freezes
+its own setup. When the last match in the process ends the frozen objects are
+released, the finished arenas collected and the thresholds put back.
+
+On by default; CC_GC_POLICY=0 turns it off, CC_GC_THRESHOLDS="20000,50,100"
+overrides the match thresholds.
+"""
+
+import gc
+import os
+from typing import Optional, Tuple
+
+from BASE_files.BASE_logging import get_logger
+from BASE_files.BASE_metrics import gc_tracker
+from BASE_files.BASE_state import process_singleton
+
+logger = get_logger("gc")
+
+MATCH_THRESHOLDS = (20000, 50, 100)
+IDLE_MIN_SECONDS = 0.004  # Free time before the next tick needed for an idle collection
+IDLE_FRACTION = 0.25  # Collect in idle time once generation 0 is this full
+
+
+def parse_thresholds(text: Optional[str]) -> Optional[Tuple[int, ...]]:
+    """'20000,50,100' -> (20000, 50, 100); None if malformed."""
+    try:
+        thresholds = tuple(int(part) for part in (text or "").split(","))
+    except ValueError:
+        return None
+    return thresholds if len(thresholds) == 3 and all(value > 0 for value in thresholds) else None
+
+
+class GcPolicy:
+    """Freeze after setup, raised thresholds and idle collections while a match runs."""
+
+    def __init__(self, enabled: bool = True, thresholds: Tuple[int, ...] = MATCH_THRESHOLDS):
+        self.enabled = enabled
+        self.thresholds = thresholds
+        self.default_thresholds = gc.get_threshold()
+        self.matches = set()  # Owners (servers, rooms, clients) with a match in progress
+        self.idle_collections = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self.matches)
+
+    def match_started(self, owner):
+        """The arena and game modules are set up: freeze them and raise the thresholds."""
+        if not self.enabled:
+            return
+        if not self.matches:
+            self.default_thresholds = gc.get_threshold()
+            gc_tracker.install()  # Pauses are timed while any match runs
+        if self.matches - {owner}:
+            # Other matches are ticking on this thread: a full collection would stall them
+            gc.freeze()
+        else:
+            # Collect what the previous arena left behind before the new setup is frozen with it
+            gc.unfreeze()
+            gc.collect()
+            gc.freeze()
+        self.matches.add(owner)
+        gc.set_threshold(*self.thresholds)
+        logger.info("🗑️  GC: Froze %d objects after match setup, thresholds %s",
+                    gc.get_freeze_count(), self.thresholds)
+
+    def match_ended(self, owner):
+        """After the last match: release the frozen objects, collect the finished arenas and restore the thresholds."""
+        if owner not in self.matches:
+            return
+        self.matches.discard(owner)
+        if not self.matches:
+            gc.unfreeze()
+            gc.set_threshold(*self.default_thresholds)
+            gc.collect()  # No match is ticking: the full collection costs nobody a frame
+            gc_tracker.uninstall()
+        self.log_summary()
+
+    def idle(self, seconds_free: float) -> bool:
+        """
+        Called by a loop with `seconds_free` until its next tick: run a young collection now
+        if one is due soon and there is time for it. Returns True if it collected.
+        """
+        if not self.matches or seconds_free < IDLE_MIN_SECONDS:
+            return False
+        count0, count1, _ = gc.get_count()
+        threshold0, threshold1, _ = gc.get_threshold()
+        if count0 < threshold0 * IDLE_FRACTION:
+            return False
+        # A generation 0 collection that would take generation 1 over its threshold collects both
+        generation = 1 if count1 + 1 >= threshold1 else 0
+        gc_tracker.scheduled = True
+        try:
+            gc.collect(generation)
+        finally:
+            gc_tracker.scheduled = False
+        self.idle_collections += 1
+        return True
+
+    def summary(self) -> dict:
+        return {
+            'active': self.active,
+            'frozen': gc.get_freeze_count(),
+            'thresholds': gc.get_threshold(),
+            'idle_collections': self.idle_collections,
+            'collected': gc_tracker.collected,
+            'pauses': {generation: {'count': sum(histogram.counts), 'total_ms': histogram.total * 1000,
+                                    'max_ms': gc_tracker.longest[generation] * 1000}
+                       for generation, histogram in gc_tracker.pauses.items()},
+        }
+
+    def log_summary(self):
+        logger.info("🗑️  GC: " + ", ".join(
+            f"gen {generation}: {sum(histogram.counts)} collections, max {gc_tracker.longest[generation] * 1000:.2f} ms"
+            for generation, histogram in gc_tracker.pauses.items())
+            + f", {self.idle_collections} in idle time")
+
+
+def _policy_from_env() -> GcPolicy:
+    thresholds = parse_thresholds(os.getenv("CC_GC_THRESHOLDS")) or MATCH_THRESHOLDS
+    return GcPolicy(enabled=os.getenv("CC_GC_POLICY", "1") != "0", thresholds=thresholds)
+
+
+# One policy per process: the collector is process-wide
+gc_policy: GcPolicy = process_singleton("gc_policy", _policy_from_env)
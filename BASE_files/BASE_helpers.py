@@ -13,6 +13,7 @@ from dotenv import load_dotenv
 
 ALPHABET = "23456789ABCDEFGHJKLMNPQRSTUVWXYZ"
 SECRET_OFFSET = 717171 
+ROOM_SEPARATOR = "-"  # "<server code>-<room id>" addresses one room of a multi-room server (BASE_rooms)
 # Remote play domain (CC-branded). Update DNS accordingly.
 REMOTE_DOMAIN = "cc.inventure71.duckdns.org"
 
@@ -94,7 +95,7 @@ def encrypt_code(ip: str, port: int, mode: str) -> str:
         return "L" + base_encode(packed + SECRET_OFFSET)
 
 def decrypt_code(code: str):
-    code = code.upper().strip()
+    code = code.upper().strip().split(ROOM_SEPARATOR)[0]  # The room part only matters to the server
     prefix = code[0]
     payload = code[1:]
     
@@ -159,68 +160,25 @@ def decrypt_api_key(encrypted_key: str) -> str:
         return ""
 
 def reload_game_code() -> types.ModuleType:
-    print("🔄 Performing deep reload of game code...")
-    
-    # 1. Identify all loaded GameFolder modules
-    game_modules = [
-        (name, module) for name, module in sys.modules.items() 
-        if name.startswith('GameFolder') and module is not None
-    ]
-    
-    # DEBUG: Check initial state of Character class in setup if loaded
-    if 'GameFolder.setup' in sys.modules:
-        try:
-             import GameFolder.setup
-             if hasattr(GameFolder.setup, 'Character'):
-                 print(f"DEBUG: Before reload, GameFolder.setup.Character ID: {id(GameFolder.setup.Character)}")
-        except: pass
-
-    # 2. Reload all dependencies first
-    for name, module in game_modules:
-        if name == 'GameFolder.setup':
-            continue
-        try:
-            importlib.reload(module)
-        except Exception as e:
-            print(f"[error] Failed to reload {name}: {e}")
-            traceback.print_exc() 
-   
-    import os
-    game_folder_path = os.path.join(os.path.dirname(__file__), '..', 'GameFolder')
-    if os.path.exists(game_folder_path):
-        for root, dirs, files in os.walk(game_folder_path):
-            for file in files:
-                if file.endswith('.py') and not file.startswith('__'):
-                    rel_path = os.path.relpath(os.path.join(root, file), game_folder_path)
-                    module_name = 'GameFolder.' + rel_path.replace(os.sep, '.').replace('.py', '')
-                    
-                    # If this module isn't loaded yet, import it
-                    if module_name not in sys.modules:
-                        try:
-                            __import__(module_name)
-                            print(f"[info] Imported new module: {module_name}")
-                        except Exception as e:
-                            print(f"[warning] Failed to import new module {module_name}: {e}")
-            
-    # 3. Explicitly reload the entry point (setup.py) last
-    # STRATEGY CHANGE: Use del + import to force fresh namespace population from reloaded dependencies
-    try:
-        if 'GameFolder.setup' in sys.modules:
-            print("Force-clearing GameFolder.setup from sys.modules to ensure clean import...")
-            del sys.modules['GameFolder.setup']
-            
-        import GameFolder.setup
-        
-        # Verify the class ID
-        if hasattr(GameFolder.setup, 'Character'):
-             print(f"DEBUG: After reload, GameFolder.setup.Character ID: {id(GameFolder.setup.Character)}")
-        
-        print("[success] Game code deep reload complete.")
-        return sys.modules['GameFolder.setup']
-    except Exception as e:
-        print(f"[error] CRITICAL: Failed to reload setup.py: {e}")
-        traceback.print_exc()
-        return None
+    """
+    Bring the loaded GameFolder modules up to date with the files on disk and return GameFolder.setup
+    (None if it fails to import). Only changed modules and the modules importing them are reloaded,
+    dependencies first; nothing is reloaded when no file changed (see BASE_reload).
+    GameFolder/tests is not game code and is left to the test runners.
+    """
+    from BASE_files.BASE_reload import reload_package
+    return reload_package(_game_folder_path(), 'GameFolder', 'GameFolder.setup', skip_dirs=('__pycache__', 'tests'))
+
+def mark_game_code_loaded() -> int:
+    """
+    Record the source hashes of GameFolder modules imported with a plain import, so the next
+    reload_game_code() treats them as current and only reloads files changed after this call.
+    """
+    from BASE_files.BASE_reload import mark_loaded
+    return mark_loaded(_game_folder_path(), 'GameFolder', skip_dirs=('__pycache__', 'tests'))
+
+def _game_folder_path() -> str:
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GameFolder'))
 
 def validate_gamefolder_importable():
     """
@@ -271,6 +229,79 @@ def validate_gamefolder_importable():
             del sys.modules[mod_name]
         return False, f"Error: {error_msg}"
 
+# Successful validations, keyed by the code they checked (see gamefolder_fingerprint)
+VALIDATION_CACHE = os.getenv("CC_VALIDATION_CACHE", "__validation_cache.json")
+# GameFolder.setup imports GameFolder, BASE_components and, through them, BASE_files (BASE_network,
+# BASE_profiler, BASE_logging, ...); nothing it reaches lives outside these three folders
+VALIDATED_FOLDERS = ("GameFolder", "BASE_components", "BASE_files")
+
+def gamefolder_fingerprint(folders=VALIDATED_FOLDERS) -> str:
+    """
+    sha256 over the interpreter version and every .py file in `folders` (tests excluded): a superset of
+    what importing GameFolder.setup executes, so any edit that can change the validation's result
+    changes the fingerprint.
+    """
+    digest = hashlib.sha256(f"{sys.version}|{sys.implementation.cache_tag}".encode())
+    for folder in folders:
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = sorted(d for d in dirs if d not in ("__pycache__", "tests"))
+            for file in sorted(files):
+                if file.endswith(".py"):
+                    path = os.path.join(root, file)
+                    with open(path, "rb") as f:
+                        digest.update(path.replace(os.sep, "/").encode() + b"\0" + hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+def _cached_validation(fingerprint: str) -> bool:
+    try:
+        with open(VALIDATION_CACHE, "r") as f:
+            return json.load(f).get("fingerprint") == fingerprint
+    except (OSError, ValueError, AttributeError):
+        return False
+
+def _remember_validation(fingerprint: str):
+    try:
+        with open(VALIDATION_CACHE, "w") as f:
+            json.dump({"fingerprint": fingerprint, "python": sys.version}, f)
+    except OSError as e:
+        print(f"[warning] Could not write {VALIDATION_CACHE}: {e}")
+
+def validate_gamefolder_in_child(timeout: float = 120.0):
+    """
+    validate_gamefolder_importable() in a fresh interpreter, so this process never imports (and has to
+    purge) the GameFolder modules. Returns (is_valid, error_message).
+    """
+    import subprocess
+    script = ("import json\n"
+              "from BASE_files.BASE_helpers import validate_gamefolder_importable\n"
+              "print('VALIDATION ' + json.dumps(validate_gamefolder_importable()))\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.getenv("PYTHONPATH")])))
+    try:
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                timeout=timeout, env=env)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return False, f"Validation process failed: {e}"
+    for line in result.stdout.splitlines():
+        if line.startswith("VALIDATION "):
+            is_valid, error_msg = json.loads(line[len("VALIDATION "):])
+            return is_valid, error_msg
+    return False, f"Validation process exited with code {result.returncode}: {result.stderr.strip()[-500:]}"
+
+def check_gamefolder_importable():
+    """
+    (is_valid, error_message) for the current GameFolder: a tree validated before (same files, same
+    interpreter) is not imported again; otherwise it is validated in a child process and a success cached.
+    """
+    fingerprint = gamefolder_fingerprint()
+    if _cached_validation(fingerprint):
+        print("GameFolder unchanged since its last successful validation, skipping the import check.")
+        return True, None
+    is_valid, error_msg = validate_gamefolder_in_child()
+    if is_valid:
+        _remember_validation(fingerprint)
+    return is_valid, error_msg
+
 def ensure_gamefolder_exists():
     """Ensure GameFolder exists with content and is importable, restoring from backup if needed."""
     game_folder = "GameFolder"
@@ -282,7 +313,7 @@ def ensure_gamefolder_exists():
     else:
         # GameFolder exists and has content, but check if it's importable
         print("GameFolder exists and has content. Validating importability...")
-        is_valid, error_msg = validate_gamefolder_importable()
+        is_valid, error_msg = check_gamefolder_importable()
         
         if not is_valid:
             print(f"GameFolder is in a broken state: {error_msg}")
@@ -316,7 +347,7 @@ def ensure_gamefolder_exists():
             
             # Validate the restored GameFolder
             print("Validating restored GameFolder...")
-            is_valid, error_msg = validate_gamefolder_importable()
+            is_valid, error_msg = check_gamefolder_importable()
             if not is_valid:
                 print(f"WARNING: Restored GameFolder is still broken: {error_msg}")
                 print("You may need to manually fix the issue or restore from a different backup.")
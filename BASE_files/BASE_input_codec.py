@@ -0,0 +1,165 @@
+"""
+Fixed-size binary input frames for the client -> server input stream.
+
+A frame is 7 bytes: 16-bit input sequence number, 8-bit action bitfield and
+the aim point quantized to whole world pixels (signed 16-bit x, y). Every
+input packet carries the newest frame plus up to INPUT_HISTORY previous ones,
+so the server can recover an action from a packet that was lost or late; it
+skips frames whose sequence number it has already applied.
+
+Packet layout (after the usual 4-byte length prefix):
+    INPUT_PACKET_MAGIC (1 byte) | frame count (1 byte) | frames, newest first
+
+Pickled messages always start with the pickle PROTO opcode (0x80), so the
+magic byte tells both formats apart without unpickling anything.
+
+Inputs that do not fit the frame (keys added by GAME_character.get_input_data,
+fire targets that differ from the aim, no mouse position) are still sent as
+pickled dicts by the caller.
+"""
+
+import struct
+from typing import List, Optional, Tuple
+
+INPUT_PACKET_MAGIC = b'I'
+INPUT_HISTORY = 3  # Previous frames repeated in every packet
+
+_FRAME = struct.Struct('>HBhh')
+FRAME_SIZE = _FRAME.size
+_HEADER = struct.Struct('>cB')
+_PACKET_STRUCTS = {}  # frame count -> struct for the whole packet
+
+SEQUENCE_MODULO = 1 << 16
+
+# Action bitfield
+MOVE_LEFT = 1 << 0
+MOVE_RIGHT = 1 << 1
+MOVE_UP = 1 << 2
+MOVE_DOWN = 1 << 3
+SHOOT = 1 << 4
+SECONDARY_FIRE = 1 << 5
+SPECIAL_FIRE = 1 << 6
+DROP_WEAPON = 1 << 7
+
+# Input dict keys a frame can represent
+FRAME_KEYS = {'mouse_pos', 'movement', 'shoot', 'secondary_fire', 'special_fire',
+              'special_fire_holding', 'drop_weapon', 'input_id'}
+_AIM_KEYS = (('shoot', SHOOT), ('secondary_fire', SECONDARY_FIRE), ('special_fire', SPECIAL_FIRE))
+_INT16_MIN, _INT16_MAX = -32768, 32767
+
+
+def encode_input_frame(input_data: dict, sequence: int) -> Optional[bytes]:
+    """
+    Encode one input dict as a binary frame.
+
+    Returns:
+        The packed frame, or None if the dict holds anything a frame cannot represent
+    """
+    if not FRAME_KEYS.issuperset(input_data):
+        return None
+    mouse_pos = input_data.get('mouse_pos')
+    movement = input_data.get('movement')
+    if mouse_pos is None or movement is None or len(mouse_pos) != 2 or len(movement) != 2:
+        return None
+
+    aim_x, aim_y = round(mouse_pos[0]), round(mouse_pos[1])
+    if not (_INT16_MIN <= aim_x <= _INT16_MAX and _INT16_MIN <= aim_y <= _INT16_MAX):
+        return None
+
+    actions = 0
+    move_x, move_y = movement
+    if move_x == -1: actions |= MOVE_LEFT
+    elif move_x == 1: actions |= MOVE_RIGHT
+    elif move_x != 0: return None
+    if move_y == 1: actions |= MOVE_UP
+    elif move_y == -1: actions |= MOVE_DOWN
+    elif move_y != 0: return None
+
+    # Fire actions always target the aim point
+    for key, bit in _AIM_KEYS:
+        if key in input_data:
+            target = input_data[key]
+            if not target or len(target) != 2 or (round(target[0]), round(target[1])) != (aim_x, aim_y):
+                return None
+            actions |= bit
+    if input_data.get('special_fire_holding', False) and not actions & SPECIAL_FIRE:
+        return None
+    if 'drop_weapon' in input_data:
+        if input_data['drop_weapon'] is not True:
+            return None
+        actions |= DROP_WEAPON
+
+    return _FRAME.pack(sequence % SEQUENCE_MODULO, actions, aim_x, aim_y)
+
+
+def frame_to_input(actions: int, aim_x: int, aim_y: int) -> dict:
+    """Expand decoded frame fields into the input dict process_input expects."""
+    aim = [aim_x, aim_y]
+    movement = [0, 0]
+    if actions & MOVE_LEFT: movement[0] = -1
+    elif actions & MOVE_RIGHT: movement[0] = 1
+    if actions & MOVE_UP: movement[1] = 1
+    elif actions & MOVE_DOWN: movement[1] = -1
+
+    input_data = {'mouse_pos': aim, 'movement': movement}
+    if actions & SHOOT: input_data['shoot'] = aim
+    if actions & SECONDARY_FIRE: input_data['secondary_fire'] = aim
+    if actions & SPECIAL_FIRE:
+        input_data['special_fire'] = aim
+        input_data['special_fire_holding'] = True
+    if actions & DROP_WEAPON: input_data['drop_weapon'] = True
+    return input_data
+
+
+def decode_input_frame(frame: bytes, offset: int = 0) -> Tuple[int, dict]:
+    """Decode one frame into (sequence, input dict)."""
+    sequence, actions, aim_x, aim_y = _FRAME.unpack_from(frame, offset)
+    return sequence, frame_to_input(actions, aim_x, aim_y)
+
+
+def pack_input_packet(frames: List[bytes]) -> bytes:
+    """Build an input packet from encoded frames, newest first."""
+    return _HEADER.pack(INPUT_PACKET_MAGIC, len(frames)) + b''.join(frames)
+
+
+def is_input_packet(data) -> bool:
+    """True if a received payload is a binary input packet rather than a pickle."""
+    return data[:1] == INPUT_PACKET_MAGIC
+
+
+def _packet_struct(count: int) -> struct.Struct:
+    """Struct for a whole packet of `count` frames, so one C call unpacks every field."""
+    packet_struct = _PACKET_STRUCTS.get(count)
+    if packet_struct is None:
+        packet_struct = _PACKET_STRUCTS[count] = struct.Struct('>cB' + 'HBhh' * count)
+    return packet_struct
+
+
+def input_packet_frames(data) -> List[Tuple[int, int, int, int]]:
+    """
+    Raw (sequence, actions, aim_x, aim_y) fields of every frame in a packet, oldest first.
+    The server checks the sequence numbers and only expands frames it has not seen yet.
+    """
+    count = data[1] if len(data) >= _HEADER.size else 0
+    if data[:1] != INPUT_PACKET_MAGIC or len(data) != _HEADER.size + count * FRAME_SIZE:
+        raise ValueError(f"Malformed input packet ({len(data)} bytes)")
+    fields = _packet_struct(count).unpack(data)
+    return [fields[i:i + 4] for i in range(len(fields) - 4, 1, -4)]
+
+
+def unpack_input_packet(data) -> List[Tuple[int, dict]]:
+    """Decode every frame of a packet into (sequence, input dict), oldest first."""
+    return [(sequence, frame_to_input(actions, aim_x, aim_y)) for sequence, actions, aim_x, aim_y in input_packet_frames(data)]
+
+
+def unwrap_sequence(sequence: int, last_input_id: int) -> Optional[int]:
+    """
+    Extend a 16-bit sequence number to a full input id relative to the last applied id.
+
+    Returns:
+        The full input id, or None if the frame is not newer than last_input_id
+    """
+    delta = (sequence - last_input_id) % SEQUENCE_MODULO
+    if delta == 0 or delta >= SEQUENCE_MODULO // 2:
+        return None
+    return last_input_id + delta
@@ -0,0 +1,151 @@
+"""
+Central logging for network and transfer hot paths.
+
+Records are handed to a queue in the calling thread and written to stdout by a
+background listener thread, so the game and network loops never block on
+console I/O. Every subsystem gets its own logger ("network.client",
+"network.server", "transfer", ...) whose level can be set independently, and a
+per-call-site rate limit keeps per-message/per-chunk lines from flooding the log.
+
+Levels can be overridden with the CC_LOG_LEVELS environment variable, e.g.
+    CC_LOG_LEVELS="network.client=DEBUG,transfer=WARNING"
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import types
+
+from BASE_files.BASE_state import process_singleton
+
+ROOT_LOGGER_NAME = "core_conflict"
+DEFAULT_LEVEL = logging.INFO
+
+# Per call site (file, line): at most RATE_LIMIT_BURST records every RATE_LIMIT_WINDOW seconds.
+# Warnings and errors are never rate limited.
+RATE_LIMIT_WINDOW = 1.0
+RATE_LIMIT_BURST = 10
+
+# One queue, handler and listener per process: a module imported again after clear_python_cache()
+# reconfigures the same ones instead of attaching a second handler to the shared logger
+_state = process_singleton("logging_state", lambda: types.SimpleNamespace(
+    lock=threading.Lock(),
+    queue=None,
+    queue_handler=None,
+    listener=None,
+))
+
+
+class RateLimitFilter(logging.Filter):
+    """Drops records from call sites that log more than `burst` times per `window` seconds."""
+
+    def __init__(self, window: float = RATE_LIMIT_WINDOW, burst: int = RATE_LIMIT_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._sites = {}  # (pathname, lineno) -> [window_start, count, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        site = (record.pathname, record.lineno)
+        state = self._sites.get(site)
+        if state is None or now - state[0] >= self.window:
+            suppressed = state[2] if state else 0
+            self._sites[site] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} (+{suppressed} similar suppressed)"
+            return True
+
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+
+        state[2] += 1
+        return False
+
+
+def _parse_level_overrides(spec: str) -> dict:
+    """Parse "subsystem=LEVEL,subsystem=LEVEL" into {subsystem: level}."""
+    levels = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        level = logging.getLevelName(level.strip().upper())
+        if isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
+
+def configure_logging(levels: dict = None, stream=None):
+    """
+    (Re)configure the queue handler and its background writer thread.
+
+    Args:
+        levels: Optional {subsystem: level} overrides (merged over CC_LOG_LEVELS)
+        stream: Where the listener writes records (default: sys.stdout)
+    """
+    with _state.lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        if _state.listener is not None:
+            _state.listener.stop()
+        if _state.queue_handler is not None:
+            root.removeHandler(_state.queue_handler)
+
+        _state.queue = queue.Queue(-1)
+        _state.queue_handler = logging.handlers.QueueHandler(_state.queue)
+        _state.queue_handler.addFilter(RateLimitFilter())
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(logging.Formatter("[%(asctime)s.%(msecs)03d] %(message)s", datefmt="%H:%M:%S"))
+        _state.listener = logging.handlers.QueueListener(_state.queue, output, respect_handler_level=False)
+        _state.listener.start()
+
+        root.addHandler(_state.queue_handler)
+        root.setLevel(DEFAULT_LEVEL)
+        # Records stay inside our handler; the root logger may be configured differently by the host app
+        root.propagate = False
+
+    overrides = _parse_level_overrides(os.getenv("CC_LOG_LEVELS", ""))
+    overrides.update(levels or {})
+    for subsystem, level in overrides.items():
+        set_level(subsystem, level)
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Return the logger for a subsystem (e.g. "network.client"), configuring logging on first use."""
+    if _state.listener is None:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
+
+
+def set_level(subsystem: str, level):
+    """Change the level of one subsystem at runtime (accepts names like "DEBUG" or logging constants)."""
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}").setLevel(level)
+
+
+def flush_logging():
+    """Block until every queued record has been written."""
+    if _state.queue is not None:
+        _state.queue.join()
+
+
+def shutdown_logging():
+    """Stop the background writer after draining the queue."""
+    with _state.lock:
+        if _state.listener is not None:
+            _state.listener.stop()
+            _state.listener = None
+
+
+atexit.register(shutdown_logging)
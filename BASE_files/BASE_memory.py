@@ -0,0 +1,244 @@
+"""
+Memory growth monitor: tracemalloc snapshots attributed to subsystems.
+
+A long-running server or client should reach a steady state after its first
+match; anything that keeps growing afterwards is a leak. While the monitor is
+running it takes a tracemalloc snapshot every CC_MEMORY_INTERVAL seconds
+(default 30) from a background thread, groups the traced bytes by source file
+and maps each file to a subsystem:
+
+    network        server.py, network_client, framing, datagrams, delta sync
+    transfers      BASE_transfer, file sync, backup jobs, patch manager
+    arena          BASE_components (arena, characters, projectiles, effects)
+    game           GameFolder (game code written by the agents)
+    agent          agent.py and coding/ (LLM handlers, merge machinery, caches)
+    visual_logger  visual_logger/
+    tooling        the other BASE_files modules (metrics, profilers, helpers)
+    python         everything else (standard library, site-packages)
+
+Growth is measured against the first snapshot (the baseline). A subsystem
+whose growth passes its budget logs a warning naming the source lines that
+grew most since the previous snapshot; it warns again only after dropping
+back under budget. Budgets come from CC_MEMORY_BUDGETS ("game=32,agent=64",
+megabytes), falling back to DEFAULT_BUDGET_MB.
+
+tracemalloc slows every allocation down (roughly 2x with one frame per
+trace), so the monitor is off unless CC_MEMORY_MONITOR=1; GameServer.start()
+and the game client start it then. rss_bytes() reads the resident set size
+without tracemalloc and is what the soak test checks.
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from BASE_files.BASE_logging import get_logger
+from BASE_files.BASE_state import process_singleton
+
+logger = get_logger("memory")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_INTERVAL = 30.0
+DEFAULT_BUDGET_MB = 64.0
+TOP_LINES = 3  # Source lines named in a warning
+
+# First match wins, so the specific BASE_files modules come before the catch-all
+SUBSYSTEMS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("network", ("server.py", "BASE_files/network_client.py", "BASE_files/BASE_network.py",
+                 "BASE_files/BASE_framing.py", "BASE_files/BASE_datagram.py", "BASE_files/BASE_delta_sync.py",
+                 "BASE_files/BASE_input_codec.py", "BASE_files/BASE_telemetry.py", "BASE_files/BASE_rooms.py",
+                 "BASE_files/BASE_shards.py")),
+    ("transfers", ("BASE_files/BASE_transfer.py", "BASE_files/BASE_file_sync.py", "BASE_files/BASE_backup_jobs.py",
+                   "BASE_files/patch_manager.py")),
+    ("arena", ("BASE_components/",)),
+    ("game", ("GameFolder/",)),
+    ("agent", ("agent.py", "coding/")),
+    ("visual_logger", ("visual_logger/",)),
+    ("tooling", ("BASE_files/",)),
+)
+OTHER = "python"
+
+
+def subsystem_of(filename: str) -> str:
+    """Subsystem a source file belongs to (OTHER outside the project)."""
+    if not filename.startswith(PROJECT_ROOT):
+        return OTHER
+    relative = filename[len(PROJECT_ROOT) + 1:].replace(os.sep, "/")
+    for name, prefixes in SUBSYSTEMS:
+        if any(relative.startswith(prefix) for prefix in prefixes):
+            return name
+    return OTHER
+
+
+def parse_budgets(text: Optional[str]) -> Dict[str, int]:
+    """'game=32,agent=64' (megabytes) -> {subsystem: bytes}; malformed entries are ignored."""
+    budgets = {}
+    for entry in (text or "").split(","):
+        name, _, megabytes = entry.partition("=")
+        try:
+            budgets[name.strip()] = int(float(megabytes) * 1024 * 1024)
+        except ValueError:
+            continue
+    return budgets
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # macOS reports bytes, Linux KiB
+
+
+def monitor_enabled() -> bool:
+    return os.getenv("CC_MEMORY_MONITOR", "0") == "1"
+
+
+class MemoryMonitor:
+    """Periodic tracemalloc snapshots, growth per subsystem and budget warnings."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, budgets: Optional[Dict[str, int]] = None,
+                 default_budget: int = int(DEFAULT_BUDGET_MB * 1024 * 1024), frames: int = 1):
+        self.interval = interval
+        self.budgets = budgets if budgets is not None else {}
+        self.default_budget = default_budget
+        self.frames = frames
+        self.baseline: Dict[str, int] = {}
+        self.current: Dict[str, int] = {}
+        self.over_budget: Dict[str, int] = {}  # subsystem -> growth when it last warned
+        self.warnings = 0
+        self.snapshots = 0
+        self.last_rss = 0
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # sample() may be called by hand while the thread runs
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def budget_for(self, subsystem: str) -> int:
+        return self.budgets.get(subsystem, self.default_budget)
+
+    def start(self, background: bool = True):
+        """Start tracing (unless something else already is), take the baseline and sample periodically."""
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self.baseline = {}
+        self._previous = None
+        self.over_budget = {}
+        self.sample()
+        if background:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+            self._thread.start()
+        logger.info("🧠 MEMORY: Tracing allocations, snapshot every %.0fs (%.1f MB traced at baseline)",
+                    self.interval, sum(self.baseline.values()) / 1024 / 1024)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self._previous = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:  # A failed snapshot must not end monitoring
+                logger.warning("🧠 MEMORY: Snapshot failed: %s", e)
+
+    def sample(self) -> Dict[str, int]:
+        """Take a snapshot, update the growth per subsystem and warn about budgets; returns the growth."""
+        with self._lock:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ))
+            totals: Dict[str, int] = {}
+            for stat in snapshot.statistics("filename"):
+                subsystem = subsystem_of(stat.traceback[0].filename)
+                totals[subsystem] = totals.get(subsystem, 0) + stat.size
+            self.current = totals
+            if not self.baseline:
+                self.baseline = dict(totals)
+            self.snapshots += 1
+            self.last_rss = rss_bytes()
+
+            growth = self.growth()
+            for subsystem in set(growth) | set(self.over_budget):  # A subsystem may have freed everything
+                grown = growth.get(subsystem, 0)
+                if grown <= self.budget_for(subsystem):
+                    self.over_budget.pop(subsystem, None)
+                elif subsystem not in self.over_budget:
+                    self.over_budget[subsystem] = grown
+                    self.warnings += 1
+                    self._warn(subsystem, grown, snapshot)
+            self._previous = snapshot
+            return growth
+
+    def growth(self) -> Dict[str, int]:
+        """Bytes each subsystem grew since the baseline (negative when it shrank)."""
+        return {subsystem: self.current.get(subsystem, 0) - self.baseline.get(subsystem, 0)
+                for subsystem in set(self.current) | set(self.baseline)}
+
+    def top_growth(self, snapshot: tracemalloc.Snapshot, subsystem: str,
+                   limit: int = TOP_LINES) -> List[Tuple[str, int]]:
+        """('file:line', bytes) of the subsystem's lines that grew most since the previous snapshot."""
+        if self._previous is None:
+            return []
+        lines = []
+        for stat in snapshot.compare_to(self._previous, "lineno"):
+            frame = stat.traceback[0]
+            if stat.size_diff > 0 and subsystem_of(frame.filename) == subsystem:
+                lines.append((f"{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno}", stat.size_diff))
+                if len(lines) == limit:
+                    break
+        return lines
+
+    def _warn(self, subsystem: str, grown: int, snapshot: tracemalloc.Snapshot):
+        lines = ", ".join(f"{where} +{size / 1024:.0f} KB" for where, size in self.top_growth(snapshot, subsystem))
+        logger.warning("🧠 MEMORY: %s grew %.1f MB since the baseline (budget %.1f MB)%s", subsystem,
+                       grown / 1024 / 1024, self.budget_for(subsystem) / 1024 / 1024,
+                       f"; growing fastest: {lines}" if lines else "")
+
+    def report(self) -> dict:
+        return {
+            'running': self.running,
+            'snapshots': self.snapshots,
+            'rss_bytes': self.last_rss,
+            'traced_bytes': dict(self.current),
+            'growth_bytes': self.growth(),
+            'over_budget': sorted(self.over_budget),
+            'warnings': self.warnings,
+        }
+
+
+def start_if_enabled() -> bool:
+    """Start the process-wide monitor when CC_MEMORY_MONITOR=1; True if this call started it."""
+    if not monitor_enabled() or memory_monitor.running:
+        return False
+    memory_monitor.interval = float(os.getenv("CC_MEMORY_INTERVAL", DEFAULT_INTERVAL))
+    memory_monitor.budgets = parse_budgets(os.getenv("CC_MEMORY_BUDGETS"))
+    memory_monitor.start()
+    return True
+
+
+# One monitor per process
+memory_monitor: MemoryMonitor = process_singleton("memory_monitor", MemoryMonitor)
@@ -18,8 +18,12 @@ from BASE_files.BASE_game_client import run_client, DEFAULT_WIDTH, DEFAULT_HEIGH
 from BASE_files.BASE_menu_renderers import MenuRenderers
 from BASE_files.BASE_menu_handlers import MenuHandlers
 from BASE_files.BASE_menu_network import MenuNetwork
-from coding.non_callable_tools.version_control import VersionControl
-from coding.non_callable_tools.action_logger import ActionLogger
+
+# Menu frame rates: full rate while the user interacts or the screen changes,
+# idle rate once nothing has changed for MENU_ACTIVE_HOLD seconds
+MENU_FPS = 60
+MENU_IDLE_FPS = 10
+MENU_ACTIVE_HOLD = 0.5
 
 # Features:
 # - Main menu
@@ -88,6 +92,7 @@ class BaseMenu:
         self.in_room = False
         self.room_code = ""  # Code displayed when creating a room
         self.join_room_code = ""  # Code entered when joining a room
+        self.target_room_code = None  # Full code of the joined room (selects a room on multi-room servers)
         self.available_games = []
         self.patch_to_apply = None
 
@@ -114,7 +119,10 @@ class BaseMenu:
         self.renderers = MenuRenderers(self)
 
         # Action logger for patch saving - use provided instance or create new one
-        self.action_logger = action_logger if action_logger is not None else ActionLogger()
+        if action_logger is None:
+            from coding.non_callable_tools.action_logger import ActionLogger
+            action_logger = ActionLogger()
+        self.action_logger = action_logger
 
         # Settings state
         self.settings_username = ""
@@ -132,6 +140,7 @@ class BaseMenu:
     def show_menu(self, menu_name: str):
         """Switch to a different menu."""
         self.current_menu = menu_name
+        self.renderers.invalidate()
 
         # Set room state
         if menu_name == "room":
@@ -150,21 +159,33 @@ class BaseMenu:
             self.patch_manager.scan_patches()
 
     def render(self):
-        """Render the current menu."""
-        self.renderers.render()
+        """Render the current menu, pushing only the changed regions to the display.
 
-        pygame.display.flip()
+        Returns:
+            True if anything was redrawn this frame
+        """
+        dirty_rects = self.renderers.render()
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        return bool(dirty_rects)
 
     def run_menu_loop(self):
         """Main menu loop."""
         print("Starting menu loop...")
+        last_activity = time.time()
         while self.running:
-            self.clock.tick(60)
+            # Full rate while the user interacts or something animates, idle rate otherwise
+            active = time.time() - last_activity < MENU_ACTIVE_HOLD
+            self.clock.tick(MENU_FPS if active else MENU_IDLE_FPS)
 
             for event in pygame.event.get():
+                last_activity = time.time()
                 if event.type == pygame.QUIT:
                     print("Quit event received.")
                     self.running = False
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.VIDEORESIZE):
+                    # The window contents were lost, repaint everything
+                    self.renderers.invalidate()
                 else:
                     # Delegate events to the UI manager first
                     ui = self.renderers._get_current_ui()
@@ -180,8 +201,8 @@ class BaseMenu:
                 self.client.update()
 
             # Only render if still running (in case game was started during update)
-            if self.running:
-                self.render()
+            if self.running and self.render():
+                last_activity = time.time()
 
         print("Menu loop finished.")
         pygame.quit()
@@ -481,6 +502,14 @@ class BaseMenu:
             self.client.disconnect()
         self.show_menu("main")
 
+    def room_closed_callback(self, reason: str):
+        """Callback when the server closes our room (its room process stopped)."""
+        print(f"[warning]  Room closed: {reason}")
+        self.show_error_message(f"Room closed: {reason}")
+        if self.client:
+            self.client.disconnect()
+        self.show_menu("main")
+
     def patch_received_callback(self, patch_path: str):
         """Callback when patch file is received from server."""
         print(f"📦 Received merge patch: {patch_path}")
@@ -502,6 +531,7 @@ class BaseMenu:
 
         try:
             # Import version control system to apply the patch
+            from coding.non_callable_tools.version_control import VersionControl
             version_control = VersionControl(self.action_logger, path_to_security_backup="__TEMP_SECURITY_BACKUP")
             result, errors = version_control.apply_all_changes(needs_rebase=True, path_to_BASE_backup="__game_backups", file_containing_patches=patch_path, skip_warnings=True)
 
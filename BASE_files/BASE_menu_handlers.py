@@ -70,6 +70,7 @@ class MenuHandlers:
             # Store the target server info and show room menu
             self.menu.target_server_ip = server_ip
             self.menu.target_server_port = server_port
+            self.menu.target_room_code = self.menu.join_room_code.strip().upper()
             self.menu.show_menu("room")
         except Exception as e:
             self.menu.show_error_message(f"Invalid room code: {str(e)}")
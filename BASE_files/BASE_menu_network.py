@@ -56,6 +56,8 @@ class MenuNetwork:
             # Update host and port in case they changed
             self.client.host = server_host
             self.client.port = server_port
+        # Joined rooms carry their code (multi-room servers route on it); our own server ignores it
+        self.client.room_code = getattr(self.menu, 'target_room_code', None)
 
         # Only connect if not already connected
         self.client.disconnect()
@@ -68,6 +70,7 @@ class MenuNetwork:
         self.client.on_file_received = self.menu.file_received_callback
         self.client.on_file_transfer_progress = self.menu.file_transfer_progress_callback
         self.client.on_name_rejected = self.menu.name_rejected_callback
+        self.client.on_room_closed = self.menu.room_closed_callback
         self.client.on_game_start = self.menu.game_start_callback
         self.client.on_patch_received = self.menu.patch_received_callback
         self.client.on_patch_sync_failed = self.menu.patch_sync_failed_callback
@@ -106,6 +109,7 @@ class MenuNetwork:
             self.menu.room_code = encrypt_code(local_ip, self.server_port, "LOCAL")
             print(f"Local room code: {self.menu.room_code}")
 
+        self.menu.target_room_code = None
         self.connect_to_server("localhost", self.server_port)
 
     def create_remote_room(self):
@@ -122,6 +126,7 @@ class MenuNetwork:
         print("NOTE: For remote public games to work, replace the external_ip with your actual external IP address")
 
         # Connect to the remote server
+        self.menu.target_room_code = None
         if not self.connect_to_server(REMOTE_DOMAIN, self.server_port):
             print("Failed to connect to remote server!")
             return False
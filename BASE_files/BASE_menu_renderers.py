@@ -11,12 +11,15 @@ from BASE_files.BASE_ui_components import (
     AgentWorkspace, TextFieldWithPaste, NotificationOverlay
 )
 
+MENU_BACKGROUND = (20, 20, 30)
+
 class MenuRenderers:
     """Handles rendering of different menu screens using components."""
 
     def __init__(self, menu_instance):
         self.menu = menu_instance
         self.managers = {}
+        self._last_rendered_ui = None
 
         # Initialize dynamic scaling system
         self._init_scaling()
@@ -260,17 +263,33 @@ class MenuRenderers:
     def _get_current_ui(self):
         return self.managers.get(self.menu.current_menu)
 
+    def invalidate(self):
+        """Force a full redraw of the current menu on the next frame (menu switch, window exposed, game exited)."""
+        ui = self._get_current_ui()
+        if ui:
+            ui.invalidate()
+
     def render(self):
-        """Render the current menu state."""
-        # Always clear the screen first to prevent artifacts from previous frames
-        self.menu.screen.fill((20, 20, 30))
+        """
+        Render the current menu state, redrawing only what changed.
 
+        Returns:
+            List of screen rects that were repainted (empty when the menu is unchanged)
+        """
         ui = self._get_current_ui()
-        if ui:
-            # First, update component data from menu state
-            self._sync_state_to_components(ui)
-            ui.update()
-            ui.render(self.menu.screen)
+        if not ui:
+            self.menu.screen.fill(MENU_BACKGROUND)
+            return [self.menu.screen.get_rect()]
+
+        # A different menu was drawn last frame, so nothing on screen can be reused
+        if ui is not self._last_rendered_ui:
+            ui.invalidate()
+            self._last_rendered_ui = ui
+
+        # First, update component data from menu state
+        self._sync_state_to_components(ui)
+        ui.update()
+        return ui.render_dirty(self.menu.screen, MENU_BACKGROUND)
 
     def _sync_state_to_components(self, ui):
         """Dynamic sync of menu variables to UI components."""
@@ -0,0 +1,308 @@
+"""
+Prometheus text-format metrics for the game server (stdlib only).
+
+MetricsExporter serves GET /metrics on 127.0.0.1 from its own thread. A
+scrape only reads counters that the game and network threads update as plain
+attributes (ints, floats, bucket lists copied in one call), so it never takes
+a lock the game loop waits on. A scrape racing an update may be one sample
+behind; every line is still internally consistent.
+
+Durations recorded outside the server object (merge pipeline stages, test
+runs, backup transfers) go through observe_duration(name, seconds, **labels)
+into a process-wide registry; the exporter publishes them as histograms.
+GC pauses are measured with gc.callbacks while an exporter or a match (the
+BASE_gc policy) is running.
+
+Enable with GameServer(metrics_port=...), `server.py --metrics-port`, or
+CC_METRICS_PORT. Port 0 picks a free port (see MetricsExporter.port).
+"""
+
+import gc
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from BASE_files.BASE_logging import get_logger
+from BASE_files.BASE_state import process_singleton
+
+logger = get_logger("metrics")
+gc_logger = get_logger("gc")
+
+PREFIX = "core_conflict"
+TICK_BUCKETS = (0.001, 0.002, 0.004, 0.008, 0.012, 0.016, 0.025, 0.05, 0.1, 0.25)
+DURATION_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+GC_BUCKETS = (0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+SLOW_GC_PAUSE_SECONDS = 0.005  # Collections longer than this are logged at INFO
+
+
+class Histogram:
+    """Cumulative-style histogram: one writer adds, any thread reads a copy."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot: above the largest bound (+Inf)
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """(per-bucket counts, sum): list() copies under the GIL, so counts are never torn."""
+        return list(self.counts), self.total
+
+
+class MetricsRegistry:
+    """Process-wide histograms keyed by (name, labels)."""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._lock = threading.Lock()  # Only taken when a new series is created
+
+    def observe(self, name: str, seconds: float, buckets: Tuple[float, ...] = DURATION_BUCKETS, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, Histogram(buckets))
+        histogram.observe(seconds)
+
+
+class GcPauseTracker:
+    """
+    Times every garbage collection through gc.callbacks and logs the slow ones. Installed while
+    an exporter or a match (BASE_gc.GcPolicy) runs; each install() is paired with an uninstall().
+    """
+
+    def __init__(self):
+        self.pauses: Dict[int, Histogram] = {generation: Histogram(GC_BUCKETS) for generation in range(3)}
+        self.longest: Dict[int, float] = {generation: 0.0 for generation in range(3)}
+        self.collected = 0
+        self.scheduled = False  # Set around collections run on purpose in idle time: not logged as stalls
+        self._start = 0.0
+        self.installed = 0
+
+    def _callback(self, phase: str, info: dict):
+        if phase == "start":
+            self._start = time.perf_counter()
+            return
+        pause = time.perf_counter() - self._start
+        generation = info.get("generation", 2)
+        self.pauses[generation].observe(pause)
+        if pause > self.longest[generation]:
+            self.longest[generation] = pause
+        self.collected += info.get("collected", 0)
+        if pause >= SLOW_GC_PAUSE_SECONDS and not self.scheduled:
+            gc_logger.info("🗑️  GC: Generation %d collection paused %.1f ms (%d objects collected)",
+                           generation, pause * 1000, info.get("collected", 0))
+        else:
+            gc_logger.debug("🗑️  GC: Generation %d collection %.2f ms%s", generation, pause * 1000,
+                            " (idle)" if self.scheduled else "")
+
+    def install(self):
+        if not self.installed:
+            gc.callbacks.append(self._callback)
+        self.installed += 1
+
+    def uninstall(self):
+        self.installed = max(0, self.installed - 1)
+        if not self.installed and self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+
+# One registry per process, shared by every subsystem that records metrics
+registry: MetricsRegistry = process_singleton("metrics_registry", MetricsRegistry)
+gc_tracker: GcPauseTracker = process_singleton("gc_pause_tracker", GcPauseTracker)
+
+
+def observe_duration(name: str, seconds: float, **labels):
+    """Record a duration (seconds) in the process-wide registry, e.g. observe_duration('test_run_seconds', 3.2)."""
+    registry.observe(name, seconds, **labels)
+
+
+class StageTimer:
+    """Times consecutive stages of a pipeline: mark(stage) records the stage that just finished."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        registry.observe(self.name, now - self._last, stage=stage)
+        self._last = now
+
+
+# ----- text format -----
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: List[str] = []
+        self._declared = set()
+
+    def _declare(self, name: str, kind: str, help_text: str):
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f"# HELP {name} {help_text}")
+            self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, kind: str, help_text: str, value, labels=()):
+        name = f"{PREFIX}_{name}"
+        self._declare(name, kind, help_text)
+        self.lines.append(f"{name}{_labels(labels)} {float(value):g}")
+
+    def histogram(self, name: str, help_text: str, histogram: Histogram, labels=()):
+        name = f"{PREFIX}_{name}"
+        self._declare(name, "histogram", help_text)
+        counts, total = histogram.snapshot()
+        running = 0
+        for bound, count in zip(histogram.buckets, counts):
+            running += count
+            self.lines.append(f"{name}_bucket{_labels(tuple(labels) + (('le', f'{bound:g}'),))} {running}")
+        running += counts[-1]
+        self.lines.append(f"{name}_bucket{_labels(tuple(labels) + (('le', '+Inf'),))} {running}")
+        self.lines.append(f"{name}_sum{_labels(labels)} {total:g}")
+        self.lines.append(f"{name}_count{_labels(labels)} {running}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _write_server(out: _Writer, server, labels=()):
+    """Series of one GameServer (or one hosted room, with labels=(('room', id),))."""
+    labels = tuple(labels)
+    out.histogram("tick_duration_seconds", "Time spent in one server tick (simulation, serialization, send)",
+                  server.tick_durations, labels)
+    out.sample("tick_overruns_total", "counter", "Ticks that took longer than the tick interval",
+               server.tick_overruns, labels)
+    out.sample("ticks_total", "counter", "Server ticks run", server.ticks_run, labels)
+    out.sample("ticks_deferred_total", "counter", "Room ticks postponed because the shared tick budget ran out",
+               server.ticks_deferred, labels)
+    out.sample("connected_clients", "gauge", "Registered client connections", len(server.clients), labels)
+    out.sample("pending_clients", "gauge", "Connections that have not sent their name yet",
+               len(server.pending_clients), labels)
+
+    arena = server.arena
+    entity_lists = (("character", "characters"), ("projectile", "projectiles"), ("weapon_pickup", "weapon_pickups"),
+                    ("ammo_pickup", "ammo_pickups"), ("platform", "platforms"))
+    for entity_type, attribute in entity_lists:
+        count = len(getattr(arena, attribute, ())) if arena is not None else 0
+        out.sample("entities", "gauge", "Arena entities by type", count, labels + (("type", entity_type),))
+
+    out.sample("snapshot_bytes", "gauge", "Size of the last serialized game_state", server.last_state_bytes, labels)
+    out.sample("snapshot_bytes_total", "counter", "Bytes of game_state serialized", server.state_bytes_total, labels)
+    out.sample("outbox_bytes_sent_total", "counter", "Bytes written to client sockets", server.outbox.bytes_sent, labels)
+
+    transfers = server.transfers
+    for direction, value in (("sent", transfers.bytes_sent), ("received", transfers.bytes_received),
+                             ("resumed", transfers.bytes_resumed)):
+        out.sample("transfer_bytes_total", "counter", "Patch/backup/file transfer bytes", value,
+                   labels + (("direction", direction),))
+    out.sample("transfer_chunks_retried_total", "counter", "Transfer chunks sent again after a bad hash",
+               transfers.chunks_retried, labels)
+    out.sample("transfers_active", "gauge", "Transfers in progress by direction", len(transfers.outgoing),
+               labels + (("direction", "outgoing"),))
+    out.sample("transfers_active", "gauge", "Transfers in progress by direction", len(transfers.incoming),
+               labels + (("direction", "incoming"),))
+
+
+def _write_process(out: _Writer, workers):
+    """Series shared by the whole process: worker pool, registry durations, GC pauses."""
+    out.sample("worker_jobs_pending", "gauge", "File/hash/archive jobs queued or running", workers.pending)
+
+    for (name, labels), histogram in sorted(list(registry.histograms.items()), key=lambda item: item[0]):
+        out.histogram(name, f"Duration histogram ({name})", histogram, labels)
+
+    for generation, histogram in gc_tracker.pauses.items():
+        out.histogram("gc_pause_seconds", "Garbage collection pause by generation", histogram,
+                      (("generation", str(generation)),))
+    out.sample("gc_collected_objects_total", "counter", "Objects freed by the garbage collector", gc_tracker.collected)
+
+
+def render_metrics(server) -> str:
+    """Every metric of `server` (a GameServer) and the process-wide registry in Prometheus text format."""
+    out = _Writer()
+    _write_server(out, server)
+    _write_process(out, server.workers)
+    return out.text()
+
+
+def render_room_metrics(manager) -> str:
+    """Metrics of a RoomManager (BASE_rooms): its scheduler plus every room's series labelled by room id."""
+    out = _Writer()
+    rooms = list(manager.rooms.values())
+    out.sample("rooms", "gauge", "Rooms hosted by this process", len(rooms))
+    out.sample("room_tick_passes_total", "counter", "Round-robin passes over the rooms", manager.tick_passes)
+    out.sample("room_tick_budget_exhausted_total", "counter", "Passes that ran out of tick budget before every room",
+               manager.budget_exhausted)
+    out.sample("connections_routing", "gauge", "Connections waiting for their room code", len(manager.pending))
+    for room in rooms:
+        _write_server(out, room, (("room", room.room_id),))
+    _write_process(out, manager.workers)
+    return out.text()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body = self.server.render(self.server.game_server).encode("utf-8")
+        except Exception as e:  # A half-built server (restart in progress) must not kill the exporter
+            self.send_error(500, str(e))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the console
+
+
+class MetricsExporter:
+    """HTTP endpoint served from a background thread on localhost (a RoomManager uses render_room_metrics)."""
+
+    def __init__(self, game_server, port: int = 0, host: str = "127.0.0.1", render=render_metrics):
+        self.game_server = game_server
+        self.host = host
+        self.requested_port = port
+        self.render = render
+        self.httpd: Optional[HTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> Optional[int]:
+        return self.httpd.server_address[1] if self.httpd else None
+
+    def start(self):
+        self.httpd = HTTPServer((self.host, self.requested_port), _MetricsHandler)
+        self.httpd.game_server = self.game_server
+        self.httpd.render = self.render
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.5},
+                                       name="metrics-exporter", daemon=True)
+        self.thread.start()
+        gc_tracker.install()
+        logger.info("📈 METRICS: Serving Prometheus metrics on http://%s:%d/metrics", self.host, self.port)
+
+    def stop(self):
+        if self.httpd is None:
+            return
+        gc_tracker.uninstall()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.httpd = None
@@ -0,0 +1,226 @@
+"""
+Live migration of game objects to reloaded GameFolder classes.
+
+After reload_game_code() the running arena still holds instances (and class
+references such as the lootpool and projectile_type_map) of the old classes.
+Instead of throwing the arena away, migrate_objects() walks it and points
+everything at the class with the same module and qualified name in the
+reloaded module:
+
+    instance         obj.__class__ = new class, then obj.init_graphics()
+    class reference  replaced in its list / dict (keys too) / set / attribute
+    function         module-level functions are looked up again; lambdas and
+                     nested functions get the reloaded module's globals
+
+Nothing is changed unless every instance is compatible with its new class:
+each field the new class's __init__ (anywhere in its MRO) assigns on self
+must already be on the object or be a class attribute, and __slots__ must
+match. Otherwise the report lists why and the caller rebuilds instead
+(GameServer._recreate_arena_with_players, EntityManager.clear).
+"""
+
+import ast
+import inspect
+import sys
+import textwrap
+import time
+import types
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+GAME_PREFIXES = ("GameFolder.",)
+WALK_PREFIXES = ("GameFolder.", "BASE_components.", "BASE_files.")  # Objects whose attributes are searched
+CONTAINERS = (list, dict, set, deque)
+
+_fields_by_code: Dict[types.CodeType, Set[str]] = {}
+
+
+def declared_fields(cls: type) -> Set[str]:
+    """Names assigned as self.<name> in the __init__ of `cls` and its bases."""
+    fields = set()
+    for klass in cls.__mro__:
+        init = klass.__dict__.get("__init__")
+        code = getattr(init, "__code__", None)
+        if code is None:
+            continue
+        cached = _fields_by_code.get(code)
+        if cached is None:
+            cached = set()
+            try:
+                tree = ast.parse(textwrap.dedent(inspect.getsource(init)))
+            except (OSError, TypeError, SyntaxError):
+                tree = None
+            if tree is not None:
+                self_name = code.co_varnames[0] if code.co_argcount else "self"
+                for node in ast.walk(tree):
+                    targets = (node.targets if isinstance(node, ast.Assign)
+                               else [node.target] if isinstance(node, (ast.AnnAssign, ast.AugAssign)) else [])
+                    for target in targets:
+                        for element in (target.elts if isinstance(target, ast.Tuple) else [target]):
+                            if (isinstance(element, ast.Attribute) and isinstance(element.value, ast.Name)
+                                    and element.value.id == self_name):
+                                cached.add(element.attr)
+            _fields_by_code[code] = cached
+        fields |= cached
+    return fields
+
+
+class MigrationReport:
+    """What one migration found and did."""
+
+    def __init__(self):
+        self.objects = 0  # Game objects visited
+        self.rebound = 0  # Instances moved to a reloaded class
+        self.references = 0  # Class/function references replaced
+        self.incompatible: List[str] = []  # Why a rebuild is needed (empty: migrated)
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.incompatible
+
+    def summary(self) -> str:
+        if not self.ok:
+            return f"incompatible ({'; '.join(self.incompatible[:3])}), rebuild needed"
+        return (f"{self.rebound} objects rebound, {self.references} references updated, "
+                f"{self.objects} objects visited in {self.seconds * 1000:.1f} ms")
+
+
+class _Migration:
+    def __init__(self, prefixes: Tuple[str, ...]):
+        self.prefixes = prefixes
+        self._current: Dict[int, Any] = {}  # id(old class or function) -> replacement (or None)
+
+    def _reloaded(self, module_name: str) -> bool:
+        return any(module_name.startswith(prefix) for prefix in self.prefixes)
+
+    def current(self, value) -> Optional[Any]:
+        """The reloaded counterpart of a class or function, or None if it is current (or unknown)."""
+        key = id(value)
+        if key in self._current:
+            return self._current[key]
+        replacement = None
+        module_name = getattr(value, "__module__", None) or ""
+        module = sys.modules.get(module_name) if self._reloaded(module_name) else None
+        if module is not None:
+            if isinstance(value, type) or "<" not in value.__qualname__:
+                found = module
+                for part in value.__qualname__.split("."):
+                    found = getattr(found, part, None)
+                if found is not None and found is not value and type(found) is type(value) \
+                        and getattr(found, "__name__", None) == value.__name__:
+                    replacement = found
+            elif isinstance(value, types.FunctionType) and value.__globals__ is not module.__dict__:
+                replacement = types.FunctionType(value.__code__, module.__dict__, value.__name__,
+                                                 value.__defaults__, value.__closure__)
+                replacement.__kwdefaults__ = value.__kwdefaults__
+                replacement.__qualname__ = value.__qualname__
+        self._current[key] = replacement
+        return replacement
+
+    def _is_reference(self, value) -> bool:
+        return isinstance(value, (type, types.FunctionType))
+
+    def _walks_into(self, value) -> bool:
+        module_name = type(value).__module__ or ""
+        return hasattr(value, "__dict__") and any(module_name.startswith(prefix) for prefix in WALK_PREFIXES)
+
+    def plan(self, roots: Iterable[Any], report: MigrationReport):
+        """Find instances to rebind and references to replace; nothing is changed yet."""
+        rebinds: List[Tuple[Any, type]] = []
+        edits: List[Tuple[str, Any, Any, Any]] = []  # (kind, holder, key, new value)
+        seen: Set[int] = set()
+        stack = list(roots)
+        while stack:
+            value = stack.pop()
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+
+            if isinstance(value, dict):
+                for key, item in list(value.items()):
+                    if self._is_reference(key) and self.current(key) is not None:
+                        edits.append(("dict_key", value, key, self.current(key)))
+                    self._plan_item(value, "item", key, item, edits, stack)
+            elif isinstance(value, (list, deque)):
+                for index, item in enumerate(list(value)):
+                    self._plan_item(value, "item", index, item, edits, stack)
+            elif isinstance(value, set):
+                for item in list(value):
+                    if self._is_reference(item) and self.current(item) is not None:
+                        edits.append(("set", value, item, self.current(item)))
+                    elif self._walks_into(item):
+                        stack.append(item)
+            elif self._walks_into(value):
+                report.objects += 1
+                new_class = self.current(type(value))
+                if new_class is not None:
+                    reason = self._incompatibility(value, new_class)
+                    if reason:
+                        report.incompatible.append(reason)
+                    rebinds.append((value, new_class))
+                for name, item in list(vars(value).items()):
+                    self._plan_item(value, "attr", name, item, edits, stack)
+        return rebinds, edits
+
+    def _plan_item(self, holder, kind: str, key, item, edits, stack):
+        if self._is_reference(item):
+            replacement = self.current(item)
+            if replacement is not None:
+                edits.append((kind, holder, key, replacement))
+        elif isinstance(item, CONTAINERS) or self._walks_into(item):
+            stack.append(item)
+
+    @staticmethod
+    def _incompatibility(obj, new_class: type) -> Optional[str]:
+        old_class = type(obj)
+        if old_class.__dict__.get("__slots__") != new_class.__dict__.get("__slots__"):
+            return f"{new_class.__qualname__}: __slots__ changed"
+        missing = sorted(name for name in declared_fields(new_class)
+                         if name not in obj.__dict__ and not hasattr(new_class, name))
+        if missing:
+            return f"{new_class.__qualname__} declares new fields {', '.join(missing)}"
+        return None
+
+    @staticmethod
+    def apply(rebinds, edits, report: MigrationReport):
+        # Values before keys: a dict whose key and value are both classes gets its value replaced first
+        for kind, holder, key, replacement in sorted(edits, key=lambda edit: edit[0] == "dict_key"):
+            if kind == "attr":
+                setattr(holder, key, replacement)
+            elif kind == "item":
+                holder[key] = replacement
+            elif kind == "dict_key":
+                holder[replacement] = holder.pop(key)
+            elif kind == "set":
+                holder.discard(key)
+                holder.add(replacement)
+            report.references += 1
+        for obj, new_class in rebinds:
+            obj.__class__ = new_class
+            report.rebound += 1
+        for obj, _ in rebinds:
+            if hasattr(obj, "init_graphics"):
+                obj.init_graphics()
+
+
+def migrate_objects(roots: Iterable[Any], prefixes: Tuple[str, ...] = GAME_PREFIXES) -> MigrationReport:
+    """
+    Move every object reachable from `roots` to the reloaded classes of the modules under `prefixes`.
+    All or nothing: if the report is not ok, nothing was changed.
+    """
+    started = time.perf_counter()
+    report = MigrationReport()
+    migration = _Migration(prefixes)
+    rebinds, edits = migration.plan(list(roots), report)
+    if report.ok:
+        migration.apply(rebinds, edits, report)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def migrate_arena(arena) -> MigrationReport:
+    """migrate_objects() for a live arena and everything it holds."""
+    report = migrate_objects([arena])
+    print(f"🔁 ARENA MIGRATION: {report.summary()}")
+    return report
@@ -0,0 +1,200 @@
+"""
+Per-tick phase profiler for the arena simulation and the server loop.
+
+Hot code marks its phases with
+
+    with tick_profiler.phase('collisions'):
+        self.handle_collisions(delta_time)
+
+When the profiler is off, phase() returns one shared no-op context manager:
+the cost is a method call and an attribute check per phase. When it is on,
+every phase duration goes into a fixed log-scale histogram (the only
+allocation per sample is the small timer object holding its start time). Histograms roll: the current window and the previous one are kept,
+so a report always covers the last WINDOW_SECONDS to 2 * WINDOW_SECONDS.
+
+Phases recorded:
+    server:  tick (whole tick), input_drain, simulation, serialize, send, flush
+    arena:   spawns, respawns, winner_check, characters, projectiles, collisions
+    game:    out_of_bounds (inside collisions, GameFolder arena)
+
+Toggle at runtime with tick_profiler.enable()/disable(), the server's
+'profiler' admin message, or CC_PROFILE=1 at startup. While enabled the server
+logs a summary every CC_PROFILE_INTERVAL seconds (default WINDOW_SECONDS).
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+from BASE_files.BASE_logging import get_logger
+from BASE_files.BASE_state import process_singleton
+
+logger = get_logger("profiler")
+
+WINDOW_SECONDS = 10.0
+
+# Bucket upper bounds in seconds: 1 us to ~2 s, 25% apart (percentiles are exact to a bucket)
+BUCKET_BOUNDS: List[float] = []
+_bound = 1e-6
+while _bound < 2.0:
+    BUCKET_BOUNDS.append(_bound)
+    _bound *= 1.25
+BUCKET_COUNT = len(BUCKET_BOUNDS) + 1  # Last bucket: above the largest bound
+
+_DISABLED = nullcontext()
+
+
+class PhaseHistogram:
+    """Rolling log-scale histogram of one phase's durations."""
+
+    def __init__(self):
+        self.current = [0] * BUCKET_COUNT
+        self.previous = [0] * BUCKET_COUNT
+        self.current_total = 0.0
+        self.previous_total = 0.0
+        self.current_max = 0.0
+        self.previous_max = 0.0
+
+    def record(self, seconds: float):
+        self.current[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.current_total += seconds
+        if seconds > self.current_max:
+            self.current_max = seconds
+
+    def rotate(self):
+        """Start a new window; the one just finished stays in the report."""
+        self.previous, self.current = self.current, [0] * BUCKET_COUNT
+        self.previous_total, self.current_total = self.current_total, 0.0
+        self.previous_max, self.current_max = self.current_max, 0.0
+
+    def summary(self) -> dict:
+        """count, mean/p50/p95/p99/max in milliseconds over the rolling window."""
+        counts = [a + b for a, b in zip(self.current, self.previous)]
+        count = sum(counts)
+        if not count:
+            return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        maximum = max(self.current_max, self.previous_max)
+
+        def percentile(fraction):
+            target = fraction * count
+            running = 0
+            for index, bucket_count in enumerate(counts):
+                running += bucket_count
+                if running >= target:
+                    return min(BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else maximum, maximum) * 1000
+            return maximum * 1000
+
+        return {
+            'count': count,
+            'mean_ms': (self.current_total + self.previous_total) / count * 1000,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': maximum * 1000,
+        }
+
+
+class _PhaseTimer:
+    """
+    Context manager timing one use of a phase into its histogram. Each phase() call gets its own
+    timer, so a phase may nest inside itself or run on several threads (rooms) at once.
+    """
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: PhaseHistogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class TickProfiler:
+    """Phase timings for the simulation thread. Reports may be taken from any thread."""
+
+    def __init__(self, enabled: bool = False, window: float = WINDOW_SECONDS,
+                 log_interval: Optional[float] = None):
+        self.enabled = enabled
+        self.window = window
+        self.log_interval = log_interval if log_interval is not None else window
+        self._histograms: Dict[str, PhaseHistogram] = {}
+        self._lock = threading.Lock()  # Guards the histogram table and rotation, not individual samples
+        self._window_start = time.monotonic()
+        self._last_log = self._window_start
+
+    def phase(self, name: str):
+        """Context manager timing `name`; a shared no-op when disabled."""
+        if not self.enabled:
+            return _DISABLED
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, PhaseHistogram())
+        return _PhaseTimer(histogram)
+
+    def enable(self):
+        if not self.enabled:
+            self.reset()
+            self.enabled = True
+            logger.info("⏱️ PROFILER: Enabled (window %.0fs)", self.window)
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            logger.info("⏱️ PROFILER: Disabled")
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._window_start = self._last_log = time.monotonic()
+
+    def tick(self):
+        """Called once per server tick: rotates windows and writes the periodic summary."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if now - self._last_log >= self.log_interval:
+            self._last_log = now
+            logger.info("⏱️ PROFILER: %s", self.format_summary())
+        if now - self._window_start >= self.window:
+            with self._lock:
+                self._window_start = now
+                for histogram in self._histograms.values():
+                    histogram.rotate()
+
+    def snapshot(self) -> dict:
+        """{'enabled', 'window_seconds', 'phases': {name: summary}} for reports and exporters."""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {
+            'enabled': self.enabled,
+            'window_seconds': self.window,
+            'phases': {name: histogram.summary() for name, histogram in sorted(histograms.items())},
+        }
+
+    def format_summary(self) -> str:
+        phases = self.snapshot()['phases']
+        if not phases:
+            return "no samples"
+        return " | ".join(f"{name} p50 {s['p50_ms']:.2f} p99 {s['p99_ms']:.2f} max {s['max_ms']:.2f} ms"
+                          for name, s in phases.items() if s['count'])
+
+
+def _profiler_from_env() -> TickProfiler:
+    interval = os.getenv("CC_PROFILE_INTERVAL")
+    return TickProfiler(enabled=os.getenv("CC_PROFILE", "0") == "1",
+                        log_interval=float(interval) if interval else None)
+
+
+# Process-wide profiler used by the arena and the server loop: toggles made through the server
+# reach the arena code however often it was imported
+tick_profiler: TickProfiler = process_singleton("tick_profiler", _profiler_from_env)
@@ -0,0 +1,280 @@
+"""
+Incremental, dependency-ordered reload of GameFolder code.
+
+reload_game_code() (BASE_helpers) runs after every file sync, patch
+application and game start on the client and after every merge on the
+server. Reloading every loaded module each time is slow and, done in
+sys.modules order, can rebind a module to a dependency that has not been
+reloaded yet. Instead:
+
+    1. scan      hash every GameFolder .py file and parse its imports (AST,
+                 cached by hash) into a module -> dependencies graph
+    2. changed   loaded modules whose source hash differs from the hash they
+                 were last loaded from (a module never loaded through here
+                 has no recorded hash and counts as changed), or whose file
+                 is gone
+    3. dirty     changed modules plus everything that imports them, directly
+                 or not
+    4. reload    dirty modules in topological order (dependencies first); the
+                 entry module (setup) is deleted and imported fresh, as before;
+                 files not imported yet are imported afterwards
+
+Nothing dirty and nothing new means no reload at all. Every call reports its
+time and module counts (printed, kept in last_report, and observed as the
+game_reload_seconds histogram).
+"""
+
+import ast
+import importlib
+import os
+import sys
+import time
+import traceback
+import types
+from typing import Dict, List, Optional, Set
+
+from BASE_files.BASE_file_sync import blob_digest
+from BASE_files.BASE_state import process_singleton
+
+HASH_ATTRIBUTE = "__cc_source_hash__"  # Set on each module to the hash of the source it was last loaded from
+
+# Caches shared by every reload in the process
+_state = process_singleton("reload_state", lambda: types.SimpleNamespace(
+    imports_by_hash={},  # (module name, source hash) -> imported module names
+    failed_imports={},  # module name -> source hash that failed to import (not retried until it changes)
+    last_report=None,
+))
+
+
+class ModuleSource:
+    """One .py file of the package: where it is, what it contains, what it imports."""
+
+    def __init__(self, name: str, path: str, digest: str, imports: Set[str], is_package: bool):
+        self.name = name
+        self.path = path
+        self.digest = digest
+        self.imports = imports
+        self.is_package = is_package
+
+
+def module_name_for(rel_path: str, package: str) -> str:
+    parts = rel_path[:-3].replace("\\", "/").split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join([package] + parts)
+
+
+def parse_imports(source: bytes, module_name: str, is_package: bool) -> Set[str]:
+    """Absolute names of every module `source` imports (top level or inside functions), relative imports resolved."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()  # The reload itself reports the error
+    package_parts = module_name.split(".") if is_package else module_name.split(".")[:-1]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base_parts = package_parts[:len(package_parts) - node.level + 1]
+                base = ".".join(base_parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            names.add(base)
+            # "from package import name" may name a submodule
+            names.update(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+    return names
+
+
+def scan_package(root: str, package: str, skip_dirs=("__pycache__",)) -> Dict[str, ModuleSource]:
+    """Every module of the package under `root`, with the package-internal modules it imports."""
+    sources = {}
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs)
+        for file in sorted(files):
+            if not file.endswith(".py"):
+                continue
+            path = os.path.join(directory, file)
+            name = module_name_for(os.path.relpath(path, root), package)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            digest = blob_digest(data)
+            key = (name, digest)
+            imports = _state.imports_by_hash.get(key)
+            if imports is None:
+                imports = parse_imports(data, name, file == "__init__.py")
+                _state.imports_by_hash[key] = imports
+            sources[name] = ModuleSource(name, path, digest, imports, file == "__init__.py")
+    for source in sources.values():
+        source.imports = {name for name in source.imports if name in sources and name != source.name}
+    return sources
+
+
+def dependents_closure(changed: Set[str], sources: Dict[str, ModuleSource]) -> Set[str]:
+    """`changed` plus every module that imports one of them, directly or through others."""
+    importers: Dict[str, Set[str]] = {name: set() for name in sources}
+    for source in sources.values():
+        for dependency in source.imports:
+            importers[dependency].add(source.name)
+    dirty = set(changed)
+    stack = list(changed)
+    while stack:
+        for importer in importers.get(stack.pop(), ()):
+            if importer not in dirty:
+                dirty.add(importer)
+                stack.append(importer)
+    return dirty
+
+
+def topological_order(names: Set[str], sources: Dict[str, ModuleSource]) -> List[str]:
+    """`names` with each module after the modules it imports (import cycles: alphabetical)."""
+    remaining = {name: {dep for dep in sources[name].imports if dep in names} if name in sources else set()
+                 for name in names}
+    order = []
+    while remaining:
+        ready = sorted(name for name, deps in remaining.items() if not deps)
+        if not ready:
+            ready = [min(remaining)]  # Cycle: break it deterministically
+        for name in ready:
+            del remaining[name]
+            order.append(name)
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+
+class ReloadReport:
+    """What one reload call did."""
+
+    def __init__(self, total: int):
+        self.total = total  # Modules in the package
+        self.changed: List[str] = []  # Loaded modules whose source changed
+        self.reloaded: List[str] = []  # Reloaded, in order (changed modules and their importers)
+        self.imported: List[str] = []  # Not loaded before this call
+        self.failed: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def skipped(self) -> bool:
+        return not self.reloaded and not self.imported
+
+    def summary(self) -> str:
+        if self.skipped:
+            return f"unchanged, reload skipped ({self.total} modules, {self.seconds * 1000:.1f} ms)"
+        return (f"{len(self.reloaded)} reloaded ({len(self.changed)} changed), {len(self.imported)} imported, "
+                f"{self.total - len(self.reloaded) - len(self.imported)} kept of {self.total} modules "
+                f"in {self.seconds * 1000:.1f} ms" + (f", {len(self.failed)} failed" if self.failed else ""))
+
+
+def reload_package(root: str, package: str, entry: str, skip_dirs=("__pycache__",)) -> Optional[types.ModuleType]:
+    """
+    Bring the loaded modules of `package` (files under `root`) up to date with the files and
+    return the entry module, or None if it failed to import.
+    """
+    started = time.perf_counter()
+    sources = scan_package(root, package, skip_dirs)
+    report = ReloadReport(len(sources))
+
+    loaded = {name: module for name, module in list(sys.modules.items())
+              if module is not None and (name == package or name.startswith(package + "."))}
+    for name, module in loaded.items():
+        source = sources.get(name)
+        if source is None:
+            if getattr(module, "__file__", None):  # File deleted: forget the module, its importers fail loudly
+                del sys.modules[name]
+                report.changed.append(name)
+            continue
+        if getattr(module, HASH_ATTRIBUTE, None) != source.digest:
+            report.changed.append(name)
+
+    dirty = dependents_closure(set(report.changed), sources)
+    dirty = {name for name in dirty if name in sys.modules}
+    new = sorted(name for name in sources if name not in loaded and name != entry
+                 and _state.failed_imports.get(name) != sources[name].digest)
+
+    if not dirty and not new and entry in sys.modules:
+        report.seconds = time.perf_counter() - started
+        _finish(report)
+        return sys.modules[entry]
+
+    for name in topological_order(dirty, sources):
+        if name == entry:
+            continue  # Imported fresh below
+        try:
+            module = importlib.reload(sys.modules[name])
+            setattr(module, HASH_ATTRIBUTE, sources[name].digest)
+            report.reloaded.append(name)
+        except Exception as e:
+            report.failed.append(name)
+            print(f"[error] Failed to reload {name}: {e}")
+            traceback.print_exc()
+
+    importlib.invalidate_caches()
+    for name in new:
+        if name in sys.modules:
+            continue  # Already imported by a module reloaded above
+        try:
+            importlib.import_module(name)
+            report.imported.append(name)
+            print(f"[info] Imported new module: {name}")
+        except Exception as e:
+            report.failed.append(name)
+            _state.failed_imports[name] = sources[name].digest
+            print(f"[warning] Failed to import new module {name}: {e}")
+
+    # The entry point is imported fresh so its namespace only holds names from the reloaded modules
+    entry_module = None
+    try:
+        if entry in dirty or entry not in sys.modules:
+            sys.modules.pop(entry, None)
+            entry_module = importlib.import_module(entry)
+            report.reloaded.append(entry)
+        else:
+            entry_module = sys.modules[entry]
+    except Exception as e:
+        report.failed.append(entry)
+        print(f"[error] CRITICAL: Failed to reload {entry}: {e}")
+        traceback.print_exc()
+
+    # Modules first imported during this call (by the entry or a reloaded module) ran the current source
+    for name, module in list(sys.modules.items()):
+        if name in sources and (name not in loaded or name in report.reloaded) and module is not None:
+            setattr(module, HASH_ATTRIBUTE, sources[name].digest)
+            if name not in loaded and name not in report.imported and name not in report.reloaded:
+                report.imported.append(name)
+
+    report.seconds = time.perf_counter() - started
+    _finish(report)
+    return entry_module
+
+
+def mark_loaded(root: str, package: str, skip_dirs=("__pycache__",)) -> int:
+    """
+    Record the current source hash on loaded modules of `package` that have none (imported
+    with a plain import, not through reload_package), so that the next reload_package() only
+    reloads what changes from now on. Call it right after such an import. Returns the count.
+    """
+    marked = 0
+    for name, source in scan_package(root, package, skip_dirs).items():
+        module = sys.modules.get(name)
+        if module is not None and HASH_ATTRIBUTE not in module.__dict__:
+            setattr(module, HASH_ATTRIBUTE, source.digest)
+            marked += 1
+    return marked
+
+
+def _finish(report: ReloadReport):
+    _state.last_report = report
+    print(f"🔄 GAME RELOAD: {report.summary()}")
+    from BASE_files.BASE_metrics import observe_duration
+    observe_duration("game_reload_seconds", report.seconds,
+                     result="skipped" if report.skipped else ("failed" if report.failed else "reloaded"))
+
+
+def last_report() -> Optional[ReloadReport]:
+    """The report of the most recent reload_package() call in this process."""
+    return _state.last_report
@@ -0,0 +1,346 @@
+"""
+Multi-room hosting: many independent arenas in one server process.
+
+RoomManager owns the listening socket and hands every connection to a room.
+A room is a GameServer created with a room_id: it opens no sockets of its own
+but keeps everything else per room (clients, input queues, patch-sync state,
+arena, tick schedule, metrics). Clients pick a room with the code they joined:
+
+    <server code>-<room id>        e.g. "R6ZQ4-3"
+
+The server code is BASE_helpers.encrypt_code(host, port, mode), exactly as for
+a single-room server (decrypt_code ignores the room part), and NetworkClient
+sends the full code in its first message ('player_name'). The manager peeks at
+that frame without consuming it and passes the socket to the room, which then
+reads the same player_name as if it had accepted the connection itself.
+
+Two threads serve every room, like the two threads of one GameServer:
+    network  waits on all sockets at once, routes new connections and runs
+             each room's _network_pass(), both under the room's reset_lock
+    game     ticks the due rooms round-robin, at most tick_budget seconds per
+             pass; rooms left when the budget runs out are counted in their
+             ticks_deferred and go first in the next pass
+
+All rooms share one worker pool, one copy of GameFolder and one set of loaded
+game modules. Reloading them for one room would swap the classes under every
+other room's arena, so hosted rooms play the base game code: a room refuses
+patch merges ('patch_merge_failed') and skips the GameFolder restore between
+matches (GameServer.shares_game_code).
+"""
+
+import pickle
+import select
+import socket
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from BASE_files.BASE_framing import HEADER, HEADER_SIZE, enable_nodelay
+from BASE_files.BASE_gc import gc_policy
+from BASE_files.BASE_helpers import ROOM_SEPARATOR, base_encode
+from BASE_files.BASE_metrics import MetricsExporter, render_room_metrics
+from BASE_files.BASE_workers import WorkerPool
+from server import GameServer
+
+MAX_ROUTING_FRAME = 64 * 1024  # A player_name message is a few hundred bytes
+ROUTING_TIMEOUT = 10.0  # Seconds a new connection may take to send its room code
+REJECT_LINGER = 10.0  # Seconds a rejected connection stays open for the client to read the rejection and hang up
+
+
+def peek_first_message(client_socket: socket.socket) -> Optional[dict]:
+    """
+    The first framed message waiting on `client_socket`, read with MSG_PEEK so it stays
+    queued for the room. None until the whole frame has arrived; raises on EOF or garbage.
+    """
+    try:
+        data = client_socket.recv(HEADER_SIZE + MAX_ROUTING_FRAME, socket.MSG_PEEK)
+    except (BlockingIOError, InterruptedError):
+        return None
+    if not data:
+        raise ConnectionResetError("Connection closed before sending a room code")
+    if len(data) < HEADER_SIZE:
+        return None
+    (size,) = HEADER.unpack_from(data)
+    if size > MAX_ROUTING_FRAME:
+        raise ValueError(f"First message too large for routing ({size} bytes)")
+    if len(data) < HEADER_SIZE + size:
+        return None
+    message = pickle.loads(data[HEADER_SIZE:HEADER_SIZE + size])
+    if not isinstance(message, dict):
+        raise ValueError("First message is not a dict")
+    return message
+
+
+class RoomManager:
+    """Hosts many GameServer rooms behind one port."""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 5555, tick_budget: Optional[float] = None,
+                 metrics_port: Optional[int] = None, listen: bool = True):
+        """listen=False: connections arrive some other way (a shard worker receives them from its router)."""
+        self.host = host
+        self.port = port
+        self.running = False
+
+        self.server_socket = None
+        if listen:
+            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server_socket.bind((host, port))
+            self.server_socket.listen(128)
+            self.server_socket.setblocking(False)
+
+        self.rooms: Dict[str, GameServer] = {}  # room_id -> room
+        self.pending: Dict[socket.socket, Tuple[Tuple[str, int], float]] = {}  # socket -> (address, accepted at)
+        self.rejected: Dict[socket.socket, float] = {}  # half-closed socket -> close deadline
+        self.workers = WorkerPool()  # Shared by every room
+        self._next_room_number = 1
+
+        # Round-robin scheduling: one pass ticks every due room unless the budget runs out first
+        self.tick_budget = tick_budget if tick_budget is not None else 1.0 / 60
+        self._next_index = 0
+        self.tick_passes = 0
+        self.budget_exhausted = 0
+
+        self.metrics_port = metrics_port
+        self.metrics_exporter: Optional[MetricsExporter] = None
+        self._threads = []
+
+    # ----- rooms -----
+
+    def _new_room_id(self) -> str:
+        room_id = base_encode(self._next_room_number)
+        self._next_room_number += 1
+        return room_id
+
+    def create_room(self, practice_mode: bool = False, tick_rate: int = 60, bots: int = 0,
+                    room_id: Optional[str] = None) -> GameServer:
+        """
+        Open a new room; players join it with room.room_code.
+        bots > 0 starts a match of that many server-side characters right away (load tests).
+        """
+        room_id = room_id or self._new_room_id()
+        room = GameServer(self.host, self.port, practice_mode=practice_mode, room_id=room_id, workers=self.workers)
+        room.tick_rate = tick_rate
+        room.tick_interval = 1.0 / tick_rate
+        room.running = True
+        room.game_start_time = time.time()
+        if bots:
+            room.bot_players = [f"Bot_{room_id}_{index}" for index in range(bots)]
+            room._recreate_arena_with_players()
+            room._arena_initialized = True
+        self.rooms[room_id] = room
+        print(f"🏠 ROOM {room_id} open: {room.room_code}" + (" (practice)" if practice_mode else "")
+              + (f" with {bots} bots" if bots else ""))
+        return room
+
+    def close_room(self, room_id: str):
+        """Disconnect a room's players and drop it."""
+        room = self.rooms.pop(room_id, None)
+        if room is not None:
+            room.stop()
+            print(f"🏠 ROOM {room_id} closed")
+
+    def room_for_code(self, code) -> Optional[GameServer]:
+        """The room a joined code refers to (only the room part is compared: hosts see several IPs)."""
+        if not isinstance(code, str) or ROOM_SEPARATOR not in code:
+            return None
+        return self.rooms.get(code.upper().strip().rpartition(ROOM_SEPARATOR)[2])
+
+    # ----- lifecycle -----
+
+    def start(self):
+        """Serve every room; blocks in the game loop like GameServer.start()."""
+        self.running = True
+        self.workers.warm_up()
+        if self.metrics_port is not None:
+            self.metrics_exporter = MetricsExporter(self, self.metrics_port, render=render_room_metrics)
+            self.metrics_exporter.start()
+
+        network_thread = threading.Thread(target=self._network_loop, name="rooms-network", daemon=True)
+        self._threads = [network_thread, threading.current_thread()]
+        network_thread.start()
+        self._game_loop()
+
+    def stop(self):
+        self.running = False
+        # Rooms are only closed once neither loop can touch their sockets any more
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=2.0)
+        for room_id in list(self.rooms):
+            self.close_room(room_id)
+        for client_socket in list(self.pending):
+            self._drop_pending(client_socket)
+        for client_socket in list(self.rejected):
+            self._close_rejected(client_socket)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        self.workers.shutdown()
+        if self.server_socket is not None:
+            self.server_socket.close()
+        print("Room manager stopped.")
+
+    # ----- network thread -----
+
+    def _network_loop(self):
+        while self.running:
+            try:
+                self._network_iteration()
+            except Exception as e:
+                print(f"Room network error: {e}")
+
+    def _network_iteration(self):
+        self._wait_for_activity(0.01)
+        self._accept_connections()
+        self._route_pending()
+        self._drain_rejected()
+        for room in list(self.rooms.values()):
+            # A room resetting on the game thread holds its reset_lock, as with GameServer._network_loop
+            with room.reset_lock:
+                room._network_pass(select_timeout=0)
+
+    def _watched_sockets(self) -> list:
+        sockets = list(self.pending) + list(self.rejected)
+        if self.server_socket is not None:
+            sockets.append(self.server_socket)
+        for room in list(self.rooms.values()):
+            sockets.extend(list(room.clients.values()))
+            sockets.extend(list(room.pending_clients))
+        return sockets
+
+    def _wait_for_activity(self, timeout: float):
+        """Sleep until any socket of any room is readable (or `timeout`)."""
+        try:
+            select.select(self._watched_sockets(), [], [], timeout)
+        except (OSError, ValueError):
+            time.sleep(timeout)  # A socket closed under us; the room passes clean it up
+
+    def _accept_connections(self):
+        if self.server_socket is None:
+            return
+        while True:
+            try:
+                client_socket, address = self.server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            client_socket.setblocking(False)
+            enable_nodelay(client_socket)
+            self.pending[client_socket] = (address, time.time())
+
+    def _route_pending(self):
+        """Hand each new connection whose player_name has arrived to the room it names."""
+        now = time.time()
+        for client_socket, (address, accepted) in list(self.pending.items()):
+            try:
+                message = peek_first_message(client_socket)
+            except Exception as e:
+                print(f"Dropping connection from {address}: {e}")
+                self._drop_pending(client_socket)
+                continue
+
+            if message is None:
+                if now - accepted > ROUTING_TIMEOUT:
+                    print(f"Dropping connection from {address}: no room code after {ROUTING_TIMEOUT:.0f}s")
+                    self._drop_pending(client_socket)
+                continue
+
+            code = message.get('room_code')
+            room = self.room_for_code(code)
+            if room is None:
+                print(f"Connection from {address} asked for unknown room {code!r}")
+                del self.pending[client_socket]
+                self._reject(client_socket, f"Room {code} not found" if code else "This server needs a room code")
+                continue
+
+            del self.pending[client_socket]
+            self._admit(room, client_socket, address)
+
+    def _admit(self, room, client_socket: socket.socket, address: Tuple[str, int]):
+        """Give a routed connection to its room (after any reset it is running: the room's reset_lock)."""
+        with room.reset_lock:
+            room._handle_new_connection(client_socket, address)
+
+    def _reject(self, client_socket: socket.socket, reason: str):
+        self._send_and_linger(client_socket, {'type': 'name_rejected', 'reason': reason})
+
+    def _send_and_linger(self, client_socket: socket.socket, message: dict):
+        """
+        Send a last message and leave the connection open, like a single-room server does with a
+        rejected name: the client handles the message from update(), which stops once it sees the
+        connection close. The socket is drained until the client hangs up or REJECT_LINGER passes.
+        """
+        payload = pickle.dumps(message)
+        try:
+            client_socket.send(HEADER.pack(len(payload)) + payload)
+        except OSError:
+            self._close_rejected(client_socket)
+            return
+        self.rejected[client_socket] = time.time() + REJECT_LINGER
+
+    def _drain_rejected(self):
+        """Discard whatever rejected clients still send; close once they hang up or linger out."""
+        now = time.time()
+        for client_socket, deadline in list(self.rejected.items()):
+            try:
+                while client_socket.recv(65536):
+                    pass
+            except (BlockingIOError, InterruptedError):
+                if now < deadline:
+                    continue
+            except OSError:
+                pass
+            self._close_rejected(client_socket)
+
+    def _close_rejected(self, client_socket: socket.socket):
+        self.rejected.pop(client_socket, None)
+        try:
+            client_socket.close()
+        except OSError:
+            pass
+
+    def _drop_pending(self, client_socket: socket.socket):
+        self.pending.pop(client_socket, None)
+        try:
+            client_socket.close()
+        except OSError:
+            pass
+
+    # ----- game thread -----
+
+    def _game_loop(self):
+        print(f"Ticking rooms (budget {self.tick_budget * 1000:.1f} ms per pass)...")
+        while self.running:
+            if not self._tick_rooms(time.time()):
+                # Nothing was due: young garbage collections run here, before the next room's tick
+                rooms = list(self.rooms.values())
+                if rooms:
+                    gc_policy.idle(min(room.last_tick_time + room.tick_interval for room in rooms) - time.time())
+                time.sleep(0.001)
+
+    def _tick_rooms(self, now: float) -> int:
+        """
+        One round-robin pass: tick due rooms until the budget is spent, starting where the last
+        pass stopped. Returns the number of rooms that ticked.
+        """
+        rooms = list(self.rooms.values())
+        if not rooms:
+            return 0
+        ticked = 0
+        self.tick_passes += 1
+        count = len(rooms)
+        start = self._next_index % count
+        deadline = time.perf_counter() + self.tick_budget
+        for offset in range(count):
+            room = rooms[(start + offset) % count]
+            if time.perf_counter() >= deadline:
+                self.budget_exhausted += 1
+                for waiting in (rooms[(start + later) % count] for later in range(offset, count)):
+                    if now - waiting.last_tick_time >= waiting.tick_interval:
+                        waiting.ticks_deferred += 1
+                self._next_index = (start + offset) % count
+                return ticked
+            if room._game_step(now):
+                ticked += 1
+            room._flush_outbox()
+        self._next_index = start + 1
+        return ticked
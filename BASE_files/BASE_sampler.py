@@ -0,0 +1,179 @@
+"""
+On-demand sampling profiler for a live server.
+
+Where the tick profiler (BASE_profiler) times the phases the code marks,
+this one shows where the time actually goes, down to the function: for N
+seconds a background thread takes every thread's stack with
+sys._current_frames() RATE times a second and counts identical stacks. The
+result is written in collapsed-stack format, one line per distinct stack:
+
+    thread:MainThread;server:main;server:GameServer._game_loop;... 42
+
+which flamegraph.pl, speedscope and inferno read as is. Frames are named
+module:qualified.name, so Arena.handle_collisions shows up as
+BASE_components.BASE_arena:Arena.handle_collisions.
+
+Start it with stack_sampler.start(seconds), the server's 'profiler' admin
+message (action 'sample'), or SIGUSR1 (install_signal_handler(), done by
+server.py's main(); CC_SAMPLE_SECONDS / CC_SAMPLE_RATE set the defaults).
+In the Docker image: docker exec <container> kill -USR1 <pid printed at startup>.
+Profiles go to CC_SAMPLE_DIR (default __profiles). Standard library only.
+
+Overhead: a sample holds the GIL while it walks the stacks, so every other
+thread waits for it. The sampler times each sample and stretches the interval
+so that sampling never takes more than MAX_OVERHEAD of wall time (2%: a
+sample costing 100 us caps the rate at 200 Hz). At the default 100 Hz a game
+server with a handful of threads spends well under 1% of a core on it. A run
+is capped at MAX_SECONDS and only one runs at a time.
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from BASE_files.BASE_logging import get_logger
+from BASE_files.BASE_state import process_singleton
+
+logger = get_logger("profiler")
+
+DEFAULT_RATE = 100  # Samples per second
+DEFAULT_SECONDS = 10.0
+MAX_SECONDS = 300.0
+MAX_OVERHEAD = 0.02  # Fraction of wall time the sampler may spend sampling
+MAX_DEPTH = 128  # Deeper stacks keep their innermost frames
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse_stack(frame, thread_name: str) -> str:
+    """'thread:<name>;outermost;...;innermost' for one thread's current frame."""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(f"thread:{thread_name}")
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples every thread's stack for a while and writes the collapsed stacks."""
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = output_dir or os.getenv("CC_SAMPLE_DIR", "__profiles")
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sampling_seconds = 0.0  # Time spent inside samples (the overhead)
+        self.wall_seconds = 0.0
+        self.last_output: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float = DEFAULT_SECONDS, rate: float = DEFAULT_RATE,
+              output_path: Optional[str] = None) -> bool:
+        """Sample for `seconds` in the background; False if a run is already going."""
+        if self.running:
+            return False
+        seconds = max(0.0, min(float(seconds), MAX_SECONDS))
+        rate = max(1.0, float(rate))
+        if output_path is None:
+            output_path = os.path.join(self.output_dir, f"server-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(seconds, rate, output_path),
+                                        name="stack-sampler", daemon=True)
+        self._thread.start()
+        logger.info("🔬 SAMPLER: Sampling all threads for %.1fs at %.0f Hz", seconds, rate)
+        return True
+
+    def stop(self):
+        """End the current run early (its profile is still written)."""
+        self._stop.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Block until the current run has written its profile; returns its path."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.last_output
+
+    def _run(self, seconds: float, rate: float, output_path: str):
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        own_id = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + seconds
+        interval = 1.0 / rate
+        names: Dict[int, str] = {}
+
+        while not self._stop.is_set():
+            sample_start = time.perf_counter()
+            if sample_start >= deadline:
+                break
+            frames = sys._current_frames()
+            if frames.keys() - names.keys():  # A thread started since the names were taken
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id != own_id:
+                    self.stacks[collapse_stack(frame, names.get(thread_id, str(thread_id)))] += 1
+            del frames
+            cost = time.perf_counter() - sample_start
+            self.samples += 1
+            self.sampling_seconds += cost
+            # Never spend more than MAX_OVERHEAD of the time sampling
+            self._stop.wait(max(interval - cost, cost / MAX_OVERHEAD - cost))
+
+        self.wall_seconds = time.perf_counter() - started
+        self.last_output = self.write(output_path)
+        logger.info("🔬 SAMPLER: %d samples, %d distinct stacks, overhead %.2f%% -> %s", self.samples,
+                    len(self.stacks), self.overhead() * 100, self.last_output)
+
+    def overhead(self) -> float:
+        """Fraction of the last run's wall time spent sampling."""
+        return self.sampling_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def write(self, path: str) -> str:
+        """Write the collapsed stacks of the last run, heaviest first."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def status(self) -> dict:
+        return {
+            'running': self.running,
+            'samples': self.samples,
+            'stacks': len(self.stacks),
+            'overhead': self.overhead(),
+            'output': self.last_output,
+        }
+
+
+def install_signal_handler(signum: Optional[int] = None) -> bool:
+    """
+    Start a run of CC_SAMPLE_SECONDS at CC_SAMPLE_RATE on SIGUSR1 (or `signum`).
+    Must be called from the main thread; returns False where the signal does not exist.
+    """
+    signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+    if signum is None:
+        return False
+    seconds = float(os.getenv("CC_SAMPLE_SECONDS", DEFAULT_SECONDS))
+    rate = float(os.getenv("CC_SAMPLE_RATE", DEFAULT_RATE))
+    signal.signal(signum, lambda *_: stack_sampler.start(seconds, rate))
+    print(f"🔬 Sampling profiler: kill -{signal.Signals(signum).name[3:]} {os.getpid()} profiles {seconds:.1f}s")
+    return True
+
+
+# One sampler per process
+stack_sampler: StackSampler = process_singleton("stack_sampler", StackSampler)
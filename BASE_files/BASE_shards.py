@@ -0,0 +1,372 @@
+"""
+Process-sharded rooms: a lobby router in front of room worker processes.
+
+One RoomManager ticks all of its rooms on one thread, so a process tops out at
+one core. ShardRouter keeps the public port and the room-code routing of
+RoomManager (BASE_rooms) but places every room in one of several worker
+processes, each a ShardWorker (a RoomManager without a listening socket)
+ticking only its own rooms:
+
+    client --TCP--> ShardRouter --send_fds--> ShardWorker k --> GameServer room
+
+Once a connection's player_name has arrived, the router passes the socket
+itself to the room's worker with socket.send_fds over a SOCK_SEQPACKET
+socketpair. From then on the worker talks to the client directly; no game
+traffic goes through the router. The same channel carries control messages
+(pickled tuples):
+
+    router -> worker   ('create_room', room_id, options) ('close_room', room_id)
+                       ('connection', room_id, conn_id, address) + fd   ('stop',)
+    worker -> router   ('ready', index) ('closed', conn_id)
+                       ('stats', index, {room_id: {'cost', 'ticks', 'clients'}})
+
+Placement: a new room goes to the live worker with the lowest load, the sum of
+its rooms' measured tick cost (share of one core spent ticking, reported every
+STATS_INTERVAL; DEFAULT_ROOM_COST until a room has been measured).
+
+Crashes: the router keeps its copy of every socket it handed over until the
+worker reports it closed. When a worker process dies, the router sends each of
+its clients a 'room_closed' message and hangs up after they do, then starts a
+replacement worker for new rooms. (A worker killed in the middle of writing a
+frame leaves a partial frame in the stream; that client sees a corrupt frame
+and a plain disconnect instead.)
+
+Game code: every worker loads the same GameFolder from disk, so a patch merge
+or a restore in one shard would rewrite the files under the rooms of every
+other shard. Worker rooms are hosted rooms (GameServer.shares_game_code): they
+refuse patch merges and leave GameFolder as it is between matches, like the
+rooms of a single RoomManager.
+
+Linux/macOS only (socket.send_fds, AF_UNIX).
+"""
+
+import multiprocessing
+import pickle
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+from BASE_files.BASE_helpers import encrypt_code, get_local_ip, ROOM_SEPARATOR
+from BASE_files.BASE_rooms import RoomManager
+from BASE_files.BASE_workers import WorkerPool
+
+CONTROL_BUFFER = 64 * 1024
+STATS_INTERVAL = 1.0
+DEFAULT_ROOM_COST = 0.02  # Share of a core assumed for a room its worker has not measured yet
+
+
+def send_control(control: socket.socket, message: tuple, fds: List[int] = ()):
+    data = pickle.dumps(message)
+    if fds:
+        socket.send_fds(control, [data], list(fds))
+    else:
+        control.send(data)
+
+
+def receive_control(control: socket.socket) -> List[Tuple[tuple, List[int]]]:
+    """Every control message waiting on `control` (non-blocking) with the descriptors attached to it."""
+    messages = []
+    while True:
+        try:
+            data, fds, _, _ = socket.recv_fds(control, CONTROL_BUFFER, 4)
+        except (BlockingIOError, InterruptedError):
+            return messages
+        if not data:
+            raise ConnectionResetError("Control channel closed")
+        messages.append((pickle.loads(data), fds))
+
+
+def server_code(host: str, port: int) -> str:
+    """The code part GameServer derives from its address (rooms append "-<room id>")."""
+    if host == "0.0.0.0":
+        return encrypt_code(get_local_ip(), port, "LOCAL")
+    return encrypt_code(host, port, "REMOTE")
+
+
+class ShardWorker(RoomManager):
+    """A worker process's rooms: connections arrive from the router instead of a listening socket."""
+
+    def __init__(self, control: socket.socket, host: str, port: int, index: int):
+        super().__init__(host, port, listen=False)
+        # CPU jobs stay on threads: the shard is already its own process, and a grandchild
+        # process would be orphaned when the router kills or loses this worker
+        self.workers.shutdown()
+        self.workers = WorkerPool(use_process=False)
+        self.control = control
+        self.control.setblocking(False)
+        self.index = index
+        self.handed: Dict[socket.socket, int] = {}  # socket received from the router -> conn_id
+        self._stats_time = time.monotonic()
+        self._stats_base: Dict[str, Tuple[float, int]] = {}  # room_id -> (tick seconds, ticks) at last report
+
+    def _watched_sockets(self) -> list:
+        return super()._watched_sockets() + [self.control]
+
+    def _network_iteration(self):
+        super()._network_iteration()
+        try:
+            for message, fds in receive_control(self.control):
+                self._handle_control(message, fds)
+        except ConnectionResetError:
+            print(f"Shard {self.index}: router went away, stopping")
+            self.running = False
+            return
+        self._release_closed()
+        self._report_stats()
+
+    def _handle_control(self, message: tuple, fds: List[int]):
+        op = message[0]
+        if op == 'connection':
+            _, room_id, conn_id, address = message
+            client_socket = socket.socket(fileno=fds[0])
+            room = self.rooms.get(room_id)
+            if room is None:
+                client_socket.close()
+                send_control(self.control, ('closed', conn_id))
+                return
+            self.handed[client_socket] = conn_id
+            self._admit(room, client_socket, address)
+        elif op == 'create_room':
+            _, room_id, options = message
+            self.create_room(room_id=room_id, **options)
+        elif op == 'close_room':
+            self.close_room(message[1])
+        elif op == 'stop':
+            self.running = False
+        for fd in fds[1:]:
+            socket.socket(fileno=fd).close()
+
+    def _in_use(self, client_socket: socket.socket) -> bool:
+        return any(client_socket in room.pending_clients or client_socket in room.clients.values()
+                   for room in list(self.rooms.values()))
+
+    def _release_closed(self):
+        """Tell the router which handed-over connections the rooms have dropped."""
+        for client_socket, conn_id in list(self.handed.items()):
+            if client_socket.fileno() != -1 and self._in_use(client_socket):
+                continue
+            del self.handed[client_socket]
+            try:
+                client_socket.close()
+            except OSError:
+                pass
+            send_control(self.control, ('closed', conn_id))
+
+    def _report_stats(self):
+        now = time.monotonic()
+        elapsed = now - self._stats_time
+        if elapsed < STATS_INTERVAL:
+            return
+        self._stats_time = now
+        stats = {}
+        for room_id, room in list(self.rooms.items()):
+            _, seconds = room.tick_durations.snapshot()
+            base_seconds, base_ticks = self._stats_base.get(room_id, (0.0, 0))
+            self._stats_base[room_id] = (seconds, room.ticks_run)
+            stats[room_id] = {'cost': (seconds - base_seconds) / elapsed,
+                              'ticks': room.ticks_run - base_ticks,
+                              'clients': len(room.clients)}
+        send_control(self.control, ('stats', self.index, stats))
+
+
+def run_shard_worker(control: socket.socket, host: str, port: int, index: int):
+    """Worker process entry point."""
+    worker = ShardWorker(control, host, port, index)
+    send_control(control, ('ready', index))
+    try:
+        worker.start()
+    finally:
+        worker.stop()
+
+
+class RemoteRoom:
+    """Router-side record of a room that lives in a worker process."""
+
+    def __init__(self, room_id: str, room_code: str, shard: "_Shard"):
+        self.room_id = room_id
+        self.room_code = room_code
+        self.shard = shard
+        self.cost: Optional[float] = None  # Measured share of a core, None until the first report
+        self.ticks_per_second = 0.0
+        self.clients = 0
+
+
+class _Shard:
+    def __init__(self, index: int, process, control: socket.socket):
+        self.index = index
+        self.process = process
+        self.control = control
+        self.alive = True
+        self.ready = False
+
+
+class ShardRouter(RoomManager):
+    """Front process: accepts and routes connections, rooms run in `workers` processes."""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 5555, workers: Optional[int] = None):
+        super().__init__(host, port)
+        self.rooms: Dict[str, RemoteRoom] = {}
+        self.shards: List[_Shard] = []
+        self.held: Dict[int, Tuple[socket.socket, str]] = {}  # conn_id -> (router's copy, room_id)
+        self.lost_rooms: Dict[str, str] = {}  # room_id -> why it went away
+        self._next_conn_id = 1
+        self._context = multiprocessing.get_context("spawn")  # The router is multi-threaded
+        self._code = server_code(host, port)
+        for index in range(workers or multiprocessing.cpu_count()):
+            self.shards.append(self._spawn_shard(index))
+
+    def _spawn_shard(self, index: int) -> _Shard:
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        process = self._context.Process(target=run_shard_worker, args=(theirs, self.host, self.port, index),
+                                        name=f"room-shard-{index}", daemon=True)
+        process.start()
+        theirs.close()
+        ours.setblocking(False)
+        print(f"🧩 SHARD {index}: worker process {process.pid}")
+        return _Shard(index, process, ours)
+
+    # ----- rooms -----
+
+    def shard_load(self, shard: _Shard) -> float:
+        return sum(room.cost if room.cost is not None else DEFAULT_ROOM_COST
+                   for room in list(self.rooms.values()) if room.shard is shard)
+
+    def _pick_shard(self) -> _Shard:
+        live = [shard for shard in self.shards if shard.alive]
+        if not live:
+            raise RuntimeError("No room worker is running")
+        return min(live, key=lambda shard: (self.shard_load(shard), shard.index))
+
+    def create_room(self, practice_mode: bool = False, tick_rate: int = 60, bots: int = 0,
+                    room_id: Optional[str] = None) -> RemoteRoom:
+        room_id = room_id or self._new_room_id()
+        shard = self._pick_shard()
+        room = RemoteRoom(room_id, f"{self._code}{ROOM_SEPARATOR}{room_id}", shard)
+        self.rooms[room_id] = room
+        send_control(shard.control, ('create_room', room_id,
+                                     {'practice_mode': practice_mode, 'tick_rate': tick_rate, 'bots': bots}))
+        print(f"🏠 ROOM {room_id} -> shard {shard.index}: {room.room_code}")
+        return room
+
+    def close_room(self, room_id: str):
+        room = self.rooms.pop(room_id, None)
+        if room is not None and room.shard.alive:
+            try:
+                send_control(room.shard.control, ('close_room', room_id))
+            except OSError:
+                pass
+
+    def _admit(self, room: RemoteRoom, client_socket: socket.socket, address: Tuple[str, int]):
+        """Pass the connection to the room's worker; keep our copy to report a worker crash."""
+        conn_id = self._next_conn_id
+        self._next_conn_id += 1
+        try:
+            send_control(room.shard.control, ('connection', room.room_id, conn_id, address), [client_socket.fileno()])
+        except OSError:
+            self._send_and_linger(client_socket, {'type': 'room_closed', 'reason': f"Room {room.room_code} is not available"})
+            return
+        self.held[conn_id] = (client_socket, room.room_id)
+
+    # ----- lifecycle -----
+
+    def start(self):
+        """Route connections and supervise the workers until stop()."""
+        self.running = True
+        print(f"Routing rooms to {len(self.shards)} worker processes...")
+        self._network_loop()
+
+    def stop(self):
+        self.running = False
+        for shard in self.shards:
+            if shard.alive:
+                try:
+                    send_control(shard.control, ('stop',))
+                except OSError:
+                    pass
+        for shard in self.shards:
+            shard.process.join(timeout=5.0)
+            if shard.process.is_alive():
+                shard.process.terminate()
+                shard.process.join(timeout=1.0)
+            shard.control.close()
+        for client_socket, _ in list(self.held.values()):
+            client_socket.close()
+        self.held.clear()
+        self.rooms.clear()
+        super().stop()
+
+    # ----- router loop -----
+
+    def _watched_sockets(self) -> list:
+        return ([self.server_socket] + list(self.pending) + list(self.rejected)
+                + [shard.control for shard in self.shards if shard.alive])
+
+    def _network_iteration(self):
+        self._wait_for_activity(0.01)
+        self._accept_connections()
+        self._route_pending()
+        self._drain_rejected()
+        for shard in list(self.shards):
+            if not shard.alive:
+                continue
+            try:
+                for message, fds in receive_control(shard.control):
+                    self._handle_worker_message(shard, message)
+                    for fd in fds:
+                        socket.socket(fileno=fd).close()
+            except (ConnectionResetError, OSError):
+                pass  # Process check below reports it
+            if not shard.process.is_alive():
+                self._shard_crashed(shard)
+
+    def _handle_worker_message(self, shard: _Shard, message: tuple):
+        op = message[0]
+        if op == 'closed':
+            held = self.held.pop(message[1], None)
+            if held is not None:
+                held[0].close()
+        elif op == 'stats':
+            for room_id, stats in message[2].items():
+                room = self.rooms.get(room_id)
+                if room is not None and room.shard is shard:
+                    room.cost = stats['cost']
+                    room.ticks_per_second = stats['ticks'] / STATS_INTERVAL
+                    room.clients = stats['clients']
+        elif op == 'ready':
+            shard.ready = True
+
+    def _shard_crashed(self, shard: _Shard):
+        """Report the dead worker's rooms to their clients and start a replacement worker."""
+        shard.alive = False
+        exit_code = shard.process.exitcode
+        lost = {room_id for room_id, room in self.rooms.items() if room.shard is shard}
+        print(f"[error] SHARD {shard.index}: worker exited with code {exit_code}, "
+              f"{len(lost)} room(s) lost: {sorted(lost)}")
+        for room_id in lost:
+            room = self.rooms.pop(room_id)
+            self.lost_rooms[room_id] = f"worker exited with code {exit_code}"
+            for conn_id, (client_socket, held_room) in list(self.held.items()):
+                if held_room == room_id:
+                    del self.held[conn_id]
+                    self._send_and_linger(client_socket, {
+                        'type': 'room_closed',
+                        'reason': f"Room {room.room_code} stopped: its server process exited (code {exit_code})",
+                    })
+        shard.control.close()
+        if self.running:
+            self.shards[self.shards.index(shard)] = self._spawn_shard(shard.index)
+
+    def shard_stats(self) -> List[dict]:
+        """Per worker: pid, rooms, measured load and ticks per second (latest reports)."""
+        report = []
+        for shard in self.shards:
+            rooms = [room for room in list(self.rooms.values()) if room.shard is shard]
+            report.append({
+                'index': shard.index,
+                'pid': shard.process.pid,
+                'alive': shard.alive,
+                'rooms': sorted(room.room_id for room in rooms),
+                'load': self.shard_load(shard),
+                'ticks_per_second': sum(room.ticks_per_second for room in rooms),
+            })
+        return report
@@ -0,0 +1,27 @@
+"""
+Process-wide singletons that survive BASE_files being imported again.
+
+BASE_tests.run_all_tests() calls clear_python_cache(), which removes every
+GameFolder, BASE_components and BASE_files module from sys.modules, so the
+next import executes those modules again. An object created at import time
+(the tick profiler, the metrics registry, the GC policy, ...) would then exist
+twice, and code imported before the clear would hold a different instance
+than code imported after it. process_singleton() keeps each instance in a
+module outside those prefixes: every import gets the one created first.
+"""
+
+import sys
+import types
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+STORE = "core_conflict_process_state"  # Not under a prefix clear_python_cache() removes
+
+
+def process_singleton(name: str, factory: Callable[[], T]) -> T:
+    """The process's `name` object, made by factory() the first time any import asks for it."""
+    store = sys.modules.setdefault(STORE, types.ModuleType(STORE))
+    if not hasattr(store, name):
+        setattr(store, name, factory())
+    return getattr(store, name)
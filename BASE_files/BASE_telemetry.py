@@ -0,0 +1,185 @@
+"""
+Per-connection network telemetry, computed from local data only.
+
+Round-trip time comes from ping/pong control messages:
+
+    A -> B  {'type': 'ping', 'sent': <A's time.monotonic()>}
+    B -> A  {'type': 'pong', 'sent': <echoed unchanged>}
+
+A computes RTT = now - sent with its own clock, so the two clocks never need
+to agree. Both the server and NetworkClient send pings every PING_INTERVAL and
+answer the other side's pings, so each side has its own view of the link.
+
+ConnectionTelemetry keeps, per connection:
+    rtt_ms / rtt_jitter_ms   smoothed RTT and its mean deviation (TCP SRTT/RTTVAR gains)
+    bytes/messages in/out    totals plus per-second rates over the last full second
+    state_avg/max_bytes      size of game_state payloads (sent on the server, received on the client)
+    send_queue_bytes         bytes waiting to be written (current and max this second)
+    arrival_jitter_ms        mean deviation of inter-arrival times from the tick interval
+                             (input on the server, game_state on the client), RFC 3550 style
+
+Counters are plain attributes updated by the network and game threads without
+a lock; a lost increment under a race only skews a rate by one message.
+"""
+
+import time
+from typing import Optional
+
+PING_INTERVAL = 1.0
+RATE_WINDOW = 1.0
+_RTT_GAIN = 1 / 8  # RFC 6298 alpha
+_JITTER_GAIN = 1 / 4  # RFC 6298 beta
+_ARRIVAL_GAIN = 1 / 16  # RFC 3550 interarrival jitter
+
+
+def make_ping(now: Optional[float] = None) -> dict:
+    return {'type': 'ping', 'sent': time.monotonic() if now is None else now}
+
+
+def make_pong(ping: dict) -> dict:
+    return {'type': 'pong', 'sent': ping.get('sent')}
+
+
+class ConnectionTelemetry:
+    """Counters and smoothed link statistics for one connection."""
+
+    def __init__(self, expected_interval: float = 1 / 60, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.expected_interval = expected_interval
+
+        self.rtt = None  # Smoothed RTT in seconds (None until the first pong)
+        self.rtt_jitter = 0.0
+        self.rtt_last = None
+        self.rtt_samples = 0
+        self.last_ping = 0.0
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.messages_in = 0
+        self.messages_out = 0
+
+        self.state_count = 0
+        self.state_bytes = 0
+        self.state_max_bytes = 0
+
+        self.send_queue_bytes = 0
+        self.send_queue_max = 0
+        self._queue_max_window = 0
+
+        self.arrival_jitter = 0.0
+        self._last_arrival = None
+
+        self._window_start = now
+        self._window_base = (0, 0, 0, 0)
+        self.rates = {'bytes_in_per_s': 0.0, 'bytes_out_per_s': 0.0,
+                      'messages_in_per_s': 0.0, 'messages_out_per_s': 0.0}
+
+    # ----- recording -----
+
+    def record_received(self, size: int):
+        self.bytes_in += size
+        self.messages_in += 1
+
+    def record_sent(self, size: int, queued_bytes: int = 0):
+        self.bytes_out += size
+        self.messages_out += 1
+        self.send_queue_bytes = queued_bytes
+        if queued_bytes > self._queue_max_window:
+            self._queue_max_window = queued_bytes
+
+    def record_state(self, size: int):
+        """One game_state payload of `size` bytes (sent or received)."""
+        self.state_count += 1
+        self.state_bytes += size
+        if size > self.state_max_bytes:
+            self.state_max_bytes = size
+
+    def record_arrival(self, now: Optional[float] = None):
+        """A periodic message (input / game_state) arrived; updates the arrival jitter."""
+        now = time.monotonic() if now is None else now
+        if self._last_arrival is not None:
+            deviation = abs((now - self._last_arrival) - self.expected_interval)
+            self.arrival_jitter += (deviation - self.arrival_jitter) * _ARRIVAL_GAIN
+        self._last_arrival = now
+
+    def record_pong(self, pong: dict, now: Optional[float] = None) -> Optional[float]:
+        """Update RTT from a pong echoing one of our pings; returns the sample in seconds."""
+        sent = pong.get('sent')
+        if not isinstance(sent, (int, float)):
+            return None
+        now = time.monotonic() if now is None else now
+        sample = now - sent
+        if sample < 0:
+            return None
+        if self.rtt is None:
+            self.rtt = sample
+            self.rtt_jitter = sample / 2
+        else:
+            self.rtt_jitter += (abs(sample - self.rtt) - self.rtt_jitter) * _JITTER_GAIN
+            self.rtt += (sample - self.rtt) * _RTT_GAIN
+        self.rtt_last = sample
+        self.rtt_samples += 1
+        return sample
+
+    def ping_due(self, now: Optional[float] = None) -> Optional[dict]:
+        """A ping message if PING_INTERVAL elapsed since the last one (also rolls the rate window)."""
+        now = time.monotonic() if now is None else now
+        self.roll(now)
+        if now - self.last_ping < PING_INTERVAL:
+            return None
+        self.last_ping = now
+        return make_ping(now)
+
+    def roll(self, now: Optional[float] = None):
+        """Close the rate window once RATE_WINDOW has passed."""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._window_start
+        if elapsed < RATE_WINDOW:
+            return
+        current = (self.bytes_in, self.bytes_out, self.messages_in, self.messages_out)
+        base = self._window_base
+        self.rates = {
+            'bytes_in_per_s': (current[0] - base[0]) / elapsed,
+            'bytes_out_per_s': (current[1] - base[1]) / elapsed,
+            'messages_in_per_s': (current[2] - base[2]) / elapsed,
+            'messages_out_per_s': (current[3] - base[3]) / elapsed,
+        }
+        self._window_base = current
+        self._window_start = now
+        self.send_queue_max = self._queue_max_window
+        self._queue_max_window = self.send_queue_bytes
+
+    # ----- reporting -----
+
+    def snapshot(self) -> dict:
+        """Plain dict of every counter (milliseconds for times)."""
+        return {
+            'rtt_ms': self.rtt * 1000 if self.rtt is not None else None,
+            'rtt_jitter_ms': self.rtt_jitter * 1000,
+            'rtt_last_ms': self.rtt_last * 1000 if self.rtt_last is not None else None,
+            'rtt_samples': self.rtt_samples,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'messages_in': self.messages_in,
+            'messages_out': self.messages_out,
+            **self.rates,
+            'state_count': self.state_count,
+            'state_avg_bytes': self.state_bytes / self.state_count if self.state_count else 0.0,
+            'state_max_bytes': self.state_max_bytes,
+            'send_queue_bytes': self.send_queue_bytes,
+            'send_queue_max_bytes': max(self.send_queue_max, self._queue_max_window),
+            'arrival_jitter_ms': self.arrival_jitter * 1000,
+        }
+
+
+def format_overlay(snapshot: dict) -> list:
+    """Short text lines for an on-screen debug overlay."""
+    rtt = snapshot['rtt_ms']
+    return [
+        f"RTT {rtt:.1f} ms  jitter {snapshot['rtt_jitter_ms']:.1f} ms" if rtt is not None else "RTT --",
+        f"in  {snapshot['bytes_in_per_s'] / 1024:.1f} KB/s  {snapshot['messages_in_per_s']:.0f} msg/s",
+        f"out {snapshot['bytes_out_per_s'] / 1024:.1f} KB/s  {snapshot['messages_out_per_s']:.0f} msg/s",
+        f"state avg {snapshot['state_avg_bytes']:.0f} B  max {snapshot['state_max_bytes']} B",
+        f"send queue {snapshot['send_queue_bytes']} B (max {snapshot['send_queue_max_bytes']} B)",
+        f"state arrival jitter {snapshot['arrival_jitter_ms']:.1f} ms",
+    ]
@@ -0,0 +1,405 @@
+"""
+Streaming, resumable chunked file transfers (patches, backups and ad-hoc files).
+
+Both the server and the client own a TransferEngine. The sender never loads a
+file into memory: it reads one chunk at a time and keeps at most `window`
+chunks in flight (sent but not yet acknowledged). The receiver writes every
+verified chunk straight into a `<transfer_id>.part` file and acknowledges it;
+peak memory per transfer is therefore window * chunk_size, whatever the file size.
+
+Every chunk carries its own sha256 and the offer carries the sha256 of the whole
+file. A corrupt chunk is rejected and re-sent from the last confirmed offset; a
+whole-file mismatch fails the transfer. The transfer id is derived from the
+kind, name and file hash, so after a reconnect the sender re-offers the same id
+and the receiver answers with the size of its .part file: the transfer resumes
+from the last confirmed offset instead of from zero.
+
+Message flow (pickled dicts on the TCP channel):
+    sender   -> receiver  {'type': 'transfer_offer', 'transfer_id', 'kind', 'name', 'meta', 'size', 'sha256', 'chunk_size'}
+    receiver -> sender    {'type': 'transfer_accept', 'transfer_id', 'offset'}
+    sender   -> receiver  {'type': 'transfer_chunk', 'transfer_id', 'offset', 'data', 'sha256'}      (window of these)
+    receiver -> sender    {'type': 'transfer_ack', 'transfer_id', 'offset', 'retry'}                (per chunk)
+    receiver -> sender    {'type': 'transfer_complete', 'transfer_id', 'success', 'error'}
+
+Completed files are handed to the handler registered for their kind; the
+handler moves the file where it belongs and returns (success, error).
+"""
+
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from BASE_files.BASE_logging import get_logger
+
+logger = get_logger("transfer")
+
+CHUNK_SIZE = 64 * 1024
+WINDOW_CHUNKS = 16  # Chunks in flight per transfer: 1 MB with 64 KB chunks
+MAX_CHUNK_RETRIES = 5  # Corrupt chunks tolerated per transfer before giving up
+MAX_TRANSFER_SIZE = 1024 * 1024 * 1024  # Offers above this are refused
+
+TRANSFER_MESSAGE_TYPES = frozenset({
+    'transfer_offer', 'transfer_accept', 'transfer_chunk', 'transfer_ack', 'transfer_complete'
+})
+
+# handler(peer, part_path, name, meta) -> (success, error); may move part_path away
+TransferHandler = Callable[[Any, str, str, dict], Tuple[bool, str]]
+
+
+def file_sha256(path: str) -> str:
+    """sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def transfer_id_for(kind: str, name: str, sha256: str) -> str:
+    """Stable id: the same content offered again (e.g. after a reconnect) resumes the same .part file."""
+    return hashlib.sha256(f"{kind}\0{name}\0{sha256}".encode('utf-8')).hexdigest()[:32]
+
+
+class OutgoingTransfer:
+    """Sender side of one transfer."""
+
+    def __init__(self, peer, path: str, kind: str, name: str, meta: dict, chunk_size: int,
+                 on_done: Optional[Callable[[bool, str], None]], sha256: Optional[str] = None):
+        self.peer = peer
+        self.path = path
+        self.kind = kind
+        self.name = name
+        self.meta = meta
+        self.chunk_size = chunk_size
+        self.on_done = on_done
+        self.size = os.path.getsize(path)
+        self.sha256 = sha256 or file_sha256(path)
+        self.transfer_id = transfer_id_for(kind, name, self.sha256)
+        self.file = None  # Open only while the receiver has accepted
+        self.acked = 0  # Confirmed by the receiver
+        self.next_offset = 0  # Next byte to send
+        self.retries = 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class IncomingTransfer:
+    """Receiver side of one transfer; confirmed bytes live in the .part file."""
+
+    def __init__(self, peer, offer: dict, part_path: str):
+        self.peer = peer
+        self.transfer_id = offer['transfer_id']
+        self.kind = offer['kind']
+        self.name = offer['name']
+        self.meta = offer.get('meta') or {}
+        self.size = offer['size']
+        self.sha256 = offer['sha256']
+        self.chunk_size = offer['chunk_size']
+        self.part_path = part_path
+        self.digest = hashlib.sha256()
+
+        # Resume from whole chunks already on disk; re-hash them to continue the whole-file hash
+        confirmed = 0
+        if os.path.exists(part_path):
+            confirmed = min(os.path.getsize(part_path), self.size)
+            confirmed -= confirmed % self.chunk_size if confirmed < self.size else 0
+        self.file = open(part_path, 'r+b' if os.path.exists(part_path) else 'w+b')
+        self.file.truncate(confirmed)
+        remaining = confirmed
+        while remaining:
+            block = self.file.read(min(remaining, 1024 * 1024))
+            self.digest.update(block)
+            remaining -= len(block)
+        self.confirmed = confirmed
+        self.resumed_from = confirmed
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class TransferEngine:
+    """
+    Sends and receives files for one endpoint.
+
+    `send(peer, message)` delivers a transfer message to a peer (the client only
+    has one peer, the server uses player ids). Safe to call from several threads.
+    """
+
+    def __init__(self, send: Callable[[Any, dict], None], temp_dir: str,
+                 chunk_size: int = CHUNK_SIZE, window: int = WINDOW_CHUNKS):
+        self.send = send
+        self.temp_dir = temp_dir
+        self.chunk_size = chunk_size
+        self.window = window
+        self.handlers: Dict[str, TransferHandler] = {}
+        self.on_progress: Optional[Callable[[str, str, float, str], None]] = None  # (kind, name, fraction, direction)
+        self.outgoing: Dict[str, OutgoingTransfer] = {}
+        self.incoming: Dict[str, IncomingTransfer] = {}
+        self._lock = threading.RLock()
+
+        # Counters for telemetry and tests
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.bytes_resumed = 0
+        self.chunks_retried = 0
+
+    def register_handler(self, kind: str, handler: TransferHandler):
+        """Handle completed transfers of `kind`."""
+        self.handlers[kind] = handler
+
+    # ----- sender side -----
+
+    def offer(self, peer, path: str, kind: str, name: str, meta: Optional[dict] = None,
+              on_done: Optional[Callable[[bool, str], None]] = None, sha256: Optional[str] = None) -> str:
+        """
+        Start sending a file. Chunks go out as the receiver acknowledges earlier ones.
+        Pass `sha256` when the file's hash was already computed (e.g. on a worker thread).
+
+        Returns:
+            The transfer id
+        """
+        transfer = OutgoingTransfer(peer, path, kind, name, meta or {}, self.chunk_size, on_done, sha256)
+        with self._lock:
+            previous = self.outgoing.pop(transfer.transfer_id, None)
+            if previous is not None:
+                previous.close()
+            self.outgoing[transfer.transfer_id] = transfer
+            self._send_offer(transfer)
+        logger.info("📤 TRANSFER: Offered %s '%s' (%d bytes) as %s", kind, name, transfer.size, transfer.transfer_id[:8])
+        return transfer.transfer_id
+
+    def _send_offer(self, transfer: OutgoingTransfer):
+        self.send(transfer.peer, {
+            'type': 'transfer_offer',
+            'transfer_id': transfer.transfer_id,
+            'kind': transfer.kind,
+            'name': transfer.name,
+            'meta': transfer.meta,
+            'size': transfer.size,
+            'sha256': transfer.sha256,
+            'chunk_size': transfer.chunk_size,
+        })
+
+    def _fill_window(self, transfer: OutgoingTransfer):
+        """Send chunks until `window` of them are unacknowledged."""
+        limit = min(transfer.size, transfer.acked + self.window * transfer.chunk_size)
+        while transfer.next_offset < limit:
+            transfer.file.seek(transfer.next_offset)
+            data = transfer.file.read(min(transfer.chunk_size, transfer.size - transfer.next_offset))
+            self.send(transfer.peer, {
+                'type': 'transfer_chunk',
+                'transfer_id': transfer.transfer_id,
+                'offset': transfer.next_offset,
+                'data': data,
+                'sha256': hashlib.sha256(data).hexdigest(),
+            })
+            transfer.next_offset += len(data)
+            self.bytes_sent += len(data)
+
+    def _on_accept(self, transfer: OutgoingTransfer, offset: int):
+        if offset < 0 or offset > transfer.size:
+            offset = 0
+        if offset:
+            logger.info("🔁 TRANSFER: Resuming %s '%s' at %d/%d bytes", transfer.kind, transfer.name, offset, transfer.size)
+        transfer.close()
+        transfer.file = open(transfer.path, 'rb')
+        transfer.acked = transfer.next_offset = offset
+        self._fill_window(transfer)
+
+    def _on_ack(self, transfer: OutgoingTransfer, message: dict):
+        if transfer.file is None:
+            return  # Paused, or acks for a previous connection
+        offset = message.get('offset', 0)
+        if message.get('retry'):
+            transfer.retries += 1
+            self.chunks_retried += 1
+            transfer.next_offset = offset  # Go back to the first unconfirmed chunk
+        transfer.acked = max(transfer.acked, min(offset, transfer.size))
+        if self.on_progress and transfer.size:
+            self.on_progress(transfer.kind, transfer.name, transfer.acked / transfer.size, 'sending')
+        self._fill_window(transfer)
+
+    def _on_complete(self, transfer: OutgoingTransfer, message: dict):
+        del self.outgoing[transfer.transfer_id]
+        transfer.close()
+        success = message.get('success', False)
+        error = message.get('error', '')
+        if success:
+            logger.info("[success] TRANSFER: %s '%s' delivered (%d bytes)", transfer.kind, transfer.name, transfer.size)
+        else:
+            logger.error("[error] TRANSFER: %s '%s' failed on the receiver: %s", transfer.kind, transfer.name, error)
+        if transfer.on_done:
+            transfer.on_done(success, error)
+
+    # ----- receiver side -----
+
+    def _on_offer(self, peer, message: dict):
+        transfer_id = message.get('transfer_id', '')
+        kind = message.get('kind')
+        size = message.get('size')
+        chunk_size = message.get('chunk_size')
+        if (not isinstance(transfer_id, str) or not transfer_id.isalnum() or kind not in self.handlers
+                or not isinstance(size, int) or not 0 <= size <= MAX_TRANSFER_SIZE
+                or not isinstance(chunk_size, int) or chunk_size <= 0):
+            logger.warning("[warning] TRANSFER: Refusing offer %r of kind %r from %s", transfer_id, kind, peer)
+            self.send(peer, {'type': 'transfer_complete', 'transfer_id': transfer_id,
+                             'success': False, 'error': 'Transfer refused'})
+            return
+
+        previous = self.incoming.pop(transfer_id, None)
+        if previous is not None:
+            previous.close()
+        os.makedirs(self.temp_dir, exist_ok=True)
+        transfer = IncomingTransfer(peer, message, os.path.join(self.temp_dir, f"{transfer_id}.part"))
+        self.incoming[transfer_id] = transfer
+        self.bytes_resumed += transfer.resumed_from
+        if transfer.resumed_from:
+            logger.info("🔁 TRANSFER: Resuming %s '%s' from %d/%d bytes", transfer.kind, transfer.name,
+                        transfer.resumed_from, transfer.size)
+        if transfer.confirmed == transfer.size:
+            self._finish(transfer)
+        else:
+            self.send(peer, {'type': 'transfer_accept', 'transfer_id': transfer_id, 'offset': transfer.confirmed})
+
+    def _on_chunk(self, transfer: IncomingTransfer, message: dict):
+        offset = message.get('offset')
+        data = message.get('data')
+        if offset != transfer.confirmed:
+            return  # In flight behind a rejected chunk; the sender re-sends from the confirmed offset
+        if (not isinstance(data, bytes) or transfer.confirmed + len(data) > transfer.size
+                or hashlib.sha256(data).hexdigest() != message.get('sha256')):
+            logger.warning("[warning] TRANSFER: Corrupt chunk at %d of '%s', requesting it again", offset, transfer.name)
+            self.send(transfer.peer, {'type': 'transfer_ack', 'transfer_id': transfer.transfer_id,
+                                      'offset': transfer.confirmed, 'retry': True})
+            return
+
+        transfer.file.seek(offset)
+        transfer.file.write(data)
+        transfer.digest.update(data)
+        transfer.confirmed += len(data)
+        self.bytes_received += len(data)
+        if self.on_progress and transfer.size:
+            self.on_progress(transfer.kind, transfer.name, transfer.confirmed / transfer.size, 'receiving')
+        if transfer.confirmed == transfer.size:
+            self._finish(transfer)
+        else:
+            self.send(transfer.peer, {'type': 'transfer_ack', 'transfer_id': transfer.transfer_id,
+                                      'offset': transfer.confirmed, 'retry': False})
+
+    def _finish(self, transfer: IncomingTransfer):
+        """Verify the whole file, hand it to the kind's handler and report the outcome."""
+        del self.incoming[transfer.transfer_id]
+        transfer.close()
+        if transfer.digest.hexdigest() != transfer.sha256:
+            success, error = False, 'File hash mismatch'
+        else:
+            try:
+                success, error = self.handlers[transfer.kind](transfer.peer, transfer.part_path, transfer.name, transfer.meta)
+            except Exception as e:
+                success, error = False, str(e)
+        if os.path.exists(transfer.part_path):
+            os.remove(transfer.part_path)
+        if success:
+            logger.info("[success] TRANSFER: Received %s '%s' (%d bytes)", transfer.kind, transfer.name, transfer.size)
+        else:
+            logger.error("[error] TRANSFER: %s '%s' failed: %s", transfer.kind, transfer.name, error)
+        self.send(transfer.peer, {'type': 'transfer_complete', 'transfer_id': transfer.transfer_id,
+                                  'success': success, 'error': error})
+
+    # ----- both sides -----
+
+    def handle_message(self, peer, message: dict) -> bool:
+        """
+        Process one transfer message from `peer`.
+
+        Returns:
+            False if the message is not a transfer message
+        """
+        msg_type = message.get('type')
+        if msg_type not in TRANSFER_MESSAGE_TYPES:
+            return False
+        transfer_id = message.get('transfer_id')
+        with self._lock:
+            if msg_type == 'transfer_offer':
+                self._on_offer(peer, message)
+                return True
+
+            if msg_type == 'transfer_chunk':
+                transfer = self.incoming.get(transfer_id)
+                if transfer is not None and transfer.peer == peer:
+                    try:
+                        self._on_chunk(transfer, message)
+                    except OSError as e:
+                        self.incoming.pop(transfer_id, None)
+                        transfer.close()
+                        self.send(peer, {'type': 'transfer_complete', 'transfer_id': transfer_id,
+                                         'success': False, 'error': str(e)})
+                return True
+
+            incoming = self.incoming.get(transfer_id)
+            if msg_type == 'transfer_complete' and incoming is not None and incoming.peer == peer:
+                # The sender gave up on this transfer; keep the .part for a later offer
+                del self.incoming[transfer_id]
+                incoming.close()
+                return True
+
+            transfer = self.outgoing.get(transfer_id)
+            if transfer is None or transfer.peer != peer:
+                return True
+            if msg_type == 'transfer_accept':
+                self._on_accept(transfer, message.get('offset', 0))
+            elif msg_type == 'transfer_ack':
+                if transfer.retries >= MAX_CHUNK_RETRIES:
+                    error = 'Too many corrupt chunks'
+                    self.send(peer, {'type': 'transfer_complete', 'transfer_id': transfer_id,
+                                     'success': False, 'error': error})
+                    self._on_complete(transfer, {'success': False, 'error': error})
+                else:
+                    self._on_ack(transfer, message)
+            else:
+                self._on_complete(transfer, message)
+        return True
+
+    def peer_disconnected(self, peer):
+        """
+        Pause everything exchanged with `peer`. Outgoing transfers wait for resume();
+        incoming .part files stay on disk until the peer offers them again.
+        """
+        with self._lock:
+            for transfer in self.outgoing.values():
+                if transfer.peer == peer:
+                    transfer.close()
+            for transfer_id, transfer in list(self.incoming.items()):
+                if transfer.peer == peer:
+                    transfer.close()
+                    del self.incoming[transfer_id]
+
+    def resume(self, peer):
+        """Re-offer paused outgoing transfers to a (re)connected peer; the receiver picks the offset."""
+        with self._lock:
+            for transfer in self.outgoing.values():
+                if transfer.peer == peer and transfer.file is None:
+                    self._send_offer(transfer)
+
+    def cancel(self, peer=None):
+        """Drop outgoing transfers to `peer` (or all of them) without notifying anyone."""
+        with self._lock:
+            for transfer_id, transfer in list(self.outgoing.items()):
+                if peer is None or transfer.peer == peer:
+                    transfer.close()
+                    del self.outgoing[transfer_id]
+            for transfer_id, transfer in list(self.incoming.items()):
+                if peer is None or transfer.peer == peer:
+                    transfer.close()
+                    del self.incoming[transfer_id]
+
+    def pending(self, peer=None) -> int:
+        """Outgoing transfers (to `peer`) not yet confirmed complete."""
+        with self._lock:
+            return sum(1 for t in self.outgoing.values() if peer is None or t.peer == peer)
@@ -1,5 +1,10 @@
 import pygame
 
+# Extra pixels around a changed component that get repainted (antialiased text, borders)
+DIRTY_PADDING = 2
+# Above this many separate dirty regions a single bounding rect is cheaper to push
+MAX_DIRTY_RECTS = 16
+
 class UIComponent:
     """Base class for all UI elements."""
     def __init__(self, x, y, width, height, name=None):
@@ -31,6 +36,17 @@ class UIComponent:
         """Render the component to the screen."""
         pass
 
+    def render_state(self):
+        """
+        Snapshot of everything that changes how the component looks.
+        UIManager compares it between frames and only redraws components whose snapshot changed.
+        """
+        return (tuple(self.rect), self.visible, self.enabled, self.hovered, self.focused)
+
+    def drawn_rect(self):
+        """Screen area the component paints into (its rect unless it draws outside of it)."""
+        return self.rect
+
 class UIManager:
     """Manages components for a specific menu state."""
     def __init__(self, menu):
@@ -38,11 +54,70 @@ class UIManager:
         self.components = []
         self.focused_component = None
 
+        # Dirty-rect tracking: last drawn snapshot and rect per component
+        self._render_states = {}
+        self._dirty_rects = []
+        self._full_redraw = True
+
     def add(self, component):
         """Add a component to the manager."""
         self.components.append(component)
+        self._full_redraw = True
         return component
 
+    def invalidate(self, rect=None):
+        """Force a region (or the whole screen when rect is None) to be redrawn on the next frame."""
+        if rect is None:
+            self._full_redraw = True
+        else:
+            self._dirty_rects.append(pygame.Rect(rect))
+
+    def collect_dirty_rects(self):
+        """Compare every component against its last drawn snapshot and return the regions that changed."""
+        for comp in self.components:
+            state = comp.render_state() if comp.visible else None
+            previous = self._render_states.get(comp)
+            if previous is not None and previous[0] == state:
+                continue
+
+            # Repaint where the component was and where it is now
+            if previous is not None and previous[1] is not None:
+                self._dirty_rects.append(previous[1])
+            drawn_rect = comp.drawn_rect().inflate(DIRTY_PADDING * 2, DIRTY_PADDING * 2) if state is not None else None
+            if drawn_rect is not None:
+                self._dirty_rects.append(drawn_rect)
+            self._render_states[comp] = (state, drawn_rect)
+
+        rects = _merge_rects(self._dirty_rects)
+        self._dirty_rects = []
+        return rects
+
+    def render_dirty(self, screen, background):
+        """
+        Redraw only the regions whose components changed since the last frame.
+
+        Returns:
+            List of rects that were repainted (empty when nothing changed), ready for pygame.display.update
+        """
+        rects = self.collect_dirty_rects()
+        screen_rect = screen.get_rect()
+
+        if self._full_redraw:
+            self._full_redraw = False
+            screen.fill(background)
+            self.render(screen)
+            return [screen_rect]
+
+        rects = [rect.clip(screen_rect) for rect in rects]
+        rects = [rect for rect in rects if rect.width > 0 and rect.height > 0]
+        previous_clip = screen.get_clip()
+        for rect in rects:
+            screen.set_clip(rect)
+            screen.fill(background, rect)
+            self.render(screen, region=rect)
+        screen.set_clip(previous_clip)
+        return rects
+
     def handle_event(self, event):
         """Distribute events to components."""
         # Handle mouse clicks to manage focus
@@ -90,22 +165,40 @@ class UIManager:
             if comp.visible:
                 comp.update(mouse_pos)
 
-    def render(self, screen):
-        """Render all visible components."""
+    def render(self, screen, region=None):
+        """Render all visible components (only those touching region, if given)."""
         # Render regular components first
         regular_components = [comp for comp in self.components if not isinstance(comp, NotificationOverlay)]
         overlay_components = [comp for comp in self.components if isinstance(comp, NotificationOverlay)]
 
         # Render regular components
         for comp in regular_components:
-            if comp.visible:
+            if comp.visible and (region is None or comp.drawn_rect().colliderect(region)):
                 comp.render(screen)
 
         # Render overlays on top
         for comp in overlay_components:
-            if comp.visible:
+            if comp.visible and (region is None or comp.drawn_rect().colliderect(region)):
                 comp.render(screen)
 
+def _merge_rects(rects):
+    """Merge overlapping rects; collapse to one bounding rect when there are too many."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        # Keep absorbing overlapping regions until the rect stops growing
+        i = 0
+        while i < len(merged):
+            if merged[i].colliderect(rect):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    if len(merged) > MAX_DIRTY_RECTS:
+        return [merged[0].unionall(merged[1:])]
+    return merged
+
 # --- TIER 1: PRIMITIVES ---
 
 class Label(UIComponent):
@@ -135,6 +228,13 @@ class Label(UIComponent):
         surf = self.font.render(self.text, True, self.color)
         screen.blit(surf, self.rect.topleft)
 
+    def render_state(self):
+        return super().render_state() + (self.text, self.color)
+
+    def drawn_rect(self):
+        # Text assigned directly (not via set_text) can be wider than the measured rect
+        return pygame.Rect(self.rect.topleft, self.font.size(self.text))
+
 class Button(UIComponent):
     """Clickable button with hover states and styles."""
     def __init__(self, x, y, width, height, text, font, callback, style="normal", name=None):
@@ -183,6 +283,9 @@ class Button(UIComponent):
                 return True
         return False
 
+    def render_state(self):
+        return super().render_state() + (self.text, self.style, self.border_color, self.text_color)
+
 class Panel(UIComponent):
     """Background container with border."""
     def __init__(self, x, y, width, height, color=(30, 30, 40), border_color=(100, 100, 120), border_width=2, name=None):
@@ -198,6 +301,9 @@ class Panel(UIComponent):
         if self.border_width > 0:
             pygame.draw.rect(screen, self.border_color, self.rect, self.border_width)
 
+    def render_state(self):
+        return super().render_state() + (self.color, self.border_color, self.border_width)
+
 class TextField(UIComponent):
     """Full-featured input with cursor, selection, and clipboard support."""
     def __init__(self, x, y, width, height, font, placeholder="", is_multiline=False, name=None):
@@ -524,6 +630,12 @@ class TextField(UIComponent):
                     cursor_y = self.rect.y + self.padding + cursor_line_visible * self.line_height
                     pygame.draw.line(screen, (255, 255, 255), (cursor_x, cursor_y), (cursor_x, cursor_y + self.line_height), 2)
 
+    def render_state(self):
+        # The cursor blink phase is part of the look, so a focused field redraws twice a second
+        blink_on = self.focused and (pygame.time.get_ticks() // 500) % 2 == 0
+        return super().render_state() + (self._text, self.placeholder, self.cursor_pos,
+                                         self.scroll_offset, self.h_scroll_offset, blink_on)
+
 class ScrollableList(UIComponent):
     """List with scrollable items."""
     def __init__(self, x, y, width, height, item_height=45, name=None):
@@ -585,6 +697,15 @@ class ScrollableList(UIComponent):
             text_surf = font.render(item['text'], True, (255, 255, 255))
             screen.blit(text_surf, (item_rect.x + 10, item_rect.y + (self.item_height - text_surf.get_height())//2))
 
+    def render_state(self):
+        # Items highlight under the mouse independently of self.hovered
+        hovered_row = None
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        if self.rect.collidepoint(mouse_x, mouse_y):
+            hovered_row = (mouse_y - self.rect.y) // self.item_height
+        items = tuple((item['text'], bool(item.get('selected'))) for item in self.items)
+        return super().render_state() + (self.scroll_offset, items, hovered_row)
+
 # --- TIER 2: COMPOSITES ---
 
 class RoomStatusBar(UIComponent):
@@ -611,6 +732,10 @@ class RoomStatusBar(UIComponent):
         stat_surf = self.menu.small_font.render(f"Status: {status}", True, color)
         screen.blit(stat_surf, (self.rect.x, self.rect.y + 55))
 
+    def render_state(self):
+        connected = bool(self.menu.client and self.menu.client.connected)
+        return super().render_state() + (self.menu.room_code, connected)
+
 class PatchBrowser(UIComponent):
     """Combines Panel, Label, and ScrollableList for patch selection."""
     def __init__(self, x, y, width, height, menu, name=None):
@@ -669,6 +794,10 @@ class PatchBrowser(UIComponent):
 
         self.list.render(screen)
 
+    def render_state(self):
+        count = len(self.menu.patch_manager.selected_patches)
+        return super().render_state() + (count, self.list.render_state())
+
 class AgentWorkspace(UIComponent):
     """Composite for agent controls: prompt, buttons, and monitor link."""
     def __init__(self, x, y, width, height, menu, name=None):
@@ -756,6 +885,10 @@ class AgentWorkspace(UIComponent):
         mon_rect = mon_surf.get_rect(center=(self.rect.centerx, self.rect.y + 370))
         screen.blit(mon_surf, mon_rect)
 
+    def render_state(self):
+        return super().render_state() + (self.prompt_field.render_state(), self.run_button.render_state(),
+                                         self.stop_button.render_state(), self.paste_button.render_state())
+
 class TextFieldWithPaste(UIComponent):
     """Composite component with text field and paste button."""
     def __init__(self, x, y, width, height, menu, font, placeholder="", name=None):
@@ -797,6 +930,9 @@ class TextFieldWithPaste(UIComponent):
         self.text_field.render(screen)
         self.paste_button.render(screen)
 
+    def render_state(self):
+        return super().render_state() + (self.text_field.render_state(), self.paste_button.render_state())
+
     @property
     def text(self):
         return self.text_field.text
@@ -834,3 +970,6 @@ class NotificationOverlay(UIComponent):
             rect = surf.get_rect(center=(700, 80))
             screen.blit(surf, rect)
 
+    def render_state(self):
+        showing = bool(self.menu.error_message) and pygame.time.get_ticks() - self.menu.error_message_time < 5000
+        return super().render_state() + (self.menu.error_message if showing else None,)
@@ -0,0 +1,137 @@
+"""
+Bounded worker pool for server file, hash and archive work.
+
+The network and game loops must never wait on the disk or on a long hash:
+one backup extraction used to stall input processing and state broadcasts for
+every player. Jobs are submitted here instead:
+
+    submit_io(fn, *args, callback=cb)   thread pool: file reads/writes, small hashes
+    submit_cpu(fn, *args, callback=cb)  one worker process: decompression, directory
+                                        hashes, rsync signatures (fn must be picklable)
+
+Callbacks are not run on the worker. They are queued and executed by the
+owner's loop when it calls run_callbacks(), so they can touch server state
+without extra locking, exactly like code running in the network loop.
+callback(result, error) receives the job's return value, or the exception it
+raised as `error`.
+
+CC_WORKER_PROCESS=0 keeps CPU jobs on the thread pool (no child process).
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from BASE_files.BASE_logging import get_logger
+
+logger = get_logger("workers")
+
+IO_WORKERS = 2
+CPU_WORKERS = 1
+MAX_PENDING_JOBS = 64  # Beyond this, jobs run inline on the caller instead of queueing without bound
+
+JobCallback = Callable[[Any, Optional[BaseException]], None]
+
+
+class WorkerPool:
+    """
+    I/O threads plus a lazily started worker process.
+    With inline=True every job runs immediately on the caller (the old behaviour; used for comparisons).
+    """
+
+    def __init__(self, io_workers: int = IO_WORKERS, use_process: Optional[bool] = None, inline: bool = False):
+        self.inline = inline
+        self.use_process = use_process if use_process is not None else os.getenv("CC_WORKER_PROCESS", "1") != "0"
+        self._io_pool = None if inline else ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="server-io")
+        self._cpu_pool = None
+        self._lock = threading.Lock()
+        self._callbacks = deque()
+        self.pending = 0
+
+        # Counters for telemetry and tests
+        self.jobs_completed = 0
+        self.jobs_inline = 0
+
+    def _get_cpu_pool(self):
+        """Start the worker process on first use (spawn: the server is multi-threaded, fork is unsafe)."""
+        if self._cpu_pool is None and self.use_process:
+            try:
+                self._cpu_pool = ProcessPoolExecutor(max_workers=CPU_WORKERS,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, ValueError, NotImplementedError) as e:
+                logger.warning("[warning] WORKERS: No worker process available (%s), CPU jobs use threads", e)
+                self.use_process = False
+        return self._cpu_pool if self.use_process else self._io_pool
+
+    def warm_up(self):
+        """Start the worker process now, so the first CPU job does not pay for spawning it mid-match."""
+        if not self.inline:
+            self.submit_cpu(os.getpid)
+
+    def submit_io(self, fn: Callable, *args, callback: Optional[JobCallback] = None):
+        """Run fn(*args) on an I/O thread; callback(result, error) runs in run_callbacks()."""
+        self._submit(self._io_pool, fn, args, callback)
+
+    def submit_cpu(self, fn: Callable, *args, callback: Optional[JobCallback] = None):
+        """Run fn(*args) in the worker process; callback(result, error) runs in run_callbacks()."""
+        self._submit(None if self.inline else self._get_cpu_pool(), fn, args, callback)
+
+    def _submit(self, pool, fn, args, callback):
+        with self._lock:
+            saturated = self.pending >= MAX_PENDING_JOBS
+            if pool is not None and not saturated:
+                self.pending += 1
+        if pool is None or saturated:
+            if saturated:
+                logger.warning("[warning] WORKERS: %d jobs pending, running %s inline", self.pending, getattr(fn, '__name__', fn))
+            self.jobs_inline += 1
+            try:
+                result, error = fn(*args), None
+            except Exception as e:
+                result, error = None, e
+            self._callbacks.append((callback, result, error))
+            return
+
+        try:
+            future = pool.submit(fn, *args)
+        except RuntimeError as e:  # Pool shut down
+            with self._lock:
+                self.pending -= 1
+            self._callbacks.append((callback, None, e))
+            return
+        future.add_done_callback(lambda f: self._job_done(f, callback))
+
+    def _job_done(self, future, callback):
+        error = future.exception() if not future.cancelled() else RuntimeError("Job cancelled")
+        result = None if error else future.result()
+        with self._lock:
+            self.pending -= 1
+        self._callbacks.append((callback, result, error))
+
+    def run_callbacks(self, limit: Optional[int] = None) -> int:
+        """Run queued completion callbacks on the calling (loop) thread; returns how many ran."""
+        ran = 0
+        while self._callbacks and (limit is None or ran < limit):
+            callback, result, error = self._callbacks.popleft()
+            ran += 1
+            self.jobs_completed += 1
+            if error is not None and callback is None:
+                logger.error("[error] WORKERS: Job failed: %s", error)
+            if callback is None:
+                continue
+            try:
+                callback(result, error)
+            except Exception as e:
+                logger.error("[error] WORKERS: Job callback failed: %s", e)
+        return ran
+
+    def shutdown(self):
+        """Stop accepting jobs; running ones finish in the background."""
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=False, cancel_futures=True)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
@@ -13,12 +13,29 @@ import importlib
 from typing import Dict, List, Optional, Callable, Any
 from collections import deque
 import select
-from datetime import datetime
+import pygame
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from BASE_files.BASE_network import NetworkObject
+from BASE_files.BASE_logging import get_logger
+from BASE_files.BASE_input_codec import encode_input_frame, pack_input_packet, INPUT_HISTORY
+from BASE_files.BASE_framing import FrameReader, send_frames, enable_nodelay, HEADER_SIZE
+from BASE_files.BASE_telemetry import ConnectionTelemetry, make_pong
+from BASE_files.BASE_transfer import TransferEngine, TRANSFER_MESSAGE_TYPES
+from BASE_files.BASE_delta_sync import build_delta, delta_stats
+from BASE_files.BASE_datagram import (
+    SequenceFilter, unpack_datagram, send_datagram, KIND_HELLO, KIND_INPUT, KIND_STATE,
+    UDP_HELLO_INTERVAL, UDP_FALLBACK_TIMEOUT
+)
+from BASE_files.BASE_file_sync import BlobCache, missing_blobs, store_blobs, apply_manifest, resolve_game_path, PROJECT_ROOT
+
+logger = get_logger("network.client")
+transfer_logger = get_logger("transfer")
+
+SEND_BATCH_BYTES = 1024 * 1024  # Queued messages are written together up to this size
+SERVER_PEER = 'server'  # The client's only transfer peer
 
 
 class NetworkClient:
@@ -26,13 +43,26 @@ class NetworkClient:
     Client-side network manager that handles server communication and entity synchronization.
     """
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 5555):
+    def __init__(self, host: str = "127.0.0.1", port: int = 5555, use_udp: Optional[bool] = None,
+                 room_code: Optional[str] = None):
         self.host = host
         self.port = port
+        self.room_code = room_code  # Full room code: selects the room on a multi-room server
         self.connected = False
         self.socket = None
         self.player_id = None
 
+        # Optional datagram channel for game_state and input (see BASE_datagram); CC_UDP=1 turns it on
+        self.use_udp = use_udp if use_udp is not None else os.getenv("CC_UDP", "0") == "1"
+        self.udp_socket = None
+        self.udp_token = None
+        self.udp_active = False  # True once anything arrived over UDP
+        self.udp_opened_time = 0.0
+        self.udp_last_received = 0.0
+        self.udp_last_hello = 0.0
+        self.udp_send_sequence = 0
+        self.udp_state_filter = SequenceFilter()
+
         # Network state
         self.receive_thread = None
         self.running = False
@@ -55,24 +85,47 @@ class NetworkClient:
         self.on_game_start = None
         self.on_game_restarting = None
         self.on_server_restarted = None
+        self.on_profiler_report = None  # Server tick profiler histograms (see request_profiler)
+        self.on_room_closed = None  # The room's server process went away (sharded hosting, see BASE_shards)
+
+        # Binary input frames: sequence counter (when no prediction ids) and recently sent frames
+        self.input_sequence = 0
+        self.recent_input_frames = deque(maxlen=INPUT_HISTORY + 1)
 
         # Lag compensation
         self.last_server_time = 0.0
         self.latency = 0.0
 
-        # File transfer state
-        self.file_transfers = {}  # file_path -> {'chunks': {}, 'total_chunks': 0, 'received_chunks': 0}
+        # RTT (ping/pong), traffic rates, game_state sizes and arrival jitter (see BASE_telemetry)
+        self.telemetry = ConnectionTelemetry()
+
+        # Patch, backup and ad-hoc file transfers (streamed to disk, resumable; see BASE_transfer)
+        self.transfers = TransferEngine(lambda peer, message: self.outgoing_queue.append(message),
+                                        os.path.join(PROJECT_ROOT, "__transfers", "client"))
+        self.transfers.register_handler('file', self._receive_file)
+        self.transfers.on_progress = self._on_transfer_progress
+        self.pending_patch_uploads = set()  # Transfer ids that must finish before patches_ready
+        self.backups_root = "__game_backups"  # Where our backups live (sent to the server on request)
         
         # File sync tracking
         self.file_sync_complete = False  # Track if file sync has completed
         self.file_sync_requested = False  # Track if we've requested sync
 
+        # Content-addressed sync: blobs are cached across sessions, manifest waits for missing blobs
+        self.blob_cache = BlobCache()
+        self.sync_root = PROJECT_ROOT  # Directory holding the GameFolder being synchronized
+        self.pending_manifest = None
+        self.pending_blob_hashes = set()
+        self.manifest_retries = 0
+
     def connect(self, player_id: str) -> bool:
         """Connect to the server."""
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
             self.socket.setblocking(False)
+            # Outgoing messages are batched per update, so Nagle's algorithm would only add delay
+            enable_nodelay(self.socket)
             self.player_id = player_id
             self.connected = True
             self.running = True
@@ -80,6 +133,7 @@ class NetworkClient:
             # Reset file sync flags for new connection
             self.file_sync_complete = False
             self.file_sync_requested = False
+            self.telemetry = ConnectionTelemetry()
 
             # Start receive thread
             self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
@@ -90,6 +144,9 @@ class NetworkClient:
             # Send player name to server
             self._send_player_name(player_id)
 
+            # Continue uploads a previous connection left unfinished (the server resumes at its offset)
+            self.transfers.resume(SERVER_PEER)
+
             return True
 
         except Exception as e:
@@ -105,6 +162,9 @@ class NetworkClient:
         self.file_sync_complete = False
         self.file_sync_requested = False
 
+        self._close_udp_channel()
+        self.transfers.peer_disconnected(SERVER_PEER)
+
         if self.socket:
             try:
                 self.socket.close()
@@ -132,8 +192,19 @@ class NetworkClient:
         if entity_manager and hasattr(entity_manager, 'prediction'):
             input_id = entity_manager.prediction.add_input(input_data)
             message['input_id'] = input_id
+        else:
+            self.input_sequence += 1
+            input_id = self.input_sequence
 
-        self.outgoing_queue.append(message)
+        # Send as a compact binary frame (plus the last few frames for redundancy) when possible;
+        # inputs with custom keys from GAME_character.get_input_data fall back to the pickled dict
+        frame = encode_input_frame(input_data, input_id)
+        if frame is None:
+            self.outgoing_queue.append(message)
+            return
+
+        self.recent_input_frames.appendleft(frame)
+        self.outgoing_queue.append(pack_input_packet(list(self.recent_input_frames)))
 
     def _send_player_name(self, player_name: str):
         """Send the requested player name to the server."""
@@ -141,6 +212,8 @@ class NetworkClient:
             'type': 'player_name',
             'player_name': player_name
         }
+        if self.room_code:
+            message['room_code'] = self.room_code
         self.outgoing_queue.append(message)
 
     def request_file_sync(self):
@@ -163,6 +236,25 @@ class NetworkClient:
         }
         self.outgoing_queue.append(message)
     
+    def request_profiler(self, action: str = 'report', **options):
+        """
+        Admin: 'enable', 'disable' or 'report' the server's tick profiler, or 'sample' its stacks
+        (options: seconds, rate) with the sampling profiler (local clients only).
+        """
+        if not self.connected:
+            return
+
+        message = {
+            'type': 'profiler',
+            'action': action,
+            **options
+        }
+        self.outgoing_queue.append(message)
+
+    def get_telemetry(self) -> dict:
+        """RTT, traffic and game_state counters of this connection (see BASE_telemetry)."""
+        return self.telemetry.snapshot()
+
     def send_patches_selection(self, patches_info: list):
         """Send selected patches info and files to server."""
         if not self.connected:
@@ -177,41 +269,40 @@ class NetworkClient:
         self.outgoing_queue.append(message)
         print(f"Sent patches selection: {[p['name'] for p in patches_info]}")
         
-        # Then send each patch file
+        # Then stream each patch file
+        self.pending_patch_uploads.clear()
         for patch_info in patches_info:
             file_path = patch_info['file_path']
             if os.path.exists(file_path):
-                self._send_patch_file(file_path, patch_info['name'])
-        
-        # Mark as ready ONCE after all files sent
-        self.mark_patches_ready()
-    
-    def _send_patch_file(self, file_path: str, patch_name: str):
-        """Send a patch file to server in chunks."""
+                transfer_id = self._send_patch_file(file_path, patch_info['name'])
+                if transfer_id:
+                    self.pending_patch_uploads.add(transfer_id)
+
+        # Mark as ready ONCE, after the server confirmed every patch file
+        if not self.pending_patch_uploads:
+            self.mark_patches_ready()
+
+    def _send_patch_file(self, file_path: str, patch_name: str) -> Optional[str]:
+        """Start streaming a patch file to the server; returns the transfer id."""
         try:
-            file_size = os.path.getsize(file_path)
-            chunk_size = 64 * 1024  # 64KB chunks
-            total_chunks = (file_size + chunk_size - 1) // chunk_size
-            
-            with open(file_path, 'rb') as f:
-                for chunk_num in range(total_chunks):
-                    chunk_data = f.read(chunk_size)
-                    
-                    message = {
-                        'type': 'patch_chunk',
-                        'patch_name': patch_name,
-                        'chunk_num': chunk_num,
-                        'total_chunks': total_chunks,
-                        'data': chunk_data,
-                        'player_id': self.player_id
-                    }
-                    
-                    self.outgoing_queue.append(message)
-            
-            print(f"Sent patch file: {patch_name} ({total_chunks} chunks)")
-            
+            transfer_id = self.transfers.offer(
+                SERVER_PEER, file_path, 'patch', patch_name,
+                on_done=lambda success, error: self._on_patch_uploaded(transfer_id, patch_name, success, error))
+            print(f"Sending patch file: {patch_name} ({os.path.getsize(file_path)} bytes)")
+            return transfer_id
+
         except Exception as e:
             print(f"Failed to send patch file {file_path}: {e}")
+            return None
+
+    def _on_patch_uploaded(self, transfer_id: str, patch_name: str, success: bool, error: str):
+        """Mark patches ready once the last pending patch upload is confirmed (or failed)."""
+        if not success:
+            print(f"Failed to send patch file {patch_name}: {error}")
+        if transfer_id in self.pending_patch_uploads:
+            self.pending_patch_uploads.discard(transfer_id)
+            if not self.pending_patch_uploads:
+                self.mark_patches_ready()
     
     def mark_patches_ready(self):
         """Mark patches as ready (all files uploaded)."""
@@ -280,34 +371,10 @@ class NetworkClient:
                 print(f"File not found: {file_path}")
                 return False
 
-            file_size = os.path.getsize(file_path)
-            file_name = os.path.basename(file_path)
-            target_path = target_path or file_name
-
-            # Read file in chunks to avoid memory issues
-            chunk_size = 64 * 1024  # 64KB chunks
-            total_chunks = (file_size + chunk_size - 1) // chunk_size
-
-            with open(file_path, 'rb') as f:
-                for chunk_num in range(total_chunks):
-                    chunk_data = f.read(chunk_size)
-
-                    message = {
-                        'type': 'file_chunk',
-                        'file_path': target_path,
-                        'chunk_num': chunk_num,
-                        'total_chunks': total_chunks,
-                        'data': chunk_data,
-                        'player_id': self.player_id
-                    }
-
-                    self.outgoing_queue.append(message)
-
-                    # Call progress callback if available
-                    if self.on_file_transfer_progress:
-                        progress = (chunk_num + 1) / total_chunks
-                        self.on_file_transfer_progress(target_path, progress, 'sending')
+            target_path = target_path or os.path.basename(file_path)
 
+            # Streamed from disk a window of chunks at a time; progress is reported as the server confirms
+            self.transfers.offer(SERVER_PEER, file_path, 'file', target_path)
             return True
 
         except Exception as e:
@@ -319,90 +386,44 @@ class NetworkClient:
         if not self.connected:
             return
 
+        # Bind/keep alive the datagram channel, or fall back to TCP-only
+        if self.udp_socket is not None:
+            self._maintain_udp_channel()
+
+        # RTT probe (the server echoes our timestamp)
+        ping = self.telemetry.ping_due()
+        if ping is not None:
+            self.outgoing_queue.append(ping)
+
         # Send outgoing messages
         self._send_outgoing_messages()
 
         # Process incoming messages
         self._process_incoming_messages()
 
-    def _recv_exact(self, size: int) -> Optional[bytes]:
-        """Receive exactly size bytes from non-blocking socket."""
-        data = b''
-        while len(data) < size and self.running and self.connected:
-            try:
-                # Wait up to 5 seconds for data
-                ready, _, _ = select.select([self.socket], [], [], 5.0)
-                if ready:
-                    chunk = self.socket.recv(size - len(data))
-                    if not chunk:
-                        return None # Disconnected
-                    data += chunk
-                else:
-                    # Timeout waiting for data chunk
-                    continue
-            except BlockingIOError:
-                # Resource temporarily unavailable, try again
-                continue
-            except Exception as e:
-                print(f"Error in _recv_exact: {e}")
-                return None
-        return data
-
     def _receive_loop(self):
         """Background thread for receiving messages."""
+        reader = FrameReader()
         while self.running and self.connected:
             try:
                 # Check if socket is readable
-                readable, _, _ = select.select([self.socket], [], [], 0.01)
-
-                if readable:
-                    # Receive message length
-                    length_bytes = self.socket.recv(4)
-                    if not length_bytes:
-                        # Server disconnected
-                        self.disconnect()
-                        break
-
-                    message_length = int.from_bytes(length_bytes, byteorder='big')
-
-                    # Receive the actual message using robust reader
-                    data = self._recv_exact(message_length)
-                    
-                    if data and len(data) == message_length:
-                        try:
-                            message = pickle.loads(data)
-                            
-                            # If this is game_state and file sync hasn't completed, skip it
-                            if message.get('type') == 'game_state' and not self.file_sync_complete:
-                                print("[warning] Received game_state before file sync complete - skipping")
-                                # Request file sync if we haven't already
-                                if not self.file_sync_requested:
-                                    self.file_sync_requested = True
-                                    self.request_file_sync()
-                                continue
-                            
-                            self.incoming_queue.append(message)
-                        except (pickle.UnpicklingError, EOFError, ValueError, UnicodeDecodeError) as pickle_error:
-                            # Pickle or decode errors - likely class mismatch or data corruption
-                            print(f"Failed to unpickle message: {type(pickle_error).__name__} (data length: {len(data)} bytes)")
-                            
-                            # If file sync hasn't completed, try requesting it as recovery
-                            if not self.file_sync_complete and not self.file_sync_requested:
-                                print("Unpickle error - requesting file sync for recovery")
-                                self.file_sync_requested = True
-                                self.request_file_sync()
-                                # Don't disconnect immediately - wait for file sync
-                                continue
-                            
+                udp_socket = self.udp_socket
+                sockets = [self.socket] if udp_socket is None else [self.socket, udp_socket]
+                readable, _, _ = select.select(sockets, [], [], 0.01)
+
+                if udp_socket is not None and udp_socket in readable:
+                    self._receive_datagrams(udp_socket)
+
+                if self.socket in readable:
+                    # Every complete frame of this read; a large message may take several reads
+                    for data in reader.recv_from(self.socket):
+                        self.telemetry.record_received(HEADER_SIZE + len(data))
+                        if not self._handle_received_frame(data):
                             self.disconnect()
-                            break
-                    else:
-                        print("Failed to receive complete message body")
-                        self.disconnect()
-                        break
+                            return
 
             except BlockingIOError:
-                # Just continue if resource temp unavailable on length read
+                # Just continue if resource temp unavailable
                 continue
             except UnicodeDecodeError as decode_error:
                 # Handle UTF-8 decode errors specifically
@@ -423,43 +444,214 @@ class NetworkClient:
                     self.disconnect()
                 break
 
-    def _send_data_safe(self, data: bytes):
-        """Send data safely to a non-blocking socket by temporarily making it blocking."""
+    def _receive_datagrams(self, udp_socket: socket.socket):
+        """Read pending datagrams; only the newest game_state is kept, late ones are dropped."""
+        while True:
+            try:
+                data = udp_socket.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return  # Closed by a fallback, or ICMP port unreachable
+
+            parsed = unpack_datagram(data)
+            if parsed is None or parsed[0] != self.udp_token:
+                continue
+            _, sequence, kind, payload = parsed
+            self.udp_last_received = time.time()
+            self.telemetry.record_received(len(data))
+            if not self.udp_active:
+                self.udp_active = True
+                print("UDP channel active: game state and input now use datagrams")
+            if kind == KIND_STATE and self.udp_state_filter.accept(sequence):
+                self._handle_received_frame(payload)
+
+    def _open_udp_channel(self, token: bytes, address: tuple):
+        """Create the datagram socket and start binding it to our session with HELLOs."""
+        self._close_udp_channel()
+        try:
+            udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            udp_socket.connect(address)
+            udp_socket.setblocking(False)
+        except OSError as e:
+            print(f"[warning] Could not open UDP channel, staying on TCP: {e}")
+            self.outgoing_queue.append({'type': 'udp_disable'})
+            return
+        self.udp_token = token
+        self.udp_state_filter = SequenceFilter()
+        self.udp_send_sequence = 0
+        self.udp_opened_time = time.time()
+        self.udp_last_received = 0.0
+        self.udp_socket = udp_socket
+        self._send_udp_hello()
+
+    def _close_udp_channel(self, report: bool = False):
+        """Stop using UDP; with report=True tell the server to send everything over TCP again."""
+        udp_socket, self.udp_socket = self.udp_socket, None
+        self.udp_active = False
+        self.udp_token = None
+        if udp_socket is not None:
+            try:
+                udp_socket.close()
+            except OSError:
+                pass
+            if report and self.connected:
+                self.outgoing_queue.append({'type': 'udp_disable'})
+
+    def _send_udp_hello(self):
+        self.udp_last_hello = time.time()
+        send_datagram(self.udp_socket, self.udp_token, 0, KIND_HELLO)
+
+    def _maintain_udp_channel(self):
+        """Resend HELLOs (binding retries and keepalive); fall back to TCP if the server went silent."""
+        now = time.time()
+        last_heard = self.udp_last_received or self.udp_opened_time
+        if now - last_heard > UDP_FALLBACK_TIMEOUT:
+            print(f"[warning] No datagrams for {UDP_FALLBACK_TIMEOUT:.0f}s - falling back to TCP-only")
+            self._close_udp_channel(report=True)
+        elif now - self.udp_last_hello >= UDP_HELLO_INTERVAL:
+            self._send_udp_hello()
+
+    def _handle_received_frame(self, data) -> bool:
+        """
+        Unpickle one received payload and queue it.
+
+        Returns:
+            False if the connection should be dropped
+        """
+        try:
+            message = pickle.loads(data)
+        except (pickle.UnpicklingError, EOFError, ValueError, UnicodeDecodeError) as pickle_error:
+            # Pickle or decode errors - likely class mismatch or data corruption
+            print(f"Failed to unpickle message: {type(pickle_error).__name__} (data length: {len(data)} bytes)")
+
+            # If file sync hasn't completed, try requesting it as recovery
+            if not self.file_sync_complete and not self.file_sync_requested:
+                print("Unpickle error - requesting file sync for recovery")
+                self.file_sync_requested = True
+                self.request_file_sync()
+                # Don't disconnect immediately - wait for file sync
+                return True
+            return False
+
+        # Link probes are answered/measured here, on the receive thread, without waiting for update()
+        msg_type = message.get('type')
+        if msg_type == 'pong':
+            rtt = self.telemetry.record_pong(message)
+            if rtt is not None:
+                self.latency = rtt / 2
+            return True
+        if msg_type == 'ping':
+            self.outgoing_queue.append(make_pong(message))
+            return True
+        if msg_type == 'game_state':
+            self.telemetry.record_state(len(data))
+            self.telemetry.record_arrival()
+
+        # If this is game_state and file sync hasn't completed, skip it
+        if msg_type == 'game_state' and not self.file_sync_complete:
+            print("[warning] Received game_state before file sync complete - skipping")
+            # Request file sync if we haven't already
+            if not self.file_sync_requested:
+                self.file_sync_requested = True
+                self.request_file_sync()
+            return True
+
+        self.incoming_queue.append(message)
+        return True
+
+    def _send_frames(self, payloads: List[bytes]):
+        """
+        Send length-prefixed messages, temporarily making the non-blocking socket blocking.
+        All headers and payloads go out in one scatter-gather write instead of being concatenated.
+        """
         if not self.socket:
             return
-            
-        was_blocking = self.socket.gettimeout() is not None
+
         try:
             self.socket.setblocking(True)
-            self.socket.sendall(data)
+            send_frames(self.socket, payloads)
         finally:
             self.socket.setblocking(False)
 
     def _send_outgoing_messages(self):
-        """Send queued outgoing messages."""
-        while self.outgoing_queue:
-            try:
+        """Send queued outgoing messages, batched into as few writes as possible."""
+        batch = []
+        batch_bytes = 0
+        message = None
+        try:
+            while self.outgoing_queue:
                 message = self.outgoing_queue.popleft()
-                msg_type = message.get('type', 'unknown')
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] 📤 DEBUG CLIENT: Sending message type '{msg_type}' - queue size now: {len(self.outgoing_queue)}")
-                if msg_type == 'file_chunk' and message.get('is_backup'):
-                    chunk_num = message.get('chunk_num', '?')
-                    total_chunks = message.get('total_chunks', '?')
-                    backup_name = message.get('backup_name', 'unknown')
-                    timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                    print(f"[{timestamp}] 📤 DEBUG CLIENT: Sending backup chunk {chunk_num+1 if isinstance(chunk_num, int) else chunk_num}/{total_chunks} for '{backup_name}'")
-
-                data = pickle.dumps(message, protocol=4)
-                length_bytes = len(data).to_bytes(4, byteorder='big')
-                self._send_data_safe(length_bytes + data)
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] [success] DEBUG CLIENT: Successfully sent message type '{msg_type}'")
-            except Exception as e:
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] [error] DEBUG CLIENT: Send error for message type '{message.get('type', 'unknown')}': {e}")
-                self.disconnect()
-                break
+                if isinstance(message, bytes):
+                    # Pre-encoded binary input packet; over UDP once the datagram channel is up
+                    udp_socket = self.udp_socket
+                    if self.udp_active and udp_socket is not None:
+                        self.udp_send_sequence += 1
+                        send_datagram(udp_socket, self.udp_token, self.udp_send_sequence, KIND_INPUT, message)
+                        self.telemetry.record_sent(len(message))
+                        continue
+                    batch.append(message)
+                else:
+                    msg_type = message.get('type', 'unknown')
+                    logger.debug("📤 CLIENT: Sending message type '%s' - queue size now: %d", msg_type, len(self.outgoing_queue))
+                    if msg_type == 'transfer_chunk':
+                        transfer_logger.debug("📤 CLIENT: Sending chunk at %d of transfer %s",
+                                              message.get('offset', 0), message.get('transfer_id', '?')[:8])
+                    batch.append(pickle.dumps(message, protocol=4))
+
+                batch_bytes += len(batch[-1])
+                self.telemetry.record_sent(HEADER_SIZE + len(batch[-1]), batch_bytes)
+                if batch_bytes >= SEND_BATCH_BYTES:
+                    self._send_frames(batch)
+                    batch, batch_bytes = [], 0
+
+            if batch:
+                self._send_frames(batch)
+                logger.debug("[success] CLIENT: Successfully sent %d messages (%d bytes)", len(batch), batch_bytes)
+        except Exception as e:
+            msg_type = message.get('type', 'unknown') if isinstance(message, dict) else 'input_frame'
+            logger.error("[error] CLIENT: Send error for message type '%s': %s", msg_type, e)
+            self.disconnect()
+
+    def _handle_file_manifest(self, manifest: dict):
+        """Compare the server manifest with the blob cache and request only missing blobs."""
+        self.pending_manifest = manifest
+        missing = missing_blobs(manifest, self.blob_cache, self.sync_root)
+        if not missing:
+            self._finish_file_sync()
+            return
+
+        self.pending_blob_hashes = set(missing)
+        transfer_logger.info("📦 File sync: requesting %d of %d blobs", len(missing), len(manifest))
+        self.outgoing_queue.append({'type': 'request_blobs', 'hashes': missing})
+
+    def _handle_file_blobs(self, blobs: dict):
+        """Cache received blobs; once every pending blob arrived, apply the manifest."""
+        if self.pending_manifest is None:
+            return
+        store_blobs(blobs, self.blob_cache)
+        self.pending_blob_hashes = {digest for digest in self.pending_blob_hashes if not self.blob_cache.has(digest)}
+        if not self.pending_blob_hashes:
+            self._finish_file_sync()
+            return
+
+        # The server's files changed between manifest and blob request - start over (bounded)
+        self.pending_manifest = None
+        if self.manifest_retries < 3:
+            self.manifest_retries += 1
+            print(f"[warning] {len(self.pending_blob_hashes)} blobs unavailable, requesting a fresh manifest")
+            self.request_file_sync()
+        else:
+            print("[error] File sync failed: server could not provide all blobs")
+
+    def _finish_file_sync(self):
+        """Hand the completed manifest to the sync callback."""
+        manifest = self.pending_manifest
+        self.pending_manifest = None
+        self.pending_blob_hashes = set()
+        self.manifest_retries = 0
+        if self.on_file_sync_received:
+            self.on_file_sync_received(manifest)
 
     def _process_incoming_messages(self):
         """Process received messages."""
@@ -472,9 +664,17 @@ class NetworkClient:
         msg_type = message.get('type')
 
         # Debug: Log all received messages
-        print(f"📨 CLIENT MSG: Received message type '{msg_type}' from server")
-
-        if msg_type == 'file_sync':
+        logger.debug("📨 CLIENT MSG: Received message type '%s' from server", msg_type)
+
+        if msg_type == 'udp_offer':
+            if self.use_udp:
+                self._open_udp_channel(message['token'], (self.host, message['port']))
+        elif msg_type == 'file_manifest':
+            self._handle_file_manifest(message['manifest'])
+        elif msg_type == 'file_blobs':
+            self._handle_file_blobs(message['blobs'])
+        elif msg_type == 'file_sync':
+            # Full-source sync from servers that predate manifests
             if self.on_file_sync_received:
                 self.on_file_sync_received(message['files'])
         elif msg_type == 'name_rejected':
@@ -484,6 +684,13 @@ class NetworkClient:
                 self.on_name_rejected(reason)
             else:
                 self.disconnect()
+        elif msg_type == 'room_closed':
+            reason = message.get('reason', 'Room closed')
+            print(f"Room closed by server: {reason}")
+            if self.on_room_closed:
+                self.on_room_closed(reason)
+            else:
+                self.disconnect()
         elif msg_type == 'game_start':
             print("Received game_start notification - starting game!")
             if self.on_game_start:
@@ -494,8 +701,8 @@ class NetworkClient:
         elif msg_type == 'character_assignment':
             if self.on_character_assigned:
                 self.on_character_assigned(message)
-        elif msg_type == 'file_chunk':
-            self._handle_file_chunk(message)
+        elif msg_type in TRANSFER_MESSAGE_TYPES:
+            self.transfers.handle_message(SERVER_PEER, message)
         elif msg_type == 'file_complete':
             if self.on_file_received:
                 self.on_file_received(message['file_path'], message.get('success', True))
@@ -529,148 +736,98 @@ class NetworkClient:
             print(f"🔄 {msg}")
             if self.on_server_restarted:
                 self.on_server_restarted(msg)
+        elif msg_type == 'profiler_report':
+            if self.on_profiler_report:
+                self.on_profiler_report(message)
         elif msg_type == 'backup_transfer_success':
             backup_name = message.get('backup_name')
-            print(f"🎉 BACKUP ACK: Server confirmed backup '{backup_name}' received and extracted successfully!")
+            transfer_logger.info("🎉 BACKUP ACK: Server confirmed backup '%s' received and extracted successfully!", backup_name)
         elif msg_type == 'backup_transfer_failed':
             backup_name = message.get('backup_name')
             error = message.get('error', 'Unknown error')
-            print(f"💥 BACKUP ACK: Server reported backup '{backup_name}' transfer/extraction failed: {error}")
+            transfer_logger.error("💥 BACKUP ACK: Server reported backup '%s' transfer/extraction failed: %s", backup_name, error)
         elif msg_type == 'request_backup':
             backup_name = message.get('backup_name')
-            print(f"🔄 BACKUP REQUEST: Client received backup request for '{backup_name}'")
+            transfer_logger.info("🔄 BACKUP REQUEST: Client received backup request for '%s'", backup_name)
             if backup_name:
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] 📤 BACKUP REQUEST: Client calling _send_backup_to_server for '{backup_name}'")
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] 🔍 DEBUG CLIENT: About to call _send_backup_to_server")
-                self._send_backup_to_server(backup_name)
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] 🔍 DEBUG CLIENT: _send_backup_to_server completed")
+                self._send_backup_to_server(backup_name, message.get('basis'), message.get('basis_name'))
+                transfer_logger.debug("🔍 CLIENT: _send_backup_to_server completed for '%s'", backup_name)
             else:
-                print(f"[error] BACKUP REQUEST: Invalid backup request - no backup_name provided")
+                transfer_logger.error("[error] BACKUP REQUEST: Invalid backup request - no backup_name provided")
 
-    def _send_backup_to_server(self, backup_name: str):
-        """Send a backup folder to the server."""
+    def _send_backup_to_server(self, backup_name: str, basis: Optional[dict] = None, basis_name: Optional[str] = None):
+        """
+        Send a backup folder to the server.
+        If the server sent a basis (digests and block signatures of its closest backup),
+        only a delta against it is sent; otherwise the whole backup as a tar.gz.
+        """
         try:
-            import os
-            cwd = os.getcwd()
-            print(f"📍 BACKUP SEND: Current working directory: {cwd}")
-
-            backup_path = f"__game_backups/{backup_name}"
+            backup_path = os.path.join(self.backups_root, backup_name)
             abs_backup_path = os.path.abspath(backup_path)
-            print(f"📍 BACKUP SEND: Looking for backup at: {abs_backup_path}")
+            transfer_logger.debug("📍 BACKUP SEND: Looking for backup at: %s", abs_backup_path)
 
             if not os.path.exists(backup_path):
-                print(f"[error] BACKUP SEND: Backup {backup_name} not found locally at {backup_path}")
-                print(f"[error] BACKUP SEND: Absolute path: {abs_backup_path}")
+                transfer_logger.error("[error] BACKUP SEND: Backup %s not found locally at %s", backup_name, abs_backup_path)
                 # List contents of __game_backups if it exists
-                game_backups_dir = "__game_backups"
+                game_backups_dir = self.backups_root
                 if os.path.exists(game_backups_dir):
-                    contents = os.listdir(game_backups_dir)
-                    print(f"[error] BACKUP SEND: Contents of __game_backups: {contents}")
+                    transfer_logger.error("[error] BACKUP SEND: Contents of __game_backups: %s", os.listdir(game_backups_dir))
                 else:
-                    print(f"[error] BACKUP SEND: __game_backups directory does not exist")
+                    transfer_logger.error("[error] BACKUP SEND: __game_backups directory does not exist")
                 return
 
-            print(f"[success] BACKUP SEND: Found backup '{backup_name}' at {backup_path}")
-            print(f"📤 BACKUP SEND: Starting to send backup '{backup_name}' from {backup_path}")
+            transfer_logger.info("📤 BACKUP SEND: Starting to send backup '%s' from %s", backup_name, backup_path)
 
-            # Create a temporary compressed archive
             import tempfile
-            import tarfile
-            import gzip
-
-            with tempfile.NamedTemporaryFile(suffix='.tar.gz', delete=False) as temp_file:
-                temp_path = temp_file.name
-
-            # Create compressed tar archive
-            with tarfile.open(temp_path, 'w:gz') as tar:
-                tar.add(backup_path, arcname=backup_name)
 
-            # Calculate total chunks BEFORE sending any chunks
-            chunk_size = 64 * 1024  # 64KB chunks
-            file_size = os.path.getsize(temp_path)
-            total_chunks = (file_size + chunk_size - 1) // chunk_size
-
-            print(f"📦 BACKUP SEND: Compressed '{backup_name}' to {file_size} bytes, will send in {total_chunks} chunks")
+            if basis is not None and basis_name:
+                # Only what differs from the server's closest backup
+                delta = build_delta(backup_path, basis)
+                with tempfile.NamedTemporaryFile(suffix='.delta', delete=False) as temp_file:
+                    pickle.dump(delta, temp_file, protocol=4)
+                    temp_path = temp_file.name
+                changed, literal = delta_stats(delta)
+                transfer_logger.info("📦 BACKUP SEND: Delta of '%s' against '%s': %d changed files, %d new bytes, %d bytes total",
+                                     backup_name, basis_name, changed, literal, os.path.getsize(temp_path))
+                kind, meta = 'backup_delta', {'basis_name': basis_name}
+            else:
+                # Create a temporary compressed archive
+                import tarfile
 
-            # Read and send in chunks
-            with open(temp_path, 'rb') as f:
-                for chunk_num in range(total_chunks):
-                    chunk_data = f.read(chunk_size)
+                with tempfile.NamedTemporaryFile(suffix='.tar.gz', delete=False) as temp_file:
+                    temp_path = temp_file.name
 
-                    chunk_message = {
-                        'type': 'file_chunk',
-                        'backup_name': backup_name,
-                        'chunk_num': chunk_num,
-                        'total_chunks': total_chunks,  # Now included in EVERY chunk
-                        'data': chunk_data,
-                        'is_backup': True
-                    }
+                # Create compressed tar archive
+                with tarfile.open(temp_path, 'w:gz') as tar:
+                    tar.add(backup_path, arcname=backup_name)
 
-                    self.outgoing_queue.append(chunk_message)
-                    progress = (chunk_num + 1) / total_chunks * 100
-                    timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                    print(f"[{timestamp}] 📤 BACKUP SEND: Queued chunk {chunk_num+1}/{total_chunks} ({progress:.1f}%) for '{backup_name}' - data size: {len(chunk_data)} bytes")
-                    timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                    print(f"[{timestamp}] 🔍 DEBUG CLIENT: Outgoing queue now has {len(self.outgoing_queue)} messages")
+                transfer_logger.info("📦 BACKUP SEND: Compressed '%s' to %d bytes, streaming to server", backup_name, os.path.getsize(temp_path))
+                kind, meta = 'backup', {}
 
-            print(f"[success] BACKUP SEND: Successfully queued all {total_chunks} chunks for backup '{backup_name}' to server")
+            # The archive is streamed from disk as the server acknowledges chunks; it is
+            # removed once the server confirmed it (kept across reconnects so the upload can resume)
+            def remove_archive(success, error):
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
 
-            # Clean up temp file
-            os.unlink(temp_path)
+            self.transfers.offer(SERVER_PEER, temp_path, kind, backup_name, meta, on_done=remove_archive)
 
         except Exception as e:
-            print(f"[error] BACKUP SEND: Failed to send backup {backup_name}: {e}")
-
-    def _handle_file_chunk(self, message: dict):
-        """Handle incoming file chunk."""
-        file_path = message['file_path']
-        chunk_num = message['chunk_num']
-        total_chunks = message['total_chunks']
-        chunk_data = message['data']
-
-        # Initialize file transfer if this is the first chunk
-        if file_path not in self.file_transfers:
-            self.file_transfers[file_path] = {
-                'chunks': {},
-                'total_chunks': total_chunks,
-                'received_chunks': 0,
-                'start_time': time.time()
-            }
-
-        transfer = self.file_transfers[file_path]
+            transfer_logger.error("[error] BACKUP SEND: Failed to send backup %s: %s", backup_name, e)
 
-        # Store the chunk
-        if chunk_num not in transfer['chunks']:
-            transfer['chunks'][chunk_num] = chunk_data
-            transfer['received_chunks'] += 1
-
-            # Call progress callback if available
-            if self.on_file_transfer_progress:
-                progress = transfer['received_chunks'] / total_chunks
-                self.on_file_transfer_progress(file_path, progress, 'receiving')
-
-        # Check if file is complete
-        if transfer['received_chunks'] == total_chunks:
-            self._assemble_file(file_path)
-
-    def _assemble_file(self, file_path: str):
-        """Assemble received chunks into a complete file."""
-        transfer = self.file_transfers[file_path]
+    def _on_transfer_progress(self, kind: str, name: str, fraction: float, direction: str):
+        """Forward ad-hoc file progress to the UI callback."""
+        if kind == 'file' and self.on_file_transfer_progress:
+            self.on_file_transfer_progress(name, fraction, direction)
 
+    def _receive_file(self, peer, part_path: str, file_path: str, meta: dict):
+        """Transfer handler for a file requested from the server: move it into place."""
         try:
             # Ensure directory exists
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-            # Write file by combining chunks in order
-            with open(file_path, 'wb') as f:
-                for chunk_num in range(transfer['total_chunks']):
-                    if chunk_num in transfer['chunks']:
-                        f.write(transfer['chunks'][chunk_num])
-                    else:
-                        raise ValueError(f"Missing chunk {chunk_num} for file {file_path}")
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            os.replace(part_path, file_path)
 
             # Send acknowledgment to server
             message = {
@@ -686,9 +843,10 @@ class NetworkClient:
                 self.on_file_received(file_path, True)
 
             print(f"File received successfully: {file_path}")
+            return True, ''
 
         except Exception as e:
-            print(f"Failed to assemble file {file_path}: {e}")
+            print(f"Failed to store file {file_path}: {e}")
 
             # Send failure acknowledgment
             message = {
@@ -703,11 +861,7 @@ class NetworkClient:
             # Call completion callback with failure
             if self.on_file_received:
                 self.on_file_received(file_path, False)
-
-        finally:
-            # Clean up transfer state
-            if file_path in self.file_transfers:
-                del self.file_transfers[file_path]
+            return False, str(e)
     
     def _handle_patch_file(self, message: dict):
         """Handle incoming patch file from server."""
@@ -816,6 +970,13 @@ class EntityManager:
         # Client-side prediction
         self.prediction = ClientPrediction()
 
+        # Cached static world layer: sky background + platforms that are not moving.
+        # Only the regions of platforms that moved (or stopped moving) are repainted.
+        self.background_color = (135, 206, 235)  # Sky blue
+        self.static_layer = None
+        self.baked_platforms: Dict[str, tuple] = {}  # network_id -> render key baked into the layer
+        self.moving_platforms = set()  # network_ids of platforms that moved this tick
+
     def set_local_player(self, player_id: str):
         """Set which player entity is controlled locally."""
         self.local_player_id = player_id
@@ -1012,10 +1173,18 @@ class EntityManager:
             platform.rect.x = int(platform.float_x)
             platform.rect.y = int(platform.float_y)
 
+        # Platforms that moved or are being pulled are drawn every frame instead of cached
+        moved = getattr(platform, 'float_x', 0) != old_x or getattr(platform, 'float_y', 0) != old_y
+        if moved or getattr(platform, 'being_pulled', False):
+            self.moving_platforms.add(network_id)
+        else:
+            self.moving_platforms.discard(network_id)
+
     def _remove_platform(self, network_id: str):
         """Remove a platform that no longer exists."""
         if network_id in self.platforms:
             del self.platforms[network_id]
+        self.moving_platforms.discard(network_id)
 
 
     def get_entities_by_type(self, entity_type: type) -> List[Any]:
@@ -1026,17 +1195,92 @@ class EntityManager:
         """Get a specific entity by network ID."""
         return self.entities.get(network_id)
         
+    def migrate_to_reloaded_classes(self) -> bool:
+        """
+        Keep the ghost entities across reload_game_code(): rebind them to the reloaded classes
+        (BASE_migration). Falls back to clear() when the new classes do not fit; returns True if kept.
+        """
+        from BASE_files.BASE_migration import migrate_objects
+        report = migrate_objects([self.entities, self.platforms])
+        print(f"🔁 ENTITY MIGRATION: {report.summary()}")
+        if not report.ok:
+            self.clear()
+            return False
+        self.invalidate_static_layer()  # Platforms may draw differently now
+        return True
+
     def clear(self):
         """Clear all entities and state."""
         self.entities.clear()
         self.platforms.clear()
         self.interpolation_buffers.clear()
+        self.invalidate_static_layer()
+
+    def invalidate_static_layer(self):
+        """Drop the cached static layer so it is fully rebuilt on the next draw."""
+        self.static_layer = None
+        self.baked_platforms.clear()
+        self.moving_platforms.clear()
+
+    @staticmethod
+    def _platform_render_key(platform) -> tuple:
+        """Everything about a platform that affects how it looks in the cached layer."""
+        rect = platform.rect
+        return (rect.x, rect.y, rect.width, rect.height,
+                tuple(getattr(platform, 'color', ())), getattr(platform, 'is_destroyed', False))
+
+    def _repaint_static_region(self, region, arena_height: float):
+        """Repaint one region of the static layer from the background and baked platforms."""
+        layer = self.static_layer
+        region = region.clip(layer.get_rect())
+        if region.width <= 0 or region.height <= 0:
+            return
+        layer.set_clip(region)
+        layer.fill(self.background_color, region)
+        for network_id in self.baked_platforms:
+            platform = self.platforms.get(network_id)
+            if platform is not None and hasattr(platform, 'draw') and platform.rect.colliderect(region):
+                platform.draw(layer, arena_height)
+        layer.set_clip(None)
+
+    def _update_static_layer(self, screen, arena_height: float):
+        """Bring the cached static layer up to date with the current platform snapshot."""
+        if self.static_layer is None or self.static_layer.get_size() != screen.get_size():
+            self.static_layer = pygame.Surface(screen.get_size(), 0, screen)
+            self.static_layer.fill(self.background_color)
+            self.baked_platforms.clear()
+
+        dirty = []
+
+        # Un-bake platforms that moved, changed appearance or disappeared
+        for network_id, baked_key in list(self.baked_platforms.items()):
+            platform = self.platforms.get(network_id)
+            if (platform is None or network_id in self.moving_platforms
+                    or self._platform_render_key(platform) != baked_key):
+                dirty.append(pygame.Rect(baked_key[:4]))
+                del self.baked_platforms[network_id]
+
+        # Bake platforms that are (again) motionless
+        for network_id, platform in self.platforms.items():
+            if network_id in self.moving_platforms or network_id in self.baked_platforms:
+                continue
+            key = self._platform_render_key(platform)
+            self.baked_platforms[network_id] = key
+            dirty.append(pygame.Rect(key[:4]))
+
+        # Platforms may draw a border around their rect, so repaint with a small margin
+        for region in dirty:
+            self._repaint_static_region(region.inflate(4, 4), arena_height)
 
     def draw_all(self, screen, arena_height: float):
-        """Draw all entities and platforms."""
-        # Draw platforms first (background)
-        for platform in self.platforms.values():
-            if hasattr(platform, 'draw'):
+        """Draw the cached static layer, then moving platforms and all entities."""
+        self._update_static_layer(screen, arena_height)
+        screen.blit(self.static_layer, (0, 0))
+
+        # Draw platforms that are currently moving on top of the cached layer
+        for network_id in self.moving_platforms:
+            platform = self.platforms.get(network_id)
+            if platform is not None and hasattr(platform, 'draw'):
                 platform.draw(screen, arena_height)
 
         # Draw entities (characters, projectiles, weapons)
@@ -1045,42 +1289,49 @@ class EntityManager:
                 entity.draw(screen, arena_height)
 
 
-def sync_game_files(files: dict):
+def sync_game_files(files: dict, blob_cache: Optional[BlobCache] = None, root: str = PROJECT_ROOT):
     """
     Synchronize game files received from server.
-    Overwrites local GameFolder files with server versions.
+
+    `files` is either a manifest {path: (sha256, size)} whose blobs are already in
+    `blob_cache`, or (older servers) {path: source text}. Only files whose content
+    differs from the local copy are written, so unchanged files keep their mtime
+    and bytecode cache.
     """
     try:
-        # Use main GameFolder at project root level, not BASE_files/GameFolder
-        game_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "GameFolder")
-
-        for filepath, content in files.items():
-            # Ensure the path is within GameFolder
-            if not filepath.startswith("GameFolder/"):
-                continue
-
-            full_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), filepath)
-            full_path = os.path.abspath(full_path)  # Normalize path
-
-            # Security check: ensure it's within the GameFolder
-            game_folder_abs = os.path.abspath(game_folder)
-            if not full_path.startswith(game_folder_abs):
-                continue
+        if all(isinstance(entry, tuple) for entry in files.values()):
+            written = apply_manifest(files, blob_cache or BlobCache(), root)
+        else:
+            written = []
+            for filepath, content in files.items():
+                # resolve_game_path rejects anything outside GameFolder
+                full_path = resolve_game_path(filepath, root)
+                if full_path is None:
+                    continue
 
-            # Create directory if needed
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                data = content.encode('utf-8')
+                try:
+                    with open(full_path, 'rb') as f:
+                        if f.read() == data:
+                            continue
+                except OSError:
+                    pass
 
-            # Write the file
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, 'wb') as f:
+                    f.write(data)
+                written.append(filepath)
 
+        for filepath in written:
             print(f"Synchronized file: {filepath}")
 
         # Reload modules to pick up changes
-        importlib.invalidate_caches()
+        if written:
+            importlib.invalidate_caches()
 
-        print("File synchronization complete")
+        print(f"File synchronization complete ({len(written)} of {len(files)} files changed)")
         return True
 
     except Exception as e:
+        print(f"[error] File synchronization failed: {e}")
         return False
@@ -10,6 +10,7 @@ from GameFolder.projectiles.BlackHoleProjectile import BlackHoleProjectile
 from GameFolder.projectiles.TornadoProjectile import TornadoProjectile
 from GameFolder.projectiles.OrbitalProjectiles import TargetingLaser, OrbitalStrikeMarker, OrbitalBlast
 from BASE_components.BASE_projectile import BaseProjectile
+from BASE_files.BASE_profiler import tick_profiler
 import pygame
 import random
 
@@ -109,7 +110,8 @@ class Arena(BaseArena):
         Custom collision logic for special projectiles.
         """
         # Handle out-of-bounds damage
-        self.handle_out_of_bounds_damage(delta_time)
+        with tick_profiler.phase('out_of_bounds'):
+            self.handle_out_of_bounds_damage(delta_time)
 
         # 1. Capture special projectiles BEFORE base collision logic removes inactive ones
         special_projs = [p for p in self.projectiles if isinstance(p, (
@@ -2,8 +2,14 @@ import pygame
 import math
 import random
 from GameFolder.projectiles.GAME_projectile import Projectile
+from BASE_components.BASE_effects import get_effect_sheet, size_bucket
 
 class BlackHoleProjectile(Projectile):
+    # Baked animation: the pulse (timer * 12) and the six alternating sparks (timer * 15)
+    # both repeat after 2*pi/3 seconds
+    EFFECT_CYCLE = 2 * math.pi / 3
+    EFFECT_FRAMES = 96
+
     def __init__(self, x, y, target_x, target_y, owner_id):
         super().__init__(x, y, [0, 0], speed=400.0, damage=0.5, owner_id=owner_id, width=60, height=60)
         self.pull_radius = 250
@@ -36,23 +42,42 @@ class BlackHoleProjectile(Projectile):
             if self.timer >= self.duration:
                 self.active = False
 
-    def draw(self, screen, arena_height):
-        if not self.active:
-            return
-
-        center_x = self.location[0]
-        center_y = arena_height - self.location[1]
-        pulse = math.sin(self.timer * 12) * 4
-        base_radius = (self.width / 2) + pulse
+    @staticmethod
+    def _draw_procedural(screen, center_x, center_y, width, timer):
+        """Draw the pulsing black hole and its orbiting sparks procedurally (used to bake the sprite sheet)."""
+        pulse = math.sin(timer * 12) * 4
+        base_radius = (width / 2) + pulse
 
         pygame.draw.circle(screen, (106, 13, 173), (int(center_x), int(center_y)), int(base_radius + 10))
         pygame.draw.circle(screen, (255, 0, 255), (int(center_x), int(center_y)), int(base_radius))
         pygame.draw.circle(screen, (0, 0, 0), (int(center_x), int(center_y)), int(base_radius - 5))
 
         for i in range(6):
-            angle = self.timer * 15 + (i * math.pi / 3)
+            angle = timer * 15 + (i * math.pi / 3)
             dist = base_radius * 0.8
             sx = center_x + math.cos(angle) * dist
             sy = center_y + math.sin(angle) * dist
             color = (147, 112, 219) if i % 2 == 0 else (75, 0, 130)
-            pygame.draw.circle(screen, color, (int(sx), int(sy)), 6)
\ No newline at end of file
+            pygame.draw.circle(screen, color, (int(sx), int(sy)), 6)
+
+    def get_effect_sheet(self):
+        """Sprite sheet with one full animation cycle, baked once per size bucket."""
+        width = size_bucket(self.width)
+        half_size = width // 2 + 16
+
+        def render_frame(frame, index):
+            timer = index / self.EFFECT_FRAMES * self.EFFECT_CYCLE
+            self._draw_procedural(frame, half_size, half_size, width, timer)
+
+        return get_effect_sheet(BlackHoleProjectile, (width,), (half_size * 2, half_size * 2),
+                                (half_size, half_size), self.EFFECT_FRAMES, render_frame)
+
+    def draw(self, screen, arena_height):
+        if not self.active:
+            return
+
+        center_x = self.location[0]
+        center_y = arena_height - self.location[1]
+
+        sheet = self.get_effect_sheet()
+        sheet.blit(screen, sheet.frame_index(self.timer / self.EFFECT_CYCLE), (center_x, center_y))
@@ -1,4 +1,5 @@
 from BASE_components.BASE_projectile import BaseProjectile
+from BASE_components.BASE_effects import get_effect_sheet, size_bucket
 import pygame
 import math
 import random
@@ -21,6 +22,10 @@ class Projectile(BaseProjectile):
         pygame.draw.ellipse(screen, self.color, py_rect)
 
 class StormCloud(Projectile):
+    # Pre-generated random variants replacing per-frame random rain and lightning
+    RAIN_VARIANTS = 8
+    LIGHTNING_VARIANTS = 4
+
     def __init__(self, x, y, target_pos, owner_id):
         # Initialize with dummy direction, speed 5, damage 0.2
         super().__init__(x, y, [0, 0], 5, 0.2, owner_id, 80, 40)
@@ -52,6 +57,49 @@ class StormCloud(Projectile):
             if self.rain_timer >= self.rain_duration:
                 self.active = False
 
+    @staticmethod
+    def _draw_rain(surface, left, top, width, length, rng):
+        """Draw one procedural rain variant (10 drops from the cloud to the ground)."""
+        for _ in range(10):
+            rx = rng.randint(int(left), int(left + width))
+            pygame.draw.line(surface, (0, 0, 255), (rx, top), (rx, top + length), 1)
+
+    @staticmethod
+    def _draw_lightning(surface, start_x, top, length, rng):
+        """Draw one procedural lightning bolt from the cloud to the ground."""
+        points = [(start_x, top)]
+        curr_y = top
+        curr_x = start_x
+        while curr_y < top + length:
+            curr_y += 20
+            curr_x += rng.randint(-15, 15)
+            points.append((curr_x, min(curr_y, top + length)))
+        if len(points) > 1:
+            pygame.draw.lines(surface, (255, 255, 255), False, points, 2)
+
+    def get_rain_sheet(self):
+        """Pre-generated rain variants, baked once per (width, fall length) bucket."""
+        width = size_bucket(self.width)
+        length = size_bucket(max(0, self.location[1]), 100)
+
+        def render_frame(frame, index):
+            self._draw_rain(frame, 0, 0, width, length, random.Random(index))
+
+        return get_effect_sheet(StormCloud, ('rain', width, length), (width + 1, length + 1), (0, 0),
+                                self.RAIN_VARIANTS, render_frame)
+
+    def get_lightning_sheet(self):
+        """Pre-generated lightning variants, baked once per fall length bucket."""
+        length = size_bucket(max(0, self.location[1]), 100)
+        # A bolt drifts at most 15px per 20px step
+        margin = 15 * (length // 20 + 1) + 2
+
+        def render_frame(frame, index):
+            self._draw_lightning(frame, margin, 0, length, random.Random(1000 + index))
+
+        return get_effect_sheet(StormCloud, ('lightning', length), (margin * 2, length + 2), (margin, 0),
+                                self.LIGHTNING_VARIANTS, render_frame)
+
     def draw(self, screen, arena_height):
         if not self.active:
             return
@@ -62,22 +110,15 @@ class StormCloud(Projectile):
         pygame.draw.ellipse(screen, (100, 100, 100), py_rect)
         
         if self.is_raining:
-            for _ in range(10):
-                rx = random.randint(int(self.location[0]), int(self.location[0] + self.width))
-                ry_start = arena_height - self.location[1]
-                ry_end = arena_height
-                pygame.draw.line(screen, (0, 0, 255), (rx, ry_start), (rx, ry_end), 1)
+            ry_start = arena_height - self.location[1]
+            fall_length = max(0, int(self.location[1]) + 1)
+            rain = self.get_rain_sheet()
+            rain.blit(screen, random.randrange(rain.frame_count), (self.location[0], ry_start),
+                      pygame.Rect(0, 0, rain.frames[0].get_width(), fall_length))
             
             if random.random() < 0.05:
                 pygame.draw.ellipse(screen, (255, 255, 255), py_rect)
+                lightning = self.get_lightning_sheet()
                 lx = self.location[0] + self.width // 2
-                ly = arena_height - self.location[1]
-                points = [(lx, ly)]
-                curr_y = ly
-                curr_x = lx
-                while curr_y < arena_height:
-                    curr_y += 20
-                    curr_x += random.randint(-15, 15)
-                    points.append((curr_x, min(curr_y, arena_height)))
-                if len(points) > 1:
-                    pygame.draw.lines(screen, (255, 255, 255), False, points, 2)
\ No newline at end of file
+                lightning.blit(screen, random.randrange(lightning.frame_count), (lx, ry_start),
+                               pygame.Rect(0, 0, lightning.frames[0].get_width(), fall_length + 1))
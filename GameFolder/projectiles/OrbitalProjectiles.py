@@ -1,4 +1,5 @@
 from GameFolder.projectiles.GAME_projectile import Projectile
+from BASE_components.BASE_effects import get_effect_sheet
 import pygame
 import math
 import random
@@ -75,18 +76,37 @@ class OrbitalStrikeMarker(Projectile):
         # Draw pulsing red circle
         pygame.draw.circle(screen, (255, 0, 0), (int(center_x), int(center_y)), int(radius), 3)
         
-        # Draw faint red vertical line to the top of the screen
+        # Draw faint red vertical line to the top of the screen (baked once per height bucket)
+        column = self.get_column_sheet(arena_height)
+        column.blit(screen, 0, (center_x, 0))
+
+    @staticmethod
+    def _draw_column(surface, center_x, column_height):
+        """Draw the translucent targeting column procedurally (used to bake the sprite sheet)."""
         # Use a Surface with alpha for transparency
         # Glow line (thicker, lower alpha)
-        glow_surface = pygame.Surface((4, arena_height), pygame.SRCALPHA)
+        glow_surface = pygame.Surface((4, column_height), pygame.SRCALPHA)
         glow_surface.fill((255, 0, 0, 50))
-        screen.blit(glow_surface, (int(center_x) - 2, 0))
+        surface.blit(glow_surface, (int(center_x) - 2, 0))
 
-        line_surface = pygame.Surface((2, arena_height), pygame.SRCALPHA)
+        line_surface = pygame.Surface((2, column_height), pygame.SRCALPHA)
         line_surface.fill((255, 0, 0, 180)) # More visible red
-        screen.blit(line_surface, (int(center_x) - 1, 0))
+        surface.blit(line_surface, (int(center_x) - 1, 0))
+
+    def get_column_sheet(self, arena_height):
+        """Single-frame sheet holding the targeting column for this arena height."""
+        column_height = int(arena_height)
+
+        def render_frame(frame, index):
+            self._draw_column(frame, 2, column_height)
+
+        return get_effect_sheet(OrbitalStrikeMarker, (column_height,), (4, column_height), (2, 0), 1,
+                                render_frame, use_alpha=True)
 
 class OrbitalBlast(Projectile):
+    # Pre-generated random flicker variants replacing per-frame random alpha
+    FLICKER_VARIANTS = 8
+
     def __init__(self, x, owner_id):
         # location [x, 0], speed 0, damage 100 per sec, width 100, height 2000
         super().__init__(x, 0, [0, 1], speed=0, damage=800, owner_id=owner_id, width=100, height=2000)
@@ -100,12 +120,9 @@ class OrbitalBlast(Projectile):
         if self.timer >= self.duration:
             self.active = False
 
-    def draw(self, screen, arena_height):
-        if not self.active:
-            return
-
-        center_x = self.location[0]
-        
+    @staticmethod
+    def _draw_beam(surface, center_x, beam_height, rng):
+        """Draw one flicker variant of the beam procedurally (used to bake the sprite sheet)."""
         # Massive white/light-blue beam spanning the entire screen height
         # Glow effect with multiple rectangles
         widths = [100, 80, 40, 20]
@@ -118,8 +135,25 @@ class OrbitalBlast(Projectile):
             color = colors[i]
             
             # Flicker effect: modulate alpha
-            flicker_alpha = max(0, min(255, alpha + random.randint(-50, 50)))
+            flicker_alpha = max(0, min(255, alpha + rng.randint(-50, 50)))
 
-            beam_surface = pygame.Surface((w, arena_height), pygame.SRCALPHA)
+            beam_surface = pygame.Surface((w, beam_height), pygame.SRCALPHA)
             beam_surface.fill((*color, flicker_alpha))
-            screen.blit(beam_surface, (int(center_x - w/2), 0))
\ No newline at end of file
+            surface.blit(beam_surface, (int(center_x - w/2), 0))
+
+    def get_effect_sheet(self, arena_height):
+        """Pre-generated flicker variants of the beam, baked once per arena height."""
+        beam_height = int(arena_height)
+
+        def render_frame(frame, index):
+            self._draw_beam(frame, 50, beam_height, random.Random(index))
+
+        return get_effect_sheet(OrbitalBlast, (beam_height,), (100, beam_height), (50, 0),
+                                self.FLICKER_VARIANTS, render_frame, use_alpha=True)
+
+    def draw(self, screen, arena_height):
+        if not self.active:
+            return
+
+        sheet = self.get_effect_sheet(arena_height)
+        sheet.blit(screen, random.randrange(sheet.frame_count), (self.location[0], 0))
@@ -2,8 +2,13 @@ import pygame
 import math
 import random
 from GameFolder.projectiles.GAME_projectile import Projectile
+from BASE_components.BASE_effects import get_effect_sheet, size_bucket
 
 class TornadoProjectile(Projectile):
+    # Baked animation: every rotation_angle term in _draw_procedural repeats after 4*pi
+    EFFECT_CYCLE = 4 * math.pi
+    EFFECT_FRAMES = 24
+
     def __init__(self, x, y, direction, damage, owner_id):
         # Tornado is large and moves relatively slowly but consistently
         super().__init__(x, y, direction, speed=3.0, damage=damage, owner_id=owner_id, width=500, height=400)
@@ -13,58 +18,83 @@ class TornadoProjectile(Projectile):
         self.duration = 6.0
         self.timer = 0.0
         self.rotation_angle = 0.0
-        # Debris particles for visual effect: (h_ratio, angle, speed, size)
-        self.particles = []
-        for _ in range(40):
-            self.particles.append({
-                'h_ratio': random.random(),
-                'angle': random.uniform(0, math.pi * 2),
-                'speed': random.uniform(2, 5),
-                'size': random.randint(2, 5)
-            })
 
     def update(self, delta_time):
         super().update(delta_time)
         self.timer += delta_time
         if self.timer >= self.duration:
             self.active = False
-        
+
         self.rotation_angle += 15.0 * delta_time
         if self.location[1] < 0:
             self.location[1] = 0
 
-    def draw(self, surface, arena_height):
-        center_x = self.location[0]
-        center_y = arena_height - self.location[1]
-        
+    @staticmethod
+    def _generate_particles(seed):
+        """Debris particles for visual effect: (h_ratio, angle, speed, size).
+        Speeds are 2.5 or 5.0 so every particle loops exactly once per EFFECT_CYCLE."""
+        rng = random.Random(seed)
+        return [{
+            'h_ratio': rng.random(),
+            'angle': rng.uniform(0, math.pi * 2),
+            'speed': rng.choice([2.5, 5.0]),
+            'size': rng.randint(2, 5)
+        } for _ in range(40)]
+
+    @staticmethod
+    def _draw_procedural(surface, center_x, center_y, pull_radius, height, rotation_angle, particles):
+        """Draw the swirling funnel and debris procedurally (used to bake the sprite sheet)."""
         num_segments = 20
         for i in range(num_segments):
             h_ratio = i / num_segments
-            seg_y = center_y - (h_ratio * self.height)
-            seg_width = 2 * self.pull_radius * (0.3 + 0.7 * h_ratio)
-            # Swaying intensity: math.sin(self.rotation_angle * 1.5 + h_ratio * 5.0) * 20
-            sway = math.sin(self.rotation_angle * 1.5 + h_ratio * 5.0) * 20
-            
+            seg_y = center_y - (h_ratio * height)
+            seg_width = 2 * pull_radius * (0.3 + 0.7 * h_ratio)
+            # Swaying intensity: math.sin(rotation_angle * 1.5 + h_ratio * 5.0) * 20
+            sway = math.sin(rotation_angle * 1.5 + h_ratio * 5.0) * 20
+
             # Swirling color palette: light gray and blue-ish gray
-            color_shift = math.sin(self.rotation_angle + h_ratio * 10) * 20
+            color_shift = math.sin(rotation_angle + h_ratio * 10) * 20
             color = (max(0, min(255, 180 + color_shift)), max(0, min(255, 185 + color_shift)), max(0, min(255, 200 + color_shift)))
-            
+
             for offset in [0, math.pi]:
                 # Double-spiral effect
-                angle = self.rotation_angle * 3.0 + h_ratio * 4.0 + offset
+                angle = rotation_angle * 3.0 + h_ratio * 4.0 + offset
                 off_x = math.cos(angle) * (seg_width * 0.2)
                 rect = pygame.Rect(0, 0, seg_width, seg_width * 0.25)
                 rect.center = (center_x + sway + off_x, seg_y)
                 pygame.draw.ellipse(surface, color, rect, 2)
 
-        for p in self.particles:
+        for p in particles:
             h_ratio = p['h_ratio']
-            radius_at_h = self.pull_radius * (0.3 + 0.7 * h_ratio)
+            radius_at_h = pull_radius * (0.3 + 0.7 * h_ratio)
             orbit_r = radius_at_h * 0.8
-            angle = p['angle'] + self.rotation_angle * p['speed'] * 0.2
+            angle = p['angle'] + rotation_angle * p['speed'] * 0.2
             dx = math.cos(angle) * orbit_r
             dy = math.sin(angle) * (orbit_r * 0.2)
-            sway = math.sin(self.rotation_angle * 1.5 + h_ratio * 5.0) * 20
+            sway = math.sin(rotation_angle * 1.5 + h_ratio * 5.0) * 20
             p_x = center_x + sway + dx
-            p_y = (center_y - h_ratio * self.height) + dy
-            pygame.draw.circle(surface, (120, 120, 140), (int(p_x), int(p_y)), p['size'])
\ No newline at end of file
+            p_y = (center_y - h_ratio * height) + dy
+            pygame.draw.circle(surface, (120, 120, 140), (int(p_x), int(p_y)), p['size'])
+
+    def get_effect_sheet(self):
+        """Sprite sheet with one full animation cycle, baked once per size bucket."""
+        pull_radius = size_bucket(self.pull_radius)
+        height = size_bucket(self.height)
+        half_width = int(pull_radius * 1.4) + 30
+        top = int(height + pull_radius * 0.3) + 10
+        bottom = int(pull_radius * 0.25) + 10
+        particles = self._generate_particles(pull_radius * 10000 + height)
+
+        def render_frame(frame, index):
+            rotation_angle = index / self.EFFECT_FRAMES * self.EFFECT_CYCLE
+            self._draw_procedural(frame, half_width, top, pull_radius, height, rotation_angle, particles)
+
+        return get_effect_sheet(TornadoProjectile, (pull_radius, height), (half_width * 2, top + bottom),
+                                (half_width, top), self.EFFECT_FRAMES, render_frame)
+
+    def draw(self, surface, arena_height):
+        center_x = self.location[0]
+        center_y = arena_height - self.location[1]
+
+        sheet = self.get_effect_sheet()
+        sheet.blit(surface, sheet.frame_index(self.rotation_angle / self.EFFECT_CYCLE), (center_x, center_y))
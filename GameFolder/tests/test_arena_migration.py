@@ -0,0 +1,151 @@
+"""
+Tests for live arena migration across code reloads (BASE_files/BASE_migration.py).
+Applies a no-op patch (every GameFolder module reloaded, no source change)
+in the middle of a headless match and on a live server: every entity must
+keep its id and position and move to the reloaded classes. A class whose
+__init__ declares a new field must be refused so the caller rebuilds.
+Reloads swap GameFolder classes process-wide, so each test restores the
+modules it found.
+"""
+
+import importlib
+import shutil
+import sys
+import threading
+import time
+from BASE_components.BASE_test_helpers import free_port, restored_game_modules, temporary_directory
+from BASE_files.BASE_helpers import reload_game_code
+from BASE_files.BASE_migration import migrate_arena, migrate_objects
+from BASE_files.network_client import NetworkClient
+
+PLAYERS = ["Alpha", "Bravo", "Charlie", "Delta"]
+
+
+def _apply_no_op_patch():
+    """What reload_game_code() does after a patch: here every module counts as changed, none differs."""
+    for name, module in list(sys.modules.items()):
+        if name.startswith("GameFolder.") and module is not None:
+            module.__dict__.pop("__cc_source_hash__", None)
+    started = time.perf_counter()
+    assert reload_game_code() is not None
+    return time.perf_counter() - started
+
+
+def _snapshot(arena):
+    entities = (list(arena.characters) + list(arena.projectiles) + list(arena.weapon_pickups)
+                + list(arena.ammo_pickups) + list(arena.platforms))
+    position = lambda entity: entity.location if hasattr(entity, "location") else (entity.rect.x, entity.rect.y)
+    return sorted((type(entity).__name__, getattr(entity, "id", None) or entity.network_id,
+                   tuple(round(value, 6) for value in position(entity))) for entity in entities)
+
+
+def _play(arena, frames):
+    for frame in range(frames):
+        for index, character in enumerate(arena.characters):
+            character.process_input({'mouse_pos': [700, 400], 'movement': [1 if (frame // 20 + index) % 2 else -1, 0],
+                                      'shoot': frame % 10 == index}, arena)
+        arena._update_simulation(arena.tick_interval)
+
+
+def test_no_op_patch_mid_match_keeps_every_entity():
+    with restored_game_modules():
+        import GameFolder.setup
+        arena = GameFolder.setup.setup_battle_arena(width=1400, height=900, headless=True, player_names=PLAYERS)
+        for character, name in zip(arena.characters, PLAYERS):
+            character.id = name
+        _play(arena, 240)
+        before = _snapshot(arena)
+        old_character_class = type(arena.characters[0])
+
+        reload_seconds = _apply_no_op_patch()
+        report = migrate_arena(arena)
+
+        assert report.ok and report.rebound > 0
+        assert _snapshot(arena) == before, "No entity id or position may change"
+        new_character_class = sys.modules["GameFolder.characters.GAME_character"].Character
+        assert new_character_class is not old_character_class
+        assert all(type(character) is new_character_class for character in arena.characters)
+        assert all(cls.__module__ != "GameFolder.setup" or sys.modules[cls.__module__].__dict__.get(cls.__name__) is cls
+                   for cls in arena.projectile_type_map)
+        stale = [provider for provider in arena.lootpool.values()
+                 if isinstance(provider, type) and getattr(sys.modules[provider.__module__], provider.__name__) is not provider]
+        assert not stale, "Lootpool entries point at the reloaded classes"
+        _play(arena, 60)  # The match goes on with the new classes
+
+        rebuild_started = time.perf_counter()
+        GameFolder.setup.setup_battle_arena(width=1400, height=900, headless=True, player_names=PLAYERS)
+        rebuild_seconds = time.perf_counter() - rebuild_started
+        print(f"No-op patch: reload {reload_seconds * 1000:.1f} ms, migration {report.seconds * 1000:.2f} ms "
+              f"({report.rebound} objects, {report.references} references) vs arena rebuild {rebuild_seconds * 1000:.1f} ms")
+
+
+def test_new_declared_field_forces_a_rebuild():
+    with temporary_directory() as tmp_path, restored_game_modules():
+        path = tmp_path / "probe.py"
+        path.write_text("class Probe:\n    def __init__(self):\n        self.hp = 10\n")
+        spec = importlib.util.spec_from_file_location("GameFolder.migration_probe", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        probe = module.Probe()
+        old_class = type(probe)
+
+        path.write_text("class Probe:\n    def __init__(self):\n        self.hp = 10\n        self.shield = 5\n")
+        spec.loader.exec_module(module)
+        report = migrate_objects([[probe]])
+        assert not report.ok and "shield" in report.incompatible[0]
+        assert type(probe) is old_class, "Nothing changes when a rebuild is needed"
+
+        path.write_text("class Probe:\n    shield = 0\n    def __init__(self):\n        self.hp = 10\n        self.shield = 5\n")
+        spec.loader.exec_module(module)
+        report = migrate_objects([[probe]])
+        assert report.ok and type(probe) is module.Probe, "A class default makes the new field compatible"
+
+
+def test_live_server_keeps_the_match_across_a_reload():
+    with restored_game_modules():
+        from server import GameServer
+
+        port = free_port()
+        server = GameServer('127.0.0.1', port, practice_mode=True)
+        client = NetworkClient('127.0.0.1', port)
+        try:
+            threading.Thread(target=server.start, daemon=True).start()
+            client.on_file_sync_received = lambda manifest: client.acknowledge_file_sync()
+            assert client.connect("Migrated")
+            client.request_file_sync()
+
+            def play(seconds):
+                start = time.time()
+                while time.time() - start < seconds:
+                    client.send_input({'mouse_pos': [100, 200], 'movement': [1, 0]})
+                    client.update()
+                    time.sleep(1 / 60)
+
+            play(1.5)
+            arena = server.arena
+            assert arena is not None
+            ids_before = sorted(character.id for character in arena.characters)
+            network_ids_before = sorted(character.network_id for character in arena.characters)
+            states_before = client.get_telemetry()['state_count']
+
+            for name, module in list(sys.modules.items()):
+                if name.startswith("GameFolder.") and module is not None:
+                    module.__dict__.pop("__cc_source_hash__", None)
+            started = time.perf_counter()
+            server._reload_game_code_live()
+            pause = time.perf_counter() - started
+            play(1.0)
+            states_after = client.get_telemetry()['state_count']
+            kept_arena = server.arena
+        finally:
+            client.disconnect()
+            server.stop()
+            shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+
+        print(f"Live reload paused the match for {pause * 1000:.1f} ms; arena kept: {kept_arena is arena}")
+        assert kept_arena is arena, "The running arena survives the reload"
+        assert sorted(character.id for character in arena.characters) == ids_before
+        assert sorted(character.network_id for character in arena.characters) == network_ids_before
+        assert type(arena.characters[0]) is sys.modules["GameFolder.characters.GAME_character"].Character
+        assert states_after > states_before, "Clients keep receiving state"
@@ -0,0 +1,84 @@
+"""
+Tests for pre-baked projectile effect animations (BASE_components/BASE_effects.py).
+Checks that sheets are shared per class and size bucket, that every baked effect
+draws, and compares 20 tornadoes drawn procedurally against the baked sheets.
+"""
+
+import math
+import time
+import pygame
+from BASE_components.BASE_effects import clear_effect_cache, _sheet_cache
+from GameFolder.projectiles.TornadoProjectile import TornadoProjectile
+from GameFolder.projectiles.BlackHoleProjectile import BlackHoleProjectile
+from GameFolder.projectiles.GAME_projectile import StormCloud
+from GameFolder.projectiles.OrbitalProjectiles import OrbitalBlast, OrbitalStrikeMarker
+
+ARENA_WIDTH = 1400
+ARENA_HEIGHT = 900
+BACKGROUND = (135, 206, 235)
+
+
+def test_effect_sheets_are_shared():
+    """Projectiles of the same class and size bucket reuse one baked sheet."""
+    clear_effect_cache()
+    first = TornadoProjectile(200, 100, [1, 0], 1.0, "Player1")
+    second = TornadoProjectile(900, 100, [-1, 0], 1.0, "Player2")
+    assert first.get_effect_sheet() is second.get_effect_sheet(), "Same-size tornadoes should share a sheet"
+    assert first.get_effect_sheet().frame_count == TornadoProjectile.EFFECT_FRAMES
+
+    second.pull_radius = 400
+    assert first.get_effect_sheet() is not second.get_effect_sheet(), "Different sizes need their own sheet"
+    assert len(_sheet_cache) == 2
+
+
+def test_baked_effects_draw():
+    """Every baked effect draws something onto the screen."""
+    clear_effect_cache()
+    storm = StormCloud(700, 500, (700, 500), "Player1")
+    storm.is_raining = True
+    projectiles = [
+        TornadoProjectile(300, 50, [1, 0], 1.0, "Player1"),
+        BlackHoleProjectile(700, 500, 700, 500, "Player1"),
+        storm,
+        OrbitalStrikeMarker(400, 100, "Player1"),
+        OrbitalBlast(1000, "Player1"),
+    ]
+    for projectile in projectiles:
+        screen = pygame.Surface((ARENA_WIDTH, ARENA_HEIGHT))
+        screen.fill(BACKGROUND)
+        blank = pygame.image.tostring(screen, 'RGB')
+        for _ in range(10):
+            projectile.update(1 / 60)
+            projectile.draw(screen, ARENA_HEIGHT)
+        assert pygame.image.tostring(screen, 'RGB') != blank, f"{type(projectile).__name__} drew nothing"
+
+
+def test_tornado_frame_time_benchmark():
+    """Compare drawing 20 tornadoes procedurally against the baked sprite sheets."""
+    clear_effect_cache()
+    tornadoes = [TornadoProjectile(70 * i + 50, 50, [1, 0], 1.0, "Player1") for i in range(20)]
+    particles = TornadoProjectile._generate_particles(0)
+    screen = pygame.Surface((ARENA_WIDTH, ARENA_HEIGHT))
+    frames = 30
+
+    start = time.perf_counter()
+    for tornado in tornadoes:
+        tornado.get_effect_sheet()
+    bake_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        for tornado in tornadoes:
+            TornadoProjectile._draw_procedural(screen, tornado.location[0], ARENA_HEIGHT - tornado.location[1],
+                                               tornado.pull_radius, tornado.height, frame * 0.25, particles)
+    procedural_ms = (time.perf_counter() - start) * 1000 / frames
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        for tornado in tornadoes:
+            tornado.rotation_angle = (frame * 0.25) % (4 * math.pi)
+            tornado.draw(screen, ARENA_HEIGHT)
+    baked_ms = (time.perf_counter() - start) * 1000 / frames
+
+    print(f"20 tornadoes: procedural {procedural_ms:.2f} ms/frame, baked {baked_ms:.2f} ms/frame (bake {bake_ms:.1f} ms once)")
+    assert baked_ms < procedural_ms, f"Baked tornadoes slower than procedural: {baked_ms:.2f} vs {procedural_ms:.2f} ms"
@@ -0,0 +1,190 @@
+"""
+Tests for content-addressed GameFolder sync (BASE_files/BASE_file_sync.py).
+Simulates 8 clients joining through the manifest / request_blobs / file_blobs
+exchange and compares bytes on the wire and time to ready against the old
+full-source sync, for an unchanged tree and for a tree with one changed file.
+"""
+
+import os
+import pickle
+import shutil
+import time
+from types import SimpleNamespace
+from BASE_components.BASE_test_helpers import temporary_directory
+from BASE_files.BASE_file_sync import BlobCache, PROJECT_ROOT, build_manifest, apply_manifest
+from BASE_files.network_client import NetworkClient, sync_game_files
+
+CLIENT_COUNT = 8
+
+
+def _read_game_folder(root):
+    """{'GameFolder/...py': bytes} the way GameServer._load_game_files collects them."""
+    files = {}
+    for dirpath, _, filenames in os.walk(os.path.join(root, "GameFolder")):
+        for name in filenames:
+            if name.endswith('.py'):
+                path = os.path.join(dirpath, name)
+                with open(path, 'rb') as f:
+                    files[os.path.relpath(path, root).replace(os.sep, '/')] = f.read()
+    return files
+
+
+def _copy_game_folder(root):
+    shutil.copytree(os.path.join(PROJECT_ROOT, "GameFolder"), os.path.join(root, "GameFolder"),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+
+
+def _mtimes(root, files):
+    return {path: os.stat(os.path.join(root, path)).st_mtime_ns for path in files}
+
+
+class _Link:
+    """Loopback between the unbound GameServer sync methods and one NetworkClient."""
+
+    def __init__(self, server, client):
+        self.server = server
+        self.client = client
+        self.bytes_down = 0
+        self.bytes_up = 0
+
+    def deliver(self, payload):
+        self.bytes_down += 4 + len(payload)
+        self.client._handle_message(pickle.loads(payload))
+
+    def pump_client(self):
+        from server import GameServer
+        while self.client.outgoing_queue:
+            message = self.client.outgoing_queue.popleft()
+            self.bytes_up += 4 + len(pickle.dumps(message))
+            if message['type'] == 'request_file_sync':
+                GameServer._send_file_sync(self.server, self.client.player_id)
+            elif message['type'] == 'request_blobs':
+                GameServer._send_file_blobs(self.server, self.client.player_id, message['hashes'])
+
+
+def _join_clients(server_files, client_roots):
+    """Run the sync handshake for every client; returns [(bytes on the wire, seconds to ready)] per client."""
+    from server import GameServer  # Import outside the timed section
+    manifest, blobs = build_manifest(server_files)
+    links = {}
+    server = SimpleNamespace(game_manifest=manifest, game_blobs=blobs, clients={})
+    server._send_frame = lambda sock, payload: links[sock].deliver(payload)
+
+    results = []
+    for index, root in enumerate(client_roots):
+        client = NetworkClient()
+        client.connected = True
+        client.player_id = f"Player{index}"
+        client.sync_root = root
+        client.blob_cache = BlobCache(os.path.join(root, "__blob_cache"))
+        written = []
+        client.on_file_sync_received = lambda files, c=client, w=written: w.extend(
+            [sync_game_files(files, c.blob_cache, c.sync_root)])
+        server.clients[client.player_id] = client.player_id
+        links[client.player_id] = link = _Link(server, client)
+
+        start = time.perf_counter()
+        client.request_file_sync()
+        link.pump_client()
+        elapsed = time.perf_counter() - start
+        assert written == [True], f"{client.player_id} never finished file sync"
+        results.append((link.bytes_down + link.bytes_up, elapsed))
+    return results
+
+
+def _legacy_join(server_files, client_roots):
+    """Old behaviour: full source in one message, every file rewritten."""
+    text_files = {path: data.decode('utf-8') for path, data in server_files.items()}
+    results = []
+    for root in client_roots:
+        start = time.perf_counter()
+        data = pickle.dumps({'type': 'file_sync', 'files': text_files})
+        message = pickle.loads(data)
+        for path, content in message['files'].items():
+            with open(os.path.join(root, path), 'w', encoding='utf-8') as f:
+                f.write(content)
+        results.append((4 + len(data), time.perf_counter() - start))
+    return results
+
+
+def _report(label, results):
+    total_bytes = sum(size for size, _ in results)
+    mean_ms = sum(elapsed for _, elapsed in results) / len(results) * 1000
+    print(f"{label}: {total_bytes} bytes for {len(results)} clients, {mean_ms:.2f} ms mean time to ready")
+    return total_bytes
+
+
+def test_unchanged_tree_transfers_no_blobs_and_keeps_mtimes():
+    """Clients that already hold the tree only receive the manifest and write nothing."""
+    with temporary_directory() as tmp_path:
+        roots = [str(tmp_path / f"client{i}") for i in range(CLIENT_COUNT)]
+        for root in roots:
+            _copy_game_folder(root)
+        server_files = _read_game_folder(PROJECT_ROOT)
+        before = [_mtimes(root, server_files) for root in roots]
+
+        new_bytes = _report("Manifest sync (unchanged tree)", _join_clients(server_files, roots))
+        assert [_mtimes(root, server_files) for root in roots] == before, "Unchanged files must not be rewritten"
+
+        # Rejoining is just as cheap
+        warm_bytes = _report("Manifest sync (unchanged tree, rejoin)", _join_clients(server_files, roots))
+        old_bytes = _report("Full-source sync (unchanged tree)", _legacy_join(server_files, roots))
+        assert new_bytes < old_bytes / 3, "Manifest sync should be far smaller than shipping every file"
+        assert warm_bytes <= new_bytes
+
+
+def test_one_changed_file_transfers_one_blob():
+    """Only the changed file's blob crosses the wire and only that file is rewritten."""
+    with temporary_directory() as tmp_path:
+        roots = [str(tmp_path / f"client{i}") for i in range(CLIENT_COUNT)]
+        for root in roots:
+            _copy_game_folder(root)
+        server_files = _read_game_folder(PROJECT_ROOT)
+        changed_path = "GameFolder/setup.py"
+        server_files[changed_path] += b"\n# balance tweak\n"
+        before = [_mtimes(root, server_files) for root in roots]
+
+        results = _join_clients(server_files, roots)
+        new_bytes = _report("Manifest sync (one file changed)", results)
+        for root, old_mtimes in zip(roots, before):
+            now = _mtimes(root, server_files)
+            changed = {path for path in server_files if now[path] != old_mtimes[path]}
+            assert changed == {changed_path}
+            with open(os.path.join(root, changed_path), 'rb') as f:
+                assert f.read() == server_files[changed_path]
+
+        old_bytes = _report("Full-source sync (one file changed)", _legacy_join(server_files, roots))
+        changed_size = len(server_files[changed_path])
+        assert new_bytes < old_bytes / 2
+        assert new_bytes < CLIENT_COUNT * (changed_size + 8192), "Only the changed blob should be downloaded"
+
+
+def test_corrupt_blob_and_missing_cache_entry():
+    """Blobs that do not match their digest are rejected; apply refuses to write without the blob."""
+    with temporary_directory() as tmp_path:
+        cache = BlobCache(str(tmp_path / "cache"))
+        manifest, blobs = build_manifest({"GameFolder/a.py": b"x = 1\n"})
+        digest = manifest["GameFolder/a.py"][0]
+
+        client = NetworkClient()
+        client.connected = True
+        client.blob_cache = cache
+        client.sync_root = str(tmp_path)
+        client.pending_manifest = manifest
+        client.pending_blob_hashes = {digest}
+        client._handle_file_blobs({digest: b"x = 2\n"})
+        assert not cache.has(digest)
+        assert client.outgoing_queue and client.outgoing_queue[0]['type'] == 'request_file_sync'
+
+        try:
+            apply_manifest(manifest, cache, str(tmp_path))
+            assert False, "apply_manifest should fail without the blob"
+        except KeyError:
+            pass
+        assert not os.path.exists(tmp_path / "GameFolder" / "a.py")
+
+        # Paths outside GameFolder are ignored
+        cache.put(b"evil")
+        escape, _ = build_manifest({"GameFolder/../escape.py": b"evil"})
+        assert apply_manifest(escape, cache, str(tmp_path)) == []
+        assert not os.path.exists(tmp_path / "escape.py")
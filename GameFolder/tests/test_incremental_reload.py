@@ -0,0 +1,118 @@
+"""
+Tests for the incremental game code reload (BASE_files/BASE_reload.py).
+Builds a small package in a temp directory (setup -> arena -> character ->
+util, plus an unrelated weapon) and checks that only changed modules and
+their importers reload, dependencies first, that an unchanged tree is not
+reloaded at all, and that new files get imported. Then times a full, an
+unchanged and a one-file reload of the real GameFolder in a subprocess.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from BASE_components.BASE_test_helpers import temporary_directory
+from BASE_files.BASE_reload import last_report, parse_imports, reload_package, topological_order, scan_package
+
+PACKAGE = "cc_reload_demo"
+FILES = {
+    "util.py": "SPEED = 1\n",
+    "characters/character.py": "from cc_reload_demo.util import SPEED\nclass Character:\n    speed = SPEED\n",
+    "arenas/arena.py": "from cc_reload_demo.characters.character import Character\nclass Arena:\n    pass\n",
+    "weapons/pistol.py": "class Pistol:\n    damage = 5\n",
+    "setup.py": ("from cc_reload_demo.arenas.arena import Arena\n"
+                 "from cc_reload_demo.characters.character import Character\n"
+                 "from cc_reload_demo.weapons.pistol import Pistol\n"),
+}
+
+
+def _write(root, rel_path, text):
+    path = os.path.join(root, PACKAGE, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_parse_imports_resolves_relative_and_submodule_imports():
+    source = b"import os\nfrom . import sibling\nfrom ..core import thing\nfrom pkg.sub import mod\ndef f():\n    import pkg.late\n"
+    imports = parse_imports(source, "pkg.sub.module", is_package=False)
+    assert {"pkg.sub.sibling", "pkg.core", "pkg.core.thing", "pkg.sub.mod", "pkg.late", "os"} <= imports
+
+
+def test_only_changed_modules_and_importers_reload_in_order():
+    with temporary_directory() as tmp_path:
+        root = str(tmp_path)
+        for rel_path, text in FILES.items():
+            _write(root, rel_path, text)
+        sys.path.insert(0, root)
+        package_root = os.path.join(root, PACKAGE)
+        try:
+            setup = reload_package(package_root, PACKAGE, f"{PACKAGE}.setup")
+            assert setup is not None and setup.Character.speed == 1
+            assert f"{PACKAGE}.setup" in last_report().reloaded and not last_report().failed
+
+            setup = reload_package(package_root, PACKAGE, f"{PACKAGE}.setup")
+            assert last_report().skipped, "Nothing changed: no module is reloaded"
+            pistol_class = setup.Pistol
+
+            _write(root, "util.py", "SPEED = 7\n")
+            setup = reload_package(package_root, PACKAGE, f"{PACKAGE}.setup")
+            report = last_report()
+            assert report.changed == [f"{PACKAGE}.util"]
+            assert report.reloaded == [f"{PACKAGE}.util", f"{PACKAGE}.characters.character",
+                                       f"{PACKAGE}.arenas.arena", f"{PACKAGE}.setup"], "Dependencies reload first"
+            assert setup.Character.speed == 7
+            assert sys.modules[f"{PACKAGE}.arenas.arena"].Character is setup.Character, "Importers see the new class"
+            assert setup.Pistol is pistol_class, "Unrelated modules are kept"
+
+            _write(root, "weapons/rifle.py", "from cc_reload_demo.weapons.pistol import Pistol\nclass Rifle(Pistol):\n    pass\n")
+            reload_package(package_root, PACKAGE, f"{PACKAGE}.setup")
+            assert last_report().imported == [f"{PACKAGE}.weapons.rifle"] and not last_report().reloaded
+            assert last_report().seconds > 0
+        finally:
+            sys.path.remove(root)
+            for name in [name for name in sys.modules if name.startswith(PACKAGE)]:
+                del sys.modules[name]
+
+
+def test_topological_order_survives_cycles():
+    with temporary_directory() as tmp_path:
+        _write(str(tmp_path), "a.py", "import cc_reload_demo.b\n")
+        _write(str(tmp_path), "b.py", "import cc_reload_demo.a\n")
+        _write(str(tmp_path), "c.py", "import cc_reload_demo.a\n")
+        sources = scan_package(os.path.join(str(tmp_path), PACKAGE), PACKAGE)
+        order = topological_order(set(sources), sources)
+        assert sorted(order) == sorted(sources) and order.index(f"{PACKAGE}.c") == 2
+
+
+BENCH_SCRIPT = textwrap.dedent("""
+    import json, os, sys, time
+    from BASE_files.BASE_helpers import reload_game_code
+    from BASE_files.BASE_reload import last_report
+    import GameFolder.setup
+    results = {}
+    for label in ("first", "unchanged"):
+        reload_game_code()
+        results[label] = (last_report().seconds, len(last_report().reloaded))
+    # Pretend one leaf file changed since it was loaded
+    leaf = sys.modules["GameFolder.weapons.Pistol"]
+    leaf.__cc_source_hash__ = "stale"
+    reload_game_code()
+    results["one file"] = (last_report().seconds, len(last_report().reloaded))
+    results["total"] = last_report().total
+    print("BENCH " + json.dumps(results))
+""")
+
+
+def test_reload_timings_on_game_folder():
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYTHONPATH=os.getcwd())
+    output = subprocess.run([sys.executable, "-c", BENCH_SCRIPT], capture_output=True, text=True,
+                            env=env, timeout=120).stdout
+    results = json.loads(next(line for line in output.splitlines() if line.startswith("BENCH "))[6:])
+    for label in ("first", "unchanged", "one file"):
+        seconds, reloaded = results[label]
+        print(f"GameFolder reload ({label}): {reloaded} of {results['total']} modules in {seconds * 1000:.1f} ms")
+    assert results["unchanged"][1] == 0, "An unchanged GameFolder is not reloaded"
+    assert results["one file"][1] < results["first"][1], "One changed file reloads only it and its importers"
+    assert results["unchanged"][0] < results["first"][0]
@@ -0,0 +1,112 @@
+"""
+Tests for binary input frames (BASE_files/BASE_input_codec.py).
+Round-trips inputs, checks the pickle fallback, verifies the server drops
+redundant history frames, and compares size and CPU cost against pickled dicts.
+"""
+
+import pickle
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+import pygame
+from BASE_components.BASE_character import BaseCharacter
+from BASE_files.BASE_input_codec import (
+    encode_input_frame, pack_input_packet, unpack_input_packet, is_input_packet, unwrap_sequence, FRAME_SIZE
+)
+from BASE_files.network_client import NetworkClient, EntityManager
+
+
+def _sample_inputs(count):
+    """Inputs as BaseCharacter.get_input_data builds them while running and shooting."""
+    inputs = []
+    for i in range(count):
+        held = {pygame.K_d} if i % 3 else {pygame.K_a, pygame.K_w}
+        if i % 7 == 0:
+            held.add(pygame.K_e)
+        mouse = [False, False, False]
+        mouse[0] = i % 2 == 0
+        inputs.append(BaseCharacter.get_input_data(held, mouse, [i % 1400, 900 - i % 900]))
+    return inputs
+
+
+def test_frame_round_trip():
+    """Every standard input survives encode/decode unchanged."""
+    for sequence, input_data in enumerate(_sample_inputs(50), start=1):
+        frame = encode_input_frame(input_data, sequence)
+        assert frame is not None and len(frame) == FRAME_SIZE
+        decoded = unpack_input_packet(pack_input_packet([frame]))
+        assert decoded == [(sequence, input_data)]
+
+
+def test_unrepresentable_inputs_fall_back_to_pickle():
+    """Custom keys, off-aim targets and missing aim are not forced into a frame."""
+    assert encode_input_frame({'mouse_pos': [1, 2], 'movement': [0, 0], 'dash': True}, 1) is None
+    assert encode_input_frame({'mouse_pos': [1, 2], 'movement': [0, 0], 'shoot': [5, 5]}, 1) is None
+    assert encode_input_frame({'drop_weapon': True}, 1) is None
+
+    client = NetworkClient()
+    client.connected = True
+    client.send_input({'mouse_pos': [1, 2], 'movement': [0, 0], 'dash': True})
+    client.send_input({'mouse_pos': [1, 2], 'movement': [1, 0]})
+    assert isinstance(client.outgoing_queue[0], dict), "Custom input should stay a pickled dict"
+    assert is_input_packet(client.outgoing_queue[1]), "Standard input should be a binary packet"
+
+
+def test_server_skips_redundant_frames_and_recovers_lost_ones():
+    """Frames repeated in later packets are queued once; a lost packet's frame comes from the next one."""
+    from server import GameServer
+    fake_server = SimpleNamespace(received_input_ids={}, last_input_ids={}, input_queues=defaultdict(list))
+
+    client = NetworkClient()
+    client.connected = True
+    entity_manager = EntityManager()
+    inputs = _sample_inputs(6)
+    for input_data in inputs:
+        client.send_input(input_data, entity_manager)
+    packets = list(client.outgoing_queue)
+
+    # Packet 3 is lost; packet 4 carries frames 4, 3, 2, 1
+    for index in (0, 1, 3, 4, 5):
+        GameServer._process_input_packet(fake_server, "Player1", packets[index])
+
+    queued = fake_server.input_queues["Player1"]
+    assert [frame['input_id'] for frame in queued] == [1, 2, 3, 4, 5, 6]
+    assert queued[2]['movement'] == inputs[2]['movement'] and queued[2]['shoot'] == inputs[2]['shoot']
+
+
+def test_sequence_unwraps_across_16_bits():
+    assert unwrap_sequence(2, 65535) == 65538
+    assert unwrap_sequence(65535, 65535) is None
+    assert unwrap_sequence(65534, 65535) is None
+
+
+def test_input_frame_size_and_cpu_benchmark():
+    """Compare bytes per packet and encode+decode cost of binary frames against pickled dicts."""
+    from server import GameServer
+    inputs = _sample_inputs(2000)
+    messages = [{'type': 'input', 'player_id': 'Player1', 'input_id': i, **data} for i, data in enumerate(inputs, start=1)]
+
+    start = time.perf_counter()
+    pickled = [pickle.dumps(message, protocol=4) for message in messages]
+    for data in pickled:
+        pickle.loads(data)
+    pickle_us = (time.perf_counter() - start) * 1e6 / len(messages)
+
+    # Client encode with 3 history frames, server decode of new frames only
+    fake_server = SimpleNamespace(received_input_ids={}, last_input_ids={}, input_queues=defaultdict(list))
+    history = []
+    start = time.perf_counter()
+    packets = []
+    for i, data in enumerate(inputs, start=1):
+        history = [encode_input_frame(data, i)] + history[:3]
+        packets.append(pack_input_packet(history))
+    for packet in packets:
+        GameServer._process_input_packet(fake_server, "Player1", packet)
+    binary_us = (time.perf_counter() - start) * 1e6 / len(inputs)
+    assert len(fake_server.input_queues["Player1"]) == len(inputs)
+
+    pickle_bytes = sum(len(data) for data in pickled) / len(pickled)
+    binary_bytes = sum(len(packet) for packet in packets) / len(packets)
+    print(f"Input packet: pickled dict {pickle_bytes:.0f} B, {pickle_us:.1f} us encode+decode | "
+          f"binary frame + 3 history frames {binary_bytes:.0f} B, {binary_us:.1f} us encode+decode")
+    assert binary_bytes < pickle_bytes / 2, f"Binary packets not smaller: {binary_bytes:.0f} vs {pickle_bytes:.0f} B"
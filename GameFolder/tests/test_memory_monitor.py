@@ -0,0 +1,58 @@
+"""
+Tests for the memory growth monitor (BASE_files/BASE_memory.py).
+Growth must be attributed to the subsystem that allocated it, and a subsystem
+over its budget must warn once, naming the lines that grew. The 50-match soak
+test lives in tests/test_memory_soak.py.
+"""
+
+import os
+import tracemalloc
+from BASE_components.BASE_test_helpers import temporary_directory
+from BASE_files.BASE_memory import MemoryMonitor, parse_budgets, subsystem_of, PROJECT_ROOT
+from coding.non_callable_tools.simple_conflict_cache import ConflictCache, MAX_ENTRIES
+
+
+def test_subsystems_and_budgets_parse():
+    assert subsystem_of(os.path.join(PROJECT_ROOT, "server.py")) == "network"
+    assert subsystem_of(os.path.join(PROJECT_ROOT, "BASE_files", "BASE_transfer.py")) == "transfers"
+    assert subsystem_of(os.path.join(PROJECT_ROOT, "BASE_files", "BASE_metrics.py")) == "tooling"
+    assert subsystem_of(os.path.join(PROJECT_ROOT, "BASE_components", "BASE_arena.py")) == "arena"
+    assert subsystem_of(os.path.join(PROJECT_ROOT, "coding", "non_callable_tools", "action_logger.py")) == "agent"
+    assert subsystem_of(os.__file__) == "python"
+    assert parse_budgets("game=1.5, agent=64,broken,bad=x") == {"game": 1536 * 1024, "agent": 64 * 1024 * 1024}
+
+
+def test_growth_over_budget_warns_once_and_names_the_line():
+    monitor = MemoryMonitor(budgets={"game": 1024 * 1024})
+    monitor.start(background=False)
+    try:
+        leak = [bytes(1024) + bytes([index % 256]) for index in range(4096)]  # ~4 MB allocated by this file
+        growth = monitor.sample()
+        assert growth["game"] > 3 * 1024 * 1024, "This test file counts as GameFolder code"
+        assert monitor.over_budget.keys() == {"game"} and monitor.warnings == 1
+        snapshot = tracemalloc.take_snapshot()
+        leak.extend(bytes(1024) + bytes([index % 256]) for index in range(512))
+        growing = monitor.top_growth(tracemalloc.take_snapshot(), "game")
+        assert growing and growing[0][0].startswith(os.path.join("GameFolder", "tests", "test_memory_monitor.py"))
+        del snapshot
+
+        monitor.sample()
+        assert monitor.warnings == 1, "Still over budget: no second warning"
+        del leak
+        monitor.sample()
+        assert not monitor.over_budget
+        assert monitor.report()["growth_bytes"].get("game", 0) < 1024 * 1024
+    finally:
+        monitor.stop()
+    assert not tracemalloc.is_tracing()
+
+
+def test_conflict_cache_is_bounded():
+    with temporary_directory() as tmp_path:
+        cache = ConflictCache(str(tmp_path / "conflict_cache.json"))
+        for index in range(MAX_ENTRIES + 50):
+            cache.store_merged_patch(f"combination{index}", {"files": {}})
+        assert len(cache.cache) == MAX_ENTRIES
+        assert "merged_patch:combination0" not in cache.cache, "The oldest entries go first"
+        assert "merged_patch:combination549" in cache.cache
+        assert len(ConflictCache(str(tmp_path / "conflict_cache.json")).cache) == MAX_ENTRIES
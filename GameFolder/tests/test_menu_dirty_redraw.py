@@ -0,0 +1,112 @@
+"""
+Tests for dirty-rect menu redraw (UIManager.render_dirty).
+An unchanged menu must repaint nothing, a change must repaint only its region,
+and the partially repainted screen must match a full redraw pixel for pixel.
+"""
+
+import os
+import time
+import pygame
+from BASE_files.BASE_ui_components import UIManager, Label, Button, Panel, TextField, ScrollableList, NotificationOverlay
+
+SCREEN_SIZE = (1400, 900)
+BACKGROUND = (20, 20, 30)
+
+
+class _FakeMenu:
+    """Just the menu attributes the components read."""
+    def __init__(self):
+        self.error_message = None
+        self.error_message_time = 0
+        self.small_font = pygame.font.Font(None, 24)
+        self.button_font = pygame.font.Font(None, 32)
+
+
+def _build_ui():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    menu = _FakeMenu()
+    ui = UIManager(menu)
+    ui.add(NotificationOverlay(menu))
+    ui.add(Panel(100, 100, 500, 600))
+    title = ui.add(Label(350, 130, "Game Room", menu.button_font, center=True))
+    field = ui.add(TextField(120, 200, 400, 45, menu.button_font, placeholder="Enter room code"))
+    button = ui.add(Button(120, 300, 300, 60, "Mark as Ready", menu.button_font, None))
+    items = ui.add(ScrollableList(700, 100, 500, 600))
+    for i in range(10):
+        items.add_item(f"Patch {i}")
+    return menu, ui, title, field, button
+
+
+def _assert_matches_full_redraw(ui, screen):
+    reference = pygame.Surface(SCREEN_SIZE)
+    reference.fill(BACKGROUND)
+    ui.render(reference)
+    assert pygame.image.tostring(screen, 'RGB') == pygame.image.tostring(reference, 'RGB'), \
+        "Dirty-rect frame differs from a full redraw"
+
+
+def test_unchanged_menu_repaints_nothing():
+    """After the first full frame an idle menu pushes no rects."""
+    menu, ui, title, field, button = _build_ui()
+    screen = pygame.Surface(SCREEN_SIZE)
+    assert ui.render_dirty(screen, BACKGROUND) == [screen.get_rect()], "First frame should be a full redraw"
+    for _ in range(5):
+        ui.update()
+        assert ui.render_dirty(screen, BACKGROUND) == [], "Idle menu should not repaint"
+
+    ui.invalidate()
+    assert ui.render_dirty(screen, BACKGROUND) == [screen.get_rect()], "invalidate() should force a full redraw"
+
+
+def test_changes_repaint_only_their_region():
+    """Text, style and notification changes repaint small regions that match a full redraw."""
+    menu, ui, title, field, button = _build_ui()
+    screen = pygame.Surface(SCREEN_SIZE)
+    ui.render_dirty(screen, BACKGROUND)
+
+    # Label text assigned directly grows past its measured rect
+    title.text = "Tests: 12/12 Passed (all green)"
+    rects = ui.render_dirty(screen, BACKGROUND)
+    assert rects and all(rect.height < 100 for rect in rects), f"Label change repainted too much: {rects}"
+    _assert_matches_full_redraw(ui, screen)
+
+    button.style = "primary"
+    button.text = "Ready!"
+    rects = ui.render_dirty(screen, BACKGROUND)
+    assert rects and all(rect.colliderect(button.rect) for rect in rects)
+    _assert_matches_full_redraw(ui, screen)
+
+    field.text = "ABC123"
+    assert ui.render_dirty(screen, BACKGROUND), "Typed text should repaint the field"
+    _assert_matches_full_redraw(ui, screen)
+
+    menu.error_message = "Ready for new game!"
+    menu.error_message_time = pygame.time.get_ticks()
+    assert ui.render_dirty(screen, BACKGROUND), "Notification should repaint the overlay"
+    _assert_matches_full_redraw(ui, screen)
+
+
+def test_idle_menu_frame_time_benchmark():
+    """Compare idle per-frame cost of the full redraw against the dirty-rect path."""
+    menu, ui, title, field, button = _build_ui()
+    screen = pygame.Surface(SCREEN_SIZE)
+    frames = 200
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        screen.fill(BACKGROUND)
+        ui.update()
+        ui.render(screen)
+    full_ms = (time.perf_counter() - start) * 1000 / frames
+
+    ui.render_dirty(screen, BACKGROUND)
+    start = time.perf_counter()
+    for _ in range(frames):
+        ui.update()
+        ui.render_dirty(screen, BACKGROUND)
+    dirty_ms = (time.perf_counter() - start) * 1000 / frames
+
+    print(f"Idle menu frame: full redraw {full_ms:.3f} ms, dirty-rect {dirty_ms:.3f} ms")
+    assert dirty_ms < full_ms, f"Idle dirty-rect frame not cheaper: {dirty_ms:.3f} vs {full_ms:.3f} ms"
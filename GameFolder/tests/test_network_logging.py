@@ -0,0 +1,114 @@
+"""
+Tests for the central queue-based logger (BASE_files/BASE_logging.py).
+Checks per-subsystem levels and per-call-site rate limiting, that importing the
+module again keeps a single handler, and benchmarks client input-send
+throughput with debug logging disabled vs enabled.
+"""
+
+import importlib
+import io
+import logging
+import logging.handlers
+import socket
+import sys
+import threading
+import time
+from BASE_files.BASE_logging import configure_logging, get_logger, set_level, flush_logging, RATE_LIMIT_BURST
+from BASE_files.network_client import NetworkClient
+
+
+def test_subsystem_levels_and_rate_limit():
+    """Levels apply per subsystem and a chatty call site is cut to the burst limit."""
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+    try:
+        set_level("network.client", logging.DEBUG)
+        set_level("transfer", logging.WARNING)
+        client_logger = get_logger("network.client")
+        transfer_logger = get_logger("transfer")
+
+        transfer_logger.info("transfer info should be hidden")
+        transfer_logger.warning("transfer warning should be shown")
+        for i in range(100):
+            client_logger.debug("hot path message %d", i)
+        for i in range(3):
+            client_logger.error("errors are never rate limited %d", i)
+        flush_logging()
+
+        output = stream.getvalue()
+        assert "transfer info should be hidden" not in output
+        assert "transfer warning should be shown" in output
+        assert output.count("hot path message") == RATE_LIMIT_BURST, "Call site should be rate limited"
+        assert output.count("errors are never rate limited") == 3
+    finally:
+        set_level("network.client", logging.NOTSET)
+        set_level("transfer", logging.NOTSET)
+        configure_logging()
+
+
+def test_reimported_module_keeps_one_handler():
+    """Importing BASE_logging again (as after clear_python_cache()) reuses the process's queue handler."""
+    get_logger("network.client")
+    root = logging.getLogger("core_conflict")
+    handlers = list(root.handlers)
+    saved = sys.modules.pop("BASE_files.BASE_logging")
+    try:
+        reimported = importlib.import_module("BASE_files.BASE_logging")
+        reimported.get_logger("network.client")
+        reimported.configure_logging()
+        queue_handlers = [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]
+        assert len(queue_handlers) == 1, f"Expected one queue handler, found {len(queue_handlers)}"
+        assert len(root.handlers) == len(handlers)
+    finally:
+        sys.modules["BASE_files.BASE_logging"] = saved
+
+
+def _send_inputs(client, count):
+    """Queue `count` input messages and time how long the client takes to send them."""
+    for i in range(count):
+        client.send_input({'movement': [1, 0], 'mouse_pos': [i % 1400, 450], 'shoot': False})
+    start = time.perf_counter()
+    client._send_outgoing_messages()
+    return time.perf_counter() - start
+
+
+def test_input_send_throughput_benchmark():
+    """Input messages per second through _send_outgoing_messages with debug logging off and on."""
+    client_sock, server_sock = socket.socketpair()
+    received = []
+
+    def drain():
+        while True:
+            data = server_sock.recv(65536)
+            if not data:
+                break
+            received.append(len(data))
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+
+    client = NetworkClient()
+    client.socket = client_sock
+    client.connected = True
+    count = 5000
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+    try:
+        set_level("network.client", logging.INFO)
+        disabled_s = _send_inputs(client, count)
+
+        set_level("network.client", logging.DEBUG)
+        enabled_s = _send_inputs(client, count)
+        flush_logging()
+    finally:
+        set_level("network.client", logging.NOTSET)
+        configure_logging()
+        client_sock.close()
+        reader.join(timeout=5)
+        server_sock.close()
+
+    disabled_rate = count / disabled_s
+    enabled_rate = count / enabled_s
+    print(f"Input send throughput: debug off {disabled_rate:,.0f} msg/s, debug on (rate limited) {enabled_rate:,.0f} msg/s")
+    assert client.connected, "Client should not have hit a send error"
+    assert disabled_rate > 1000, f"Input send unexpectedly slow with logging disabled: {disabled_rate:.0f} msg/s"
@@ -0,0 +1,135 @@
+"""
+Tests for multi-room hosting (BASE_files/BASE_rooms.py).
+Checks room codes, the round-robin tick budget with stub rooms, that the
+network thread leaves a resetting room alone, that rooms refuse patch merges
+and GameFolder restores, and routing of unknown codes.
+The 20-room benchmark lives in tests/test_room_manager_load.py.
+"""
+
+import shutil
+import threading
+import time
+from types import SimpleNamespace
+from BASE_components.BASE_test_helpers import free_port, patched
+from BASE_files.BASE_helpers import ROOM_SEPARATOR, decrypt_code, encrypt_code
+from BASE_files.network_client import NetworkClient
+
+
+def _stub_room(cost, ticked):
+    room = SimpleNamespace(last_tick_time=0.0, tick_interval=1 / 60, ticks_deferred=0)
+
+    def game_step(now):
+        if now - room.last_tick_time < room.tick_interval:
+            return False
+        ticked.append(room)
+        time.sleep(cost)
+        room.last_tick_time = now
+        return True
+    room._game_step = game_step
+    room._flush_outbox = lambda: None
+    return room
+
+
+def test_round_robin_budget_defers_and_rotates():
+    from BASE_files.BASE_rooms import RoomManager
+
+    manager = RoomManager('127.0.0.1', 0, tick_budget=0.025)
+    try:
+        ticked = []
+        rooms = [_stub_room(0.01, ticked) for _ in range(5)]
+        manager.rooms = {str(index): room for index, room in enumerate(rooms)}
+
+        manager._tick_rooms(now=1.0)
+        assert ticked == rooms[:3], "Budget of 25 ms fits three 10 ms rooms"
+        assert manager.budget_exhausted == 1
+        assert [room.ticks_deferred for room in rooms] == [0, 0, 0, 1, 1]
+
+        ticked.clear()
+        manager._tick_rooms(now=1.0)
+        assert ticked == rooms[3:], "Deferred rooms go first; rooms ticked at this time are not due"
+        assert manager.budget_exhausted == 1
+    finally:
+        manager.rooms = {}
+        manager.stop()
+
+
+def test_network_thread_waits_for_a_resetting_room():
+    """A room's network pass and new connections wait while its game thread holds reset_lock."""
+    from BASE_files.BASE_rooms import RoomManager
+
+    manager = RoomManager('127.0.0.1', 0)
+    served = []
+    room = SimpleNamespace(reset_lock=threading.Lock(), clients={}, pending_clients={},
+                           _network_pass=lambda select_timeout: served.append('pass'),
+                           _handle_new_connection=lambda client_socket, address: served.append('admit'))
+    try:
+        manager.rooms = {'1': room}
+        with room.reset_lock:  # The room is in _restart_server
+            network = threading.Thread(target=manager._network_iteration)
+            admit = threading.Thread(target=manager._admit, args=(room, None, ('127.0.0.1', 1)))
+            network.start()
+            admit.start()
+            time.sleep(0.2)
+            assert not served, "Nothing may touch the room's connections during its reset"
+        network.join(timeout=2.0)
+        admit.join(timeout=2.0)
+        assert sorted(served) == ['admit', 'pass']
+    finally:
+        manager.rooms = {}
+        manager.stop()
+
+
+def test_rooms_refuse_patches_and_keep_game_folder():
+    """Hosted rooms share the loaded game code: no merge, no restore that would reload it under other rooms."""
+    from BASE_files.BASE_rooms import RoomManager
+    from coding.non_callable_tools import backup_handling
+
+    manager = RoomManager('127.0.0.1', free_port())
+    refusals, handlers = [], []
+    try:
+        room = manager.create_room(practice_mode=True)
+        other = manager.create_room(practice_mode=True)
+        assert room.shares_game_code and other.shares_game_code
+        room.client_patches = {'Player1': [{'name': 'faster_guns', 'base_backup': 'base'}]}
+        with patched(room, "_notify_patch_merge_failed", refusals.append), \
+                patched(backup_handling, "BackupHandler", lambda *args: handlers.append(args)):
+            room._merge_and_distribute_patches()
+            room._restore_gamefolder_to_base()
+            room._restore_gamefolder_to_base(full=True)
+        assert refusals and "patches are disabled" in refusals[0]
+        assert not handlers, "A hosted room must not touch GameFolder"
+    finally:
+        manager.stop()
+        shutil.rmtree(room.server_patches_dir, ignore_errors=True)
+        shutil.rmtree(other.server_patches_dir, ignore_errors=True)
+
+
+def test_room_codes_route_and_unknown_codes_are_rejected():
+    from BASE_files.BASE_rooms import RoomManager
+
+    port = free_port()
+    manager = RoomManager('127.0.0.1', port)
+    rejected = []
+    try:
+        room = manager.create_room(practice_mode=True)
+        server_code, _, room_id = room.room_code.rpartition(ROOM_SEPARATOR)
+        assert server_code == encrypt_code('127.0.0.1', port, "REMOTE") and room_id == room.room_id
+        assert decrypt_code(room.room_code)[1] == port, "Joining decodes the port from the server part"
+        assert manager.room_for_code(room.room_code.lower()) is room
+        assert manager.room_for_code(server_code) is None
+
+        threading.Thread(target=manager.start, daemon=True).start()
+        stray = NetworkClient('127.0.0.1', port, room_code=f"{server_code}{ROOM_SEPARATOR}ZZ")
+        stray.on_name_rejected = rejected.append
+        assert stray.connect("Stray")
+        deadline = time.time() + 5.0
+        while not rejected and time.time() < deadline:
+            stray.update()
+            time.sleep(0.01)
+        stray.disconnect()
+    finally:
+        manager.stop()
+        shutil.rmtree(room.server_patches_dir, ignore_errors=True)
+
+    assert rejected and "not found" in rejected[0]
+    assert not room.clients
@@ -0,0 +1,48 @@
+"""
+Startup import benchmark for both entry points (main.py for the menu, server.py).
+Each one is imported in a fresh interpreter under `python -X importtime`: the
+agent stack (LLM handlers), the merge machinery and the visual logger client
+must not be imported, and the total import time must stay within budget.
+"""
+
+import os
+import subprocess
+import sys
+from BASE_components.BASE_test_helpers import temporary_directory
+
+ENTRY_POINTS = {"main": "import main", "server": "import server"}
+# Before the heavy modules were made lazy both entry points took 1.8 s - 2.1 s here, now about 0.3 s
+IMPORT_BUDGET_SECONDS = 1.0
+LAZY_MODULES = ("agent", "coding.generic_implementation", "coding.handlers", "google.genai", "openai",
+                "merge3", "coding.non_callable_tools.version_control", "coding.non_callable_tools.action_logger",
+                "websockets")
+
+
+def _import_times(statement, cache_path):
+    """{module: cumulative seconds} from -X importtime for one fresh interpreter."""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", CC_VALIDATION_CACHE=cache_path, PYTHONPATH=os.getcwd())
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, env=env, timeout=180)
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def test_entry_points_import_within_budget():
+    with temporary_directory() as tmp_path:
+        for entry, statement in ENTRY_POINTS.items():
+            cache_path = str(tmp_path / f"{entry}.json")
+            _import_times(statement, cache_path)  # Writes the bytecode and the validation cache
+            times = _import_times(statement, cache_path)
+            heaviest = sorted(((seconds, name) for name, seconds in times.items() if name != entry), reverse=True)[:3]
+            print(f"{entry} imports in {times[entry] * 1000:.0f} ms ({len(times)} modules), heaviest: "
+                  + ", ".join(f"{name} {seconds * 1000:.0f} ms" for seconds, name in heaviest))
+
+            loaded = sorted(name for name in times if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES))
+            assert not loaded, f"{entry} imports modules that must load on first use: {loaded}"
+            assert times[entry] < IMPORT_BUDGET_SECONDS, f"{entry} import time regressed: {times[entry]:.2f} s"
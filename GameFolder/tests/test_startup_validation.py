@@ -0,0 +1,97 @@
+"""
+Tests for the cached GameFolder import validation (BASE_files/BASE_helpers.py).
+The fingerprint must follow file contents and cover every project module
+GameFolder.setup imports, a validation must run in a child process without
+touching this process's modules, an unchanged tree must skip the import pass,
+and a cold start (no cache) is timed against a warm start for both entry
+points (main.py and server.py).
+"""
+
+import os
+import subprocess
+import sys
+import time
+from BASE_components.BASE_test_helpers import patched, temporary_directory
+from BASE_files import BASE_helpers
+
+ENTRY_POINTS = {"server.py": "import server", "main.py": "import main"}
+
+
+def test_fingerprint_follows_file_contents():
+    with temporary_directory() as tmp_path:
+        folder = tmp_path / "GameFolder"
+        (folder / "tests").mkdir(parents=True)
+        (folder / "setup.py").write_text("VALUE = 1\n")
+        (folder / "tests" / "test_x.py").write_text("pass\n")
+        first = BASE_helpers.gamefolder_fingerprint((str(folder),))
+        assert BASE_helpers.gamefolder_fingerprint((str(folder),)) == first
+
+        (folder / "tests" / "test_x.py").write_text("assert True\n")
+        assert BASE_helpers.gamefolder_fingerprint((str(folder),)) == first, "Tests are not part of the game code"
+        (folder / "setup.py").write_text("VALUE = 2\n")
+        assert BASE_helpers.gamefolder_fingerprint((str(folder),)) != first
+
+
+def test_fingerprint_covers_everything_setup_imports():
+    script = ("import os, sys\n"
+              "import GameFolder.setup\n"
+              "root = os.getcwd()\n"
+              "for module in list(sys.modules.values()):\n"
+              "    path = getattr(module, '__file__', None) or ''\n"
+              "    if path.startswith(root + os.sep):\n"
+              "        print('LOADED ' + os.path.relpath(path, root))\n")
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYTHONPATH=os.getcwd())
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    loaded = [line[len("LOADED "):] for line in result.stdout.splitlines() if line.startswith("LOADED ")]
+    assert any(path.startswith("BASE_files") for path in loaded)
+    outside = [path for path in loaded if path.split(os.sep)[0] not in BASE_helpers.VALIDATED_FOLDERS]
+    assert not outside, f"Imported by GameFolder.setup but not fingerprinted: {outside}"
+
+
+def test_validation_runs_in_a_child_and_is_cached():
+    with temporary_directory() as tmp_path, patched(BASE_helpers, "VALIDATION_CACHE", str(tmp_path / "validation.json")):
+        loaded_before = {name: module for name, module in sys.modules.items() if name.startswith("GameFolder")}
+
+        assert BASE_helpers.check_gamefolder_importable() == (True, None)
+        loaded_after = {name: module for name, module in sys.modules.items() if name.startswith("GameFolder")}
+        assert loaded_after == loaded_before, "Validation must not import or purge modules in this process"
+        assert os.path.exists(BASE_helpers.VALIDATION_CACHE)
+
+        def no_child():
+            raise AssertionError("An unchanged tree must not be validated again")
+        with patched(BASE_helpers, "validate_gamefolder_in_child", no_child):
+            assert BASE_helpers.check_gamefolder_importable() == (True, None)
+
+        with patched(BASE_helpers, "gamefolder_fingerprint", lambda: "another tree"):
+            with patched(BASE_helpers, "validate_gamefolder_in_child", lambda: (False, "SyntaxError: boom")):
+                assert BASE_helpers.check_gamefolder_importable() == (False, "SyntaxError: boom")
+            with patched(BASE_helpers, "validate_gamefolder_in_child", no_child):
+                try:
+                    BASE_helpers.check_gamefolder_importable()
+                    assert False, "A failed validation is never cached"
+                except AssertionError as e:
+                    assert "must not be validated again" in str(e)
+
+
+def _start_time(statement, cache_path):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", CC_VALIDATION_CACHE=cache_path,
+               PYTHONPATH=os.getcwd())
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True, env=env, timeout=180)
+    elapsed = time.perf_counter() - started
+    assert result.returncode == 0, result.stderr[-2000:]
+    # main.py imports server.py, so one start can check twice: count the checks that were not cached
+    return elapsed, result.stdout.count("Validating importability") - result.stdout.count("skipping the import check")
+
+
+def test_cold_and_warm_start_of_both_entry_points():
+    with temporary_directory() as tmp_path:
+        for entry, statement in ENTRY_POINTS.items():
+            cache_path = str(tmp_path / f"{entry}.json")
+            cold, cold_validations = _start_time(statement, cache_path)
+            warm, warm_validations = _start_time(statement, cache_path)
+            print(f"{entry} start: cold {cold * 1000:.0f} ms (validated in a child), "
+                  f"warm {warm * 1000:.0f} ms (cached), saved {(cold - warm) * 1000:.0f} ms")
+            assert cold_validations == 1 and warm_validations == 0
+            assert warm < cold, "A cached validation must make the start faster"
@@ -0,0 +1,177 @@
+"""
+Tests for the per-tick phase profiler (BASE_files/BASE_profiler.py).
+Checks histogram percentiles and window rotation, that a phase nested in
+itself or timed on two threads at once keeps each start, that the process keeps one
+profiler when BASE_files is imported again, measures what a disabled
+profiler costs per tick of a headless arena, verifies every arena and server
+phase is recorded, and toggles the profiler on a live server through the
+admin message.
+"""
+
+import importlib
+import shutil
+import sys
+import threading
+import time
+from BASE_components.BASE_test_helpers import free_port
+from BASE_files.BASE_profiler import PhaseHistogram, TickProfiler, tick_profiler
+from BASE_files.network_client import NetworkClient
+from GameFolder.arenas.GAME_arena import Arena
+from GameFolder.characters.GAME_character import Character
+
+TICKS = 600
+ARENA_PHASES = {'spawns', 'respawns', 'winner_check', 'characters', 'projectiles', 'collisions', 'out_of_bounds'}
+SERVER_PHASES = {'tick', 'input_drain', 'simulation', 'serialize', 'send', 'flush'}
+
+
+def test_histogram_percentiles_and_rotation():
+    histogram = PhaseHistogram()
+    for _ in range(98):
+        histogram.record(0.001)
+    histogram.record(0.010)
+    histogram.record(0.050)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    assert 0.8 <= summary['p50_ms'] <= 1.25, "Percentiles are exact to one 25% bucket"
+    assert 8.0 <= summary['p99_ms'] <= 12.5
+    assert summary['max_ms'] == 50.0
+
+    histogram.rotate()
+    assert histogram.summary()['count'] == 100, "The previous window stays in the report"
+    histogram.rotate()
+    assert histogram.summary()['count'] == 0
+
+
+def test_nested_and_concurrent_phases_keep_their_own_start():
+    profiler = TickProfiler(enabled=True)
+    with profiler.phase('outer'):
+        time.sleep(0.02)
+        with profiler.phase('outer'):  # Same phase nested: must not overwrite the outer start
+            pass
+    durations = profiler.snapshot()['phases']['outer']
+    assert durations['count'] == 2
+    assert durations['max_ms'] >= 15.0, "The outer use should cover its whole block"
+
+    def worker(delay):
+        with profiler.phase('threaded'):
+            time.sleep(delay)
+
+    threads = [threading.Thread(target=worker, args=(delay,)) for delay in (0.05, 0.001)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    threaded = profiler.snapshot()['phases']['threaded']
+    assert threaded['count'] == 2
+    assert threaded['max_ms'] >= 40.0, "A short use on another thread must not cut the long one short"
+
+
+def _arena():
+    arena = Arena(800, 600, headless=True)
+    for index in range(4):
+        arena.add_character(Character(f"Bot{index}", "", "", [150.0 + index * 150, 300.0]))
+    return arena
+
+
+def _run_ticks(arena, profiler):
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        with profiler.phase('tick'):
+            arena._update_simulation(arena.tick_interval)
+    return (time.perf_counter() - start) / TICKS
+
+
+def test_profiler_survives_a_cleared_module_cache():
+    saved = sys.modules.pop("BASE_files.BASE_profiler")  # What clear_python_cache() does before a test run
+    try:
+        reimported = importlib.import_module("BASE_files.BASE_profiler")
+        assert reimported is not saved and reimported.tick_profiler is tick_profiler
+    finally:
+        sys.modules["BASE_files.BASE_profiler"] = saved
+
+
+def test_disabled_profiler_costs_next_to_nothing():
+    profiler = TickProfiler(enabled=False)
+    calls = 200000
+    start = time.perf_counter()
+    for _ in range(calls):
+        with profiler.phase('x'):
+            pass
+    disabled_call = (time.perf_counter() - start) / calls
+
+    assert not tick_profiler.enabled
+    arena = _arena()
+    off = min(_run_ticks(arena, tick_profiler) for _ in range(3))
+    tick_profiler.enable()
+    try:
+        on = min(_run_ticks(arena, tick_profiler) for _ in range(3))
+    finally:
+        tick_profiler.disable()
+
+    print(f"disabled phase() {disabled_call * 1e9:.0f} ns/call; arena tick {off * 1e6:.1f} us off, {on * 1e6:.1f} us on")
+    assert disabled_call < 2e-6, "A disabled phase should cost well under a microsecond or two"
+
+
+def test_arena_phases_are_recorded():
+    arena = _arena()
+    tick_profiler.enable()
+    try:
+        _run_ticks(arena, tick_profiler)
+        phases = tick_profiler.snapshot()['phases']
+    finally:
+        tick_profiler.disable()
+    assert ARENA_PHASES <= set(phases)
+    for name in ARENA_PHASES:
+        assert phases[name]['count'] == TICKS, f"{name} should be timed once per tick"
+    assert phases['collisions']['mean_ms'] >= phases['out_of_bounds']['mean_ms'], "out_of_bounds runs inside collisions"
+    assert phases['tick']['p99_ms'] > 0
+
+
+def test_admin_message_toggles_live_profiler():
+    from server import GameServer
+
+    port = free_port()
+    server = GameServer('127.0.0.1', port, practice_mode=True)
+    client = NetworkClient('127.0.0.1', port)
+    reports = []
+    client.on_profiler_report = reports.append
+    client.on_file_sync_received = lambda manifest: client.acknowledge_file_sync()
+
+    def wait_for_report(count, timeout=10.0):
+        deadline = time.time() + timeout
+        while len(reports) < count and time.time() < deadline:
+            client.send_input({'mouse_pos': [100, 200], 'movement': [1, 0]})
+            client.update()
+            time.sleep(1 / 60)
+        assert len(reports) >= count, "No profiler report received"
+        return reports[count - 1]
+
+    try:
+        threading.Thread(target=server.start, daemon=True).start()
+        assert client.connect("Admin")
+        client.request_file_sync()
+        deadline = time.time() + 10.0
+        while not server.arena and time.time() < deadline:
+            client.update()
+            time.sleep(0.005)
+
+        client.request_profiler('enable')
+        assert wait_for_report(1)['enabled']
+        for _ in range(60):
+            client.send_input({'mouse_pos': [100, 200], 'movement': [1, 0]})
+            client.update()
+            time.sleep(1 / 60)
+        client.request_profiler('report')
+        phases = wait_for_report(2)['phases']
+        assert SERVER_PHASES | ARENA_PHASES <= set(phases), f"Missing phases: {(SERVER_PHASES | ARENA_PHASES) - set(phases)}"
+        assert phases['tick']['count'] > 10
+        print("live tick: " + ", ".join(f"{name} p99 {phases[name]['p99_ms']:.3f} ms" for name in sorted(SERVER_PHASES)))
+
+        client.request_profiler('disable')
+        assert not wait_for_report(3)['enabled']
+        assert not tick_profiler.enabled
+    finally:
+        tick_profiler.disable()
+        client.disconnect()
+        server.stop()
+        shutil.rmtree(server.server_patches_dir, ignore_errors=True)
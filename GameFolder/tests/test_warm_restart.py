@@ -0,0 +1,159 @@
+"""
+Tests for the warm restart after a finished match (GameServer._restart_server).
+BackupHandler.sync_backup() must rewrite only differing files. On a live
+server, a match is ended and two players rejoin: the restart must go through
+game over -> resetting -> lobby -> playing with no fixed pause, keep the
+loaded GameFolder modules when the folder already matches the base backup,
+and report how long it took from match end to the next playable match.
+The warm restore is timed against the full delete-and-copy restore.
+"""
+
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from coding.non_callable_tools.backup_handling import BackupHandler
+from BASE_components.BASE_test_helpers import free_port, restored_game_modules, temporary_directory
+from BASE_files.BASE_helpers import reload_game_code
+from BASE_files.network_client import NetworkClient
+
+PLAYERS = ["Alpha", "Bravo"]
+
+
+@contextmanager
+def _base_backup():
+    """A base backup of the current GameFolder, removed afterwards."""
+    existed = os.path.isdir("__game_backups")
+    handler = BackupHandler("__game_backups")
+    backup_path, backup_name = handler.create_backup("GameFolder")
+    os.utime(backup_path)  # The most recent backup is the base
+    try:
+        yield backup_name
+    finally:
+        shutil.rmtree(backup_path, ignore_errors=True)
+        if not existed:
+            shutil.rmtree("__game_backups", ignore_errors=True)
+
+
+def test_sync_backup_rewrites_only_differing_files():
+    with temporary_directory() as tmp_path:
+        handler = BackupHandler(str(tmp_path / "backups"))
+        source = tmp_path / "GameFolder"
+        (source / "weapons").mkdir(parents=True)
+        (source / "setup.py").write_text("VALUE = 1\n")
+        (source / "weapons" / "Pistol.py").write_text("DAMAGE = 5\n")
+        _, backup_name = handler.create_backup(str(source))
+
+        (source / "weapons" / "Pistol.py").write_text("DAMAGE = 50\n")
+        (source / "weapons" / "Rifle.py").write_text("DAMAGE = 9\n")
+        (source / "__pycache__").mkdir()
+        (source / "__pycache__" / "setup.cpython-311.pyc").write_bytes(b"cache")
+        os.utime(source / "setup.py", (0, 0))
+
+        copied, removed = handler.sync_backup(backup_name, str(source))
+        assert copied == [os.path.join("weapons", "Pistol.py")]
+        assert removed == [os.path.join("weapons", "Rifle.py")]
+        assert (source / "weapons" / "Pistol.py").read_text() == "DAMAGE = 5\n"
+        assert os.path.getmtime(source / "setup.py") == 0, "Identical files are not rewritten"
+        assert (source / "__pycache__" / "setup.cpython-311.pyc").exists(), "Cache files are left alone"
+        assert handler.sync_backup(backup_name, str(source)) == ([], [])
+
+
+def _pump(clients, until, timeout=20.0):
+    deadline = time.time() + timeout
+    while not until():
+        assert time.time() < deadline, "Timed out"
+        for client in clients:
+            if client.connected:
+                client.update()
+        time.sleep(1 / 120)
+
+
+def _join(server, port, names):
+    """Connect every player, then sync: an arena built before all have registered would end the match at once."""
+    clients = []
+    for name in names:
+        client = NetworkClient('127.0.0.1', port)
+        client.on_file_sync_received = lambda manifest, client=client: client.acknowledge_file_sync()
+        assert client.connect(name)
+        clients.append(client)
+    _pump(clients, lambda: all(name in server.clients for name in names))
+    for client in clients:
+        client.request_file_sync()
+    return clients
+
+
+def test_finished_match_restarts_warm():
+    with _base_backup(), restored_game_modules():
+        from server import GameServer, PHASE_LOBBY, PHASE_PLAYING
+
+        port = free_port()
+        server = GameServer('127.0.0.1', port)
+        server.restart_delay = 0.2  # The winner screen; the default is 5 s
+        phases = []
+        set_phase = server._set_phase
+        server._set_phase = lambda phase: (phases.append(phase), set_phase(phase))
+        clients = []
+        try:
+            threading.Thread(target=server.start, daemon=True).start()
+            clients = _join(server, port, PLAYERS)
+            _pump(clients, lambda: server.match_phase == PHASE_PLAYING
+                  and len(server.clients_file_sync_ack) == len(PLAYERS))
+            character_class = type(server.arena.characters[0])
+
+            server.arena.game_over = True
+            _pump(clients, lambda: server.match_phase == PHASE_LOBBY and not any(client.connected for client in clients))
+
+            rejoined = _join(server, port, PLAYERS)
+            clients += rejoined
+            _pump(rejoined, lambda: server.match_phase == PHASE_PLAYING
+                  and all(client.get_telemetry()['state_count'] > 0 for client in rejoined))
+            timings = dict(server.restart_timings)
+            assert type(server.arena.characters[0]) is character_class, "The loaded modules were kept"
+        finally:
+            for client in clients:
+                client.disconnect()
+            server.stop()
+            shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+
+        assert phases[-4:] == ["game_over", "resetting", "lobby", "playing"]
+        print("Match end to next match playable: " + ", ".join(
+            f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+        assert timings["resetting"] < 1.0, "The reset holds no fixed pause"
+        assert timings["match_end_to_playable"] < server.restart_delay + timings["resetting"] + timings["lobby"] + 0.5
+
+
+def test_warm_restore_is_faster_than_a_full_restore():
+    with _base_backup(), restored_game_modules():
+        from server import GameServer
+
+        server = GameServer('127.0.0.1', free_port())
+        try:
+            pistol_path = os.path.join("GameFolder", "weapons", "Pistol.py")
+            with open(pistol_path) as f:
+                original = f.read()
+            timings = {}
+            try:
+                for label, full, change in (("warm, unchanged", False, False), ("warm, one file changed", False, True),
+                                            ("full", True, False)):
+                    if change:  # A merged patch changed a file and the server reloaded it
+                        with open(pistol_path, "a") as f:
+                            f.write("# Changed by a patch\n")
+                        reload_game_code()
+                    started = time.perf_counter()
+                    server._restore_gamefolder_to_base(full=full)
+                    import GameFolder.setup  # What the next match needs before its arena can be built
+                    timings[label] = time.perf_counter() - started
+                    with open(pistol_path) as f:
+                        assert f.read() == original
+            finally:
+                with open(pistol_path, "w") as f:
+                    f.write(original)
+        finally:
+            server.stop()
+            shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+
+        print("GameFolder restore: " + ", ".join(f"{label} {seconds * 1000:.1f} ms" for label, seconds in timings.items()))
+        assert timings["warm, unchanged"] < timings["full"]
+        assert timings["warm, one file changed"] < timings["full"]
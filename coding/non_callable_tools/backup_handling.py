@@ -222,6 +222,47 @@ class BackupHandler:
         
         return backup_path, backup_name
 
+    def _list_files(self, path: str) -> dict:
+        """{relative path: full path} of the files under path, without cache files."""
+        found = {}
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not should_skip_item(d)]
+            for name in files:
+                if not should_skip_item(name):
+                    full_path = os.path.join(root, name)
+                    found[os.path.relpath(full_path, path)] = full_path
+        return found
+
+    def sync_backup(self, backup_name: str, target_path: str):
+        """
+        Make target_path match a backup by rewriting only the files whose content differs
+        and deleting the files the backup does not have. Cache files are left alone.
+
+        Returns:
+            (copied, removed): relative paths of the files rewritten and deleted
+        """
+        backup_path = os.path.join(self.backup_folder, backup_name)
+        if not os.path.isdir(backup_path):
+            raise ValueError(f"Backup {backup_name} does not exist")
+
+        wanted = self._list_files(backup_path)
+        present = self._list_files(target_path) if os.path.isdir(target_path) else {}
+        copied, removed = [], []
+        for rel_path, source in sorted(wanted.items()):
+            destination = os.path.join(target_path, rel_path)
+            if rel_path in present and os.path.getsize(source) == os.path.getsize(destination):
+                with open(source, 'rb') as a, open(destination, 'rb') as b:
+                    if a.read() == b.read():
+                        continue
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            # copyfile, not copy2: the file gets a fresh mtime so no stale bytecode is reused
+            shutil.copyfile(source, destination)
+            copied.append(rel_path)
+        for rel_path in sorted(set(present) - set(wanted)):
+            os.remove(present[rel_path])
+            removed.append(rel_path)
+        return copied, removed
+
     def list_backups(self):
         """
         List all available backups.
@@ -11,6 +11,9 @@ import time
 from pathlib import Path
 from typing import Dict, List, Optional
 
+# Entries kept on disk and in memory; the least recently created are dropped first
+MAX_ENTRIES = 500
+
 
 class ConflictCache:
     """Simple cache for conflict resolutions."""
@@ -19,6 +22,7 @@ class ConflictCache:
         self.cache_file = Path(cache_file)
         self.cache_file.parent.mkdir(parents=True, exist_ok=True)
         self.cache = self._load_cache()
+        self._prune()
 
     def _load_cache(self) -> Dict:
         """Load cache from disk."""
@@ -30,8 +34,18 @@ class ConflictCache:
                 return {}
         return {}
 
+    def _prune(self):
+        """Drop the oldest entries beyond MAX_ENTRIES (a long-running server would otherwise grow forever)."""
+        excess = len(self.cache) - MAX_ENTRIES
+        if excess <= 0:
+            return
+        by_age = sorted(self.cache, key=lambda key: self.cache[key].get("created", self.cache[key].get("timestamp", 0)))
+        for key in by_age[:excess]:
+            del self.cache[key]
+
     def _save_cache(self):
         """Save cache to disk."""
+        self._prune()
         try:
             with open(self.cache_file, 'w') as f:
                 json.dump(self.cache, f, indent=2)
@@ -17,12 +17,12 @@ if not ensure_gamefolder_exists():
 import random
 import argparse
 from BASE_files.BASE_menu import BaseMenu
-from coding.non_callable_tools.action_logger import action_logger
 
 # TODO: Remember to call client.update() regularly in your main loop to process incoming messages and send outgoing ones.")
 
 
 def run_menu():
+    from coding.non_callable_tools.action_logger import action_logger
     menu = BaseMenu(action_logger=action_logger)
     menu.run_menu_loop()
 
@@ -13,11 +13,12 @@ import pickle
 import os
 import sys
 import glob
+import ipaddress
 import importlib
 from typing import Dict, List, Set, Tuple, Optional
 from collections import defaultdict
 import select
-from BASE_files.BASE_helpers import reload_game_code, get_local_ip, encrypt_code
+from BASE_files.BASE_helpers import reload_game_code, mark_game_code_loaded, get_local_ip, encrypt_code, ROOM_SEPARATOR
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -29,51 +30,127 @@ if not ensure_gamefolder_exists():
     sys.exit(1)
 
 import GameFolder.setup
-from coding.non_callable_tools.version_control import VersionControl
+# The merge machinery (VersionControl, merge3) and the agent stack (LLM handlers) are imported
+# where a patch merge needs them: a server with nothing to merge never pays for them
 from coding.tools.conflict_resolution import get_all_conflicts
-from agent import auto_fix_conflicts
 from BASE_files.BASE_helpers import load_settings
+from BASE_files.BASE_logging import get_logger
+from BASE_files.BASE_input_codec import is_input_packet, input_packet_frames, frame_to_input, unwrap_sequence
+from BASE_files.BASE_file_sync import build_manifest, PROJECT_ROOT
+from BASE_files.BASE_migration import migrate_arena
+from BASE_files.BASE_transfer import TransferEngine, TRANSFER_MESSAGE_TYPES, file_sha256
+from BASE_files.BASE_delta_sync import build_basis
+from BASE_files.BASE_backup_jobs import extract_backup_archive, rebuild_backup_from_delta
+from BASE_files.BASE_workers import WorkerPool
+from BASE_files.BASE_profiler import tick_profiler
+from BASE_files.BASE_gc import gc_policy
+from BASE_files.BASE_memory import memory_monitor, start_if_enabled as start_memory_monitor
+from BASE_files.BASE_sampler import stack_sampler, install_signal_handler, DEFAULT_SECONDS, DEFAULT_RATE
+from BASE_files.BASE_telemetry import ConnectionTelemetry, make_pong
+from BASE_files.BASE_metrics import Histogram, MetricsExporter, StageTimer, observe_duration, TICK_BUCKETS
+from BASE_files.BASE_framing import FrameReader, FrameOutbox, enable_nodelay, HEADER_SIZE
+from BASE_files.BASE_datagram import (
+    UdpSession, unpack_datagram, send_datagram, KIND_HELLO, KIND_INPUT, KIND_STATE, MAX_DATAGRAM_PAYLOAD
+)
+
+logger = get_logger("network.server")
+transfer_logger = get_logger("transfer")
+
+# Match lifecycle (GameServer.match_phase), driven by the game loop
+PHASE_LOBBY = "lobby"          # Players join; the arena is built at the first file sync
+PHASE_PLAYING = "playing"      # An arena exists and ticks
+PHASE_GAME_OVER = "game_over"  # Winner announced, restart_delay running
+PHASE_RESETTING = "resetting"  # Clients dropped, GameFolder being restored; new connections wait in the listen backlog
 
 class GameServer:
     """
     Authoritative server that runs the game simulation and broadcasts state to clients.
     """
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 5555, practice_mode: bool = False):
+    def __init__(self, host: str = "0.0.0.0", port: int = 5555, practice_mode: bool = False,
+                 metrics_port: Optional[int] = None, room_id: Optional[str] = None,
+                 workers: Optional[WorkerPool] = None):
+        """
+        room_id: set when this server is one room hosted by a RoomManager (BASE_rooms). A hosted
+        room opens no sockets or threads of its own: the manager hands it connections and drives
+        _network_pass() and _game_step(). Patches and transfers get a per-room directory.
+        Hosted rooms share GameFolder and the loaded game modules with every other room, so they
+        refuse patch merges and never restore GameFolder (see shares_game_code).
+        """
         self.host = host
         self.port = port
         self.practice_mode = practice_mode
+        self.room_id = room_id
         self.running = False
 
-        # Network setup
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server_socket.bind((host, port))
-        self.server_socket.listen(8)  # Max 8 players
-        self.server_socket.setblocking(False)
+        # Prometheus endpoint on localhost (see BASE_metrics); CC_METRICS_PORT enables it too
+        if metrics_port is None and os.getenv("CC_METRICS_PORT"):
+            metrics_port = int(os.getenv("CC_METRICS_PORT"))
+        self.metrics_port = metrics_port
+        self.metrics_exporter: Optional[MetricsExporter] = None
+        self.owns_memory_monitor = False  # True when start() started the process-wide memory monitor
+
+        # Network setup (a hosted room receives its connections from the RoomManager instead)
+        self.server_socket = None
+        self.udp_socket = None
+        if room_id is None:
+            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server_socket.bind((host, port))
+            self.server_socket.listen(8)  # Max 8 players
+            self.server_socket.setblocking(False)
+
+            # Optional datagram channel for game_state and input on the same port number (see BASE_datagram)
+            try:
+                self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self.udp_socket.bind((host, port))
+                self.udp_socket.setblocking(False)
+            except OSError as e:
+                print(f"[warning] UDP channel unavailable, clients will use TCP only: {e}")
+                self.udp_socket = None
+        self.udp_sessions: Dict[str, UdpSession] = {}  # player_id -> datagram session
+        self.udp_tokens: Dict[bytes, UdpSession] = {}  # session token -> session
 
         # Client management
         self.clients: Dict[str, socket.socket] = {}  # player_id -> socket
         self.client_addresses: Dict[str, Tuple[str, int]] = {}  # player_id -> (ip, port)
         self.input_queues: Dict[str, List] = defaultdict(list)  # player_id -> list of inputs
         self.last_input_ids: Dict[str, int] = {}  # player_id -> last processed input_id
+        self.received_input_ids: Dict[str, int] = {}  # player_id -> newest input_id queued (drops redundant frames)
         self.player_name_to_id: Dict[str, str] = {}  # requested_name -> assigned_player_id
         self.player_id_to_character: Dict[str, str] = {}  # assigned_player_id -> character_id
+        self.bot_players: List[str] = []  # Server-side characters with no client (load tests, bot rooms)
 
         # Pending connections (sockets waiting for player_name)
         self.pending_clients: Dict[socket.socket, Tuple[str, int]] = {}  # socket -> (ip, port)
+        self.frame_readers: Dict[socket.socket, FrameReader] = {}  # socket -> partially received frames
+        self.outbox = FrameOutbox()  # Outgoing frames, flushed once per game tick / network pass
+        self.telemetry: Dict[socket.socket, ConnectionTelemetry] = {}  # RTT, rates, sizes per connection
 
         # Game state
         self.arena = None
         self.tick_rate = 60  # 60 FPS simulation
         self.tick_interval = 1.0 / self.tick_rate
+
+        # Counters read by the metrics exporter (plain attributes, updated by the game thread only)
+        self.tick_durations = Histogram(TICK_BUCKETS)
+        self.ticks_run = 0
+        self.tick_overruns = 0
+        self.last_state_bytes = 0
+        self.state_bytes_total = 0
+        self.ticks_deferred = 0  # Hosted rooms: passes where the manager's tick budget ran out before this room
+        self.backup_request_times: Dict[str, float] = {}  # backup name -> when we first asked for it
         self.last_tick_time = 0.0
         self.game_start_time = 0.0
 
         # Auto-restart configuration
         self.restart_delay = 5.0  # seconds to wait before restart
         self.game_finished_time = 0.0
-        self.waiting_for_restart = False
+        self.match_phase = PHASE_LOBBY
+        self.phase_changed_at = time.perf_counter()
+        self.match_ended_at: Optional[float] = None
+        self.restart_timings: Dict[str, float] = {}  # Last restart: seconds spent in each phase, and the total
+        self.reset_lock = threading.Lock()  # Held during a reset; the network thread takes it for each pass
 
         # Empty server timeout configuration
         self.empty_server_timeout = 5.0  # seconds to wait with no clients before resetting
@@ -82,7 +159,11 @@ class GameServer:
 
         # File synchronization
         self.game_files = {}  # filename -> content
+        self.game_manifest = {}  # filename -> (sha256, size)
+        self.game_blobs = {}  # sha256 -> raw file bytes
         self._load_game_files()
+        # The GameFolder modules imported at startup match the files: a restart reloads only what differs
+        mark_game_code_loaded()
 
         # Patch synchronization for game start
         self.clients_patch_received: Set[str] = set()  # Track which clients have received patches
@@ -95,13 +176,26 @@ class GameServer:
         self.clients_file_sync_ack: Set[str] = set()  # Track clients who finished reloading classes
 
         # Server-side patch management
-        self.server_patches_dir = "__server_patches"
+        self.server_patches_dir = "__server_patches" if room_id is None else os.path.join("__server_patches", room_id)
         os.makedirs(self.server_patches_dir, mode=0o755, exist_ok=True)
         self.client_patches: Dict[str, List[Dict]] = {}  # player_id -> list of patch info
-        self.client_patch_files: Dict[str, Dict] = {}  # (player_id, patch_name) -> {'chunks': {}, 'total': N}
         self.clients_ready_status: Set[str] = set()  # Track which clients marked as ready
         self.client_backups: Dict[str, str] = {}  # player_id -> backup_name
-        self.client_backup_transfers: Dict[str, Dict] = {}  # (player_id:backup_name) -> transfer info
+
+        # File reads, hashes and archive extraction run here, never in the network/game loops
+        # (hosted rooms share their manager's pool)
+        self.owns_workers = workers is None
+        self.workers = workers if workers is not None else WorkerPool()
+
+        # Patch, backup and ad-hoc file transfers (streamed to disk, resumable; see BASE_transfer)
+        transfers_dir = os.path.join(PROJECT_ROOT, "__transfers", "server")
+        if room_id is not None:
+            transfers_dir = os.path.join(transfers_dir, room_id)
+        self.transfers = TransferEngine(self._send_transfer_message, transfers_dir)
+        self.transfers.register_handler('patch', self._receive_patch_file)
+        self.transfers.register_handler('backup', self._receive_client_backup)
+        self.transfers.register_handler('backup_delta', self._receive_backup_delta)
+        self.transfers.register_handler('file', self._receive_client_file)
 
         # Backup transfer tracking
         self.backup_transfer_in_progress = False
@@ -132,26 +226,51 @@ class GameServer:
         else:
             # Remote room - use the host as domain
             self.room_code = encrypt_code(host, port, "REMOTE")
+        if room_id is not None:
+            # Rooms sharing a port: the server's code plus the room id, which the manager routes on
+            self.room_code = f"{self.room_code}{ROOM_SEPARATOR}{room_id}"
 
     def _load_game_files(self):
-        """Load all Python files from GameFolder for synchronization."""
+        """Load all Python files from GameFolder and build the sync manifest."""
         game_folder = os.path.join(os.path.dirname(__file__), "GameFolder")
+        raw_files = {}
         for root, dirs, files in os.walk(game_folder):
             for file in files:
                 if file.endswith('.py'):
                     filepath = os.path.join(root, file)
-                    rel_path = os.path.relpath(filepath, os.path.dirname(__file__))
+                    # Manifest paths always use '/' so clients on any OS resolve them the same way
+                    rel_path = os.path.relpath(filepath, os.path.dirname(__file__)).replace(os.sep, '/')
 
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        self.game_files[rel_path] = content
-                        print(f"Loaded game file: {rel_path}")
+                        with open(filepath, 'rb') as f:
+                            raw_files[rel_path] = f.read()
                     except Exception as e:
                         print(f"Failed to load {rel_path}: {e}")
 
-    def _restore_gamefolder_to_base(self):
-        """Restore GameFolder to the base backup and clear module cache."""
+        self.game_files = {path: data.decode('utf-8', errors='replace') for path, data in raw_files.items()}
+        self.game_manifest, self.game_blobs = build_manifest(raw_files)
+        total_bytes = sum(size for _, size in self.game_manifest.values())
+        print(f"Loaded {len(self.game_manifest)} game files ({total_bytes} bytes) for synchronization")
+
+    @property
+    def shares_game_code(self) -> bool:
+        """
+        True for a room hosted by a RoomManager: GameFolder and sys.modules are shared with the
+        other rooms, and reloading them would swap classes under arenas this room cannot migrate.
+        """
+        return self.room_id is not None
+
+    def _restore_gamefolder_to_base(self, full: bool = False):
+        """
+        Restore GameFolder to the base backup.
+        Only the files that differ from the backup are rewritten and only the modules they
+        affect (and their importers) are reloaded; when the folder already matches the base
+        the loaded modules are kept as they are. `full` (or a failed incremental reload)
+        deletes and copies every file and clears the module cache instead.
+        A hosted room never merged anything into GameFolder, so it leaves the folder alone.
+        """
+        if self.shares_game_code:
+            return
         try:
             from coding.non_callable_tools.backup_handling import BackupHandler
             import traceback
@@ -167,13 +286,30 @@ class GameServer:
             backups_with_mtime = [(b, os.path.getmtime(os.path.join("__game_backups", b))) for b in backups]
             backups_with_mtime.sort(key=lambda x: x[1], reverse=True)
             base_backup = backups_with_mtime[0][0]
-            
-            print(f"Restoring GameFolder to base backup: {base_backup}")
-            success, _ = backup_handler.restore_backup(base_backup, target_path="GameFolder")
-            
-            if success:
+
+            restored = False
+            if not full:
+                copied, removed = backup_handler.sync_backup(base_backup, "GameFolder")
+                if not copied and not removed:
+                    print(f"[success] GameFolder already matches base backup {base_backup}, loaded modules kept")
+                    restored = True
+                # Only the rewritten and deleted modules and their importers are reloaded
+                elif reload_game_code() is not None:
+                    print(f"[success] GameFolder restored to base backup: {base_backup} "
+                          f"({len(copied)} files rewritten, {len(removed)} removed)")
+                    self._load_game_files()
+                    restored = True
+                else:
+                    print("[warning] Incremental reload after restore failed, restoring the full base backup")
+
+            if not restored:
+                print(f"Restoring GameFolder to base backup: {base_backup}")
+                success, _ = backup_handler.restore_backup(base_backup, target_path="GameFolder")
+                if not success:
+                    print(f"[warning] Failed to restore GameFolder to base backup: {base_backup}")
+                    return
                 print(f"[success] GameFolder restored to base backup: {base_backup}")
-                
+
                 # Clear Python module cache for GameFolder modules
                 modules_to_clear = [key for key in list(sys.modules.keys()) if key.startswith('GameFolder')]
                 for module_name in modules_to_clear:
@@ -183,22 +319,42 @@ class GameServer:
                         pass
                 importlib.invalidate_caches()
                 print(f"[success] Cleared {len(modules_to_clear)} cached GameFolder modules")
-                
+
                 # Reload game files after restore
                 self._load_game_files()
-                
-                # Clear any cached merged patch file
-                merged_patch_path = os.path.join(self.server_patches_dir, "merged_patch.json")
-                if os.path.exists(merged_patch_path):
-                    os.remove(merged_patch_path)
-                    print("[success] Cleared old merged_patch.json file")
-            else:
-                print(f"[warning] Failed to restore GameFolder to base backup: {base_backup}")
+
+            # Clear any cached merged patch file
+            merged_patch_path = os.path.join(self.server_patches_dir, "merged_patch.json")
+            if os.path.exists(merged_patch_path):
+                os.remove(merged_patch_path)
+                print("[success] Cleared old merged_patch.json file")
         except Exception as e:
             print(f"[error] Error restoring GameFolder to base backup: {e}")
             import traceback
             traceback.print_exc()
 
+    @property
+    def waiting_for_restart(self) -> bool:
+        return self.match_phase == PHASE_GAME_OVER
+
+    def _set_phase(self, phase: str):
+        """Move the match lifecycle on; from game over to the next match, time each phase."""
+        now = time.perf_counter()
+        if self.match_phase == PHASE_PLAYING and phase != PHASE_PLAYING:
+            gc_policy.match_ended(self)
+        if phase == PHASE_GAME_OVER:
+            self.match_ended_at = now
+            self.restart_timings = {}
+        elif self.match_ended_at is not None:
+            self.restart_timings[self.match_phase] = now - self.phase_changed_at
+            if phase == PHASE_PLAYING:
+                self.restart_timings['match_end_to_playable'] = now - self.match_ended_at
+                self.match_ended_at = None
+                print("⏱️  Match end to next match playable: " + ", ".join(
+                    f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.restart_timings.items()))
+        self.match_phase = phase
+        self.phase_changed_at = now
+
     def _get_available_backups(self) -> set:
         """Get set of backup names server has available."""
         backup_dir = "__game_backups"
@@ -206,14 +362,41 @@ class GameServer:
             return set()
         return {d for d in os.listdir(backup_dir) if os.path.isdir(os.path.join(backup_dir, d))}
 
-    def _request_backup_from_client(self, player_id: str, backup_name: str):
-        """Request backup transfer from client."""
-        message = {
-            'type': 'request_backup',
-            'backup_name': backup_name
-        }
-        self._send_message_to_client(player_id, message)
-        print(f"📨 BACKUP REQUEST: Server sent backup request to client '{player_id}' for backup '{backup_name}'")
+    def _closest_backup(self) -> Optional[str]:
+        """The most recently modified backup the server has: the basis for delta backup transfers."""
+        backup_dir = "__game_backups"
+        backups = [b for b in self._get_available_backups() if not b.startswith('.')]
+        if not backups:
+            return None
+        return max(backups, key=lambda b: os.path.getmtime(os.path.join(backup_dir, b)))
+
+    def _request_backup_from_client(self, player_id: str, backup_name: str, full: bool = False):
+        """
+        Request backup transfer from client.
+        Unless `full` is set, the request carries the digests and block signatures of our
+        closest backup so the client only sends what differs from it (see BASE_delta_sync).
+        """
+        basis_name = None if full else self._closest_backup()
+        self.backup_request_times.setdefault(backup_name, time.perf_counter())
+
+        def send_request(basis, error=None):
+            message = {
+                'type': 'request_backup',
+                'backup_name': backup_name
+            }
+            if basis is not None:
+                message['basis_name'] = basis_name
+                message['basis'] = basis
+            self._send_message_to_client(player_id, message)
+            print(f"📨 BACKUP REQUEST: Server sent backup request to client '{player_id}' for backup '{backup_name}'"
+                  + (f" (delta against '{basis_name}')" if basis is not None else ""))
+
+        if basis_name:
+            # Signatures of every basis file: hashed in the worker process, request sent from the network loop
+            self.workers.submit_cpu(build_basis, os.path.abspath(os.path.join("__game_backups", basis_name)),
+                                    callback=send_request)
+        else:
+            send_request(None)
 
     def start(self):
         """Start the server."""
@@ -227,6 +410,16 @@ class GameServer:
         print(f"🎮 ROOM CODE: {self.room_code}")
         print(f"{'='*60}\n")
 
+        # Spawn the worker process before the first match needs it
+        self.workers.warm_up()
+
+        if self.metrics_port is not None:
+            self.metrics_exporter = MetricsExporter(self, self.metrics_port)
+            self.metrics_exporter.start()
+
+        # Off unless CC_MEMORY_MONITOR=1 (tracemalloc slows every allocation down)
+        self.owns_memory_monitor = start_memory_monitor()
+
         # Start network thread
         network_thread = threading.Thread(target=self._network_loop, daemon=True)
         network_thread.start()
@@ -237,7 +430,18 @@ class GameServer:
     def stop(self):
         """Stop the server."""
         self.running = False
-        self.server_socket.close()
+        self.outbox.flush()
+        if self.owns_workers:
+            self.workers.shutdown()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        if self.owns_memory_monitor:
+            memory_monitor.stop()
+        gc_policy.match_ended(self)
+        if self.udp_socket is not None:
+            self.udp_socket.close()
+        if self.server_socket is not None:
+            self.server_socket.close()
         # Create a copy of client sockets to avoid "dictionary changed size during iteration" error
         for client_socket in list(self.clients.values()):
             try:
@@ -246,48 +450,120 @@ class GameServer:
                 pass
         print("Server stopped.")
 
-    def _send_data_safe(self, client_socket: socket.socket, data: bytes):
-        """Send data safely to a non-blocking socket by temporarily making it blocking."""
-        was_blocking = client_socket.gettimeout() is not None
-        try:
-            client_socket.setblocking(True)
-            client_socket.sendall(data)
-        finally:
-            client_socket.setblocking(False)
+    def _send_frame(self, client_socket: socket.socket, payload: bytes):
+        """
+        Queue one length-prefixed message for a client.
+        Everything queued for a client goes out in one batch at the next flush
+        (end of the game tick or of the network pass).
+        """
+        self.outbox.queue(client_socket, payload)
+        telemetry = self.telemetry.get(client_socket)
+        if telemetry is not None:
+            telemetry.record_sent(HEADER_SIZE + len(payload), self.outbox.pending_bytes(client_socket))
+
+    def _send_pings(self):
+        """Ping every registered client once per PING_INTERVAL (RTT is measured from the echoed pong)."""
+        for client_socket in list(self.clients.values()):
+            telemetry = self.telemetry.get(client_socket)
+            ping = telemetry.ping_due() if telemetry is not None else None
+            if ping is not None:
+                self._send_frame(client_socket, pickle.dumps(ping))
+
+    def client_telemetry(self) -> Dict[str, dict]:
+        """{player_id: telemetry snapshot} for every connected client."""
+        snapshots = {}
+        for player_id, client_socket in list(self.clients.items()):
+            telemetry = self.telemetry.get(client_socket)
+            if telemetry is not None:
+                snapshots[player_id] = telemetry.snapshot()
+        return snapshots
+
+    def _flush_outbox(self):
+        """Write all queued messages and drop clients whose socket failed or stopped reading."""
+        for client_socket in self.outbox.flush():
+            player_id = next((pid for pid, sock in list(self.clients.items()) if sock == client_socket), None)
+            if player_id:
+                print(f"Send to {player_id} failed or backlog too large, disconnecting")
+                self._handle_client_disconnect(player_id)
+            elif self.pending_clients.pop(client_socket, None) is not None:
+                self.frame_readers.pop(client_socket, None)
+                self.telemetry.pop(client_socket, None)
+                try:
+                    client_socket.close()
+                except OSError:
+                    pass
 
     def _network_loop(self):
         """Handle network connections and client communication."""
         while self.running:
             try:
                 # Check for new connections
-                try:
-                    client_socket, address = self.server_socket.accept()
-                    self._handle_new_connection(client_socket, address)
-                except BlockingIOError:
-                    pass  # No new connections
+                # A reset holds the lock: new connections wait in the listen backlog until it is done
+                with self.reset_lock:
+                    try:
+                        client_socket, address = self.server_socket.accept()
+                        self._handle_new_connection(client_socket, address)
+                    except BlockingIOError:
+                        pass  # No new connections
 
-                # Handle existing clients
-                self._handle_client_messages()
+                    self._network_pass()
 
                 time.sleep(0.01)  # Small delay to prevent busy waiting
 
             except Exception as e:
                 print(f"Network error: {e}")
 
+    def _network_pass(self, select_timeout: float = 0.01):
+        """One pass over the connected clients (the RoomManager runs it for every hosted room)."""
+        # Handle existing clients
+        self._handle_client_messages(select_timeout)
+
+        # Finish file/hash/archive jobs completed by the worker pool
+        self.workers.run_callbacks()
+
+        # RTT probes
+        self._send_pings()
+
+        # Replies produced while handling messages go out together
+        self._flush_outbox()
+
     def _handle_new_connection(self, client_socket: socket.socket, address: Tuple[str, int]):
         """Handle a new client connection."""
         print(f"New connection from {address}")
 
         # Add to pending clients - wait for player_name message
         self.pending_clients[client_socket] = address
+        # The only place a connection's telemetry is created; lookups never recreate it after a disconnect
+        self.telemetry[client_socket] = ConnectionTelemetry(self.tick_interval)
         client_socket.setblocking(False)
+        # Frames are batched per tick, so there is nothing for Nagle's algorithm to coalesce
+        enable_nodelay(client_socket)
 
         print(f"Waiting for player_name from {address}")
 
+    def _reload_game_code_live(self):
+        """
+        reload_game_code() without ending a running match: the live arena is migrated to the
+        reloaded classes (BASE_migration) and only rebuilt if they no longer fit its objects.
+        """
+        live_arena = self.arena
+        self.arena = None  # CRITICAL: Stop game loop from using objects while their classes are replaced
+        reloaded_setup = reload_game_code()
+        if live_arena is None or reloaded_setup is None:
+            return reloaded_setup
+
+        report = migrate_arena(live_arena)
+        if report.ok:
+            self.arena = live_arena
+        else:
+            print("[warning] Live arena does not fit the reloaded classes, rebuilding it")
+            self._recreate_arena_with_players()
+        return reloaded_setup
+
     def _recreate_arena_with_players(self):
         """Recreate the arena with the currently connected players."""
         # Get list of connected player names (these are already the custom names)
-        connected_player_names = list(self.clients.keys())
+        connected_player_names = list(self.clients.keys()) + self.bot_players
 
         # In practice mode, add a dummy AI player with unlimited lives
         if self.practice_mode and len(connected_player_names) == 1:
@@ -322,6 +598,10 @@ class GameServer:
                     player_name = connected_player_names[i]
                     character.id = player_name
 
+                    # Bot players never run out of lives: a bot room keeps its match going
+                    if player_name in self.bot_players:
+                        character.lives = float('inf')
+
                     # In practice mode, make AI bot have unlimited lives
                     if self.practice_mode and player_name == "AI_Bot_Practice":
                         # PRACTICE MODE ONLY: AI bot with unlimited lives for endless practice
@@ -331,6 +611,10 @@ class GameServer:
                         print("PRACTICE MODE: AI bot configured with unlimited lives (dies but respawns infinitely)")
                     
             print(f"[success] Arena recreated successfully with {len(self.arena.characters)} characters")
+            # Arena and game modules are set up: freeze them, raise the GC thresholds (BASE_gc)
+            gc_policy.match_started(self)
+            if self.match_phase != PHASE_PLAYING:
+                self._set_phase(PHASE_PLAYING)
             
         except ImportError as e:
             print(f"[error] Failed to import game modules: {e}")
@@ -428,8 +712,7 @@ class GameServer:
             }
             
             data = pickle.dumps(message)
-            length_bytes = len(data).to_bytes(4, byteorder='big')
-            self._send_data_safe(client_socket, length_bytes + data)
+            self._send_frame(client_socket, data)
             
             print(f"Sent merge patch to {player_id} ({len(patch_content)} bytes)")
         except Exception as e:
@@ -446,11 +729,10 @@ class GameServer:
             'type': 'game_start'
         }
         data = pickle.dumps(message)
-        length_bytes = len(data).to_bytes(4, byteorder='big')
 
         for player_id, client_socket in self.clients.items():
             try:
-                self._send_data_safe(client_socket, length_bytes + data)
+                self._send_frame(client_socket, data)
                 print(f"Sent game_start to {player_id}")
             except Exception as e:
                 print(f"Failed to send game_start to {player_id}: {e}")
@@ -471,72 +753,65 @@ class GameServer:
             'details': failure_details
         }
         data = pickle.dumps(message)
-        length_bytes = len(data).to_bytes(4, byteorder='big')
         
         for player_id, client_socket in self.clients.items():
             try:
-                self._send_data_safe(client_socket, length_bytes + data)
+                self._send_frame(client_socket, data)
                 print(f"Sent patch_sync_failed notification to {player_id}")
             except Exception as e:
                 print(f"Failed to send patch_sync_failed to {player_id}: {e}")
 
     def _send_file_sync(self, player_id: str):
-        """Send game files to client for synchronization."""
+        """Send the GameFolder manifest to a client; it requests the blobs it is missing."""
         try:
             client_socket = self.clients[player_id]
 
-            # Send file sync header
             sync_data = {
-                'type': 'file_sync',
-                'files': self.game_files
+                'type': 'file_manifest',
+                'manifest': self.game_manifest
             }
 
             data = pickle.dumps(sync_data)
-            # Send length first, then data
-            length_bytes = len(data).to_bytes(4, byteorder='big')
-            self._send_data_safe(client_socket, length_bytes + data)
+            self._send_frame(client_socket, data)
 
-            print(f"Sent file sync to {player_id}")
+            print(f"Sent file manifest to {player_id} ({len(self.game_manifest)} files, {len(data)} bytes)")
 
         except Exception as e:
             print(f"Failed to send file sync to {player_id}: {e}")
 
-    def _recv_exact(self, socket, size: int) -> Optional[bytes]:
-        """Receive exactly size bytes from non-blocking socket."""
-        data = b''
-        while len(data) < size:
-            try:
-                # Wait up to 5 seconds for data
-                ready, _, _ = select.select([socket], [], [], 5.0)
-                if ready:
-                    chunk = socket.recv(size - len(data))
-                    if not chunk:
-                        return None # Disconnected
-                    data += chunk
-                else:
-                    # Timeout waiting for data chunk - connection likely dead
-                    print(f"Timeout waiting for data in _recv_exact (expected {size} bytes, got {len(data)})")
-                    return None  # Return None instead of continuing forever
-            except BlockingIOError:
-                # Resource temporarily unavailable, try again
-                continue
-            except Exception as e:
-                print(f"Error in _recv_exact: {e}")
-                return None
-        return data
+    def _send_file_blobs(self, player_id: str, hashes: List[str]):
+        """Send the requested GameFolder blobs to a client."""
+        try:
+            client_socket = self.clients[player_id]
+
+            # Unknown hashes (files changed since the manifest was sent) are left out;
+            # the client notices and asks for a fresh manifest
+            blobs = {digest: self.game_blobs[digest] for digest in hashes if digest in self.game_blobs}
+            data = pickle.dumps({'type': 'file_blobs', 'blobs': blobs})
+            self._send_frame(client_socket, data)
+
+            print(f"Sent {len(blobs)}/{len(hashes)} file blobs to {player_id} ({len(data)} bytes)")
 
-    def _handle_client_messages(self):
+        except Exception as e:
+            print(f"Failed to send file blobs to {player_id}: {e}")
+
+    def _handle_client_messages(self, select_timeout: float = 0.01):
         """Receive and process messages from all clients."""
         # Check both regular clients and pending clients
         sockets_to_check = list(self.clients.values()) + list(self.pending_clients.keys())
 
         if not sockets_to_check:
             return
+        if self.udp_socket is not None:
+            sockets_to_check.append(self.udp_socket)
 
         try:
-            readable, _, _ = select.select(sockets_to_check, [], [], 0.01)
+            readable, _, _ = select.select(sockets_to_check, [], [], select_timeout)
 
             for client_socket in readable:
+                if client_socket is self.udp_socket:
+                    self._handle_datagrams()
+                    continue
                 try:
                     # Find player_id for this socket (check both regular and pending clients)
                     player_id = None
@@ -556,38 +831,37 @@ class GameServer:
                         else:
                             continue
 
-                    # Receive message
-                    length_bytes = client_socket.recv(4)
-                    if not length_bytes:
-                        # Client disconnected
-                        if is_pending:
-                            # Pending client disconnected
-                            if client_socket in self.pending_clients:
-                                address = self.pending_clients[client_socket]
-                                del self.pending_clients[client_socket]
-                                print(f"Pending client from {address} disconnected before sending player_name")
+                    # Receive whatever is available; a large message may take several passes
+                    reader = self.frame_readers.get(client_socket)
+                    if reader is None:
+                        reader = self.frame_readers[client_socket] = FrameReader()
+                    frames = reader.recv_from(client_socket)
+                    telemetry = self.telemetry.get(client_socket)
+
+                    for data in frames:
+                        if telemetry is not None:
+                            telemetry.record_received(HEADER_SIZE + len(data))
+                        if not is_pending and is_input_packet(data):
+                            # Binary input frames are decoded directly, no unpickling
+                            if telemetry is not None:
+                                telemetry.record_arrival()
+                            self._process_input_packet(player_id, data)
                         else:
-                            # Regular client disconnected
-                            self._handle_client_disconnect(player_id)
-                        continue
-
-                    message_length = int.from_bytes(length_bytes, byteorder='big')
+                            message = pickle.loads(data)
+                            self._process_client_message(player_id, message, client_socket)
+                            if is_pending and client_socket not in self.pending_clients:
+                                # Registered (or rejected) by player_name: later frames belong to the new player
+                                player_id = next((pid for pid, sock in self.clients.items() if sock == client_socket), None)
+                                is_pending = False
+                                if player_id is None:
+                                    break
 
-                    # Receive the actual message using robust reader
-                    data = self._recv_exact(client_socket, message_length)
-                    
-                    if data and len(data) == message_length:
-                        message = pickle.loads(data)
-                        self._process_client_message(player_id, message, client_socket)
-                    else:
-                        print(f"Failed to receive complete message body from {player_id}")
-                        if not is_pending:
-                            self._handle_client_disconnect(player_id)
-                
                 except BlockingIOError:
                     continue
                 except Exception as e:
-                    # Client likely disconnected
+                    # Client disconnected (ConnectionResetError on EOF) or sent a corrupt frame
+                    self.frame_readers.pop(client_socket, None)
+                    self.telemetry.pop(client_socket, None)
                     if is_pending:
                         # Pending client disconnected
                         if client_socket in self.pending_clients:
@@ -602,9 +876,81 @@ class GameServer:
         except Exception as e:
             print(f"Error handling client messages: {e}")
 
+    def _handle_datagrams(self):
+        """Read pending datagrams: HELLOs bind/refresh a session address, INPUTs carry input packets."""
+        for _ in range(256):  # Bounded so a flood cannot starve the TCP clients
+            try:
+                data, address = self.udp_socket.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                continue  # ICMP errors from earlier sends surface here on some platforms
+
+            parsed = unpack_datagram(data)
+            if parsed is None:
+                continue
+            token, sequence, kind, payload = parsed
+            session = self.udp_tokens.get(token)
+            if session is None or session.disabled or session.player_id not in self.clients:
+                continue
+
+            if session.address != address:
+                print(f"UDP channel for {session.player_id} bound to {address}")
+                session.address = address
+            telemetry = self.telemetry.get(self.clients[session.player_id])
+            if telemetry is not None:
+                telemetry.record_received(len(data))
+            if kind == KIND_HELLO:
+                send_datagram(self.udp_socket, token, 0, KIND_HELLO, address=address)
+            elif kind == KIND_INPUT and is_input_packet(payload):
+                # Input packets carry their own history; the server skips frames it already applied
+                if session.input_filter.accept(sequence):
+                    if telemetry is not None:
+                        telemetry.record_arrival()
+                    try:
+                        self._process_input_packet(session.player_id, payload)
+                    except ValueError:
+                        pass  # Malformed packet
+
+    def _offer_udp_channel(self, player_id: str):
+        """Issue a datagram session token over TCP; the client binds its UDP address with it."""
+        if self.udp_socket is None or player_id not in self.clients:
+            return
+        self._close_udp_session(player_id)
+        session = UdpSession(player_id)
+        self.udp_sessions[player_id] = session
+        self.udp_tokens[session.token] = session
+        offer = {'type': 'udp_offer', 'token': session.token, 'port': self.port}
+        self._send_frame(self.clients[player_id], pickle.dumps(offer))
+
+    def _close_udp_session(self, player_id: str):
+        session = self.udp_sessions.pop(player_id, None)
+        if session is not None:
+            self.udp_tokens.pop(session.token, None)
+
+    def _process_input_packet(self, player_id: str, data: bytes):
+        """Queue the frames of a binary input packet that have not been received yet."""
+        last_id = self.received_input_ids.get(player_id, self.last_input_ids.get(player_id, 0))
+        for sequence, actions, aim_x, aim_y in input_packet_frames(data):
+            input_id = unwrap_sequence(sequence, last_id)
+            if input_id is None:
+                continue  # Redundant copy of a frame we already queued
+            input_data = frame_to_input(actions, aim_x, aim_y)
+            input_data['type'] = 'input'
+            input_data['player_id'] = player_id
+            input_data['input_id'] = input_id
+            self.input_queues[player_id].append(input_data)
+            last_id = input_id
+        self.received_input_ids[player_id] = last_id
+
     def _handle_client_disconnect(self, player_id: str):
         """Handle client disconnection."""
         if player_id in self.clients:
+            self.frame_readers.pop(self.clients[player_id], None)
+            self.telemetry.pop(self.clients[player_id], None)
+            self.outbox.discard(self.clients[player_id])
+            self._close_udp_session(player_id)
+            self.transfers.peer_disconnected(player_id)
             try:
                 self.clients[player_id].close()
             except:
@@ -613,6 +959,7 @@ class GameServer:
             del self.client_addresses[player_id]
             if player_id in self.input_queues:
                 del self.input_queues[player_id]
+            self.received_input_ids.pop(player_id, None)
             # Remove from active character mapping
             if player_id in self.player_id_to_character:
                 del self.player_id_to_character[player_id]
@@ -646,6 +993,12 @@ class GameServer:
         if msg_type == 'input':
             # Add to input queue
             self.input_queues[player_id].append(message)
+            telemetry = self.telemetry.get(client_socket)
+            if telemetry is not None:
+                telemetry.record_arrival()
+            input_id = message.get('input_id', 0)
+            if input_id > self.received_input_ids.get(player_id, 0):
+                self.received_input_ids[player_id] = input_id
         elif msg_type == 'request_file_sync':
             # Client requested file synchronization
             # IMPORTANT: Do NOT create arena here - wait until client finishes reloading classes
@@ -655,6 +1008,9 @@ class GameServer:
             # Always send file_sync to ensure client loads latest classes
             # This is safe now because game hasn't started yet
             self._send_file_sync(player_id)
+        elif msg_type == 'request_blobs':
+            # Client compared the manifest with its blob cache and needs these files
+            self._send_file_blobs(player_id, message.get('hashes', []))
         elif msg_type == 'request_start_game':
             # Client requested to start the game - send merge patch to all clients
             print(f"Player {player_id} requested to start game")
@@ -762,9 +1118,8 @@ class GameServer:
                             'reason': 'Name already taken'
                         }
                         data = pickle.dumps(response)
-                        length_bytes = len(data).to_bytes(4, byteorder='big')
                         try:
-                            self._send_data_safe(client_socket, length_bytes + data)
+                            self._send_frame(client_socket, data)
                         except:
                             pass
                         return
@@ -798,25 +1153,38 @@ class GameServer:
                     'assigned_character': requested_name  # Use the requested name for display
                 }
                 data = pickle.dumps(response)
-                length_bytes = len(data).to_bytes(4, byteorder='big')
                 try:
-                    self._send_data_safe(self.clients[player_id], length_bytes + data)
+                    self._send_frame(self.clients[player_id], data)
                 except Exception as e:
                     print(f"Failed to send character assignment: {e}")
+
+                # Registered: offer the datagram channel for state and input
+                self._offer_udp_channel(player_id)
+                # Continue transfers to this player that a previous connection left unfinished
+                self.transfers.resume(player_id)
+        elif msg_type == 'udp_disable':
+            # Client received nothing over UDP and continues TCP-only
+            session = self.udp_sessions.get(player_id)
+            if session is not None:
+                session.disabled = True
+                print(f"{player_id} fell back to TCP-only (no datagrams reached it)")
+        elif msg_type == 'ping':
+            # Echo the client's own timestamp; it computes RTT with its clock
+            if client_socket is not None:
+                self._send_frame(client_socket, pickle.dumps(make_pong(message)))
+        elif msg_type == 'pong':
+            telemetry = self.telemetry.get(client_socket)
+            if telemetry is not None:
+                telemetry.record_pong(message)
+        elif msg_type == 'profiler':
+            # Admin: toggle the tick profiler or fetch its histograms
+            self._handle_profiler_request(player_id, message)
         elif msg_type == 'file_request':
             # Client requesting a file
             self._handle_file_request(player_id, message)
-        elif msg_type == 'file_chunk':
-            # Client sending a file chunk - check if it's a backup chunk
-            if message.get('is_backup', False):
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] 📦 ROUTING: Routing backup chunk {message.get('chunk_num', '?')} to _handle_backup_chunk")
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] 🔍 DEBUG SERVER: Received backup chunk from {player_id} - backup: {message.get('backup_name', 'unknown')}")
-                self._handle_backup_chunk(player_id, message)
-            else:
-                print(f"📦 ROUTING: Routing regular file chunk to _handle_file_chunk")
-                self._handle_file_chunk(player_id, message)
+        elif msg_type in TRANSFER_MESSAGE_TYPES:
+            # Patch/backup/file transfer traffic (offers, chunks, acks) in either direction
+            self.transfers.handle_message(player_id, message)
         elif msg_type == 'file_ack':
             # Client acknowledging file receipt
             success = message.get('success', True)
@@ -847,9 +1215,6 @@ class GameServer:
                 self.client_backups[player_id] = backup_name
 
             print(f"{player_id} selected {len(patches)} patch(es) from backup '{backup_name}'")
-        elif msg_type == 'patch_chunk':
-            # Client sending a patch file chunk
-            self._handle_patch_chunk(player_id, message)
         elif msg_type == 'patches_ready':
             # Client marked patches as ready
             self.clients_ready_status.add(player_id)
@@ -862,6 +1227,31 @@ class GameServer:
                 merge_thread = threading.Thread(target=self._merge_and_distribute_patches, daemon=True)
                 merge_thread.start()
 
+    def _handle_profiler_request(self, player_id: str, message: dict):
+        """
+        Admin message {'type': 'profiler', 'action': 'enable' | 'disable' | 'report' | 'sample'}.
+        'sample' starts the sampling profiler (BASE_sampler) for message['seconds'] at message['rate'].
+        Only accepted from clients on this machine; answered with a 'profiler_report'.
+        """
+        address = self.client_addresses.get(player_id)
+        if not address or not ipaddress.ip_address(address[0]).is_loopback:
+            print(f"Profiler request from {player_id} denied (not a local client)")
+            return
+
+        action = message.get('action', 'report')
+        if action == 'enable':
+            tick_profiler.enable()
+        elif action == 'disable':
+            tick_profiler.disable()
+        elif action == 'sample':
+            stack_sampler.start(message.get('seconds', DEFAULT_SECONDS), message.get('rate', DEFAULT_RATE))
+        report = tick_profiler.snapshot()
+        report['sampler'] = stack_sampler.status()
+        report['memory'] = memory_monitor.report()
+        report['gc'] = gc_policy.summary()
+        report['type'] = 'profiler_report'
+        self._send_message_to_client(player_id, report)
+
     def _handle_file_request(self, player_id: str, message: dict):
         """Handle a file request from a client."""
         file_path = message.get('file_path')
@@ -912,292 +1302,115 @@ class GameServer:
             self._send_message_to_client(player_id, response)
             return
 
-        # Send file in chunks
-        try:
-            file_size = os.path.getsize(full_path)
-            chunk_size = 64 * 1024  # 64KB chunks
-            total_chunks = (file_size + chunk_size - 1) // chunk_size
-
-            with open(full_path, 'rb') as f:
-                for chunk_num in range(total_chunks):
-                    chunk_data = f.read(chunk_size)
-
-                    chunk_message = {
-                        'type': 'file_chunk',
-                        'file_path': file_path,
-                        'chunk_num': chunk_num,
-                        'total_chunks': total_chunks,
-                        'data': chunk_data
-                    }
-
-                    self._send_message_to_client(player_id, chunk_message)
-
-            print(f"Sent file {file_path} to {player_id} ({total_chunks} chunks)")
-
-        except Exception as e:
-            print(f"Failed to send file {file_path} to {player_id}: {e}")
-            response = {
-                'type': 'file_complete',
-                'file_path': file_path,
-                'success': False,
-                'error': str(e)
-            }
-            self._send_message_to_client(player_id, response)
-
-    def _handle_file_chunk(self, player_id: str, message: dict):
-        """Handle a file chunk received from a client."""
-        file_path = message.get('file_path')
-        chunk_num = message.get('chunk_num')
-        total_chunks = message.get('total_chunks')
-        chunk_data = message.get('data')
-        is_backup = message.get('is_backup', False)
-
-        if not all([file_path, isinstance(chunk_num, int), isinstance(total_chunks, int), chunk_data]):
-            print(f"Invalid file chunk from {player_id}")
-            return
-
-        # Handle backup transfers differently
-        if is_backup:
-            self._handle_backup_chunk(player_id, message)
-            return
-
-        # Initialize file transfer tracking if needed
-        if not hasattr(self, 'client_file_transfers'):
-            self.client_file_transfers = {}
-
-        client_key = f"{player_id}:{file_path}"
-        if client_key not in self.client_file_transfers:
-            self.client_file_transfers[client_key] = {
-                'chunks': {},
-                'total_chunks': total_chunks,
-                'received_chunks': 0
-            }
-
-        transfer = self.client_file_transfers[client_key]
-
-        # Store chunk if not already received
-        if chunk_num not in transfer['chunks']:
-            transfer['chunks'][chunk_num] = chunk_data
-            transfer['received_chunks'] += 1
-
-        # Check if file is complete
-        if transfer['received_chunks'] == total_chunks:
-            self._assemble_client_file(player_id, file_path)
-
-    def _handle_backup_chunk(self, player_id: str, message: dict):
-        """Handle a backup file chunk received from a client."""
-        backup_name = message.get('backup_name')
-        chunk_num = message.get('chunk_num')
-        total_chunks = message.get('total_chunks')
-        chunk_data = message.get('data')
-
-        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-        print(f"[{timestamp}] 📦 BACKUP CHUNK: Received chunk {chunk_num+1 if isinstance(chunk_num, int) else '?'} from {player_id} for '{backup_name}'")
-        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-        print(f"[{timestamp}] 🔍 DEBUG: Message details - backup: {backup_name}, chunk: {chunk_num}/{total_chunks}, data_size: {len(chunk_data) if chunk_data else 0} bytes")
-        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-        print(f"[{timestamp}] 🔍 DEBUG: Current transfer state - in_progress: {getattr(self, 'backup_transfer_in_progress', False)}, expected_backup: {getattr(self, 'backup_transfer_name', 'None')}")
-
-        if not all([backup_name, isinstance(chunk_num, int), isinstance(total_chunks, int), chunk_data]):
-            print(f"[error] BACKUP CHUNK: Invalid backup chunk from {player_id}: missing or invalid fields")
-            return
-
-        # Reject invalid total_chunks
-        if total_chunks <= 0:
-            print(f"[error] BACKUP CHUNK: Invalid total_chunks {total_chunks} from {player_id}")
-            return
+        # Hash the file on an I/O thread, then stream it; chunks follow the client's acknowledgements
+        def offer_file(digest, error):
+            try:
+                if error is not None:
+                    raise error
+                self.transfers.offer(player_id, full_path, 'file', file_path, sha256=digest)
+                print(f"Sending file {file_path} to {player_id} ({os.path.getsize(full_path)} bytes)")
+            except Exception as e:
+                print(f"Failed to send file {file_path} to {player_id}: {e}")
+                response = {
+                    'type': 'file_complete',
+                    'file_path': file_path,
+                    'success': False,
+                    'error': str(e)
+                }
+                self._send_message_to_client(player_id, response)
 
-        # Validate chunk_num bounds
-        if chunk_num < 0 or chunk_num >= total_chunks:
-            print(f"[error] BACKUP CHUNK: Invalid chunk_num {chunk_num} (should be 0-{total_chunks-1}) from {player_id}")
-            return
+        self.workers.submit_io(file_sha256, full_path, callback=offer_file)
 
-        # Initialize backup transfer tracking if needed
-        if not hasattr(self, 'client_backup_transfers'):
-            self.client_backup_transfers = {}
-
-        client_key = f"{player_id}:{backup_name}"
-        if client_key not in self.client_backup_transfers:
-            print(f"📁 BACKUP CHUNK: Starting new transfer for '{backup_name}' from {player_id} ({total_chunks} chunks total)")
-            self.client_backup_transfers[client_key] = {
-                'chunks': {},
-                'total_chunks': total_chunks,
-                'received_chunks': 0
-            }
+    def _send_transfer_message(self, player_id: str, message: dict):
+        """Queue a transfer message (offer/chunk/ack) for a player; dropped if they left."""
+        client_socket = self.clients.get(player_id)
+        if client_socket is not None:
+            self._send_frame(client_socket, pickle.dumps(message))
 
-        transfer = self.client_backup_transfers[client_key]
-
-        # Store chunk if not already received
-        if chunk_num not in transfer['chunks']:
-            transfer['chunks'][chunk_num] = chunk_data
-            transfer['received_chunks'] += 1
-            progress = transfer['received_chunks'] / total_chunks * 100
-            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-            print(f"[{timestamp}] [success] BACKUP CHUNK: Stored chunk {chunk_num+1}/{total_chunks} ({progress:.1f}%) for '{backup_name}' from {player_id}")
-            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-            print(f"[{timestamp}] 📊 DEBUG: Chunk received - backup: {backup_name}, received: {transfer['received_chunks']}/{total_chunks}")
-        else:
-            print(f"[warning] BACKUP CHUNK: Duplicate chunk {chunk_num} for '{backup_name}' from {player_id}")
-
-        # Check if backup is complete
-        if transfer['received_chunks'] == total_chunks:
-            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-            print(f"[{timestamp}] 🎯 BACKUP CHUNK: All {total_chunks} chunks received for '{backup_name}' from {player_id}, starting assembly...")
-            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-            print(f"[{timestamp}] 🔄 DEBUG: Starting backup assembly for {backup_name}")
-            success = self._assemble_client_backup(player_id, backup_name)
+    def _receive_client_backup(self, player_id: str, archive_path: str, backup_name: str, meta: dict) -> Tuple[bool, str]:
+        """
+        Transfer handler for a backup archive a client streamed to us.
+        Extraction and hash verification run in the worker process; the outcome is reported
+        to the client (backup_transfer_success/failed) from the callback.
+        """
+        backup_dir = os.path.abspath("__game_backups")
+        os.makedirs(backup_dir, exist_ok=True)
+        backup_name = os.path.basename(backup_name)
+        job_archive = os.path.join(backup_dir, f".{backup_name}.tar.gz")
+        os.replace(archive_path, job_archive)
+        print(f"🔧 BACKUP ASSEMBLY: Extracting '{backup_name}' from {player_id} ({os.path.getsize(job_archive)} bytes compressed)")
+
+        def extracted(result, error):
+            success, reason = result if error is None else (False, str(error))
+            self._report_backup_result(player_id, backup_name, success, reason)
             if success:
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] [success] DEBUG: Backup assembly successful for {backup_name}")
-                if hasattr(self, 'backup_transfer_in_progress') and self.backup_transfer_in_progress:
-                    if backup_name == getattr(self, 'backup_transfer_name', None):
-                        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                        print(f"[{timestamp}] 🎉 BACKUP TRANSFER: Successfully completed transfer of '{backup_name}'")
-                        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                        print(f"[{timestamp}] 🚩 DEBUG: Setting backup_transfer_complete_event for {backup_name}")
-                        self.backup_transfer_in_progress = False
-                        # Signal completion to waiting thread
-                        if hasattr(self, 'backup_transfer_complete_event'):
-                            self.backup_transfer_complete_event.set()
-                            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                            print(f"[{timestamp}] 🎯 DEBUG: backup_transfer_complete_event.set() called")
-                        else:
-                            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                            print(f"[{timestamp}] [warning] DEBUG: backup_transfer_complete_event not found!")
+                print(f"[success] BACKUP ASSEMBLY: Extracted and verified backup '{backup_name}' from {player_id}")
             else:
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] 💥 BACKUP TRANSFER: Assembly failed for '{backup_name}' from {player_id}")
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] [error] DEBUG: Backup assembly failed - setting event anyway")
-                # Signal failure to waiting thread
-                if hasattr(self, 'backup_transfer_complete_event'):
-                    self.backup_transfer_complete_event.set()
-                    timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                    print(f"[{timestamp}] 🎯 DEBUG: backup_transfer_complete_event.set() called (failure)")
-                else:
-                    timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                    print(f"[{timestamp}] [warning] DEBUG: backup_transfer_complete_event not found on failure!")
-
-    def _assemble_client_backup(self, player_id: str, backup_name: str) -> bool:
-        """Assemble a complete backup from client chunks and extract it."""
-        client_key = f"{player_id}:{backup_name}"
-        if client_key not in self.client_backup_transfers:
-            print(f"[error] BACKUP ASSEMBLY: No transfer data found for '{backup_name}' from {player_id}")
-            return False
+                transfer_logger.error("💥 BACKUP TRANSFER: Assembly failed for '%s' from %s: %s", backup_name, player_id, reason)
+            self._finish_backup_transfer(backup_name, success)
 
-        transfer = self.client_backup_transfers[client_key]
-        print(f"🔧 BACKUP ASSEMBLY: Starting assembly of '{backup_name}' from {player_id} ({transfer['total_chunks']} chunks)")
-
-        try:
-            # Assemble the compressed backup data
-            backup_data = b''
-            for i in range(transfer['total_chunks']):
-                if i not in transfer['chunks']:
-                    print(f"[error] BACKUP ASSEMBLY: Missing chunk {i} for backup {backup_name}")
-                    return False
-                backup_data += transfer['chunks'][i]
-
-            print(f"📦 BACKUP ASSEMBLY: Assembled {len(backup_data)} bytes of compressed data for '{backup_name}'")
-
-            # Save to __game_backups directory
-            backup_dir = "__game_backups"
-            os.makedirs(backup_dir, exist_ok=True)
-
-            # Extract the compressed tar archive
-            import tarfile
-            import io
-
-            print(f"📂 BACKUP ASSEMBLY: Extracting '{backup_name}' to {backup_dir}/")
-            with io.BytesIO(backup_data) as bio:
-                with tarfile.open(fileobj=bio, mode='r:gz') as tar:
-                    # Extract to backup directory
-                    tar.extractall(path=backup_dir)
-
-            print(f"[success] BACKUP ASSEMBLY: Successfully extracted backup '{backup_name}' from {player_id}")
-
-            # Verify backup integrity by checking hash matches name
-            extracted_backup_path = os.path.join(backup_dir, backup_name)
-            if os.path.exists(extracted_backup_path):
-                from coding.non_callable_tools.backup_handling import BackupHandler
-                backup_handler = BackupHandler()
-                computed_hash = backup_handler.compute_directory_hash(extracted_backup_path, debug=True)
-                if computed_hash != backup_name:
-                    print(f"[error] BACKUP ASSEMBLY: Hash verification FAILED for '{backup_name}' from {player_id}")
-                    print(f"   Expected hash: {backup_name}")
-                    print(f"   Computed hash: {computed_hash}")
-                    
-                    # Clean up corrupted backup
-                    import shutil
-                    if os.path.isdir(extracted_backup_path):
-                        shutil.rmtree(extracted_backup_path)
-                    elif os.path.isfile(extracted_backup_path):
-                        os.remove(extracted_backup_path)
-                    
-                    # Send failure acknowledgment
-                    error_message = {
-                        'type': 'backup_transfer_failed',
-                        'backup_name': backup_name,
-                        'error': f'Hash verification failed: expected {backup_name}, got {computed_hash}'
-                    }
-                    self._send_message_to_client(player_id, error_message)
-                    print(f"📤 BACKUP ASSEMBLY: Sent hash verification failure acknowledgment to {player_id}")
-                    return False
-                else:
-                    print(f"[success] BACKUP ASSEMBLY: Hash verification PASSED for '{backup_name}' from {player_id}")
-
-
-            # Clean up transfer data
-            del self.client_backup_transfers[client_key]
-
-            # Send success acknowledgment to client
-            ack_message = {
-                'type': 'backup_transfer_success',
-                'backup_name': backup_name
-            }
-            self._send_message_to_client(player_id, ack_message)
-            print(f"📤 BACKUP ASSEMBLY: Sent success acknowledgment to {player_id} for '{backup_name}'")
+        self.workers.submit_cpu(extract_backup_archive, job_archive, backup_dir, backup_name, callback=extracted)
+        return True, ''
 
-            return True
-
-        except Exception as e:
-            print(f"[error] BACKUP ASSEMBLY: Failed to assemble backup {backup_name} from {player_id}: {e}")
-
-            # Send failure acknowledgment
-            error_message = {
-                'type': 'backup_transfer_failed',
-                'backup_name': backup_name,
-                'error': str(e)
-            }
-            self._send_message_to_client(player_id, error_message)
-            print(f"📤 BACKUP ASSEMBLY: Sent failure acknowledgment to {player_id} for '{backup_name}': {e}")
-
-            return False
-
-    def _assemble_client_file(self, player_id: str, file_path: str):
-        """Assemble a complete file from client chunks."""
-        client_key = f"{player_id}:{file_path}"
-        transfer = self.client_file_transfers[client_key]
+    def _receive_backup_delta(self, player_id: str, delta_path: str, backup_name: str, meta: dict) -> Tuple[bool, str]:
+        """
+        Transfer handler for a backup sent as a delta against one of our backups.
+        Rebuilt and verified in the worker process; if that fails the full archive is requested instead.
+        """
+        backup_dir = os.path.abspath("__game_backups")
+        backup_name = os.path.basename(backup_name)
+        basis_name = os.path.basename(meta.get('basis_name', ''))
+        job_delta = os.path.join(backup_dir, f".{backup_name}.delta")
+        os.replace(delta_path, job_delta)
+        delta_size = os.path.getsize(job_delta)
+
+        def rebuilt(result, error):
+            success, reason, (changed, literal) = result if error is None else (False, str(error), (0, 0))
+            if not success:
+                transfer_logger.error("💥 BACKUP DELTA: Rebuilding '%s' from %s failed (%s), requesting the full backup",
+                                      backup_name, player_id, reason)
+                self._request_backup_from_client(player_id, backup_name, full=True)
+                return
+            transfer_logger.info("🎉 BACKUP DELTA: Rebuilt '%s' from '%s' (%d changed files, %d new bytes, %d byte delta)",
+                                 backup_name, basis_name, changed, literal, delta_size)
+            self._report_backup_result(player_id, backup_name, True, '')
+            self._finish_backup_transfer(backup_name, True)
+
+        self.workers.submit_cpu(rebuild_backup_from_delta, job_delta, backup_dir, basis_name, backup_name, callback=rebuilt)
+        return True, ''
+
+    def _report_backup_result(self, player_id: str, backup_name: str, success: bool, error: str):
+        """Tell the sending client whether its backup was extracted and verified."""
+        if success:
+            message = {'type': 'backup_transfer_success', 'backup_name': backup_name}
+        else:
+            message = {'type': 'backup_transfer_failed', 'backup_name': backup_name, 'error': error}
+        self._send_message_to_client(player_id, message)
 
+    def _finish_backup_transfer(self, backup_name: str, success: bool):
+        """Clear the in-progress flag for the awaited backup and wake the waiting merge thread."""
+        requested = self.backup_request_times.pop(backup_name, None)
+        if requested is not None:
+            observe_duration('backup_transfer_seconds', time.perf_counter() - requested,
+                             result='ok' if success else 'failed')
+        if success and self.backup_transfer_in_progress and backup_name == self.backup_transfer_name:
+            transfer_logger.info("🎉 BACKUP TRANSFER: Successfully completed transfer of '%s'", backup_name)
+            self.backup_transfer_in_progress = False
+        # Signal the waiting merge thread either way
+        if hasattr(self, 'backup_transfer_complete_event'):
+            self.backup_transfer_complete_event.set()
+
+    def _receive_client_file(self, player_id: str, part_path: str, file_path: str, meta: dict) -> Tuple[bool, str]:
+        """Transfer handler for an ad-hoc file a client streamed to us; stored under uploads/."""
         try:
             # Security check: ensure the target path is safe
-            allowed_dirs = ['uploads', 'temp']
-            target_dir = allowed_dirs[0] if 'uploads' in allowed_dirs else 'temp'
-
-            # Create target directory if it doesn't exist
-            full_dir = os.path.join(os.path.dirname(__file__), target_dir)
+            full_dir = os.path.join(os.path.dirname(__file__), 'uploads')
             os.makedirs(full_dir, exist_ok=True)
 
             # Create safe filename
             safe_filename = os.path.basename(file_path).replace('..', '').replace('/', '_').replace('\\', '_')
             full_path = os.path.join(full_dir, f"{player_id}_{safe_filename}")
-
-            # Write file by combining chunks in order
-            with open(full_path, 'wb') as f:
-                for chunk_num in range(transfer['total_chunks']):
-                    if chunk_num in transfer['chunks']:
-                        f.write(transfer['chunks'][chunk_num])
-                    else:
-                        raise ValueError(f"Missing chunk {chunk_num}")
+            os.replace(part_path, full_path)
 
             # Send success acknowledgment
             response = {
@@ -1209,9 +1422,10 @@ class GameServer:
             self._send_message_to_client(player_id, response)
 
             print(f"Received and saved file from {player_id}: {full_path}")
+            return True, ''
 
         except Exception as e:
-            print(f"Failed to assemble file from {player_id}: {e}")
+            print(f"Failed to store file from {player_id}: {e}")
             response = {
                 'type': 'file_complete',
                 'file_path': file_path,
@@ -1219,11 +1433,7 @@ class GameServer:
                 'error': str(e)
             }
             self._send_message_to_client(player_id, response)
-
-        finally:
-            # Clean up transfer state
-            if client_key in self.client_file_transfers:
-                del self.client_file_transfers[client_key]
+            return False, str(e)
 
     def _send_message_to_client(self, player_id: str, message: dict):
         """Send a message to a specific client."""
@@ -1233,72 +1443,29 @@ class GameServer:
 
         try:
             data = pickle.dumps(message)
-            length_bytes = len(data).to_bytes(4, byteorder='big')
-            self._send_data_safe(self.clients[player_id], length_bytes + data)
+            self._send_frame(self.clients[player_id], data)
             print(f"📤 MSG SEND: Successfully sent '{message.get('type', 'unknown')}' message to {player_id}")
         except Exception as e:
             print(f"[error] MSG SEND: Failed to send '{message.get('type', 'unknown')}' message to {player_id}: {e}")
             # Client might have disconnected
             self._remove_client(player_id)
     
-    def _handle_patch_chunk(self, player_id: str, message: dict):
-        """Handle incoming patch file chunk from client."""
-        patch_name = message.get('patch_name')
-        chunk_num = message.get('chunk_num')
-        total_chunks = message.get('total_chunks')
-        chunk_data = message.get('data')
-        
-        if not all([patch_name, isinstance(chunk_num, int), isinstance(total_chunks, int), chunk_data]):
-            print(f"Invalid patch chunk from {player_id}")
-            return
-        
-        # Create tracking key
-        key = f"{player_id}:{patch_name}"
-        
-        if key not in self.client_patch_files:
-            self.client_patch_files[key] = {
-                'chunks': {},
-                'total': total_chunks,
-                'received': 0
-            }
-        
-        transfer = self.client_patch_files[key]
-        
-        # Store chunk if not already received
-        if chunk_num not in transfer['chunks']:
-            transfer['chunks'][chunk_num] = chunk_data
-            transfer['received'] += 1
-        
-        # Check if complete
-        if transfer['received'] == total_chunks:
-            self._assemble_patch_file(player_id, patch_name)
-    
-    def _assemble_patch_file(self, player_id: str, patch_name: str):
-        """Assemble complete patch file from chunks."""
-        key = f"{player_id}:{patch_name}"
-        transfer = self.client_patch_files[key]
-        
+    def _receive_patch_file(self, player_id: str, part_path: str, patch_name: str, meta: dict) -> Tuple[bool, str]:
+        """Transfer handler for a patch file a client streamed to us."""
         try:
             # Create player's patch directory with proper permissions
             player_patch_dir = os.path.join(self.server_patches_dir, player_id)
             os.makedirs(player_patch_dir, mode=0o755, exist_ok=True)
-            
-            # Write file
-            patch_path = os.path.join(player_patch_dir, f"{patch_name}.json")
-            with open(patch_path, 'wb') as f:
-                for chunk_num in range(transfer['total']):
-                    if chunk_num in transfer['chunks']:
-                        f.write(transfer['chunks'][chunk_num])
-                    else:
-                        raise ValueError(f"Missing chunk {chunk_num}")
-            
+
+            patch_path = os.path.join(player_patch_dir, f"{os.path.basename(patch_name)}.json")
+            os.replace(part_path, patch_path)
+
             print(f"[success] Received complete patch from {player_id}: {patch_name}")
-            
-            # Clean up transfer state
-            del self.client_patch_files[key]
-            
+            return True, ''
+
         except Exception as e:
-            print(f"Failed to assemble patch from {player_id}: {e}")
+            print(f"Failed to store patch from {player_id}: {e}")
+            return False, str(e)
 
     def _merge_and_distribute_patches(self):
         """
@@ -1308,7 +1475,13 @@ class GameServer:
         print("\n" + "="*60)
         print("STARTING PATCH MERGE PROCESS")
         print("="*60)
-        
+        stages = StageTimer('merge_stage_seconds')
+
+        if self.shares_game_code and any(self.client_patches.values()):
+            self._notify_patch_merge_failed(
+                f"Room {self.room_id} shares its game code with the other rooms on this server: patches are disabled")
+            return
+
         # Step 1: Validate base backup compatibility
         all_patches_info = list(self.client_patches.values())
         compatible, error = self._validate_base_backup_compatibility(all_patches_info)
@@ -1319,6 +1492,7 @@ class GameServer:
             return
         
         print("[success] Base backup validation passed")
+        stages.mark('validate')
 
         # Step 1.5: Ensure server has required backup
         required_backup = None
@@ -1375,6 +1549,8 @@ class GameServer:
                     self._notify_patch_merge_failed(f"Required backup '{required_backup}' not available")
                     return
 
+        stages.mark('fetch_backup')
+
         # Step 2: Collect all patch file paths
         all_patch_paths = []
         for player_id, patches_info in self.client_patches.items():
@@ -1385,6 +1561,7 @@ class GameServer:
                     all_patch_paths.append(patch_path)
         
         print(f"Found {len(all_patch_paths)} patch files to merge")
+        stages.mark('collect')
         
         if len(all_patch_paths) == 0:
             print("No patches to merge, starting game directly")
@@ -1431,6 +1608,7 @@ class GameServer:
                         break
 
                     base_backup_name = all_patches_info[0][0].get('base_backup', 'Unknown')
+                    from agent import auto_fix_conflicts
                     auto_fix_conflicts(settings, output_path, patch_paths=all_patch_paths, base_backup=base_backup_name)
                     
                     # Check if conflicts remain
@@ -1444,6 +1622,8 @@ class GameServer:
                 except Exception as e:
                     print(f"[error] Auto-fix failed: {e}")
         
+        stages.mark('merge')
+
         # Step 4: Check final result
         if not success:
             print("\n[error] MERGE FAILED AFTER 3 ATTEMPTS")
@@ -1454,6 +1634,7 @@ class GameServer:
 
         # Apply merged patch to server's GameFolder
         try:
+            from coding.non_callable_tools.version_control import VersionControl
             vc = VersionControl()
             vc.apply_all_changes(
                 needs_rebase=True,
@@ -1461,8 +1642,7 @@ class GameServer:
                 file_containing_patches=output_path,
                 skip_warnings=True
             )
-            self.arena = None  # CRITICAL: Stop game loop from using old objects before reload
-            reloaded_setup = reload_game_code() 
+            reloaded_setup = self._reload_game_code_live()
             if reloaded_setup:
                 # Re-import the setup function since it was imported at startup
                 from GameFolder.setup import setup_battle_arena
@@ -1472,17 +1652,18 @@ class GameServer:
 
             self._load_game_files()  # Reload with patched code
 
-            self.arena = None
             print("[success] Server GameFolder updated with merged patches")
         except Exception as e:
             print(f"[error] Failed to apply patches to server: {e}")
             self._notify_patch_merge_failed(f"Server patch application failed: {e}")
             return
 
+        stages.mark('apply')
         print("Distributing to clients")
 
         # Step 5: Send merged patch to all clients
         self._initiate_game_start_with_patch_sync(output_path)
+        stages.mark('distribute')
     
     def _validate_base_backup_compatibility(self, all_patches_info: List[List[Dict]]) -> tuple:
         """Validate that all patches use the same base backup."""
@@ -1537,6 +1718,7 @@ class GameServer:
             base_backup_name = data.get('name_of_backup', 'Unknown')
         
         # Create version control instance
+        from coding.non_callable_tools.version_control import VersionControl
         vc = VersionControl()
         
         # Start with first two patches
@@ -1599,11 +1781,10 @@ class GameServer:
             'reason': reason
         }
         data = pickle.dumps(message)
-        length_bytes = len(data).to_bytes(4, byteorder='big')
         
         for player_id, client_socket in self.clients.items():
             try:
-                self._send_data_safe(client_socket, length_bytes + data)
+                self._send_frame(client_socket, data)
             except Exception as e:
                 print(f"Failed to notify {player_id}: {e}")
         
@@ -1616,106 +1797,138 @@ class GameServer:
         print("Starting game simulation...")
 
         while self.running:
-            current_time = time.time()
+            self._game_step(time.time())
 
-            # Check if we need to restart after game over (skip in practice mode)
-            if self.waiting_for_restart and not self.practice_mode:
-                if current_time - self.game_finished_time >= self.restart_delay:
-                    self._restart_server()
-                    continue
+            # Everything queued for a client this iteration leaves in one write
+            self._flush_outbox()
 
-            # Check if game just finished (send restart message immediately)
-            # Skip game over logic in practice mode
-            if self.arena and self.arena.game_over and not self.waiting_for_restart and not self.practice_mode:
-                self.game_finished_time = time.time()
-                self.waiting_for_restart = True
-
-                winner_name = self.arena.winner.id if self.arena.winner and hasattr(self.arena.winner, 'id') else "Unknown"
-                print(f"\n🎉 GAME OVER! Winner: {winner_name}")
-                print(f"🏆 Server will restart in {self.restart_delay} seconds...")
-
-                # Send restart message to all clients
-                restart_message = {
-                    'type': 'game_restarting',
-                    'winner': winner_name,
-                    'restart_delay': self.restart_delay,
-                    'message': f'Game finished! Winner: {winner_name}. Server restarting in {self.restart_delay} seconds...'
-                }
-                data = pickle.dumps(restart_message, protocol=4)
-                length_bytes = len(data).to_bytes(4, byteorder='big')
+            # Young garbage collections run here, in the time left before the next tick
+            gc_policy.idle(self.last_tick_time + self.tick_interval - time.time())
 
-                for player_id, client_socket in self.clients.items():
-                    try:
-                        self._send_data_safe(client_socket, length_bytes + data)
-                        print(f"Sent restart notification to {player_id}")
-                    except Exception as e:
-                        print(f"Failed to send restart notification to {player_id}: {e}")
+            # Sleep to prevent busy waiting
+            time.sleep(0.001)
 
-            # Check if server has been empty too long
-            if self.waiting_for_clients and len(self.clients) == 0:
-                if current_time - self.last_client_disconnect_time >= self.empty_server_timeout:
-                    self._reset_empty_server()
-                    continue
+    def _game_step(self, current_time: float) -> bool:
+        """Restart/reset checks, then one simulation tick if it is due. Returns True if it ticked."""
+        # Check if we need to restart after game over (skip in practice mode)
+        if self.match_phase == PHASE_GAME_OVER and not self.practice_mode:
+            if current_time - self.game_finished_time >= self.restart_delay:
+                self._restart_server()
+                return False
+
+        # Check if game just finished (send restart message immediately)
+        # Skip game over logic in practice mode
+        if self.arena and self.arena.game_over and not self.waiting_for_restart and not self.practice_mode:
+            self.game_finished_time = time.time()
+            self._set_phase(PHASE_GAME_OVER)
+
+            winner_name = self.arena.winner.id if self.arena.winner and hasattr(self.arena.winner, 'id') else "Unknown"
+            print(f"\n🎉 GAME OVER! Winner: {winner_name}")
+            print(f"🏆 Server will restart in {self.restart_delay} seconds...")
+
+            # Send restart message to all clients
+            restart_message = {
+                'type': 'game_restarting',
+                'winner': winner_name,
+                'restart_delay': self.restart_delay,
+                'message': f'Game finished! Winner: {winner_name}. Server restarting in {self.restart_delay} seconds...'
+            }
+            data = pickle.dumps(restart_message, protocol=4)
+
+            for player_id, client_socket in self.clients.items():
+                try:
+                    self._send_frame(client_socket, data)
+                    print(f"Sent restart notification to {player_id}")
+                except Exception as e:
+                    print(f"Failed to send restart notification to {player_id}: {e}")
 
-            # Fixed timestep game update
-            if current_time - self.last_tick_time >= self.tick_interval:
+        # Check if server has been empty too long
+        if self.waiting_for_clients and len(self.clients) == 0:
+            if current_time - self.last_client_disconnect_time >= self.empty_server_timeout:
+                self._reset_empty_server()
+                return False
+
+        # Fixed timestep game update
+        if current_time - self.last_tick_time >= self.tick_interval:
+            tick_start = time.perf_counter()
+            with tick_profiler.phase('tick'):
                 self._update_simulation(self.tick_interval)
                 self._broadcast_game_state()
-                self.last_tick_time = current_time
-
-            # Sleep to prevent busy waiting
-            time.sleep(0.001)
+                with tick_profiler.phase('flush'):
+                    self._flush_outbox()
+            tick_seconds = time.perf_counter() - tick_start
+            self.tick_durations.observe(tick_seconds)
+            self.ticks_run += 1
+            if tick_seconds > self.tick_interval:
+                self.tick_overruns += 1
+            self.last_tick_time = current_time
+            tick_profiler.tick()
+            return True
+        return False
 
     def _restart_server(self):
-        """Reset server state and notify clients to disconnect."""
+        """
+        Reset server state and disconnect the clients so they rejoin for the next match.
+        The reset runs under reset_lock (PHASE_RESETTING): connections arriving meanwhile wait
+        in the listen backlog and are served as soon as it is done (PHASE_LOBBY), no fixed pause.
+        """
         print("\n" + "="*50)
         print("GAME FINISHED - RESTARTING SERVER")
         print("="*50)
 
-        # Disconnect all clients FIRST
-        for player_id in list(self.clients.keys()):
-            try:
-                self.clients[player_id].close()
-            except:
-                pass
+        with self.reset_lock:
+            self._set_phase(PHASE_RESETTING)
 
-        # Reset all server state
-        self.clients.clear()
-        self.client_addresses.clear()
-        self.input_queues.clear()
-        self.last_input_ids.clear()
-        self.player_name_to_id.clear()
-        self.player_id_to_character.clear()
-        self.pending_clients.clear()
+            # Disconnect all clients FIRST
+            for player_id in list(self.clients.keys()):
+                self.outbox.discard(self.clients[player_id])
+                self.frame_readers.pop(self.clients[player_id], None)
+                self.telemetry.pop(self.clients[player_id], None)
+                try:
+                    self.clients[player_id].close()
+                except:
+                    pass
+
+            # Reset all server state
+            self.clients.clear()
+            self.client_addresses.clear()
+            self.input_queues.clear()
+            self.last_input_ids.clear()
+            self.received_input_ids.clear()
+            self.udp_sessions.clear()
+            self.udp_tokens.clear()
+            self.transfers.cancel()
+            self.player_name_to_id.clear()
+            self.player_id_to_character.clear()
+            self.pending_clients.clear()
+
+            # Reset patch synchronization state
+            self.clients_patch_received.clear()
+            self.clients_patch_ready.clear()
+            self.clients_patch_failed.clear()
+            self.waiting_for_patch_sync = False
+            self.waiting_for_patch_received = False
+            self.client_patches.clear()
+            self.clients_ready_status.clear()
+            if hasattr(self, 'clients_file_sync_ack'):
+                self.clients_file_sync_ack.clear()
 
-        # Reset patch synchronization state
-        self.clients_patch_received.clear()
-        self.clients_patch_ready.clear()
-        self.clients_patch_failed.clear()
-        self.waiting_for_patch_sync = False
-        self.waiting_for_patch_received = False
-        self.client_patches.clear()
-        self.client_patch_files.clear()
-        self.clients_ready_status.clear()
-        if hasattr(self, 'clients_file_sync_ack'):
-            self.clients_file_sync_ack.clear()
+            # CRITICAL: Restore GameFolder to base backup before resetting game state
+            self._restore_gamefolder_to_base()
 
-        # CRITICAL: Restore GameFolder to base backup before resetting game state
-        self._restore_gamefolder_to_base()
+            # Reset game state
+            self.arena = None
+            self.game_start_time = time.time()
+            self.game_finished_time = 0.0
 
-        # Reset game state
-        self.arena = None
-        self.game_start_time = time.time()
-        self.waiting_for_restart = False
-        self.game_finished_time = 0.0
+            # Reset arena initialization flag
+            if hasattr(self, '_arena_initialized'):
+                delattr(self, '_arena_initialized')
 
-        # Reset arena initialization flag
-        if hasattr(self, '_arena_initialized'):
-            delattr(self, '_arena_initialized')
+            self._set_phase(PHASE_LOBBY)
 
-        print("Server reset complete. All clients disconnected.")
-        # Give clients time to detect disconnection before accepting new connections
-        time.sleep(2.0)
+        print(f"Server reset complete in {self.restart_timings.get(PHASE_RESETTING, 0.0) * 1000:.0f} ms. "
+              "All clients disconnected.")
         print("Players can now reconnect and start a new game.")
 
     def _reset_empty_server(self):
@@ -1724,41 +1937,46 @@ class GameServer:
         print("SERVER EMPTY - RESETTING TO LOBBY")
         print("="*60)
 
-        # Cancel empty server timeout
-        self.waiting_for_clients = False
-        self.last_client_disconnect_time = 0.0
-
-        # Reset all server state (similar to restart but without disconnecting clients since there are none)
-        self.input_queues.clear()
-        self.last_input_ids.clear()
-        self.player_name_to_id.clear()
-        self.player_id_to_character.clear()
-        self.pending_clients.clear()
+        with self.reset_lock:
+            # Cancel empty server timeout
+            self.waiting_for_clients = False
+            self.last_client_disconnect_time = 0.0
+
+            # Reset all server state (similar to restart but without disconnecting clients since there are none)
+            self.input_queues.clear()
+            self.last_input_ids.clear()
+            self.received_input_ids.clear()
+            self.udp_sessions.clear()
+            self.udp_tokens.clear()
+            self.transfers.cancel()
+            self.player_name_to_id.clear()
+            self.player_id_to_character.clear()
+            self.pending_clients.clear()
+
+            # Reset patch synchronization state
+            self.clients_patch_received.clear()
+            self.clients_patch_ready.clear()
+            self.clients_patch_failed.clear()
+            self.waiting_for_patch_sync = False
+            self.waiting_for_patch_received = False
+            self.client_patches.clear()
+            self.clients_ready_status.clear()
+            if hasattr(self, 'clients_file_sync_ack'):
+                self.clients_file_sync_ack.clear()
 
-        # Reset patch synchronization state
-        self.clients_patch_received.clear()
-        self.clients_patch_ready.clear()
-        self.clients_patch_failed.clear()
-        self.waiting_for_patch_sync = False
-        self.waiting_for_patch_received = False
-        self.client_patches.clear()
-        self.client_patch_files.clear()
-        self.clients_ready_status.clear()
-        if hasattr(self, 'clients_file_sync_ack'):
-            self.clients_file_sync_ack.clear()
+            # CRITICAL: Restore GameFolder to base backup before resetting game state
+            self._restore_gamefolder_to_base()
 
-        # CRITICAL: Restore GameFolder to base backup before resetting game state
-        self._restore_gamefolder_to_base()
+            # Reset game state
+            self.arena = None
+            self.game_start_time = time.time()
+            self.game_finished_time = 0.0
 
-        # Reset game state
-        self.arena = None
-        self.game_start_time = time.time()
-        self.waiting_for_restart = False
-        self.game_finished_time = 0.0
+            # Reset arena initialization flag
+            if hasattr(self, '_arena_initialized'):
+                delattr(self, '_arena_initialized')
 
-        # Reset arena initialization flag
-        if hasattr(self, '_arena_initialized'):
-            delattr(self, '_arena_initialized')
+            self._set_phase(PHASE_LOBBY)
 
         print("Server reset to lobby state. Waiting for players to join...")
 
@@ -1768,14 +1986,16 @@ class GameServer:
             return
 
         # Process all queued inputs
-        for player_id, inputs in self.input_queues.items():
-            for input_data in inputs:
-                self._apply_player_input(player_id, input_data)
-            # Clear processed inputs
-            inputs.clear()
+        with tick_profiler.phase('input_drain'):
+            for player_id, inputs in self.input_queues.items():
+                for input_data in inputs:
+                    self._apply_player_input(player_id, input_data)
+                # Clear processed inputs
+                inputs.clear()
 
         # Update arena (physics, collisions, etc.)
-        self.arena.update(delta_time)
+        with tick_profiler.phase('simulation'):
+            self.arena.update(delta_time)
 
     def _apply_player_input(self, player_id: str, input_data: dict):
         """Apply input from a client to the corresponding character."""
@@ -1815,6 +2035,33 @@ class GameServer:
         if not set(self.clients.keys()).issubset(self.clients_file_sync_ack):
             return
 
+        with tick_profiler.phase('serialize'):
+            data = self._serialize_game_state()
+        if data is None:
+            return
+        self.last_state_bytes = len(data)
+        self.state_bytes_total += len(data)
+
+        # Clients with a bound datagram channel get the state as one sequenced datagram.
+        # Everyone else gets it queued on TCP; the game loop flushes each client's frames
+        # for this tick together and disconnects clients whose send failed.
+        # Create snapshot to avoid RuntimeError if dictionary is modified during iteration
+        with tick_profiler.phase('send'):
+            for player_id, client_socket in list(self.clients.items()):
+                telemetry = self.telemetry.get(client_socket)
+                if telemetry is not None:
+                    telemetry.record_state(len(data))
+                session = self.udp_sessions.get(player_id)
+                if session is not None and session.active and len(data) <= MAX_DATAGRAM_PAYLOAD:
+                    send_datagram(self.udp_socket, session.token, session.next_sequence(), KIND_STATE, data,
+                                  session.address)
+                    if telemetry is not None:
+                        telemetry.record_sent(len(data), self.outbox.pending_bytes(client_socket))
+                else:
+                    self._send_frame(client_socket, data)
+
+    def _serialize_game_state(self) -> Optional[bytes]:
+        """Pickle the current game state once for every client (None if it cannot be serialized)."""
         # Collect all network objects
         # Build character states with input ID tracking
         character_states = []
@@ -1835,7 +2082,7 @@ class GameServer:
         # Check if game just finished
         if self.arena.game_over and not self.waiting_for_restart:
             self.game_finished_time = time.time()
-            self.waiting_for_restart = True
+            self._set_phase(PHASE_GAME_OVER)
 
             winner_name = self.arena.winner.id if self.arena.winner and hasattr(self.arena.winner, 'id') else "Unknown"
             print(f"\n🎉 GAME OVER! Winner: {winner_name}")
@@ -1849,11 +2096,10 @@ class GameServer:
                 'message': f'Game finished! Winner: {winner_name}. Server restarting in {self.restart_delay} seconds...'
             }
             data = pickle.dumps(restart_message, protocol=4)
-            length_bytes = len(data).to_bytes(4, byteorder='big')
 
             for player_id, client_socket in self.clients.items():
                 try:
-                    self._send_data_safe(client_socket, length_bytes + data)
+                    self._send_frame(client_socket, data)
                 except Exception as e:
                     print(f"Failed to send restart notification to {player_id}: {e}")
 
@@ -1877,7 +2123,6 @@ class GameServer:
         try:
             # Use protocol 4 for better compatibility and to avoid encoding issues
             data = pickle.dumps(game_state, protocol=4)
-            length_bytes = len(data).to_bytes(4, byteorder='big')
         except Exception as e:
             print(f"[warning] Failed to serialize game state: {e}")
             # DEBUG: Diagnose class mismatch
@@ -1898,21 +2143,9 @@ class GameServer:
                 print(f"Error during debug printing: {debug_e}")
             
             # Skip this broadcast frame to prevent server crash
-            return
-
-        # Send to all clients
-        disconnected_clients = []
-        # Create snapshot to avoid RuntimeError if dictionary is modified during iteration
-        for player_id, client_socket in list(self.clients.items()):
-            try:
-                self._send_data_safe(client_socket, length_bytes + data)
-            except Exception as e:
-                print(f"Failed to send to {player_id}: {e}")
-                disconnected_clients.append(player_id)
+            return None
 
-        # Clean up disconnected clients
-        for player_id in disconnected_clients:
-            self._handle_client_disconnect(player_id)
+        return data
 
 
 def main():
@@ -1924,10 +2157,30 @@ def main():
     parser.add_argument('--host', default='0.0.0.0', help='Server host (default: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=5555, help='Server port (default: 5555)')
     parser.add_argument('--practice', action='store_true', help='Enable practice mode (no auto-restart)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics on 127.0.0.1:PORT/metrics (default: off)')
+    parser.add_argument('--rooms', type=int, default=1,
+                        help='Host this many independent rooms on the port (default: 1, a plain server)')
+    parser.add_argument('--shards', type=int, default=0,
+                        help='Run the rooms in this many worker processes behind a router (default: 0, one process)')
 
     args = parser.parse_args()
 
-    server = GameServer(args.host, args.port, practice_mode=args.practice)
+    # SIGUSR1 samples every thread's stack for a while (BASE_sampler)
+    install_signal_handler()
+
+    if args.shards > 0:
+        from BASE_files.BASE_shards import ShardRouter
+        server = ShardRouter(args.host, args.port, workers=args.shards)
+        for _ in range(args.rooms):
+            server.create_room(practice_mode=args.practice)
+    elif args.rooms > 1:
+        from BASE_files.BASE_rooms import RoomManager
+        server = RoomManager(args.host, args.port, metrics_port=args.metrics_port)
+        for _ in range(args.rooms):
+            server.create_room(practice_mode=args.practice)
+    else:
+        server = GameServer(args.host, args.port, practice_mode=args.practice, metrics_port=args.metrics_port)
 
     try:
         server.start()
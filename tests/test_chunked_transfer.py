@@ -0,0 +1,190 @@
+"""
+Tests for the streaming transfer engine (BASE_files/BASE_transfer.py).
+Runs two engines over an in-memory link to check the in-flight window, peak
+memory for a file much larger than the window, corrupt-chunk retries, whole-file
+hash failures and resuming from the .part file, then streams a file from a real
+NetworkClient to a live GameServer across a disconnect/reconnect.
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+import tracemalloc
+from collections import deque
+from BASE_components.BASE_test_helpers import free_port, temporary_directory
+from BASE_files.BASE_transfer import TransferEngine, file_sha256, CHUNK_SIZE, WINDOW_CHUNKS
+from BASE_files.network_client import NetworkClient
+
+FILE_SIZE = 32 * 1024 * 1024
+
+
+class _Link:
+    """In-memory link between a sender and a receiver engine; messages are pickled like on the wire."""
+
+    def __init__(self, temp_dir, window=WINDOW_CHUNKS):
+        self.queue = deque()  # (destination, pickled message)
+        self.sender = TransferEngine(lambda peer, m: self._put('receiver', m), str(temp_dir / 'sender'), window=window)
+        self.receiver = TransferEngine(lambda peer, m: self._put('sender', m), str(temp_dir / 'receiver'), window=window)
+        self.received = {}
+        self.corrupt_offsets = set()
+        self.max_in_flight = 0
+
+        def store(peer, part_path, name, meta):
+            self.received[name] = file_sha256(part_path)
+            return True, ''
+        self.receiver.register_handler('blob', store)
+
+    def _put(self, destination, message):
+        if message['type'] == 'transfer_chunk' and message['offset'] in self.corrupt_offsets:
+            self.corrupt_offsets.discard(message['offset'])
+            message = dict(message, data=b'x' + message['data'][1:])
+        self.queue.append((destination, pickle.dumps(message)))
+        in_flight = sum(1 for d, m in self.queue if d == 'receiver') * CHUNK_SIZE
+        self.max_in_flight = max(self.max_in_flight, in_flight)
+
+    def run(self, limit=None):
+        """Deliver messages until the link is idle (or `limit` deliveries)."""
+        delivered = 0
+        while self.queue and (limit is None or delivered < limit):
+            destination, data = self.queue.popleft()
+            engine = self.receiver if destination == 'receiver' else self.sender
+            engine.handle_message('sender' if destination == 'receiver' else 'receiver', pickle.loads(data))
+            delivered += 1
+
+
+def _write_random_file(path, size):
+    with open(path, 'wb') as f:
+        for _ in range(size // (1024 * 1024)):
+            f.write(os.urandom(1024 * 1024))
+        f.write(os.urandom(size % (1024 * 1024)))
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def test_window_bounds_memory_for_large_file():
+    """A 32 MB file streams with at most one window in flight and peak memory far below the file size."""
+    with temporary_directory() as tmp_path:
+        source = tmp_path / 'big.bin'
+        expected = _write_random_file(source, FILE_SIZE)
+        link = _Link(tmp_path)
+        done = []
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        link.sender.offer('receiver', str(source), 'blob', 'big', on_done=lambda ok, err: done.append(ok))
+        link.run()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert done == [True]
+        assert link.received['big'] == expected
+        assert link.max_in_flight <= WINDOW_CHUNKS * CHUNK_SIZE
+        assert peak < 8 * 1024 * 1024, f"Peak memory {peak} should be bounded by the window, not the file"
+        assert not os.listdir(tmp_path / 'receiver'), ".part file should be gone after completion"
+        print(f"32 MB in {elapsed:.2f}s ({FILE_SIZE / elapsed / 1024 / 1024:.0f} MB/s), "
+              f"peak traced memory {peak / 1024 / 1024:.1f} MB, max in flight {link.max_in_flight // 1024} KB")
+
+
+def test_corrupt_chunk_is_resent_and_bad_file_hash_fails():
+    with temporary_directory() as tmp_path:
+        source = tmp_path / 'data.bin'
+        expected = _write_random_file(source, 5 * CHUNK_SIZE + 123)
+
+        link = _Link(tmp_path)
+        link.corrupt_offsets = {2 * CHUNK_SIZE}
+        done = []
+        link.sender.offer('receiver', str(source), 'blob', 'data', on_done=lambda ok, err: done.append(ok))
+        link.run()
+        assert done == [True] and link.received['data'] == expected
+        assert link.sender.chunks_retried == 1
+
+        # An offer whose whole-file hash does not match the content fails
+        link = _Link(tmp_path / 'second')
+        done = []
+        link.sender.offer('receiver', str(source), 'blob', 'data', on_done=lambda ok, err: done.append((ok, err)))
+        destination, data = link.queue.popleft()
+        offer = pickle.loads(data)
+        offer['sha256'] = '0' * 64
+        link.queue.appendleft((destination, pickle.dumps(offer)))
+        link.run()
+        assert done == [(False, 'File hash mismatch')]
+
+
+def test_resume_after_disconnect_continues_from_confirmed_offset():
+    with temporary_directory() as tmp_path:
+        source = tmp_path / 'resume.bin'
+        size = 40 * CHUNK_SIZE + 7
+        expected = _write_random_file(source, size)
+        link = _Link(tmp_path, window=4)
+        done = []
+        link.sender.offer('receiver', str(source), 'blob', 'resume', on_done=lambda ok, err: done.append(ok))
+        link.run(limit=30)
+
+        # Connection drops: in-flight messages are lost, both sides pause
+        link.queue.clear()
+        link.sender.peer_disconnected('receiver')
+        link.receiver.peer_disconnected('sender')
+        sent_before = link.sender.bytes_sent
+
+        link.sender.resume('receiver')
+        link.run()
+        assert done == [True] and link.received['resume'] == expected
+        assert link.receiver.bytes_resumed > 0
+        resent = link.sender.bytes_sent - sent_before
+        assert resent <= size - link.receiver.bytes_resumed + CHUNK_SIZE, "Only unconfirmed bytes should be sent again"
+
+
+def test_live_upload_resumes_across_reconnect():
+    """A client upload interrupted by a disconnect completes after reconnecting without starting over."""
+    with temporary_directory() as tmp_path:
+        from server import GameServer
+
+        source = tmp_path / 'upload.bin'
+        expected = _write_random_file(source, 8 * 1024 * 1024)
+        port = free_port()
+        server = GameServer('127.0.0.1', port, practice_mode=True)
+        client = NetworkClient('127.0.0.1', port)
+        saved_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'uploads', 'Uploader_upload.bin')
+        try:
+            threading.Thread(target=server.start, daemon=True).start()
+            assert client.connect("Uploader")
+            deadline = time.time() + 10.0
+            while 'Uploader' not in server.clients and time.time() < deadline:
+                client.update()
+                time.sleep(0.005)
+            assert client.send_file(str(source), 'upload.bin')
+            transfer = next(iter(client.transfers.outgoing.values()))
+
+            # Disconnect once a few MB are confirmed
+            while transfer.acked < 3 * 1024 * 1024 and time.time() < deadline:
+                client.update()
+            assert 0 < transfer.acked < transfer.size, "Transfer should be interrupted mid-way"
+            client.disconnect()
+            while 'Uploader' in server.clients and time.time() < deadline:
+                time.sleep(0.01)
+
+            assert client.connect("Uploader")
+            deadline = time.time() + 20.0
+            while client.transfers.pending() and time.time() < deadline:
+                client.update()
+                time.sleep(0.001)
+
+            assert client.transfers.pending() == 0
+            assert server.transfers.bytes_resumed >= 3 * 1024 * 1024 - CHUNK_SIZE
+            with open(saved_path, 'rb') as f:
+                assert hashlib.sha256(f.read()).hexdigest() == expected
+            print(f"Resumed at {server.transfers.bytes_resumed} of {transfer.size} bytes")
+        finally:
+            client.disconnect()
+            server.stop()
+            shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+            if os.path.exists(saved_path):
+                os.remove(saved_path)
+            uploads_dir = os.path.dirname(saved_path)
+            if os.path.isdir(uploads_dir) and not os.listdir(uploads_dir):
+                os.rmdir(uploads_dir)
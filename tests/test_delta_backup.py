@@ -0,0 +1,167 @@
+"""
+Tests for rsync-style delta backup transfer (BASE_files/BASE_delta_sync.py).
+Checks reconstruction with edited, added, moved and deleted files, rejects
+unsafe paths, benchmarks a one-file difference against the full tar.gz
+transfer the client used before, and runs the request/delta exchange between
+a live GameServer and NetworkClient.
+"""
+
+import io
+import os
+import pickle
+import shutil
+import tarfile
+import threading
+import time
+from BASE_components.BASE_test_helpers import free_port, temporary_directory, working_directory
+from BASE_files.BASE_delta_sync import build_basis, build_delta, reconstruct_backup
+from BASE_files.network_client import NetworkClient
+from coding.non_callable_tools.backup_handling import BackupHandler
+from coding.non_callable_tools.helpers import copytree_filtered, should_skip_item
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+
+def _copy_gamefolder(target):
+    copytree_filtered(os.path.join(PROJECT_ROOT, 'GameFolder'), str(target), should_skip_item)
+
+
+def _edit_one_file(root):
+    """Append a small function to one source file, as a typical patch would."""
+    path = os.path.join(str(root), 'arenas', 'GAME_arena.py')
+    with open(path, 'a') as f:
+        f.write("\n\ndef _patched_helper(value):\n    return value * 2\n")
+
+
+def _hash(path):
+    return BackupHandler(os.path.dirname(str(path))).compute_directory_hash(str(path))
+
+
+def test_reconstruct_edits_additions_moves_and_deletions():
+    with temporary_directory() as tmp_path:
+        basis_root = tmp_path / 'basis'
+        client_root = tmp_path / 'client'
+        _copy_gamefolder(basis_root)
+        _copy_gamefolder(client_root)
+        _edit_one_file(client_root)
+        (client_root / 'new_module.py').write_text("VALUE = 1\n")
+        os.rename(client_root / 'setup.py', client_root / 'setup_moved.py')
+        removed = 'weapons/' + sorted(os.listdir(client_root / 'weapons'))[0]
+        os.remove(client_root / removed)
+
+        delta = build_delta(str(client_root), build_basis(str(basis_root)))
+        kinds = {rel: entry[0] for rel, entry in delta['files'].items()}
+        assert kinds['arenas/GAME_arena.py'] == 'delta'
+        assert kinds['new_module.py'] == 'data'
+        assert kinds['setup_moved.py'] == 'copy'
+        assert removed not in kinds
+
+        target = tmp_path / 'rebuilt'
+        reconstruct_backup(delta, str(basis_root), str(target))
+        assert _hash(target) == _hash(client_root)
+
+
+def test_unsafe_paths_are_rejected():
+    with temporary_directory() as tmp_path:
+        for rel_path in ('../escape.py', '/etc/passwd', 'a/../../b.py', ''):
+            target = tmp_path / f'rebuilt{abs(hash(rel_path))}'
+            try:
+                reconstruct_backup({'block_size': 2048, 'files': {rel_path: ('data', b'x')}}, str(tmp_path), str(target))
+                assert False, f"{rel_path!r} should be rejected"
+            except ValueError:
+                pass
+        assert not (tmp_path.parent / 'escape.py').exists()
+
+
+def _full_transfer(client_root, server_dir):
+    """The previous path: tar.gz the whole backup, extract it, recompute its hash."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        tar.add(str(client_root), arcname='backup')
+    archive = buffer.getvalue()
+    shutil.rmtree(server_dir, ignore_errors=True)
+    with tarfile.open(fileobj=io.BytesIO(archive), mode='r:gz') as tar:
+        tar.extractall(path=str(server_dir))
+    _hash(server_dir / 'backup')
+    return len(archive), 0
+
+
+def _delta_transfer(client_root, basis_root, server_dir):
+    """Server sends a basis, client answers with a delta, server rebuilds and verifies."""
+    basis_bytes = pickle.dumps(build_basis(str(basis_root)), protocol=4)
+    delta_bytes = pickle.dumps(build_delta(str(client_root), pickle.loads(basis_bytes)), protocol=4)
+    shutil.rmtree(server_dir, ignore_errors=True)
+    reconstruct_backup(pickle.loads(delta_bytes), str(basis_root), str(server_dir))
+    _hash(server_dir)
+    return len(delta_bytes), len(basis_bytes)
+
+
+def test_one_file_difference_benchmark():
+    """Delta transfer against the full tar.gz for a backup differing from the server's in one file."""
+    with temporary_directory() as tmp_path:
+        basis_root = tmp_path / 'server_basis'
+        client_root = tmp_path / 'client_backup'
+        _copy_gamefolder(basis_root)
+        _copy_gamefolder(client_root)
+        _edit_one_file(client_root)
+        backup_size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(client_root) for f in files)
+
+        results = {}
+        for label, run in (("full tar.gz", lambda: _full_transfer(client_root, tmp_path / 'full')),
+                           ("delta", lambda: _delta_transfer(client_root, basis_root, tmp_path / 'delta'))):
+            timings = []
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                upstream, downstream = run()
+                timings.append(time.perf_counter() - start)
+            results[label] = upstream
+            print(f"{label:>11}: {upstream:7d} bytes client->server, {downstream:6d} bytes server->client, "
+                  f"{min(timings) * 1000:6.1f} ms (backup of {backup_size} bytes)")
+
+        assert results["delta"] * 10 < results["full tar.gz"], "A one-file change should send a small fraction of the archive"
+        assert _hash(tmp_path / 'delta') == _hash(client_root)
+
+
+def test_live_backup_request_uses_delta():
+    """The server's request carries a basis; the client's reply rebuilds the backup on the server."""
+    with temporary_directory() as tmp_path:
+        from server import GameServer
+
+        port = free_port()
+        server = GameServer('127.0.0.1', port, practice_mode=True)
+        client = NetworkClient('127.0.0.1', port)
+        patches_dir = os.path.abspath(server.server_patches_dir)
+
+        basis_root = tmp_path / '__game_backups' / 'basis'
+        _copy_gamefolder(basis_root)
+        client_root = tmp_path / 'client_backups' / 'pending'
+        _copy_gamefolder(client_root)
+        _edit_one_file(client_root)
+        backup_name = _hash(client_root)
+        os.rename(client_root, client_root.parent / backup_name)
+        client.backups_root = str(tmp_path / 'client_backups')
+        with working_directory(tmp_path):
+            try:
+                threading.Thread(target=server.start, daemon=True).start()
+                assert client.connect("Backer")
+                deadline = time.time() + 10.0
+                while 'Backer' not in server.clients and time.time() < deadline:
+                    client.update()
+                    time.sleep(0.005)
+
+                server._request_backup_from_client('Backer', backup_name)
+                while not (tmp_path / '__game_backups' / backup_name).exists() and time.time() < deadline:
+                    client.update()
+                    time.sleep(0.005)
+                while client.transfers.pending() and time.time() < deadline:
+                    client.update()
+                    time.sleep(0.005)
+
+                assert _hash(tmp_path / '__game_backups' / backup_name) == backup_name
+                assert 0 < client.transfers.bytes_sent < 4096, "Only the delta should travel"
+                assert not any(name.startswith('.') for name in os.listdir(tmp_path / '__game_backups'))
+            finally:
+                client.disconnect()
+                server.stop()
+                shutil.rmtree(patches_dir, ignore_errors=True)
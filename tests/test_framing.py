@@ -0,0 +1,174 @@
+"""
+Tests for the shared framing module (BASE_files/BASE_framing.py).
+Checks frame splitting/coalescing, corrupt headers and view lifetime, then
+measures loopback TCP throughput for payloads from 64 B to 64 MB against the
+old recv(4) + bytes-concatenation reader and header+payload sendall.
+"""
+
+import random
+import select
+import socket
+import threading
+import time
+from BASE_files.BASE_framing import FrameReader, send_frames, send_frame, HEADER
+
+PAYLOAD_SIZES = [64, 4 * 1024, 256 * 1024, 4 * 1024 * 1024, 64 * 1024 * 1024]
+BYTES_PER_SIZE = 64 * 1024 * 1024
+RUNS = 3  # Best of, loopback numbers are noisy
+
+
+def _frame(payload):
+    return HEADER.pack(len(payload)) + payload
+
+
+def test_frames_split_across_reads_and_many_per_read():
+    """Arbitrary read boundaries yield the same payloads, several frames per read when available."""
+    rng = random.Random(7)
+    payloads = [bytes([i % 251]) * rng.choice([0, 1, 3, 64, 5000, 70000]) for i in range(200)]
+    stream = b''.join(_frame(p) for p in payloads)
+
+    reader = FrameReader(initial_size=1024)
+    received = []
+    largest_batch = 0
+    offset = 0
+    while offset < len(stream):
+        step = rng.choice([1, 2, 5, 100, 4096, 100000])
+        frames = reader.feed(stream[offset:offset + step])
+        largest_batch = max(largest_batch, len(frames))
+        received.extend(frames)
+        offset += step
+    assert received == payloads
+    assert reader.buffered == 0
+    assert largest_batch > 1, "One read holding several frames should decode them all"
+
+
+def test_corrupt_header_and_stale_views():
+    """An impossible length is rejected; payload views die at the next read."""
+    reader = FrameReader(max_frame_size=1024)
+    try:
+        reader.feed(HEADER.pack(4096))
+        assert False, "Oversized frame should be rejected"
+    except ValueError:
+        pass
+
+    sender_socket, receiver_socket = _loopback_pair()
+    try:
+        reader = FrameReader()
+        send_frame(sender_socket, b'hello')
+        select.select([receiver_socket], [], [], 5.0)
+        first = reader.recv_from(receiver_socket)[0]
+        assert first == b'hello'
+        send_frame(sender_socket, b'world')
+        select.select([receiver_socket], [], [], 5.0)
+        assert reader.recv_from(receiver_socket)[0] == b'world'
+        try:
+            bytes(first)
+            assert False, "Views must not outlive the next read"
+        except ValueError:
+            pass
+    finally:
+        sender_socket.close()
+        receiver_socket.close()
+
+
+def _legacy_recv_exact(sock, size):
+    """The reader server.py and network_client.py used before: concatenate chunk by chunk."""
+    data = b''
+    while len(data) < size:
+        ready, _, _ = select.select([sock], [], [], 5.0)
+        if ready:
+            try:
+                chunk = sock.recv(size - len(data))
+            except BlockingIOError:
+                continue
+            if not chunk:
+                return None
+            data += chunk
+    return data
+
+
+def _legacy_receive(sock, count):
+    received = 0
+    while received < count:
+        ready, _, _ = select.select([sock], [], [], 5.0)
+        assert ready, "Legacy receive stalled"
+        try:
+            length_bytes = sock.recv(4)
+        except BlockingIOError:
+            continue
+        # Like the old code, assumes the 4 header bytes arrive together
+        data = _legacy_recv_exact(sock, int.from_bytes(length_bytes, byteorder='big'))
+        assert data is not None
+        received += 1
+
+
+def _framed_receive(sock, count):
+    reader = FrameReader()
+    received = 0
+    while received < count:
+        ready, _, _ = select.select([sock], [], [], 5.0)
+        assert ready, "Framed receive stalled"
+        received += len(reader.recv_from(sock))
+
+
+def _loopback_pair():
+    server = socket.create_server(('127.0.0.1', 0))
+    client = socket.create_connection(server.getsockname())
+    accepted, _ = server.accept()
+    server.close()
+    accepted.setblocking(False)
+    return client, accepted
+
+
+def _measure(size, count, send, receive):
+    sender_socket, receiver_socket = _loopback_pair()
+    payload = bytes(size)
+    try:
+        thread = threading.Thread(target=send, args=(sender_socket, payload, count), daemon=True)
+        start = time.perf_counter()
+        thread.start()
+        receive(receiver_socket, count)
+        elapsed = time.perf_counter() - start
+        thread.join(5.0)
+    finally:
+        sender_socket.close()
+        receiver_socket.close()
+    return size * count / elapsed / (1024 * 1024)
+
+
+def _send_framed(sock, payload, count):
+    for _ in range(count):
+        send_frame(sock, payload)
+
+
+def _send_legacy(sock, payload, count):
+    for _ in range(count):
+        sock.sendall(len(payload).to_bytes(4, byteorder='big') + payload)
+
+
+def test_loopback_throughput():
+    """Framed reader/writer against the old implementation on loopback TCP."""
+    for size in PAYLOAD_SIZES:
+        count = max(1, min(5000, BYTES_PER_SIZE // size))
+        framed = max(_measure(size, count, _send_framed, _framed_receive) for _ in range(RUNS))
+        legacy = max(_measure(size, count, _send_legacy, _legacy_receive) for _ in range(RUNS))
+        print(f"{size:>9} B x {count:>4}: framed {framed:8.1f} MB/s, legacy {legacy:8.1f} MB/s ({framed / legacy:.1f}x)")
+        assert framed > 0
+
+
+def test_batched_send_arrives_as_one_read():
+    """send_frames writes several frames in one call; the reader returns them together."""
+    sender_socket, receiver_socket = _loopback_pair()
+    try:
+        payloads = [b'state', b'x' * 300, b'', b'event']
+        assert send_frames(sender_socket, payloads) == sum(4 + len(p) for p in payloads)
+        select.select([receiver_socket], [], [], 5.0)
+        reader = FrameReader()
+        frames = []
+        deadline = time.time() + 5.0
+        while len(frames) < len(payloads) and time.time() < deadline:
+            frames.extend(bytes(frame) for frame in reader.recv_from(receiver_socket))
+        assert frames == payloads
+    finally:
+        sender_socket.close()
+        receiver_socket.close()
@@ -0,0 +1,174 @@
+"""
+Tests for the garbage-collector policy (BASE_files/BASE_gc.py) and a tick benchmark.
+A match start must freeze the set-up objects and raise the thresholds, idle()
+must collect only when a collection is due and there is time for it, and the
+match end must put everything back. The benchmark plays the same scripted
+host match (server ticks plus the hosting client decoding every state) with
+the policy off and on, once with the stock game code and once with game code
+that leaves reference cycles behind every tick, and compares tick p99 and the
+collections that ran inside a tick.
+"""
+
+import gc
+import pickle
+import random
+import time
+from contextlib import contextmanager
+from BASE_components.BASE_test_helpers import free_port, patched
+from BASE_files.BASE_gc import GcPolicy, MATCH_THRESHOLDS, gc_policy, parse_thresholds
+from BASE_files.BASE_metrics import gc_tracker
+from BASE_files.network_client import EntityManager
+
+BOTS = [f"Bot{index}" for index in range(8)]
+TICKS = 1500
+CYCLES_PER_TICK = 150  # Reference cycles left behind by game code, e.g. projectiles linked to their spawner
+CPYTHON_THRESHOLDS = (700, 10, 10)  # What the collector runs with when nothing changes it
+
+
+@contextmanager
+def _restored_gc():
+    thresholds = gc.get_threshold()
+    try:
+        yield
+    finally:
+        gc.unfreeze()
+        gc.set_threshold(*thresholds)
+
+
+def test_match_freezes_raises_thresholds_and_restores():
+    with _restored_gc():
+        policy = GcPolicy()
+        owner, other = object(), object()
+        before = gc.get_threshold()
+        installed = gc_tracker.installed
+        policy.match_started(owner)
+        assert gc.get_freeze_count() > 0 and gc.get_threshold() == MATCH_THRESHOLDS
+        assert gc_tracker.installed == installed + 1, "Pauses are timed by the shared tracker"
+        collections = []
+        gc.callbacks.append(lambda phase, info: phase == "start" and collections.append(info["generation"]))
+        try:
+            policy.match_started(other)  # A second room in the same process
+        finally:
+            gc.callbacks.pop()
+        assert 2 not in collections, "No full collection while another match is ticking"
+
+        assert not policy.idle(0.001), "No time before the next tick"
+        gc.collect(0)
+        assert not policy.idle(0.010), "Generation 0 is nearly empty"
+        garbage = [[] for _ in range(int(MATCH_THRESHOLDS[0] * 0.3))]
+        young = sum(gc_tracker.pauses[0].counts)
+        assert policy.idle(0.010)
+        assert policy.idle_collections == 1 and sum(gc_tracker.pauses[0].counts) == young + 1
+        assert policy.summary()['pauses'][0]['count'] == young + 1
+        del garbage
+
+        policy.match_ended(owner)
+        assert gc.get_threshold() == MATCH_THRESHOLDS, "The other match is still running"
+        assert gc.get_freeze_count() > 0, "Nothing is unfrozen while a match runs"
+        policy.match_ended(other)
+        assert gc.get_threshold() == before and gc.get_freeze_count() == 0
+        assert gc_tracker.installed == installed
+        assert not policy.idle(1.0), "No match: the collector runs on its own"
+
+
+def test_disabled_policy_and_threshold_overrides():
+    with _restored_gc():
+        before = gc.get_threshold()
+        policy = GcPolicy(enabled=False)
+        policy.match_started(object())
+        assert gc.get_threshold() == before and not policy.active
+        assert parse_thresholds("5000,20,50") == (5000, 20, 50)
+        assert parse_thresholds("5000,20") is None and parse_thresholds("a,b,c") is None and parse_thresholds(None) is None
+
+
+def _play(server, policy, cycles):
+    """One scripted match; returns (sorted tick durations, collections that ran inside a tick by generation)."""
+    from GameFolder.weapons.GAME_weapon import Weapon
+
+    rng = random.Random(50)
+    entity_manager = EntityManager()
+    server._recreate_arena_with_players()
+    for character in server.arena.characters:
+        character.pickup_weapon(Weapon(cooldown=0.1, max_ammo=100000))
+    if policy is not None:
+        policy.match_started(server)
+    else:
+        gc.set_threshold(*CPYTHON_THRESHOLDS)
+
+    in_tick = False
+    in_tick_collections = [0, 0, 0]
+
+    def count(phase, info):
+        if phase == "start" and in_tick:
+            in_tick_collections[info["generation"]] += 1
+
+    gc.callbacks.append(count)
+    durations = []
+    try:
+        for tick in range(TICKS):
+            for bot in BOTS:
+                target = [rng.uniform(0, 1400), rng.uniform(0, 900)]
+                inputs = {'input_id': tick, 'mouse_pos': target, 'movement': [rng.choice((-1, 0, 1)), rng.choice((0, 1))]}
+                if tick % 3 == 0:
+                    inputs['shoot'] = target
+                server.input_queues[bot].append(inputs)
+
+            in_tick = True
+            started = time.perf_counter()
+            for _ in range(cycles):
+                spawner = {}
+                spawner['child'] = {'owner': spawner}
+            server._update_simulation(server.arena.tick_interval)
+            entity_manager.update_from_server(pickle.loads(server._serialize_game_state()))
+            duration = time.perf_counter() - started
+            in_tick = False
+            durations.append(duration)
+            if policy is not None:
+                policy.idle(server.tick_interval - duration)
+    finally:
+        gc.callbacks.remove(count)
+        if policy is not None:
+            policy.match_ended(server)
+        server.arena = None
+    return sorted(durations), in_tick_collections
+
+
+def _percentile(durations, fraction):
+    return durations[min(len(durations) - 1, int(len(durations) * fraction))] * 1000
+
+
+def test_benchmark_tick_p99_with_policy_off_and_on():
+    # The server's own policy is off; each run sets up its own
+    with _restored_gc(), patched(gc_policy, "enabled", False):
+        from server import GameServer
+
+        server = GameServer('127.0.0.1', free_port())
+        server.bot_players = list(BOTS)
+        results = {}
+        try:
+            for scenario, cycles in (("stock game code", 0), ("game code leaving cycles", CYCLES_PER_TICK)):
+                for label in ("off", "on"):
+                    policy = GcPolicy() if label == "on" else None
+                    durations, collections = _play(server, policy, cycles)
+                    results[scenario, label] = (durations, collections, policy)
+        finally:
+            server.stop()
+
+        for (scenario, label), (durations, collections, policy) in results.items():
+            print(f"GC policy {label:>3}, {scenario}: tick p50 {_percentile(durations, 0.5):.2f} ms, "
+                  f"p99 {_percentile(durations, 0.99):.2f} ms, max {durations[-1] * 1000:.2f} ms, "
+                  f"collections inside ticks by generation {collections}"
+                  + (f", {policy.idle_collections} in idle time" if policy else ""))
+
+        for scenario in ("stock game code", "game code leaving cycles"):
+            off_durations, off_collections, _ = results[scenario, "off"]
+            on_durations, on_collections, _ = results[scenario, "on"]
+            assert sum(on_collections) <= sum(off_collections)
+            # Timing on a shared machine is noisy: the policy must not make p99 clearly worse
+            assert _percentile(on_durations, 0.99) < _percentile(off_durations, 0.99) * 2 + 1.0
+
+        off_collections = results["game code leaving cycles", "off"][1]
+        on_collections, policy = results["game code leaving cycles", "on"][1:]
+        assert off_collections[0] > 0, "Without the policy the cycles trigger collections mid-tick"
+        assert sum(on_collections) * 10 <= sum(off_collections), "With it they run between ticks"
+        assert policy.idle_collections > 0
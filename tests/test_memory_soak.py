@@ -0,0 +1,76 @@
+"""
+Soak test for the memory growth monitor (BASE_files/BASE_memory.py).
+Plays 50 scripted matches in one process (bots moving and shooting through the
+server's input queues, every game_state fed to a client EntityManager) and
+checks that resident memory after the last match is where it was after the
+warm-up, and that no subsystem grew past its budget. It takes about 40 s, so
+it runs under pytest only: the in-game test runner collects GameFolder/tests.
+"""
+
+import pickle
+import random
+from BASE_components.BASE_test_helpers import free_port
+from BASE_files.BASE_memory import MemoryMonitor, rss_bytes
+from BASE_files.network_client import EntityManager
+
+MATCHES = 50
+WARM_UP_MATCHES = 10  # Caches, pools and lazily built tables fill up during these
+TICKS_PER_MATCH = 240
+BOTS = ["Bot0", "Bot1", "Bot2", "Bot3"]
+# Resident memory may move by allocator fragmentation, not by anything that scales with the matches played
+RSS_TOLERANCE_BYTES = 4 * 1024 * 1024
+
+
+def _play_match(server, entity_manager, rng):
+    """One scripted match: a fresh arena, bots moving and shooting, every state decoded by a client."""
+    from GameFolder.weapons.GAME_weapon import Weapon
+
+    server._recreate_arena_with_players()
+    for character in server.arena.characters:
+        character.pickup_weapon(Weapon(cooldown=0.1, max_ammo=1000))
+    entity_manager.clear()
+    fired = 0
+    for tick in range(TICKS_PER_MATCH):
+        for bot in BOTS:
+            target = [rng.uniform(0, 1400), rng.uniform(0, 900)]
+            inputs = {'input_id': tick, 'mouse_pos': target, 'movement': [rng.choice((-1, 0, 1)), rng.choice((0, 1))]}
+            if tick % 4 == 0:
+                inputs['shoot'] = target
+            server.input_queues[bot].append(inputs)
+        server._update_simulation(server.arena.tick_interval)
+        data = server._serialize_game_state()
+        if data is not None:
+            entity_manager.update_from_server(pickle.loads(data))
+        fired = max(fired, len(server.arena.projectiles))
+    server.arena = None
+    return fired
+
+
+def test_soak_fifty_matches_keeps_memory_flat():
+    from server import GameServer
+
+    server = GameServer('127.0.0.1', free_port())
+    server.bot_players = list(BOTS)
+    entity_manager = EntityManager()
+    rng = random.Random(49)
+    monitor = MemoryMonitor(budgets={}, default_budget=2 * 1024 * 1024)
+    rss = []
+    most_projectiles = 0
+    try:
+        for match in range(MATCHES):
+            if match == WARM_UP_MATCHES:
+                monitor.start(background=False)
+            most_projectiles = max(most_projectiles, _play_match(server, entity_manager, rng))
+            rss.append(rss_bytes())
+        growth = monitor.sample()
+    finally:
+        monitor.stop()
+        server.stop()
+
+    assert most_projectiles > 0, "The bots shoot"
+    grown = rss[-1] - rss[WARM_UP_MATCHES]
+    print(f"Soak: {MATCHES} matches (up to {most_projectiles} projectiles in flight), RSS {rss[WARM_UP_MATCHES] / 1e6:.1f} MB after warm-up, "
+          f"{rss[-1] / 1e6:.1f} MB after the last match; traced growth: "
+          + ", ".join(f"{name} {size / 1024:+.0f} KB" for name, size in sorted(growth.items())))
+    assert not monitor.over_budget, f"Subsystems kept growing: {monitor.report()['growth_bytes']}"
+    assert grown < RSS_TOLERANCE_BYTES, f"RSS grew {grown / 1e6:.1f} MB over {MATCHES - WARM_UP_MATCHES} matches"
@@ -0,0 +1,145 @@
+"""
+Tests for the Prometheus exporter (BASE_files/BASE_metrics.py).
+Checks the text format of histograms and labels, then scrapes a live
+practice match with one player: tick, client, entity, snapshot and GC series
+must be present and consistent, and repeated scraping must not push ticks
+over budget.
+"""
+
+import shutil
+import threading
+import time
+import urllib.request
+from BASE_components.BASE_test_helpers import free_port
+from BASE_files.BASE_metrics import Histogram, MetricsRegistry, StageTimer, _Writer, registry
+from BASE_files.network_client import NetworkClient
+
+MATCH_SECONDS = 3.0
+SCRAPE_INTERVAL = 0.05  # Far more often than a real Prometheus, to expose any contention
+
+
+def _parse(text):
+    """{(name, frozenset(labels)): value} from Prometheus text format."""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        series, value = line.rsplit(' ', 1)
+        labels = frozenset()
+        if '{' in series:
+            series, raw = series[:-1].split('{', 1)
+            labels = frozenset(tuple(pair.split('=', 1)) for pair in raw.split(','))
+            labels = frozenset((key, val.strip('"')) for key, val in labels)
+        samples[(series, labels)] = float(value)
+    return samples
+
+
+def test_histogram_text_format():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+    out = _Writer()
+    out.histogram("demo_seconds", "Demo", histogram, (("stage", "merge"),))
+    out.sample("demo_info", "gauge", "Demo", 1, (("path", 'C:\\a "b"'),))
+    samples = _parse(out.text())
+    bucket = lambda le: samples[("core_conflict_demo_seconds_bucket", frozenset({("stage", "merge"), ("le", le)}))]
+    assert out.text().count("# TYPE core_conflict_demo_seconds histogram") == 1
+    assert [bucket("0.1"), bucket("1"), bucket("+Inf")] == [1, 3, 4], "Buckets are cumulative"
+    assert samples[("core_conflict_demo_seconds_count", frozenset({("stage", "merge")}))] == 4
+    assert 'core_conflict_demo_info{path="C:\\\\a \\"b\\""} 1' in out.text(), "Label values are escaped"
+
+    local = MetricsRegistry()
+    local.observe("job_seconds", 0.2, kind="a")
+    local.observe("job_seconds", 0.3, kind="a")
+    local.observe("job_seconds", 0.3, kind="b")
+    assert len(local.histograms) == 2 and local.histograms[("job_seconds", (("kind", "a"),))].snapshot()[0][4] == 2
+
+    stages = StageTimer("unit_test_stage_seconds")
+    stages.mark("first")
+    stages.mark("second")
+    assert ("unit_test_stage_seconds", (("stage", "second"),)) in registry.histograms
+
+
+def _scrape(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5.0) as response:
+        assert response.status == 200
+        return response.read().decode("utf-8")
+
+
+def test_scrape_during_headless_match():
+    from server import GameServer
+
+    port = free_port()
+    server = GameServer('127.0.0.1', port, practice_mode=True, metrics_port=0)
+    client = NetworkClient('127.0.0.1', port)
+    scrapes, scrape_times = [], []
+    stop_scraping = threading.Event()
+
+    def scraper():
+        while not stop_scraping.is_set():
+            started = time.perf_counter()
+            scrapes.append(_scrape(server.metrics_exporter.port))
+            scrape_times.append(time.perf_counter() - started)
+            time.sleep(SCRAPE_INTERVAL)
+
+    try:
+        threading.Thread(target=server.start, daemon=True).start()
+        client.on_file_sync_received = lambda manifest: client.acknowledge_file_sync()
+        assert client.connect("Scraped")
+        client.request_file_sync()
+
+        def play(seconds):
+            start = time.time()
+            frame = 0
+            while time.time() - start < seconds:
+                frame += 1
+                client.send_input({'mouse_pos': [100 + frame % 50, 200], 'movement': [1, 0]})
+                client.update()
+                time.sleep(1 / 60)
+
+        play(1.0)  # Let the match start before measuring
+        quiet_before = server.tick_durations.snapshot()
+        play(MATCH_SECONDS)
+        quiet_after = server.tick_durations.snapshot()
+
+        thread = threading.Thread(target=scraper, daemon=True)
+        thread.start()
+        play(MATCH_SECONDS)
+        stop_scraping.set()
+        thread.join(timeout=5.0)
+        scraped_after = server.tick_durations.snapshot()
+        final = _parse(_scrape(server.metrics_exporter.port))
+    finally:
+        stop_scraping.set()
+        client.disconnect()
+        server.stop()
+        shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+
+    assert len(scrapes) > 10, "Scraper thread should have completed many requests"
+    assert server.metrics_exporter.port is None, "stop() closes the endpoint"
+
+    ticks = final[("core_conflict_tick_duration_seconds_count", frozenset())]
+    assert ticks > 0 and final[("core_conflict_ticks_total", frozenset())] == ticks
+    assert final[("core_conflict_tick_duration_seconds_bucket", frozenset({("le", "+Inf")}))] == ticks
+    assert final[("core_conflict_connected_clients", frozenset())] == 1
+    assert final[("core_conflict_entities", frozenset({("type", "character")}))] >= 1
+    assert final[("core_conflict_snapshot_bytes", frozenset())] > 0
+    assert final[("core_conflict_outbox_bytes_sent_total", frozenset())] > 0
+    assert ("core_conflict_gc_pause_seconds_count", frozenset({("generation", "0")})) in final
+
+    def over_budget(before, after):
+        """Share of ticks in a window slower than 12 ms (TICK_BUCKETS boundary below the 16.7 ms interval)."""
+        deltas = [b - a for a, b in zip(before[0], after[0])]
+        total = sum(deltas)
+        slow = sum(deltas[server.tick_durations.buckets.index(0.012) + 1:])
+        return slow / total if total else 0.0, total
+
+    quiet_share, quiet_ticks = over_budget(quiet_before, quiet_after)
+    scraped_share, scraped_ticks = over_budget(quiet_after, scraped_after)
+    scrape_times.sort()
+    print(f"{len(scrapes)} scrapes, p50 {scrape_times[len(scrape_times) // 2] * 1000:.1f} ms "
+          f"max {scrape_times[-1] * 1000:.1f} ms, {len(scrapes[-1])} bytes; "
+          f"ticks >12 ms: {quiet_share:.1%} of {quiet_ticks} without scraping, "
+          f"{scraped_share:.1%} of {scraped_ticks} while scraping")
+    assert scraped_ticks > 0.5 * quiet_ticks, "Scraping must not slow the tick rate"
+    assert scraped_share <= quiet_share + 0.05, "Scraping must not push ticks over budget"
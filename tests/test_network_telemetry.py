@@ -0,0 +1,182 @@
+"""
+Tests for per-connection telemetry (BASE_files/BASE_telemetry.py).
+Checks RTT smoothing, rate windows and arrival jitter with synthetic clocks,
+then runs a live GameServer with clients over loopback: directly, and through
+a TCP proxy adding a known delay, which the ping/pong RTT must reflect on both
+the server and the client.
+"""
+
+import heapq
+import select
+import shutil
+import socket
+import threading
+import time
+import pygame
+from BASE_components.BASE_test_helpers import free_port
+from BASE_files.BASE_game_client import draw_network_overlay
+from BASE_files.BASE_telemetry import ConnectionTelemetry, make_ping, make_pong
+from BASE_files.network_client import NetworkClient
+
+PROXY_DELAY = 0.025  # Each direction
+MEASURE_SECONDS = 3.0
+
+
+def test_rtt_smoothing_rates_and_arrival_jitter():
+    telemetry = ConnectionTelemetry(expected_interval=0.02, now=0.0)
+    for sent in range(10):
+        telemetry.record_pong(make_pong(make_ping(now=float(sent))), now=sent + 0.050)
+    snapshot = telemetry.snapshot()
+    assert abs(snapshot['rtt_ms'] - 50.0) < 0.01 and snapshot['rtt_jitter_ms'] < 25.0
+    assert telemetry.record_pong({'type': 'pong', 'sent': None}) is None
+
+    telemetry.record_pong(make_pong(make_ping(now=20.0)), now=20.250)
+    assert telemetry.snapshot()['rtt_ms'] > 50.0 and telemetry.snapshot()['rtt_last_ms'] == 250.0
+
+    for index in range(100):
+        telemetry.record_sent(1000, queued_bytes=index)
+        telemetry.record_received(10)
+    telemetry.roll(now=0.5)
+    assert telemetry.snapshot()['bytes_out_per_s'] == 0.0, "No rate before a full window"
+    telemetry.roll(now=2.0)
+    snapshot = telemetry.snapshot()
+    assert snapshot['bytes_out_per_s'] == 50000.0 and snapshot['messages_in_per_s'] == 50.0
+    assert snapshot['send_queue_max_bytes'] == 99
+
+    steady = ConnectionTelemetry(expected_interval=0.02, now=0.0)
+    bursty = ConnectionTelemetry(expected_interval=0.02, now=0.0)
+    for index in range(200):
+        steady.record_arrival(now=index * 0.02)
+        bursty.record_arrival(now=(index // 2) * 0.04)  # Pairs arriving together
+    assert steady.snapshot()['arrival_jitter_ms'] < 0.01
+    assert bursty.snapshot()['arrival_jitter_ms'] > 15.0
+
+
+def test_overlay_renders():
+    pygame.font.init()
+    surface = pygame.Surface((400, 200))
+    telemetry = ConnectionTelemetry()
+    draw_network_overlay(surface, pygame.font.Font(None, 20), telemetry.snapshot())
+    telemetry.record_pong(make_pong(make_ping()))
+    draw_network_overlay(surface, pygame.font.Font(None, 20), telemetry.snapshot())
+
+
+class _DelayProxy:
+    """TCP proxy forwarding each chunk after a fixed delay in both directions."""
+
+    def __init__(self, target_port, delay):
+        self.delay = delay
+        self.target_port = target_port
+        self.listener = socket.socket()
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        peers = {}
+        pending = []  # (due, order, destination, data)
+        order = 0
+        while self.running:
+            timeout = max(0.0, min(0.005, pending[0][0] - time.time())) if pending else 0.005
+            readable, _, _ = select.select([self.listener] + list(peers), [], [], timeout)
+            for sock in readable:
+                if sock is self.listener:
+                    client, _ = self.listener.accept()
+                    upstream = socket.create_connection(('127.0.0.1', self.target_port))
+                    peers[client], peers[upstream] = upstream, client
+                    continue
+                try:
+                    data = sock.recv(65536)
+                except OSError:
+                    data = b''
+                if not data:
+                    self.running = False
+                    break
+                order += 1
+                heapq.heappush(pending, (time.time() + self.delay, order, peers[sock], data))
+            while pending and pending[0][0] <= time.time():
+                _, _, destination, data = heapq.heappop(pending)
+                try:
+                    destination.sendall(data)
+                except OSError:
+                    pass
+        for sock in peers:
+            sock.close()
+        self.listener.close()
+
+    def close(self):
+        self.running = False
+        self.thread.join(timeout=2.0)
+
+
+def test_lookups_never_recreate_a_closed_connections_telemetry():
+    from server import GameServer
+
+    server = GameServer('127.0.0.1', free_port())
+    connection, peer = socket.socketpair()
+    try:
+        server._handle_new_connection(connection, ('127.0.0.1', 1))
+        assert connection in server.telemetry, "Created when the connection registers"
+        server.clients['Ghost'] = connection
+        # The disconnect dropped its telemetry while a broadcast or a report still held the socket
+        server.telemetry.pop(connection)
+        server._send_frame(connection, b'state')
+        assert server.client_telemetry() == {}
+        assert connection not in server.telemetry
+    finally:
+        server.clients.clear()
+        server.stop()
+        peer.close()
+        shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+
+
+def test_live_telemetry_over_loopback_and_delayed_link():
+    from server import GameServer
+
+    port = free_port()
+    server = GameServer('127.0.0.1', port, practice_mode=True)
+    proxy = _DelayProxy(port, PROXY_DELAY)
+    clients = {'Direct': NetworkClient('127.0.0.1', port), 'Delayed': NetworkClient('127.0.0.1', proxy.port)}
+    try:
+        threading.Thread(target=server.start, daemon=True).start()
+        for name, client in clients.items():
+            client.on_file_sync_received = lambda manifest, c=client: c.acknowledge_file_sync()
+            assert client.connect(name)
+            client.request_file_sync()
+
+        start = time.time()
+        frame = 0
+        while time.time() - start < MEASURE_SECONDS:
+            frame += 1
+            for client in clients.values():
+                client.send_input({'mouse_pos': [100 + frame % 50, 200], 'movement': [1, 0]})
+                client.update()
+            time.sleep(1 / 60)
+
+        on_server = server.client_telemetry()
+        on_clients = {name: client.get_telemetry() for name, client in clients.items()}
+    finally:
+        for client in clients.values():
+            client.disconnect()
+        server.stop()
+        proxy.close()
+        shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+
+    for name in clients:
+        server_view, client_view = on_server[name], on_clients[name]
+        print(f"{name:>7}: server RTT {server_view['rtt_ms']:.1f} ms (jitter {server_view['rtt_jitter_ms']:.1f}), "
+              f"client RTT {client_view['rtt_ms']:.1f} ms; out {server_view['bytes_out_per_s'] / 1024:.1f} KB/s "
+              f"{server_view['messages_out_per_s']:.0f} msg/s, in {server_view['messages_in_per_s']:.0f} msg/s; "
+              f"state avg {server_view['state_avg_bytes']:.0f} B max {server_view['state_max_bytes']} B; "
+              f"input jitter {server_view['arrival_jitter_ms']:.1f} ms, state jitter {client_view['arrival_jitter_ms']:.1f} ms")
+        for view in (server_view, client_view):
+            assert view['rtt_samples'] >= 2
+            assert view['messages_in_per_s'] > 20 and view['bytes_out_per_s'] > 0
+            assert view['state_count'] > 0 and view['state_max_bytes'] >= view['state_avg_bytes'] > 0
+
+    assert on_clients['Direct']['rtt_ms'] < 2 * PROXY_DELAY * 1000
+    for view in (on_server['Delayed'], on_clients['Delayed']):
+        assert view['rtt_last_ms'] >= 2 * PROXY_DELAY * 1000, "RTT must include the proxy's delay both ways"
@@ -0,0 +1,200 @@
+"""
+Tests for per-tick output batching (FrameOutbox in BASE_files/BASE_framing.py).
+Checks ordering across partial writes and backlog limits, then runs a real
+GameServer with 8 loopback clients and compares socket send calls per second
+and state latency against the old per-message blocking sendall without TCP_NODELAY.
+"""
+
+import select
+import shutil
+import socket
+import threading
+import time
+from collections import Counter, deque
+from BASE_components.BASE_test_helpers import free_port
+from BASE_files.BASE_framing import FrameOutbox, FrameReader
+from BASE_files.network_client import NetworkClient
+
+CLIENT_COUNT = 8
+MEASURE_SECONDS = 2.0
+
+_calls = Counter()
+
+
+class _CountingSocket(socket.socket):
+    """Counts the socket calls that turn into send-path syscalls."""
+
+    def sendmsg(self, *args):
+        _calls['sendmsg'] += 1
+        return super().sendmsg(*args)
+
+    def send(self, *args):
+        _calls['send'] += 1
+        return super().send(*args)
+
+    def sendall(self, *args):
+        _calls['sendall'] += 1
+        return super().sendall(*args)
+
+    def setblocking(self, flag):
+        _calls['setblocking'] += 1
+        return super().setblocking(flag)
+
+
+class _CountingListener:
+    """Wraps the server's listening socket so accepted sockets are counted."""
+
+    def __init__(self, listener):
+        self.listener = listener
+
+    def accept(self):
+        sock, address = self.listener.accept()
+        return _CountingSocket(sock.family, sock.type, sock.proto, fileno=sock.detach()), address
+
+    def close(self):
+        self.listener.close()
+
+
+class _TimedQueue(deque):
+    """Incoming queue that records how old each game_state is when it arrives."""
+
+    def __init__(self, latencies):
+        super().__init__()
+        self.latencies = latencies
+
+    def append(self, message):
+        if message.get('type') == 'game_state':
+            self.latencies.append(time.time() - message['timestamp'])
+        super().append(message)
+
+
+def test_partial_writes_keep_frame_order():
+    """Frames queued faster than the peer reads come out complete and in order."""
+    sender, receiver = socket.socketpair()
+    sender.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    sender.setblocking(False)
+    receiver.setblocking(False)
+    outbox = FrameOutbox()
+    payloads = [bytes([i % 256]) * (i * 37 % 9000) for i in range(300)]
+    try:
+        for payload in payloads:
+            outbox.queue(sender, payload)
+        reader = FrameReader()
+        received = []
+        deadline = time.time() + 10.0
+        while len(received) < len(payloads) and time.time() < deadline:
+            assert outbox.flush() == []
+            select.select([receiver], [], [], 0.01)
+            try:
+                received.extend(bytes(frame) for frame in reader.recv_from(receiver))
+            except ConnectionResetError:
+                break
+        assert received == payloads
+        assert outbox.pending_bytes(sender) == 0
+        assert outbox.send_calls < len(payloads), "Frames should share sendmsg calls"
+    finally:
+        sender.close()
+        receiver.close()
+
+
+def test_stalled_client_is_reported_not_blocking():
+    """A peer that never reads fills the backlog; flush reports it instead of blocking."""
+    sender, receiver = socket.socketpair()
+    sender.setblocking(False)
+    outbox = FrameOutbox(max_backlog=256 * 1024)
+    try:
+        start = time.perf_counter()
+        failed = []
+        for _ in range(200):
+            outbox.queue(sender, bytes(16 * 1024))
+            failed = outbox.flush()
+            if failed:
+                break
+        assert failed == [sender]
+        assert outbox.pending_bytes(sender) == 0
+        assert time.perf_counter() - start < 1.0
+    finally:
+        sender.close()
+        receiver.close()
+
+
+def _run_match(legacy: bool):
+    """Run a practice match with 8 clients; returns (send calls/s, latencies, states per client)."""
+    import server as server_module
+    from server import GameServer
+
+    port = free_port()
+    server = GameServer('127.0.0.1', port, practice_mode=True)
+    server.server_socket = _CountingListener(server.server_socket)
+    nodelay = server_module.enable_nodelay
+    if legacy:
+        # The previous behaviour: one blocking sendall per message, Nagle left on
+        def send_frame_legacy(client_socket, payload):
+            try:
+                client_socket.setblocking(True)
+                client_socket.sendall(len(payload).to_bytes(4, byteorder='big') + payload)
+            finally:
+                client_socket.setblocking(False)
+        server._send_frame = send_frame_legacy
+        server_module.enable_nodelay = lambda sock: None
+
+    clients = []
+    latencies = []
+    try:
+        threading.Thread(target=server.start, daemon=True).start()
+        for index in range(CLIENT_COUNT):
+            client = NetworkClient('127.0.0.1', port)
+            client.on_file_sync_received = lambda manifest, c=client: c.acknowledge_file_sync()
+            assert client.connect(f"Bot{index}")
+            if legacy:
+                client.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+            client.request_file_sync()
+            clients.append(client)
+
+        deadline = time.time() + 10.0
+        while len(server.clients_file_sync_ack) < CLIENT_COUNT and time.time() < deadline:
+            for client in clients:
+                client.update()
+            time.sleep(0.005)
+        assert len(server.clients_file_sync_ack) == CLIENT_COUNT, "Clients never finished joining"
+
+        for client in clients:
+            client.incoming_queue = _TimedQueue(latencies)
+        time.sleep(0.2)
+        latencies.clear()
+        _calls.clear()
+        start = time.time()
+        frame = 0
+        while time.time() - start < MEASURE_SECONDS:
+            frame += 1
+            for index, client in enumerate(clients):
+                client.send_input({'mouse_pos': [100 + frame % 50, 200], 'movement': [(-1) ** index, 0]})
+                client.update()
+            time.sleep(1 / 60)
+        elapsed = time.time() - start
+        send_calls = sum(_calls.values()) / elapsed
+        states = len(latencies) / CLIENT_COUNT
+    finally:
+        for client in clients:
+            client.disconnect()
+        server.stop()
+        server_module.enable_nodelay = nodelay
+        shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+    return send_calls, sorted(latencies), states
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else float('nan')
+
+
+def test_eight_client_match_syscalls_and_latency():
+    """Batched + TCP_NODELAY against the old per-message sendall path on a live server."""
+    results = {}
+    for label, legacy in (("per-message sendall", True), ("batched + NODELAY", False)):
+        send_calls, latencies, states = _run_match(legacy)
+        results[label] = send_calls
+        print(f"{label}: {send_calls:7.0f} send-path socket calls/s, {states:.0f} states/client, "
+              f"latency p50 {_percentile(latencies, 0.5):.2f} ms, p99 {_percentile(latencies, 0.99):.2f} ms")
+        assert states > 0, "Clients should receive game state"
+
+    assert results["batched + NODELAY"] < results["per-message sendall"]
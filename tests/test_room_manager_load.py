@@ -0,0 +1,71 @@
+"""
+Load test for multi-room hosting (BASE_files/BASE_rooms.py).
+Runs 20 practice rooms of bots in one process behind one port: every bot must
+land in its own room's arena and receive that room's game state, no room may
+be starved by the round-robin, and per-room tick metrics must be published.
+"""
+
+import shutil
+import threading
+import time
+import urllib.request
+from BASE_components.BASE_test_helpers import free_port
+from BASE_files.network_client import NetworkClient
+
+ROOM_COUNT = 20
+MATCH_SECONDS = 4.0
+
+
+def test_twenty_rooms_of_bots_in_one_process():
+    from BASE_files.BASE_rooms import RoomManager
+
+    port = free_port()
+    manager = RoomManager('127.0.0.1', port, metrics_port=0)
+    rooms = [manager.create_room(practice_mode=True) for _ in range(ROOM_COUNT)]
+    bots = []
+    try:
+        threading.Thread(target=manager.start, daemon=True).start()
+        for index, room in enumerate(rooms):
+            bot = NetworkClient('127.0.0.1', port, room_code=room.room_code)
+            bot.on_file_sync_received = lambda manifest, b=bot: b.acknowledge_file_sync()
+            assert bot.connect(f"Bot{index:02d}")
+            bot.request_file_sync()
+            bots.append(bot)
+
+        start = time.time()
+        frame = 0
+        while time.time() - start < MATCH_SECONDS:
+            frame += 1
+            for index, bot in enumerate(bots):
+                bot.send_input({'mouse_pos': [100 + (frame + index) % 50, 200],
+                                'movement': [1 if (frame // 30 + index) % 2 else -1, 0]})
+                bot.update()
+            time.sleep(1 / 60)
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{manager.metrics_exporter.port}/metrics", timeout=5.0) as response:
+            metrics = response.read().decode("utf-8")
+        room_states = [(sorted(room.clients), sorted(character.id for character in room.arena.characters)
+                        if room.arena else []) for room in rooms]
+        bot_telemetry = [bot.get_telemetry() for bot in bots]
+        ticks = [room.ticks_run for room in rooms]
+        overruns = sum(room.tick_overruns for room in rooms)
+        deferred = sum(room.ticks_deferred for room in rooms)
+        passes, exhausted = manager.tick_passes, manager.budget_exhausted
+    finally:
+        for bot in bots:
+            bot.disconnect()
+        manager.stop()
+        for room in rooms:
+            shutil.rmtree(room.server_patches_dir, ignore_errors=True)
+
+    elapsed = MATCH_SECONDS
+    print(f"{ROOM_COUNT} rooms: ticks per room min {min(ticks)} max {max(ticks)} "
+          f"({min(ticks) / elapsed:.0f}-{max(ticks) / elapsed:.0f}/s), {overruns} overruns, "
+          f"{deferred} deferred ticks, budget exhausted in {exhausted} of {passes} passes")
+    for index, (clients, characters) in enumerate(room_states):
+        assert clients == [f"Bot{index:02d}"], f"Room {index} should hold only its own bot"
+        assert characters == sorted([f"Bot{index:02d}", "AI_Bot_Practice"])
+    assert all(telemetry['state_count'] > 0 for telemetry in bot_telemetry), "Every bot receives its room's state"
+    assert min(ticks) > 0.25 * max(ticks), "Round-robin must not starve any room"
+    assert f'core_conflict_connected_clients{{room="{rooms[-1].room_id}"}} 1' in metrics
+    assert 'core_conflict_tick_overruns_total{room=' in metrics and 'core_conflict_rooms 20' in metrics
@@ -0,0 +1,171 @@
+"""
+Tests for process-sharded rooms (BASE_files/BASE_shards.py).
+Checks least-loaded placement and that worker rooms refuse patch merges, then
+runs a router with two worker processes: players of four rooms receive state
+through sockets handed to the workers, a killed worker's players get
+'room_closed' while the other worker's rooms keep playing. Finally compares
+total ticks per second of CPU-bound bot rooms for 1..N worker processes.
+"""
+
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import threading
+import time
+from BASE_components.BASE_test_helpers import free_port, patched
+from BASE_files.network_client import NetworkClient
+
+BENCH_ROOMS = 4
+BENCH_TICK_RATE = 2000  # Far above 60 so every room is CPU bound
+BENCH_SECONDS = 3.0
+
+
+def _cleanup(router, room_ids):
+    router.stop()
+    _cleanup_dirs(room_ids)
+
+
+def _cleanup_dirs(room_ids):
+    for room_id in room_ids:
+        shutil.rmtree(os.path.join("__server_patches", room_id), ignore_errors=True)
+
+
+def _wait_until(condition, timeout, step=None):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if step:
+            step()
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_rooms_go_to_the_least_loaded_worker():
+    from BASE_files.BASE_shards import DEFAULT_ROOM_COST, ShardRouter
+
+    router = ShardRouter('127.0.0.1', free_port(), workers=2)
+    room_ids = []
+    try:
+        first, second = router.create_room(), router.create_room()
+        room_ids += [first.room_id, second.room_id]
+        assert first.shard is not second.shard, "Unmeasured rooms spread evenly"
+        assert router.shard_load(first.shard) == DEFAULT_ROOM_COST
+
+        first.cost = 0.5  # A heavy room, as if its worker had reported it
+        second.cost = 0.1
+        third = router.create_room()
+        room_ids.append(third.room_id)
+        assert third.shard is second.shard, "Placement follows measured tick cost"
+        assert router.room_for_code(third.room_code) is third
+    finally:
+        _cleanup(router, room_ids)
+    assert all(not shard.process.is_alive() for shard in router.shards), "stop() ends every worker"
+
+
+def test_worker_rooms_refuse_patches():
+    """Shards load one GameFolder from disk: a room in a worker must not merge into it or restore it."""
+    from BASE_files.BASE_shards import ShardWorker, send_control
+
+    router_end, worker_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    worker = ShardWorker(worker_end, '127.0.0.1', free_port(), 0)
+    refusals = []
+    try:
+        send_control(router_end, ('create_room', 'S1', {'practice_mode': True}))
+        assert _wait_until(lambda: 'S1' in worker.rooms, 2.0, step=worker._network_iteration)
+        room = worker.rooms['S1']
+        assert room.shares_game_code
+        room.client_patches = {'Player1': [{'name': 'faster_guns', 'base_backup': 'base'}]}
+        with patched(room, "_notify_patch_merge_failed", refusals.append):
+            room._merge_and_distribute_patches()
+        assert refusals and "patches are disabled" in refusals[0]
+    finally:
+        worker.stop()
+        router_end.close()
+        _cleanup_dirs(['S1'])
+
+
+def test_killed_worker_closes_only_its_rooms():
+    from BASE_files.BASE_shards import ShardRouter
+
+    port = free_port()
+    router = ShardRouter('127.0.0.1', port, workers=2)
+    rooms = [router.create_room(practice_mode=True) for _ in range(4)]
+    players, closed = [], {}
+    try:
+        threading.Thread(target=router.start, daemon=True).start()
+        for index, room in enumerate(rooms):
+            player = NetworkClient('127.0.0.1', port, room_code=room.room_code)
+            player.on_file_sync_received = lambda manifest, p=player: p.acknowledge_file_sync()
+            player.on_room_closed = lambda reason, i=index: closed.setdefault(i, reason)
+            assert player.connect(f"Player{index}")
+            player.request_file_sync()
+            players.append(player)
+
+        def play():
+            for player in players:
+                if player.connected:
+                    player.send_input({'mouse_pos': [100, 200], 'movement': [1, 0]})
+                    player.update()
+
+        assert _wait_until(lambda: all(p.get_telemetry()['state_count'] > 0 for p in players), 60.0, play), \
+            "Every player receives its room's state from a worker process"
+
+        victim = rooms[0].shard
+        lost = [index for index, room in enumerate(rooms) if room.shard is victim]
+        kept = [index for index in range(len(rooms)) if index not in lost]
+        states_before = [player.get_telemetry()['state_count'] for player in players]
+        os.kill(victim.process.pid, signal.SIGKILL)
+
+        assert _wait_until(lambda: set(closed) >= set(lost), 15.0, play), "The dead worker's players are told"
+        _wait_until(lambda: False, 1.0, play)  # The surviving rooms keep going
+        states_after = [player.get_telemetry()['state_count'] for player in players]
+        stats = router.shard_stats()
+    finally:
+        for player in players:
+            player.disconnect()
+        _cleanup(router, [room.room_id for room in rooms])
+
+    print(f"Worker {victim.index} killed: rooms {sorted(router.lost_rooms)} lost, players notified: "
+          f"{ {index: closed[index] for index in sorted(closed)} }")
+    assert sorted(closed) == lost, "Only the killed worker's rooms close"
+    assert all("process exited" in closed[index] for index in lost)
+    assert all(states_after[index] > states_before[index] for index in kept), "Other rooms keep sending state"
+    assert sorted(router.lost_rooms) == sorted(rooms[index].room_id for index in lost)
+    assert len(stats) == 2 and all(shard['alive'] for shard in stats), "A replacement worker is started"
+
+
+def _bench_ticks_per_second(workers):
+    from BASE_files.BASE_shards import STATS_INTERVAL, ShardRouter
+
+    router = ShardRouter('127.0.0.1', free_port(), workers=workers)
+    rooms = [router.create_room(tick_rate=BENCH_TICK_RATE, bots=4) for _ in range(BENCH_ROOMS)]
+    try:
+        threading.Thread(target=router.start, daemon=True).start()
+        assert _wait_until(lambda: all(room.ticks_per_second > 0 for room in rooms), 60.0), "Rooms start ticking"
+        time.sleep(STATS_INTERVAL)  # Skip the first report (start-up)
+        samples = []
+        deadline = time.time() + BENCH_SECONDS
+        while time.time() < deadline:
+            samples.append(sum(room.ticks_per_second for room in rooms))
+            time.sleep(STATS_INTERVAL)
+    finally:
+        _cleanup(router, [room.room_id for room in rooms])
+    return sum(samples) / len(samples)
+
+
+def test_ticks_per_second_scale_with_worker_processes():
+    cores = multiprocessing.cpu_count()
+    counts = list(range(1, min(4, cores) + 1)) if cores > 1 else [1, 2]
+    results = {workers: _bench_ticks_per_second(workers) for workers in counts}
+
+    for workers, total in results.items():
+        print(f"{BENCH_ROOMS} bot rooms on {workers} worker process(es), {cores} core(s): "
+              f"{total:.0f} ticks/s in total ({total / results[1]:.2f}x)")
+    best = max(results.values())
+    if cores > 1:
+        assert best > 1.3 * results[1], "More worker processes must tick more rooms per second on a multi-core host"
+    else:
+        assert results[counts[-1]] > 0.5 * results[1], "Extra workers on one core must not collapse throughput"
@@ -0,0 +1,127 @@
+"""
+Tests for the on-demand sampling profiler (BASE_files/BASE_sampler.py).
+Profiles a headless match and checks that the collapsed stacks name
+Arena.handle_collisions, that the output is in the format flame-graph tools
+read, and that the measured overhead stays within MAX_OVERHEAD. Then starts
+runs through SIGUSR1 and through the admin message on a live server.
+"""
+
+import os
+import re
+import shutil
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from BASE_components.BASE_test_helpers import environment, free_port, patched, temporary_directory
+from BASE_files.BASE_sampler import MAX_OVERHEAD, StackSampler, install_signal_handler, stack_sampler
+from BASE_files.network_client import NetworkClient
+from GameFolder.arenas.GAME_arena import Arena
+from GameFolder.characters.GAME_character import Character
+
+COLLAPSED_LINE = re.compile(r"^thread:[^;]+(;[^;]+:[^;]+)* \d+$")
+
+
+def _arena():
+    arena = Arena(800, 600, headless=True)
+    for index in range(4):
+        arena.add_character(Character(f"Bot{index}", "", "", [150.0 + index * 150, 300.0]))
+    return arena
+
+
+def _play(arena, seconds):
+    """Ticks the arena for `seconds`; returns the ticks run."""
+    ticks = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        arena._update_simulation(arena.tick_interval)
+        ticks += 1
+    return ticks
+
+
+def test_headless_match_profile_names_handle_collisions():
+    with temporary_directory() as tmp_path:
+        arena = _arena()
+        baseline = _play(arena, 1.0)
+
+        sampler = StackSampler(str(tmp_path))
+        output_path = str(tmp_path / "match.folded")
+        assert sampler.start(seconds=1.0, rate=200, output_path=output_path)
+        assert not sampler.start(), "Only one run at a time"
+        sampled = _play(arena, 1.0)
+        assert sampler.wait(timeout=10.0) == output_path
+
+        with open(output_path) as f:
+            lines = f.read().splitlines()
+        assert lines and all(COLLAPSED_LINE.match(line) for line in lines), lines[:3]
+        assert any("Arena.handle_collisions" in line for line in lines), "Collision frames are sampled"
+        main_thread = sum(int(line.rsplit(" ", 1)[1]) for line in lines if line.startswith("thread:MainThread;"))
+        assert main_thread == sampler.samples
+        print(f"Sampler: {sampler.samples} samples, {len(lines)} stacks, overhead {sampler.overhead() * 100:.2f}%, "
+              f"arena ticks in 1 s: {baseline} without, {sampled} with")
+        assert sampler.overhead() <= MAX_OVERHEAD * 1.1
+
+
+@contextmanager
+def _sampling_to_temporary_directory():
+    """Point the process-wide sampler at a fresh directory; any run it started is finished afterwards."""
+    with temporary_directory() as tmp_path, patched(stack_sampler, "output_dir", str(tmp_path)):
+        try:
+            yield tmp_path
+        finally:
+            stack_sampler.stop()
+            stack_sampler.wait(timeout=10.0)
+
+
+def test_sigusr1_starts_a_run():
+    if not hasattr(signal, "SIGUSR1"):
+        return  # No SIGUSR1 on this platform
+    with _sampling_to_temporary_directory() as output_dir, environment(CC_SAMPLE_SECONDS="0.3"):
+        previous = signal.getsignal(signal.SIGUSR1)
+        try:
+            assert install_signal_handler()
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.05)  # The handler runs in the main thread at the next bytecode boundary
+            output = stack_sampler.wait(timeout=10.0)
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+        assert output is not None and os.path.dirname(output) == str(output_dir)
+        assert os.path.getsize(output) > 0
+
+
+def test_admin_message_samples_live_server():
+    with _sampling_to_temporary_directory():
+        from server import GameServer
+
+        port = free_port()
+        server = GameServer('127.0.0.1', port, practice_mode=True)
+        client = NetworkClient('127.0.0.1', port)
+        reports = []
+        client.on_profiler_report = reports.append
+        client.on_file_sync_received = lambda manifest: client.acknowledge_file_sync()
+        try:
+            threading.Thread(target=server.start, daemon=True).start()
+            assert client.connect("Admin")
+            client.request_file_sync()
+            deadline = time.time() + 10.0
+            while not server.arena and time.time() < deadline:
+                client.update()
+                time.sleep(0.005)
+
+            client.request_profiler('sample', seconds=1.0, rate=100)
+            deadline = time.time() + 10.0
+            while not reports and time.time() < deadline:
+                client.send_input({'mouse_pos': [100, 200], 'movement': [1, 0]})
+                client.update()
+                time.sleep(1 / 60)
+            assert reports and reports[0]['sampler']['running']
+            output = stack_sampler.wait(timeout=10.0)
+        finally:
+            client.disconnect()
+            server.stop()
+            shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+
+        with open(output) as f:
+            profile = f.read()
+        assert "server:GameServer._game_loop" in profile, "The game thread is sampled"
+        assert "server:GameServer._network_loop" in profile, "So is the network thread"
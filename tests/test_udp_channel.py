@@ -0,0 +1,193 @@
+"""
+Tests for the optional datagram channel (BASE_files/BASE_datagram.py).
+Runs a live GameServer with UDP clients behind a relay that drops and reorders
+datagrams, and measures how old the newest rendered game_state is at each
+client frame. The same loss pattern is also replayed in order with a 200 ms
+retransmission (what TCP would do) to show the head-of-line blocking avoided.
+Also checks the TCP-only fallback when no datagram gets through.
+"""
+
+import heapq
+import random
+import select
+import shutil
+import socket
+import threading
+import time
+from BASE_components.BASE_test_helpers import free_port, patched
+import BASE_files.network_client as network_client
+from BASE_files.BASE_datagram import SequenceFilter, pack_datagram, unpack_datagram, KIND_STATE
+from BASE_files.network_client import NetworkClient
+
+CLIENT_COUNT = 4
+MEASURE_SECONDS = 2.0
+RETRANSMIT_DELAY = 0.2  # Linux minimum TCP RTO
+
+
+def test_datagram_round_trip_and_sequence_filter():
+    token = b'12345678'
+    parsed = unpack_datagram(pack_datagram(token, 7, KIND_STATE, b'state'))
+    assert parsed[:3] == (token, 7, KIND_STATE) and bytes(parsed[3]) == b'state'
+    assert unpack_datagram(b'junk') is None
+
+    sequence_filter = SequenceFilter()
+    accepted = [seq for seq in [1, 2, 4, 3, 4, 6, 5, 7] if sequence_filter.accept(seq)]
+    assert accepted == [1, 2, 4, 6, 7]
+    assert sequence_filter.stale == 3 and sequence_filter.gaps == 2
+
+
+class _LossyRelay:
+    """
+    UDP relay between one client and the server.
+    Server -> client datagrams are dropped with probability `loss` and delayed by a random
+    jitter (which reorders them). With in_order=True a dropped datagram is instead
+    retransmitted after RETRANSMIT_DELAY and holds back everything behind it, like TCP.
+    """
+
+    def __init__(self, server_address, loss=0.0, jitter=0.0, in_order=False, seed=1):
+        self.server_address = server_address
+        self.loss = loss
+        self.jitter = jitter
+        self.in_order = in_order
+        self.rng = random.Random(seed)
+        self.client_side = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.client_side.bind(('127.0.0.1', 0))
+        self.server_side = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server_side.connect(server_address)
+        self.address = self.client_side.getsockname()
+        self.client_address = None
+        self.queue = []  # (deliver_at, order, data)
+        self.order = 0
+        self.last_delivery = 0.0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _schedule(self, data):
+        now = time.time()
+        delay = self.rng.uniform(0, self.jitter)
+        if self.rng.random() < self.loss:
+            if not self.in_order:
+                return
+            delay += RETRANSMIT_DELAY
+        deliver_at = now + delay
+        if self.in_order:
+            deliver_at = max(deliver_at, self.last_delivery)
+            self.last_delivery = deliver_at
+        self.order += 1
+        heapq.heappush(self.queue, (deliver_at, self.order, data))
+
+    def _run(self):
+        while self.running:
+            timeout = 0.002 if self.queue else 0.02
+            readable, _, _ = select.select([self.client_side, self.server_side], [], [], timeout)
+            try:
+                if self.client_side in readable:
+                    data, self.client_address = self.client_side.recvfrom(65536)
+                    self.server_side.send(data)  # Client -> server is left lossless
+                if self.server_side in readable:
+                    self._schedule(self.server_side.recv(65536))
+            except OSError:
+                pass
+            now = time.time()
+            while self.queue and self.queue[0][0] <= now:
+                _, _, data = heapq.heappop(self.queue)
+                if self.client_address:
+                    self.client_side.sendto(data, self.client_address)
+
+    def close(self):
+        self.running = False
+        self.thread.join(1.0)
+        self.client_side.close()
+        self.server_side.close()
+
+
+def _run_match(relay_options, duration=MEASURE_SECONDS):
+    """Practice match with UDP clients behind lossy relays; returns state ages and channel state before teardown."""
+    from server import GameServer
+
+    port = free_port()
+    server = GameServer('127.0.0.1', port, practice_mode=True)
+    clients, relays, ages = [], [], []
+    try:
+        threading.Thread(target=server.start, daemon=True).start()
+        for index in range(CLIENT_COUNT):
+            relay = _LossyRelay(('127.0.0.1', port), seed=index, **relay_options)
+            relays.append(relay)
+            client = NetworkClient('127.0.0.1', port, use_udp=True)
+            open_channel = client._open_udp_channel
+            client._open_udp_channel = lambda token, address, r=relay, o=open_channel: o(token, r.address)
+            client.on_file_sync_received = lambda manifest, c=client: c.acknowledge_file_sync()
+            client.latest_state_time = None
+            client.on_game_state_received = lambda state, c=client: setattr(c, 'latest_state_time', state['timestamp'])
+            assert client.connect(f"Udp{index}")
+            client.request_file_sync()
+            clients.append(client)
+
+        deadline = time.time() + 10.0
+        while time.time() < deadline and not all(c.udp_active and c.latest_state_time for c in clients):
+            for client in clients:
+                client.update()
+            time.sleep(0.005)
+
+        start = time.time()
+        frame = 0
+        while time.time() - start < duration:
+            frame += 1
+            for index, client in enumerate(clients):
+                client.send_input({'mouse_pos': [100 + frame % 50, 200], 'movement': [(-1) ** index, 0]})
+                client.update()
+                if client.latest_state_time:
+                    ages.append(time.time() - client.latest_state_time)
+            time.sleep(1 / 60)
+        return {
+            'ages': sorted(ages),
+            'udp_active': [c.udp_active for c in clients],
+            'fell_back': [c.udp_socket is None and c.udp_token is None for c in clients],
+            'server_disabled': [s.disabled for s in server.udp_sessions.values()],
+            'stale': sum(c.udp_state_filter.stale for c in clients),
+            'gaps': sum(c.udp_state_filter.gaps for c in clients),
+        }
+    finally:
+        for client in clients:
+            client.disconnect()
+        server.stop()
+        for relay in relays:
+            relay.close()
+        shutil.rmtree(server.server_patches_dir, ignore_errors=True)
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def test_state_freshness_under_loss_and_reordering():
+    """Datagrams keep the rendered state fresh under loss; in-order delivery stalls behind losses."""
+    scenarios = [
+        ("udp, lossless", {}),
+        ("udp, 10% loss + 30 ms jitter", {'loss': 0.10, 'jitter': 0.03}),
+        ("in-order (TCP model), 10% loss + 30 ms jitter", {'loss': 0.10, 'jitter': 0.03, 'in_order': True}),
+    ]
+    results = {}
+    for label, options in scenarios:
+        match = _run_match(options)
+        ages = match['ages']
+        assert ages, f"{label}: no game state rendered"
+        assert all(match['udp_active']), f"{label}: UDP channel never came up"
+        results[label] = (_percentile(ages, 0.5), _percentile(ages, 0.99))
+        print(f"{label}: state age p50 {results[label][0]:.1f} ms, p99 {results[label][1]:.1f} ms, "
+              f"{match['gaps']} states lost, {match['stale']} late states dropped")
+
+    udp_p99 = results["udp, 10% loss + 30 ms jitter"][1]
+    tcp_p99 = results["in-order (TCP model), 10% loss + 30 ms jitter"][1]
+    assert udp_p99 < tcp_p99, "Datagrams should avoid head-of-line stalls"
+
+
+def test_falls_back_to_tcp_when_no_datagrams_arrive():
+    """With every datagram dropped the client reports udp_disable and keeps receiving state over TCP."""
+    with patched(network_client, 'UDP_FALLBACK_TIMEOUT', 1.0):
+        match = _run_match({'loss': 1.0}, duration=1.5)
+        assert all(match['fell_back']) and not any(match['udp_active'])
+        assert len(match['server_disabled']) == CLIENT_COUNT and all(match['server_disabled'])
+        ages = match['ages']
+        assert ages and ages[len(ages) // 2] < 0.2, "State should keep flowing over TCP after the fallback"
@@ -0,0 +1,72 @@
+"""
+Tests for the server worker pool (BASE_files/BASE_workers.py).
+Checks that completion callbacks only run on the owner's loop, that job errors
+reach the callback, that CPU jobs run in another process and that a saturated
+pool degrades to inline work. The 50 MB backup transfer benchmark lives in
+tests/test_worker_pool_transfer.py.
+"""
+
+import os
+import threading
+import time
+from BASE_components.BASE_test_helpers import patched
+import BASE_files.BASE_workers as workers
+from BASE_files.BASE_workers import WorkerPool
+
+
+def _fail(message):
+    raise ValueError(message)
+
+
+def test_callbacks_run_only_on_the_loop_thread():
+    pool = WorkerPool(use_process=False)
+    seen = []
+    try:
+        pool.submit_io(threading.get_ident, callback=lambda result, error: seen.append((result, threading.get_ident(), error)))
+        pool.submit_io(_fail, "boom", callback=lambda result, error: seen.append((result, threading.get_ident(), error)))
+        deadline = time.time() + 5.0
+        while pool.pending and time.time() < deadline:
+            time.sleep(0.005)
+        assert seen == [], "Callbacks must wait for run_callbacks()"
+        assert pool.run_callbacks() == 2
+
+        worker_thread, loop_thread, error = next(entry for entry in seen if entry[2] is None)
+        assert worker_thread != loop_thread == threading.get_ident()
+        failed = next(entry for entry in seen if entry[2] is not None)
+        assert isinstance(failed[2], ValueError) and str(failed[2]) == "boom"
+    finally:
+        pool.shutdown()
+
+
+def test_cpu_jobs_run_in_a_worker_process():
+    pool = WorkerPool(use_process=True)
+    pids = []
+    try:
+        pool.submit_cpu(os.getpid, callback=lambda result, error: pids.append(result))
+        deadline = time.time() + 30.0
+        while not pids and time.time() < deadline:
+            pool.run_callbacks()
+            time.sleep(0.01)
+        assert pids and pids[0] != os.getpid()
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_pool_runs_jobs_inline():
+    with patched(workers, "MAX_PENDING_JOBS", 1):
+        pool = WorkerPool(use_process=False, io_workers=1)
+        release = threading.Event()
+        results = []
+        try:
+            pool.submit_io(release.wait, 5.0, callback=lambda result, error: results.append('queued'))
+            pool.submit_io(lambda: 'inline', callback=lambda result, error: results.append(result))
+            assert pool.jobs_inline == 1
+            release.set()
+            deadline = time.time() + 5.0
+            while len(results) < 2 and time.time() < deadline:
+                pool.run_callbacks()
+                time.sleep(0.005)
+            assert results == ['inline', 'queued']
+        finally:
+            release.set()
+            pool.shutdown()
@@ -0,0 +1,157 @@
+"""
+Benchmark for the server worker pool (BASE_files/BASE_workers.py).
+Streams a 50 MB backup from a client process into a live practice match and
+compares tick and network-loop timing with the old inline extraction against
+the pooled one: with the pool, tick p99 must stay within one tick budget and
+the network loop must no longer block on extraction.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from BASE_components.BASE_test_helpers import free_port, temporary_directory, working_directory
+from BASE_files.BASE_workers import WorkerPool
+from BASE_files.network_client import NetworkClient
+from coding.non_callable_tools.backup_handling import BackupHandler
+
+BACKUP_FILES = 50
+FILE_SIZE = 1024 * 1024
+SETTLE_SECONDS = 0.5  # Keep timing after completion so a stall that ended the transfer is counted
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The uploading player runs in its own process, like a remote client: its tar.gz work must not share our GIL
+UPLOADER = """
+import sys, time
+from BASE_files.network_client import NetworkClient
+client = NetworkClient('127.0.0.1', int(sys.argv[1]))
+client.backups_root = sys.argv[2]
+client.on_file_sync_received = lambda manifest: client.acknowledge_file_sync()
+assert client.connect('Uploader')
+client.request_file_sync()
+deadline = time.time() + 120.0
+while time.time() < deadline:
+    client.update()
+    time.sleep(0.001)
+"""
+
+
+def _make_backup(root):
+    """A backup of incompressible files, named by its directory hash like real backups."""
+    pending = root / 'pending'
+    pending.mkdir(parents=True)
+    for index in range(BACKUP_FILES):
+        (pending / f'asset_{index:02d}.bin').write_bytes(os.urandom(FILE_SIZE))
+    backup_name = BackupHandler(str(root)).compute_directory_hash(str(pending))
+    os.rename(pending, root / backup_name)
+    return backup_name
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def _match_with_backup_transfer(tmp_path, client_backups, backup_name, inline):
+    """Practice match while a second player streams a full backup; returns timing during the transfer."""
+    from server import GameServer
+
+    port = free_port()
+    server = GameServer('127.0.0.1', port, practice_mode=True)
+    patches_dir = os.path.abspath(server.server_patches_dir)
+    if inline:
+        server.workers.shutdown()
+        server.workers = WorkerPool(inline=True)
+    run_dir = tmp_path / ('inline' if inline else 'pooled')
+    run_dir.mkdir()
+
+    ticks, loop_passes = [], []  # (started, tick seconds), pass start times
+    game_step = server._game_step
+    handle_messages = server._handle_client_messages
+
+    def timed_step(*args, **kwargs):
+        started = time.perf_counter()
+        ticked = game_step(*args, **kwargs)
+        if ticked:
+            ticks.append((started, time.perf_counter() - started))
+        return ticked
+
+    def timed_messages(*args, **kwargs):
+        loop_passes.append(time.perf_counter())
+        return handle_messages(*args, **kwargs)
+
+    server._game_step = timed_step
+    server._handle_client_messages = timed_messages
+    player = NetworkClient('127.0.0.1', port)
+    done = []
+    server._finish_backup_transfer = lambda name, success, f=server._finish_backup_transfer: (done.append(success), f(name, success))
+    uploader = None
+    with working_directory(run_dir):
+        try:
+            threading.Thread(target=server.start, daemon=True).start()
+            player.on_file_sync_received = lambda manifest: player.acknowledge_file_sync()
+            assert player.connect("Player")
+            player.request_file_sync()
+            uploader = subprocess.Popen([sys.executable, '-c', UPLOADER, str(port), str(client_backups)], cwd=PROJECT_ROOT,
+                                        env=dict(os.environ, PYTHONPATH=PROJECT_ROOT, SDL_VIDEODRIVER='dummy'),
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            deadline = time.time() + 30.0
+            while 'Uploader' not in server.clients and time.time() < deadline:
+                player.update()
+                time.sleep(0.005)
+            assert 'Uploader' in server.clients, "Uploader process did not connect"
+
+            server._request_backup_from_client('Uploader', backup_name, full=True)
+            start = time.perf_counter()
+            deadline = time.time() + 90.0
+            frame = 0
+            finished = None
+            while (finished is None or time.time() - finished < SETTLE_SECONDS) and time.time() < deadline:
+                frame += 1
+                player.send_input({'mouse_pos': [100 + frame % 50, 200], 'movement': [1, 0]})
+                player.update()
+                time.sleep(1 / 60)
+                if done and finished is None:
+                    finished = time.time()
+                    elapsed = time.perf_counter() - start
+
+            gaps = lambda stamps: [b - a for a, b in zip(stamps, stamps[1:]) if a >= start]
+            return {
+                'success': done == [True] and (run_dir / '__game_backups' / backup_name).is_dir(),
+                'ticks': [seconds for started, seconds in list(ticks) if started >= start],
+                'loop': gaps(list(loop_passes)),
+                'elapsed': elapsed if finished else None,
+                'tick_interval': server.tick_interval,
+            }
+        finally:
+            if uploader is not None:
+                uploader.kill()
+                uploader.wait()
+            player.disconnect()
+            server.stop()
+            shutil.rmtree(patches_dir, ignore_errors=True)
+
+
+def test_backup_transfer_keeps_ticks_on_budget():
+    """Extracting and verifying a 50 MB backup must not stall the game or network loop."""
+    with temporary_directory() as tmp_path:
+        client_backups = tmp_path / 'client_backups'
+        backup_name = _make_backup(client_backups)
+
+        results = {}
+        for label, inline in (("inline", True), ("pooled", False)):
+            result = _match_with_backup_transfer(tmp_path, client_backups, backup_name, inline)
+            results[label] = result
+            assert result['success'], f"{label}: backup was not received and verified"
+            assert result['ticks'], f"{label}: no ticks during the transfer"
+            print(f"{label:>6}: {BACKUP_FILES} MB backup in {result['elapsed']:.2f}s, "
+                  f"tick p50 {_percentile(result['ticks'], 0.5):.1f} ms p99 {_percentile(result['ticks'], 0.99):.1f} ms "
+                  f"max {max(result['ticks']) * 1000:.1f} ms, "
+                  f"network loop p99 {_percentile(result['loop'], 0.99):.1f} ms max {max(result['loop']) * 1000:.1f} ms")
+
+        pooled = results["pooled"]
+        budget = pooled['tick_interval'] * 1000
+        assert _percentile(pooled['ticks'], 0.99) < budget, "Tick p99 must stay within the tick budget"
+        assert max(pooled['loop']) < max(results["inline"]['loop']), "Network loop should no longer block on extraction"